@@ -1,10 +1,10 @@
 import streamlit as st
-from supabase import create_client
 from typing import Optional, Dict, Any, Tuple
 import pandas as pd
 import traceback # Import traceback for detailed error logging
 import math
 import time
+import uuid
 from datetime import datetime # <-- AÑADIR IMPORTACIÓN
 
 # Configuración de página - MOVER AL INICIO
@@ -18,6 +18,8 @@ st.set_page_config(
 # Auth y DB
 from src.auth.auth_manager import AuthManager
 from src.data.database import DBManager
+from src.data.conexion_supabase import crear_cliente_compartido, estadisticas_pool
+from src.data.cache_datos import cache_datos, CATALOGO
 # --- NUEVO: Importar CotizacionManager ---
 from src.logic.cotizacion_manager import CotizacionManager, CotizacionManagerError
 # ---------------------------------------
@@ -37,20 +39,34 @@ from src.config.constants import (
 # Utils y PDF
 from src.utils.session_manager import SessionManager
 from src.pdf.pdf_generator import generar_bytes_pdf_cotizacion, CotizacionPDF # Importar la nueva función helper y la clase
+from src.pdf.pdf_anticipado import nombre_archivo_pdf
 
 # Calculadoras
 from src.logic.calculators.calculadora_costos_escala import CalculadoraCostosEscala, DatosEscala
 from src.logic.calculators.calculadora_litografia import CalculadoraLitografia
+from src.logic.calculators.curva_precio import CurvaPrecio
+from src.logic.calculators.solver_precio import SolverPrecio
+from src.logic.grafo_cotizacion import construir_grafo_cotizacion, entradas_desde_formulario
+from src.logic.cache_calculos import cache_calculos
+from src.logic.corpus_calculos import corpus_calculos
+from src.logic.snapshot_calculo import CLAVE_SNAPSHOT, evaluar_con_snapshot, snapshot_desde_parametros
 # --- NUEVO: Importar generador de informe ---
 from src.logic.report_generator import generar_informe_tecnico_markdown, markdown_a_pdf
 # --------------------------------------------
 
 # UI Components - mover estas importaciones al final
+from src.ui.perfil_ui import perfilar_rerun, mostrar_perfilador
+from src.utils.perfilador import tramo, medir, CALCULO
+from src.utils.metricas import CALCULO_DURACION, iniciar_exportacion, registrar_actividad_sesion
+from src.ui.trabajos_ui import enviar_trabajo, mostrar_trabajo, descartar_trabajo
+from src.ui.pdf_anticipado_ui import (
+    anticipar_pdf_cotizacion, usar_pdf_anticipado, pdf_anticipado_listo, cancelar_pdf_anticipado
+)
 from src.ui.auth_ui import handle_authentication, show_login, show_user_info, show_profile_update
 from src.ui.calculator_view import show_calculator, show_quote_results # Mantener solo los usados
 # MODIFICADO: Importar funciones específicas
-from src.ui.calculator.product_section import (_mostrar_material, _mostrar_adhesivo, 
-                                             _mostrar_grafado_altura, mostrar_secciones_internas_formulario)
+from src.ui.calculator.client_section import selector_cliente
+from src.ui.calculator.product_section import seccion_material_adhesivo, mostrar_secciones_internas_formulario
 # --- NUEVO: Importar vista de gestión y dashboard ---
 from src.ui.manage_quotes_view import show_manage_quotes
 from src.ui.manage_clients_view import show_manage_clients, show_create_client
@@ -85,11 +101,18 @@ def initialize_session_state():
 
 def initialize_services():
     """Inicializa los servicios principales (Supabase, Auth, DB) si no existen"""
+    # Exportación de métricas del proceso (solo la primera vez) y actividad de la sesión
+    iniciar_exportacion()
+    if 'sesion_metricas_id' not in st.session_state:
+        st.session_state.sesion_metricas_id = uuid.uuid4().hex
+    registrar_actividad_sesion(st.session_state.sesion_metricas_id)
+
     try:
         if 'supabase' not in st.session_state:
             supabase_url = st.secrets["SUPABASE_URL"]
             supabase_key = st.secrets["SUPABASE_KEY"]
-            st.session_state.supabase = create_client(supabase_url, supabase_key)
+            # Cliente liviano por sesión sobre el pool HTTP compartido del proceso
+            st.session_state.supabase = crear_cliente_compartido(supabase_url, supabase_key)
         
         if 'auth_manager' not in st.session_state:
             st.session_state.auth_manager = AuthManager(st.session_state.supabase)
@@ -112,33 +135,38 @@ def initialize_services():
         st.error(f"Error crítico inicializando servicios: {e}")
         st.stop()
 
-@st.cache_resource
 def load_initial_data() -> Dict[str, Any]:
     """
     Carga los datos iniciales necesarios para la calculadora.
     
+    Los datos pasan por RLS, así que se guardan en la caché de datos por principal
+    (rol + usuario, ver src/data/cache_datos.py) y no en un st.cache_resource global,
+    que serviría a todos los usuarios lo que leyó el primero. Cambiar precios
+    invalida el dominio 'catalogo'.
+    
     Returns:
         Dict con los datos necesarios para la operación de la calculadora
     """
+    db = st.session_state.db
+    return cache_datos.obtener_o_calcular(
+        CATALOGO, db.principal(), 'load_initial_data', (), lambda: _cargar_datos_iniciales(db),
+        ttl=600, guardar_vacios=False,
+    )
+
+def _cargar_datos_iniciales(db: DBManager) -> Dict[str, Any]:
     try:
-        db = st.session_state.db
         # Cargar datos base sujetos a RLS
         data = {
             'materiales': db.get_materiales(),
             'acabados': db.get_acabados(),
             'tipos_producto': db.get_tipos_producto(),
-            # Clientes: admin ve todos; comercial solo propios
-            'clientes': (
-                db.get_clientes() if st.session_state.get('usuario_rol') == 'administrador'
-                else db.get_clientes_by_comercial(st.session_state.get('comercial_id'))
-            ),
             'tipos_grafado': db.get_tipos_grafado(),
             'adhesivos': db.get_adhesivos(),
             'estados_cotizacion': db.get_estados_cotizacion() # <-- AÑADIDO
         }
         
         # Verificar que se obtuvieron todos los datos necesarios (excluding adhesives for now as they might be optional initially)
-        required_data = ['materiales', 'acabados', 'tipos_producto', 'clientes', 
+        required_data = ['materiales', 'acabados', 'tipos_producto',
                          'tipos_grafado', 'estados_cotizacion'] # <-- AÑADIDO a la verificación
         missing_data = [k for k in required_data if k not in data or not data[k]]
         if missing_data:
@@ -153,6 +181,7 @@ def load_initial_data() -> Dict[str, Any]:
             st.exception(e)
         return {}
 
+@medir(CALCULO)
 def handle_calculation(form_data: Dict[str, Any], cliente_obj: Cliente) -> Optional[Dict[str, Any]]:
     """
     Maneja el proceso de cálculo de la cotización.
@@ -195,279 +224,77 @@ def handle_calculation(form_data: Dict[str, Any], cliente_obj: Cliente) -> Optio
             print(f"Ajustar Planchas: {st.session_state.get('ajustar_planchas')}, Valor: {st.session_state.get('precio_planchas')}")
             print(f"Ajustar Rentabilidad: {st.session_state.get('rentabilidad_ajustada')}")
         
-        # Crear instancia de calculadora
-        calculadora = CalculadoraCostosEscala(ancho_maximo=ANCHO_MAXIMO_MAQUINA)
-        
-        # Preparar datos para el cálculo
         es_manga = form_data['es_manga']
         num_tintas = form_data['num_tintas']
-        material_id = form_data['material_id']
-        adhesivo_id = form_data.get('adhesivo_id')
-        
-        # Obtener material y acabado de la base de datos
-        # REMOVED: material = st.session_state.db.get_material(material_id) # No longer needed for price
-        acabado = st.session_state.db.get_acabado(form_data.get('acabado_id')) if not es_manga else None
-        
-        # --- Determinar Valor Material --- 
-        valor_material_base = 0.0
-        ID_SIN_ADHESIVO = 4 # Assuming ID 4 corresponds to "Sin adhesivo"
-
-        if not es_manga and adhesivo_id:
-            # Etiqueta con adhesivo: Buscar valor combinado
-            print(f"Buscando valor para Material ID: {material_id}, Adhesivo ID: {adhesivo_id}")
-            valor_combinado = st.session_state.db.get_material_adhesivo_valor(material_id, adhesivo_id)
-            if valor_combinado is not None:
-                valor_material_base = valor_combinado
-                print(f"Valor combinado encontrado: {valor_material_base}")
-            else:
-                st.error(f"No se encontró precio para la combinación de Material ID {material_id} y Adhesivo ID {adhesivo_id}. Por favor, verifique la configuración.")
-                return None # Stop calculation if price not found
-        elif not es_manga and not adhesivo_id:
-            # Etiqueta SIN adhesivo seleccionado - REQUERIDO?
-            st.error("Para Etiquetas, debe seleccionar un Adhesivo.")
-            # Alternative: Fetch base material price if adhesive is optional
-            # material = st.session_state.db.get_material(material_id)
-            # if material:
-            #     valor_material_base = material.valor
-            # else:
-            #     st.error(f"Material base ID {material_id} no encontrado.")
-            #     return None
-            return None # Assuming adhesive is required for etiquetas for now
-        elif es_manga:
-            # Manga: Buscar valor usando el ID del material y el ID de "Sin adhesivo"
-            print(f"Buscando valor para Material ID (Manga): {material_id}, Adhesivo ID: {ID_SIN_ADHESIVO}")
-            valor_manga = st.session_state.db.get_material_adhesivo_valor(material_id, ID_SIN_ADHESIVO)
-            if valor_manga is not None:
-                valor_material_base = valor_manga
-                print(f"Valor encontrado para manga: {valor_material_base}")
-            else:
-                st.error(f"No se encontró precio base para el Material de Manga ID {material_id} (con adhesivo 'Sin adhesivo'). Verifique la tabla material_adhesivo.")
-                return None
-        # --- Fin Determinar Valor Material ---
-
-        # === Aplicar Ajustes Admin (si existen y están activos) ===
-        valor_material = valor_material_base # Start with the fetched value
-        if st.session_state.get('ajustar_material'):
-            valor_material = st.session_state.get('valor_material_ajustado', valor_material)
-            print(f"ADMIN: Usando valor material ajustado: {valor_material}")
-
-        # --- Troquel Cost Logic --- 
-        valor_troquel_a_pasar = None # Default to None (signal internal calculation)
-        if st.session_state.get('ajustar_troquel'):
-            valor_troquel_a_pasar = st.session_state.get('precio_troquel', 0.0) # Use admin value if adjusting
-            print(f"ADMIN: Usando valor troquel ajustado: {valor_troquel_a_pasar}")
-        # Else: valor_troquel_a_pasar remains None
-        # --- End Troquel Cost Logic ---
-        
-        # --- Plate cost Logic (already correct, but confirming) ---
-        valor_plancha_a_pasar = None # Default to None (signal internal calculation)
-        if st.session_state.get('ajustar_planchas'):
-            # Use the TOTAL adjusted price directly
-            valor_plancha_a_pasar = st.session_state.get('precio_planchas', 0.0)
-            print(f"ADMIN: Usando valor TOTAL de planchas ajustado: {valor_plancha_a_pasar}")
-        # Else: valor_plancha_a_pasar remains None
-        # --- End Plate cost Logic ---
-
-        rentabilidad = RENTABILIDAD_MANGAS if es_manga else RENTABILIDAD_ETIQUETAS
-        rentabilidad_ajustada = st.session_state.get('rentabilidad_ajustada')
-        if rentabilidad_ajustada is not None and rentabilidad_ajustada > 0:
-            rentabilidad = rentabilidad_ajustada / 100.0  # Convertir % a decimal
-            print(f"ADMIN: Usando rentabilidad ajustada: {rentabilidad}")
-        else:
-            print(f"Usando rentabilidad por defecto: {rentabilidad}")
+        acabado_id = form_data.get('acabado_id')
 
-        # Procesar troquel_existe explícitamente
-        troquel_existe = form_data.get('tiene_troquel')
-        print(f"\n=== DEBUG TROQUEL EXISTE ===")
-        print(f"Valor original: {troquel_existe} (tipo: {type(troquel_existe)})")
-        
-        # Conversión más explícita y segura a booleano
-        if isinstance(troquel_existe, str):
-            troquel_existe_lower = troquel_existe.lower()
-            # Para el caso específico de "Sí"/"No" de la UI
-            if troquel_existe == "Sí":
-                troquel_existe = True
-            elif troquel_existe == "No":
-                troquel_existe = False
-            else:
-                # Para otros casos de string
-                troquel_existe = troquel_existe_lower == 'true' or troquel_existe_lower == 'yes' or troquel_existe_lower == '1'
-        elif isinstance(troquel_existe, (int, float)):
-            troquel_existe = troquel_existe > 0
-        else:
-            troquel_existe = bool(troquel_existe)
-            
-        print(f"Valor procesado: {troquel_existe} (tipo: {type(troquel_existe)})")
-        
-        # Ajustar el ancho si es manga
-        ancho_base = form_data['ancho']
-        if es_manga:
-            # Caso excepcional: Fundas Transparentes (0 Tintas)
-            if form_data.get('num_tintas', 0) == 0:
-                ancho_ajustado = (ancho_base * 2) + 6
-                print(f"\n=== AJUSTE DE ANCHO PARA MANGA - FUNDA TRANSPARENTE (0 TINTAS) ===")
-                print(f"Ancho original (cerrado): {ancho_base}")
-                print(f"Fórmula aplicada: (ancho * 2) + 6 = ({ancho_base} * 2) + 6 = {ancho_ajustado}")
-                # Validación de máximo permitido 415mm (efectivo)
-                if ancho_ajustado > 415:
-                    st.error(f"El ancho efectivo ({ancho_ajustado:.2f} mm) excede el máximo permitido (415 mm) para fundas transparentes.")
-                    return None
-                # Restricción de grafado: >325mm no permite grafado
-                if ancho_ajustado > 325:
-                    # Forzar grafado a 'Sin grafado' (ID=1) si es necesario
-                    try:
-                        if form_data.get('tipo_grafado_id') not in (None, 1):
-                            print("Grafado no permitido (>325mm) en funda transparente. Forzando 'Sin grafado'.")
-                            form_data['tipo_grafado_id'] = 1
-                            form_data['tipo_grafado_nombre'] = 'Sin grafado'
-                    except Exception:
-                        pass
-            else:
-                ancho_ajustado = (ancho_base * FACTOR_ANCHO_MANGAS) + INCREMENTO_ANCHO_MANGAS
-                print(f"\n=== AJUSTE DE ANCHO PARA MANGA ===")
-                print(f"Ancho original: {ancho_base}")
-                print(f"Factor manga: {FACTOR_ANCHO_MANGAS}")
-                print(f"Incremento manga: {INCREMENTO_ANCHO_MANGAS}")
-                print(f"Ancho ajustado: ({ancho_base} * {FACTOR_ANCHO_MANGAS}) + {INCREMENTO_ANCHO_MANGAS} = {ancho_ajustado}")
-        else:
-            ancho_ajustado = ancho_base
-        
-        # Usar las escalas definidas por el usuario
-        # Imprimir el valor de troquel_existe justo antes de asignarlo
-        print(f"\n=== DEBUG TROQUEL EXISTE JUSTO ANTES DE CREAR DATOS_ESCALA ===")
-        print(f"Valor a asignar a datos_escala.troquel_existe: {troquel_existe} (tipo: {type(troquel_existe)})")
-        
-        datos_escala = DatosEscala(
-            escalas=form_data['escalas'],
-            pistas=form_data['pistas'],
-            ancho=ancho_ajustado,
-            avance=form_data['avance'],
-            avance_total=form_data['avance'] + (GAP_AVANCE_MANGAS if es_manga else GAP_AVANCE_ETIQUETAS),
-            desperdicio=0,
-            velocidad_maquina=VELOCIDAD_MAQUINA_MANGAS_7_TINTAS if (es_manga and num_tintas >= 7) 
-                            else VELOCIDAD_MAQUINA_NORMAL,
-            rentabilidad=rentabilidad,  # Usar la rentabilidad determinada (ajustada o defecto)
-            porcentaje_desperdicio=DESPERDICIO_MANGAS if es_manga else DESPERDICIO_ETIQUETAS,
-            valor_metro=valor_material, # Usar el valor de material determinado (combinado/base + ajustado)
-            troquel_existe=troquel_existe,
-            planchas_por_separado=form_data.get('planchas_separadas', False),
-            unidad_montaje_dientes=form_data.get('unidad_montaje_dientes')
-        )
-        
-        # Verificar inmediatamente después de crear datos_escala
-        print(f"\n=== DEBUG TROQUEL EXISTE INMEDIATAMENTE DESPUÉS DE CREAR DATOS_ESCALA ===")
-        print(f"Valor asignado a datos_escala.troquel_existe: {datos_escala.troquel_existe} (tipo: {type(datos_escala.troquel_existe)})")
-        
-        # --- Calcular Mejor Opción de Desperdicio UNA VEZ ---
-        calc_lito = CalculadoraLitografia() # Necesitamos instancia para obtener mejor opción
+        # Fundas transparentes (manga sin tintas) de más de 325 mm no permiten grafado
+        if es_manga and num_tintas == 0 and (form_data['ancho'] * 2) + 6 > 325:
+            if form_data.get('tipo_grafado_id') not in (None, 1):
+                print("Grafado no permitido (>325mm) en funda transparente. Forzando 'Sin grafado'.")
+                form_data['tipo_grafado_id'] = 1
+                form_data['tipo_grafado_nombre'] = 'Sin grafado'
+
+        # --- Grafo de cálculo incremental (vive en la sesión) ---
+        # Solo se recalculan los nodos cuyas entradas cambiaron desde el último cálculo:
+        # cambiar escalas o rentabilidad no vuelve a consultar precios ni a calcular
+        # troquel, plancha o la unidad de montaje.
+        if 'grafo_cotizacion' not in st.session_state:
+            st.session_state.grafo_cotizacion = construir_grafo_cotizacion(
+                st.session_state.db, ancho_maximo=ANCHO_MAXIMO_MAQUINA
+            )
+        grafo = st.session_state.grafo_cotizacion
+        ajustes_admin = {
+            'ajustar_material': st.session_state.get('ajustar_material'),
+            'valor_material_ajustado': st.session_state.get('valor_material_ajustado'),
+            'ajustar_troquel': st.session_state.get('ajustar_troquel'),
+            'precio_troquel': st.session_state.get('precio_troquel'),
+            'ajustar_planchas': st.session_state.get('ajustar_planchas'),
+            'precio_planchas': st.session_state.get('precio_planchas'),
+            'rentabilidad_ajustada': st.session_state.get('rentabilidad_ajustada'),
+        }
+        entradas_grafo = entradas_desde_formulario(form_data, ajustes_admin)
+        # Cotización reabierta en modo edición: su snapshot guardado evita recalcular
+        # mientras no cambien las entradas ni los precios (src/logic/snapshot_calculo.py)
+        snapshot_editar = None
+        info_snapshot = st.session_state.get('snapshot_calculo_editar')
+        if (st.session_state.get('modo_edicion') and info_snapshot
+                and info_snapshot['cotizacion_id'] == st.session_state.get('cotizacion_id_editar')):
+            snapshot_editar = info_snapshot['snapshot']
         try:
-            mejor_opcion = calc_lito.obtener_mejor_opcion_desperdicio(datos_escala, es_manga)
-            if mejor_opcion is None:
-                st.error("No se encontró una configuración de cilindro/repetición válida para este avance.")
-                return None
-            print(f"\nMejor Opción Desperdicio: Dientes={mejor_opcion.dientes}, Reps={mejor_opcion.repeticiones}, Medida={mejor_opcion.medida_mm}, Desp={mejor_opcion.desperdicio:.4f}")
-        except ValueError as e_desp:
-            st.error(f"Error determinando la mejor opción de desperdicio: {e_desp}")
+            # Configuraciones idénticas ya calculadas (en cualquier sesión) salen de la
+            # caché compartida sin ejecutar las calculadoras (src/logic/cache_calculos.py)
+            with CALCULO_DURACION.cronometrar(tipo_producto='manga' if es_manga else 'etiqueta'):
+                valores, snapshot_calculo = evaluar_con_snapshot(grafo, entradas_grafo, snapshot_editar)
+        except ValueError as e_grafo:
+            st.error(str(e_grafo))
             return None
-        # -----------------------------------------------------
-
-        # Calcular área de etiqueta usando la calculadora (¿Se necesita antes de calcular_costos_por_escala?)
-        # area_result = calculadora.calcular_area_etiqueta(datos_escala, num_tintas, es_manga) # Parece que no se usa directamente ahora
-        # if 'error' in area_result:
-        #     st.error(f"Error calculando área: {area_result['error']}")
-        #     return None
-        # datos_escala.set_area_etiqueta(area_result['area'])
+        # Corpus de cálculos reales para regresión (solo con CORPUS_CALCULOS_ACTIVO)
+        corpus_calculos.registrar(grafo, entradas_grafo, valores, getattr(cliente_obj, 'id', None))
+
+        datos_escala = valores['geometria']
+        mejor_opcion = valores['mejor_opcion']
+        acabado = valores['acabado']
+        valor_material = valores['valor_material']
+        num_tintas_ajustado = valores['num_tintas_ajustado']
+        rentabilidad = valores['rentabilidad']
+        rentabilidad_ajustada = ajustes_admin['rentabilidad_ajustada']
+        print(f"\nMejor Opción Desperdicio: Dientes={mejor_opcion.dientes}, Reps={mejor_opcion.repeticiones}, Medida={mejor_opcion.medida_mm}, Desp={mejor_opcion.desperdicio:.4f}")
+        print(f"Tintas seleccionadas: {num_tintas}, ajustadas para cálculos: {num_tintas_ajustado}")
+
+        for nodo_costo in ('troquel', 'plancha'):
+            if valores[nodo_costo].get('advertencia'):
+                st.warning(f"Advertencia: {valores[nodo_costo]['advertencia']}")
+        valor_troquel_defecto = valores['troquel']['valor']
+        valor_plancha_defecto = valores['plancha']['valor']
+        precio_sin_constante = valores['plancha']['precio_sin_constante']
 
-        # ---- AJUSTAR NÚMERO DE TINTAS SI EL ACABADO LO REQUIERE ----
-        num_tintas = form_data['num_tintas']  # Número original seleccionado por el usuario
-        acabado_id = form_data.get('acabado_id')
-        es_manga = form_data['es_manga']
-        
-        # Ajustar tintas para acabados especiales
-        num_tintas_ajustado = num_tintas
-        if not es_manga and acabado_id in [3, 4, 5, 6]:
-            num_tintas_ajustado = num_tintas + 1
-            print(f"\n=== AJUSTE DE TINTAS POR ACABADO ESPECIAL ===")
-            print(f"Tintas originales seleccionadas: {num_tintas}")
-            print(f"Acabado ID {acabado_id} requiere 1 tinta adicional")
-            print(f"Tintas ajustadas para cálculos: {num_tintas_ajustado}")
-            
-            # Validar que no se exceda el límite
-            if num_tintas_ajustado > 7:
-                st.error(f"El acabado seleccionado requiere 1 tinta adicional en el cálculo. "
-                         f"Con las {num_tintas} tintas seleccionadas, se excede el máximo de 7 tintas "
-                         f"permitidas. Para este acabado, seleccione máximo 6 tintas.")
-                return None
-        else:
-            print(f"\n=== SIN AJUSTE DE TINTAS ===")
-            print(f"Tintas seleccionadas: {num_tintas} (sin ajuste)")
-            
-        # A partir de este punto, usamos num_tintas_ajustado para todos los cálculos internos
-        
-        # --- GUARDAR DATOS DE CALCULO PARA GUARDADO POSTERIOR --- 
-        # Guardamos los valores finales que se usaron en el cálculo
-        # para pasarlos luego a guardar_calculos_escala
-        
-        # Calcular valor_troquel por defecto (si no ajustado), respetando selección de unidad
-        valor_troquel_defecto = 0.0
-        if not st.session_state.get('ajustar_troquel'):
-            # Siempre calcular el valor del troquel, incluso si el usuario eligió una unidad específica
-            # Esto asegura que tengamos un valor para el informe técnico
-            troquel_result = calc_lito.calcular_valor_troquel(
-                datos_escala, 
-                mejor_opcion.repeticiones,
-                troquel_existe=datos_escala.troquel_existe,
-                tipo_grafado_id=form_data.get('tipo_grafado_id'),
-                es_manga=es_manga
-            )
-            if 'error' in troquel_result:
-                 st.warning(f"Advertencia: No se pudo calcular el valor del troquel por defecto: {troquel_result['error']}")
-            else:
-                 valor_troquel_defecto = troquel_result.get('valor', 0.0)
-            
-            # Imprimir el valor calculado para depuración
-            print(f"\n=== DEBUG VALOR TROQUEL CALCULADO ===")
-            print(f"Valor troquel calculado: {valor_troquel_defecto}")
-            print(f"Unidad montaje elegida: {form_data.get('unidad_montaje_dientes')}")
-            print(f"Troquel existe: {datos_escala.troquel_existe}")
-
-        # Calcular valor_plancha por defecto (si no ajustado)
-        valor_plancha_defecto = 0.0
-        precio_sin_constante = None # Inicializar para guardar el valor separado
-        if not st.session_state.get('ajustar_planchas'):
-             # Si el usuario eligió unidad, dejar a la calculadora interna computar plancha (None)
-             if form_data.get('unidad_montaje_dientes') is not None:
-                 valor_plancha_defecto = None
-             else:
-                 # Usar el número de tintas ajustado para calcular la plancha con Litografía
-                 plancha_result = calc_lito.calcular_precio_plancha(datos_escala, num_tintas_ajustado, es_manga)
-                 if 'error' in plancha_result:
-                     st.warning(f"Advertencia: No se pudo calcular el valor de plancha por defecto: {plancha_result['error']}")
-                 else:
-                     # Usar el precio que incluye la división por constante si planchas_por_separado=False
-                     valor_plancha_defecto = plancha_result.get('precio', 0.0)
-                     # Guardar el precio ANTES de aplicar la constante (si existe)
-                     if plancha_result.get('detalles'):
-                        precio_sin_constante = plancha_result['detalles'].get('precio_sin_constante')
-
-        # Verificar que el valor de troquel_existe se haya asignado correctamente a datos_escala
-        print(f"\n=== DEBUG TROQUEL EXISTE EN DATOS_ESCALA ===")
-        print(f"Valor en datos_escala.troquel_existe: {datos_escala.troquel_existe} (tipo: {type(datos_escala.troquel_existe)})")
-        
-        # Verificar el valor de troquel_existe en form_data
-        print(f"\n=== DEBUG TROQUEL EXISTE EN FORM_DATA ===")
-        print(f"Valor en form_data['tiene_troquel']: {form_data.get('tiene_troquel')} (tipo: {type(form_data.get('tiene_troquel'))})")
-        
-        # Verificar el valor procesado antes de asignarlo a datos_escala
-        print(f"\n=== DEBUG TROQUEL EXISTE ANTES DE ASIGNAR A DATOS_ESCALA ===")
-        print(f"Valor de troquel_existe: {troquel_existe} (tipo: {type(troquel_existe)})")
-        
         datos_calculo_persistir = {
             'valor_material': valor_material, # Valor final usado
-            'valor_plancha': st.session_state.get('precio_planchas', valor_plancha_defecto) if st.session_state.get('ajustar_planchas') else valor_plancha_defecto,
+            'valor_plancha': valor_plancha_defecto, # Ajuste admin o cálculo por defecto (nodo 'plancha')
             'valor_acabado': acabado.valor if acabado else 0,
-            'valor_troquel': st.session_state.get('precio_troquel', valor_troquel_defecto) if st.session_state.get('ajustar_troquel') else valor_troquel_defecto,
-            'rentabilidad': datos_escala.rentabilidad, # Guardar el valor decimal directamente
+            'valor_troquel': valor_troquel_defecto, # Ajuste admin o cálculo por defecto (nodo 'troquel')
+            'rentabilidad': rentabilidad, # Mismo valor que recibía DatosEscala
             'avance': datos_escala.avance,
             'ancho': form_data['ancho'], # Guardar ancho original sin ajuste de manga
             'unidad_z_dientes': form_data.get('unidad_montaje_dientes') or (mejor_opcion.dientes if mejor_opcion else 0),
@@ -524,27 +351,18 @@ def handle_calculation(form_data: Dict[str, Any], cliente_obj: Cliente) -> Optio
             datos_calculo_persistir['valor_plancha_separado'] = None # Si no aplica o es cero
         # -------------------------------------------------------------
 
-        # Realizar cálculos principales por escala
-        print(f"\n=== REALIZAR CÁLCULOS PRINCIPALES POR ESCALA ===")
-        print(f"  - Tintas originales: {num_tintas}")
-        print(f"  - Tintas ajustadas: {num_tintas_ajustado}")
-        print(f"  - Es manga: {es_manga}")
-        print(f"  - Acabado ID: {acabado_id}")
-
-        resultados = calculadora.calcular_costos_por_escala(
-            datos=datos_escala,
-            num_tintas=num_tintas_ajustado,  # IMPORTANTE: Usar el valor AJUSTADO que incluye +1 para acabados especiales
-            valor_plancha=datos_calculo_persistir['valor_plancha'], 
-            valor_troquel=datos_calculo_persistir['valor_troquel'], 
-            valor_material=datos_calculo_persistir['valor_material'], 
-            valor_acabado=datos_calculo_persistir['valor_acabado'],
-            es_manga=es_manga,
-            tipo_grafado_id=datos_calculo_persistir['tipo_grafado_id'], 
-            acabado_id=acabado_id
-        )
-        
+        # Resultados por escala y curva de precio salen del grafo (plan compartido).
+        # Copias: los nodos en caché no deben mutarse aguas abajo.
+        resultados = [dict(resultado) for resultado in valores['resultados']]
+
         if resultados:
-            # --- NUEVO: Preparar modelo Cotizacion usando CotizacionManager --- 
+            # --- Curva de precio en forma cerrada (se persiste con parametros_especiales) ---
+            curva_precio = valores['curva_precio']
+            datos_calculo_persistir['parametros_especiales']['curva_precio'] = curva_precio.to_dict()
+            # --- Snapshot del cálculo: al reabrir la cotización se muestra sin recalcular ---
+            datos_calculo_persistir['parametros_especiales'][CLAVE_SNAPSHOT] = snapshot_calculo.to_dict()
+
+            # --- NUEVO: Preparar modelo Cotizacion usando CotizacionManager ---
             print("\nCálculo exitoso. Preparando modelo de cotización...")
             try:
                 manager = st.session_state.cotizacion_manager
@@ -670,6 +488,37 @@ def show_navigation():
         key="navigation_radio"
     )
 
+    # Utilización del pool HTTP compartido (solo administradores)
+    if st.session_state.get('usuario_rol') == 'administrador':
+        stats_pool = estadisticas_pool()
+        if stats_pool:
+            with st.sidebar.expander("🔌 Pool de conexiones", expanded=False):
+                st.caption(
+                    f"Peticiones: {stats_pool['peticiones']} · "
+                    f"Reutilización: {stats_pool['tasa_reutilizacion']:.1%}"
+                )
+                st.caption(
+                    f"Conexiones: {stats_pool['conexiones_en_uso']} en uso / "
+                    f"{stats_pool['conexiones_abiertas']} abiertas (máx {stats_pool['max_conexiones']}, "
+                    f"pico {stats_pool['utilizacion_pico']:.0%})"
+                )
+                st.caption(f"Sesiones: {stats_pool['sesiones_creadas']} · Handshakes: {stats_pool['conexiones_nuevas']}")
+
+        stats_cache = cache_datos.estadisticas()
+        with st.sidebar.expander("🗃️ Caché de datos", expanded=False):
+            st.caption(f"Entradas: {stats_cache['entradas']} / {stats_cache['max_entradas']}")
+            for dominio, datos in sorted(stats_cache['dominios'].items()):
+                st.caption(
+                    f"{dominio} (v{datos['version']}): {datos['aciertos']} aciertos, {datos['fallos']} fallos "
+                    f"({datos['tasa_aciertos']:.1%}) · {datos['vencidas']} vencidas · {datos['descartadas']} descartadas"
+                )
+            stats_calculos = cache_calculos.estadisticas()
+            st.caption(
+                f"Cálculos: {stats_calculos['entradas']} / {stats_calculos['max_entradas']} · "
+                f"{stats_calculos['aciertos']} aciertos, {stats_calculos['fallos']} fallos "
+                f"({stats_calculos['tasa_aciertos']:.1%})"
+            )
+
     # Obtener la clave de la vista que CORRESPONDE al radio seleccionado
     selected_key_from_radio = next((k for k, v in options.items() if v == selected_display_name), 'calculator')
 
@@ -682,6 +531,7 @@ def show_navigation():
         if 'current_calculation' in st.session_state: del st.session_state['current_calculation']
         if 'cotizacion_model' in st.session_state: del st.session_state['cotizacion_model']
         if 'cotizacion_guardada' in st.session_state: del st.session_state['cotizacion_guardada']
+        cancelar_pdf_anticipado()
         if 'modo_edicion' in st.session_state: 
              st.session_state.modo_edicion = False # Salir de modo edición si navegamos fuera
              st.session_state.cotizacion_id_editar = None # <-- Corregido nombre de clave
@@ -713,12 +563,6 @@ def initialize_session():
     
     return True
 
-def get_filtered_clients():
-    """Obtiene todos los clientes sin filtrar. Los comerciales pueden ver todos los clientes,
-    aunque solo pueden trabajar con las referencias que les corresponden."""
-    # Siempre mostrar todos los clientes independientemente del rol
-    return st.session_state.db.get_clientes()
-
 def _mostrar_ajustes_admin():
     """Muestra la sección de ajustes avanzados para administradores (fuera del form)."""
     if st.session_state.usuario_rol == 'administrador':
@@ -852,6 +696,10 @@ def mostrar_calculadora():
                                     st.session_state['ajustar_rentabilidad'] = bool(params_esp.get('ajustar_rentabilidad', False))
                                     if params_esp.get('rentabilidad_ajustada') is not None:
                                         st.session_state['rentabilidad_ajustada'] = params_esp.get('rentabilidad_ajustada')
+                                st.session_state['snapshot_calculo_editar'] = {
+                                    'cotizacion_id': cotizacion_id_editar,
+                                    'snapshot': snapshot_desde_parametros(params_esp),
+                                }
                         except Exception as e_precarga:
                             print(f"ADVERTENCIA: No se pudieron precargar parametros_especiales: {e_precarga}")
                         # Nota: el manejo de "sin tipo de producto" ya se hace arriba
@@ -892,23 +740,21 @@ def mostrar_calculadora():
     
     st.write(f"Selecciona un cliente y un tipo de producto para comenzar a cotizar.")
     
-    clientes = get_filtered_clients()
-    default_cliente_index = 0
+    cliente_inicial = None
     if is_edit_mode and datos_cargados:
         cliente_id_cargado = datos_cargados.get('cliente_id')
         if cliente_id_cargado:
-            try:
-                default_cliente_index = next(i for i, c in enumerate(clientes) if c.id == cliente_id_cargado)
-            except StopIteration:
-                 st.warning(f"Cliente ID {cliente_id_cargado} no encontrado.")
-                 default_cliente_index = 0 
-                 
-    cliente_seleccionado = st.selectbox(
-        "Cliente",
-        options=clientes,
-        format_func=lambda x: x.nombre,
-        index=default_cliente_index, 
+            cliente_inicial = (
+                st.session_state.db.get_indice_clientes().obtener(cliente_id_cargado)
+                or st.session_state.db.get_cliente(cliente_id_cargado)
+            )
+            if cliente_inicial is None:
+                st.warning(f"Cliente ID {cliente_id_cargado} no encontrado.")
+
+    cliente_seleccionado = selector_cliente(
+        st.session_state.db,
         key="cliente_selector",
+        cliente_inicial=cliente_inicial,
         disabled=is_edit_mode # Deshabilitar en modo edición
     )
     
@@ -994,29 +840,11 @@ def mostrar_calculadora():
         es_manga = (tipo_producto_seleccionado_id == 2) if tipo_producto_seleccionado_id else False
         st.session_state['es_manga'] = es_manga
         
-        # -- Material (Fuera del form, si ya se seleccionó Tipo Producto) --
-        material_obj_actual = None
+        # -- Material y Adhesivo (si ya se seleccionó Tipo Producto) --
+        # Fragmento: cambiar material o adhesivo solo vuelve a ejecutar esta sección
         if tipo_producto_seleccionado_id:
             materiales = st.session_state.initial_data.get('materiales', [])
-            _mostrar_material(es_manga, materiales, datos_cargados)
-            st.divider()
-            # Obtener el objeto material actual DESPUÉS de llamar a _mostrar_material
-            material_obj_actual = st.session_state.get('material_select')
-        
-        # -- Adhesivo (Fuera del form, si aplica y hay material) --
-        if not es_manga and material_obj_actual:
-            material_id_actual = material_obj_actual.id
-            adhesivos_filtrados = []
-            db = st.session_state.db
-            try:
-                print(f"APP: Llamando a get_adhesivos_for_material para ID: {material_id_actual}") # DEBUG
-                adhesivos_filtrados = db.get_adhesivos_for_material(material_id_actual)
-                print(f"APP: Resultado get_adhesivos_for_material: {len(adhesivos_filtrados)} items") # DEBUG
-            except Exception as e:
-                st.error(f"APP: Error al obtener adhesivos: {e}")
-                
-            # Llamar a _mostrar_adhesivo fuera del form
-            _mostrar_adhesivo(adhesivos_filtrados, material_obj_actual, datos_cargados)
+            seccion_material_adhesivo(es_manga, materiales, datos_cargados)
             st.divider()
             
 
@@ -1400,7 +1228,9 @@ def main():
         SessionManager.clear_messages()
         
     # --- Mostrar Navegación --- 
-    show_navigation()
+    with tramo('show_navigation'):
+        show_navigation()
+    mostrar_perfilador()
     # ------------------------
 
     # --- Cargar datos iniciales si no están ---
@@ -1413,7 +1243,8 @@ def main():
         with st.spinner("Cargando datos iniciales (materiales, acabados, etc.)..."):
             try:
                 # Llamar a la función cacheada
-                data = load_initial_data() 
+                with tramo('load_initial_data'):
+                    data = load_initial_data() 
                 if data:
                     st.session_state.initial_data = data
                 else:
@@ -1440,7 +1271,11 @@ def main():
 
     # Mostrar la vista actual
     current_view = st.session_state.get('current_view', 'calculator') # Obtener vista actual
+    with tramo(f"vista:{current_view}"):
+        _mostrar_vista(current_view)
 
+def _mostrar_vista(current_view: str):
+    """Llama a la función de la vista actual"""
     if current_view == 'calculator':
         mostrar_calculadora()
     elif current_view == 'quote_results':
@@ -1479,6 +1314,42 @@ def main():
         st.session_state.current_view = 'calculator'
         st.rerun()
 
+def _mostrar_solver_precio(datos_calculo_persistir: Dict[str, Any]):
+    """Muestra el solver de precio objetivo (cantidad o rentabilidad) sobre la curva de precio."""
+    curva = CurvaPrecio.from_dict(
+        (datos_calculo_persistir.get('parametros_especiales') or {}).get('curva_precio')
+    )
+    if curva is None:
+        return
+
+    solver = SolverPrecio(curva)
+    with st.expander("🎯 Precio objetivo"):
+        st.caption(f"Valor mínimo alcanzable por unidad: ${solver.valor_minimo_alcanzable():,.2f}")
+        col_cant, col_rent = st.columns(2)
+        with col_cant:
+            st.markdown("**Cantidad para un valor por unidad**")
+            valor_objetivo = st.number_input("Valor por unidad objetivo", min_value=0.0, value=0.0,
+                                             step=1.0, key="solver_valor_objetivo")
+            if valor_objetivo > 0:
+                resultado = solver.escala_para_valor_unidad(valor_objetivo)
+                if resultado.get('error'):
+                    st.warning(resultado['error'])
+                else:
+                    st.success(f"Cantidad mínima: {resultado['escala']:,} unidades "
+                               f"(valor unidad ${resultado['valor_unidad']:,.2f})")
+        with col_rent:
+            st.markdown("**Rentabilidad para un precio tope**")
+            escala_rent = st.number_input("Escala", min_value=1, value=1000, step=100, key="solver_escala_rentabilidad")
+            precio_tope = st.number_input("Precio tope por unidad", min_value=0.0, value=0.0,
+                                          step=1.0, key="solver_precio_tope")
+            if precio_tope > 0:
+                resultado = solver.rentabilidad_para_valor_unidad(int(escala_rent), precio_tope)
+                if resultado.get('error'):
+                    st.warning(resultado['error'])
+                else:
+                    st.success(f"Rentabilidad máxima: {resultado['rentabilidad_porcentaje']:.2f}% "
+                               f"(valor unidad ${resultado['valor_unidad']:,.2f})")
+
 def show_quote_results():
     """Muestra los resultados de la cotización calculada."""
     # --- MOSTRAR INFORME SI YA ESTÁ GUARDADA ---
@@ -1497,29 +1368,33 @@ def show_quote_results():
         # --- Botones de PDF y Nueva Cotización ---
         col_pdf, col_new = st.columns(2)
         with col_pdf:
-             # --- Lógica para botón Generar PDF --- 
+             # --- Lógica para botón Generar PDF (render en la cola de trabajos) --- 
              if st.button("📄 Generar PDF", key="pdf_button_saved"):
-                  with st.spinner("Generando PDF..."):
+                  # El PDF se empezó a generar al guardar: servirlo si ya está (o seguir su avance)
+                  if not usar_pdf_anticipado('trabajo_pdf_cotizacion', st.session_state.cotizacion_id):
                       try:
                           # Obtener datos completos usando el ID guardado
-                        cotizacion_id = st.session_state.cotizacion_id
-                        datos_pdf = st.session_state.db.get_datos_completos_cotizacion(cotizacion_id)
-                        if datos_pdf:
-                              print(f"DEBUG PDF COTIZACION: datos_pdf contiene: {datos_pdf}") # <-- LÍNEA DE DEBUG AÑADIDA
-                              pdf_gen = CotizacionPDF()
-                              pdf_bytes = pdf_gen.generar_pdf(datos_pdf)
-                              # Ofrecer descarga
-                              st.download_button(
-                                  label="Descargar PDF Ahora",
-                                  data=pdf_bytes,
-                                  file_name=f"{datos_pdf.get('identificador') or 'Cotizacion_' + str(datos_pdf.get('consecutivo', 'N'))}.pdf", # Usar identificador, con fallback y sin reemplazo de espacios
-                                  mime="application/pdf"
-                              )
-                        else:
+                          cotizacion_id = st.session_state.cotizacion_id
+                          datos_pdf = st.session_state.db.get_datos_completos_cotizacion(cotizacion_id)
+                          if datos_pdf:
+                              st.session_state.pdf_cotizacion_nombre = nombre_archivo_pdf(datos_pdf)
+                              enviar_trabajo('trabajo_pdf_cotizacion', 'pdf_cotizacion', generar_bytes_pdf_cotizacion, datos_pdf)
+                          else:
                               st.error("No se pudieron obtener los datos completos para generar el PDF.")
                       except Exception as e_pdf:
                           st.error(f"Error generando PDF: {e_pdf}")
                           traceback.print_exc()
+
+             pdf_bytes = (pdf_anticipado_listo(st.session_state.cotizacion_id)
+                          or mostrar_trabajo('trabajo_pdf_cotizacion', "Generando PDF"))
+             if pdf_bytes:
+                  # Ofrecer descarga
+                  st.download_button(
+                      label="Descargar PDF Ahora",
+                      data=pdf_bytes,
+                      file_name=st.session_state.get('pdf_cotizacion_nombre', 'Cotizacion.pdf'),
+                      mime="application/pdf"
+                  )
         
         with col_new:
             if st.button("Nueva Cotización", key="new_quote_button_saved"):
@@ -1536,6 +1411,10 @@ def show_quote_results():
                     del st.session_state['recotizacion_info']
                 if 'informe_tecnico_md' in st.session_state: # Limpiar informe anterior
                     del st.session_state['informe_tecnico_md']
+                descartar_trabajo('trabajo_pdf_cotizacion')
+                descartar_trabajo('trabajo_informe_pdf')
+                cancelar_pdf_anticipado()
+                st.session_state.pop('informe_pdf_clave', None)
                 SessionManager.reset_calculator_widgets()
                 st.rerun()
                 
@@ -1559,12 +1438,14 @@ def show_quote_results():
                 
                 nombre_archivo = f"Informe_Tecnico_{id_para_archivo}"
                 
-                # Generar enlace de descarga
-                pdf_download_link = markdown_a_pdf(informe_md, nombre_archivo)
+                # Generar enlace de descarga en segundo plano (una vez por informe)
+                clave_informe = (nombre_archivo, hash(informe_md))
+                if st.session_state.get('informe_pdf_clave') != clave_informe:
+                    st.session_state.informe_pdf_clave = clave_informe
+                    enviar_trabajo('trabajo_informe_pdf', 'informe_tecnico_pdf', markdown_a_pdf, informe_md, nombre_archivo)
+                pdf_download_link = mostrar_trabajo('trabajo_informe_pdf', "Generando PDF del informe")
                 if pdf_download_link:
                     st.markdown(pdf_download_link, unsafe_allow_html=True)
-                else:
-                    st.error("No se pudo generar el PDF para descarga.")
             except Exception as e_pdf:
                 st.error(f"Error al preparar PDF para descarga: {e_pdf}")
         # -----------------------------------------
@@ -1614,7 +1495,9 @@ def show_quote_results():
     else:
         # Si no existe, mostrar el dataframe original
         st.dataframe(resultados_df)
-    
+
+    _mostrar_solver_precio(datos_calculo_persistir)
+
     st.divider()
     
     # --- Formulario y Lógica de Guardado --- 
@@ -1810,6 +1693,10 @@ def show_quote_results():
                                 st.success(message)
                                 st.session_state.cotizacion_guardada = True
                                 st.session_state.cotizacion_id = cotizacion_id_final
+                                # Hidratar y renderizar el PDF en segundo plano: el usuario casi
+                                # siempre lo pide a continuación (src/pdf/pdf_anticipado.py)
+                                descartar_trabajo('trabajo_pdf_cotizacion')
+                                anticipar_pdf_cotizacion(cotizacion_id_final)
                                 
                                 # --- GENERAR INFORME TÉCNICO AQUÍ --- 
                                 try:
@@ -1889,6 +1776,7 @@ def show_quote_results():
             del st.session_state['recotizacion_info']
         if 'informe_tecnico_md' in st.session_state: # Limpiar informe anterior
             del st.session_state['informe_tecnico_md']
+        cancelar_pdf_anticipado()
         SessionManager.reset_calculator_widgets()
         st.rerun()
 
@@ -1902,4 +1790,5 @@ def show_reports():
     # Aquí se implementará la lógica para mostrar reportes
 
 if __name__ == "__main__":
-    main()
+    with perfilar_rerun():
+        main()
@@ -0,0 +1,110 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Datos y utilidades compartidos por las pruebas:
+
+    - Grafo de cálculo, caché de cálculos y snapshot de cotizaciones
+      (test_grafo_cotizacion.py, test_cache_calculos.py, test_snapshot_calculo.py):
+      ENTRADAS, BDPrecios y evaluar / evaluar_cacheado / evaluar_guardado.
+    - Índices de clientes y cotizaciones (test_indice_clientes.py,
+      test_indice_cotizaciones.py): sesiones() sobre el Supabase falso en proceso de
+      benchmarks/supabase_falso.py.
+
+Uso:
+    from ayudas_pruebas import ENTRADAS, BDPrecios, evaluar
+"""
+
+import contextlib
+import io
+import sys
+
+sys.path.append('.')
+
+from benchmarks.supabase_falso import BaseFalsa, ClienteSupabaseFalso, CLAVE_USUARIOS, poblar_base
+from src.data.database import DBManager
+from src.data.models import Acabado
+from src.logic.cache_calculos import evaluar_con_cache
+from src.logic.snapshot_calculo import evaluar_con_snapshot
+
+# Entradas del grafo para una etiqueta de 50 x 70 mm, 3 pistas y 4 tintas
+ENTRADAS = {
+    'ancho': 50.0, 'avance': 70.0, 'pistas': 3, 'es_manga': False, 'num_tintas': 4,
+    'acabado_id': 2, 'material_id': 1, 'adhesivo_id': 1, 'tiene_troquel': False,
+    'planchas_separadas': False, 'unidad_montaje_dientes': None, 'tipo_grafado_id': None,
+    'escalas': [1000, 5000, 10000], 'ajustar_material': False, 'valor_material_ajustado': None,
+    'ajustar_troquel': False, 'precio_troquel': None, 'ajustar_planchas': False,
+    'precio_planchas': None, 'rentabilidad_ajustada': None,
+}
+
+
+class BDPrecios:
+    """
+    BD mínima con precios modificables que cuenta las lecturas de precio.
+    Con valores_material, cada lectura del material devuelve el siguiente valor de la
+    lista (el último se repite).
+    """
+
+    def __init__(self, valor_material: float = 1800.0, valor_acabado: float = 300.0, valores_material=None):
+        self.valores_material = list(valores_material) if valores_material else [valor_material]
+        self.valor_acabado = valor_acabado
+        self.lecturas = 0
+
+    @property
+    def valor_material(self) -> float:
+        return self.valores_material[0]
+
+    @valor_material.setter
+    def valor_material(self, valor: float) -> None:
+        self.valores_material = [valor]
+
+    def get_material_adhesivo_valor(self, material_id, adhesivo_id):
+        self.lecturas += 1
+        if len(self.valores_material) > 1:
+            return self.valores_material.pop(0)
+        return self.valores_material[0]
+
+    def get_acabado(self, acabado_id):
+        self.lecturas += 1
+        return Acabado(id=acabado_id, valor=self.valor_acabado)
+
+
+def silencio():
+    """Las calculadoras imprimen debug en cada paso"""
+    return contextlib.redirect_stdout(io.StringIO())
+
+
+def evaluar(grafo, entradas=ENTRADAS, objetivos=None):
+    """grafo.evaluar sin el debug de las calculadoras"""
+    with silencio():
+        return grafo.evaluar(entradas, objetivos)
+
+
+def evaluar_cacheado(grafo, cache, entradas=ENTRADAS):
+    """evaluar_con_cache sin el debug de las calculadoras"""
+    with silencio():
+        return evaluar_con_cache(grafo, entradas, cache)
+
+
+def evaluar_guardado(grafo, snapshot=None, entradas=ENTRADAS):
+    """evaluar_con_snapshot sin el debug de las calculadoras: (valores, snapshot)"""
+    with silencio():
+        return evaluar_con_snapshot(grafo, entradas, snapshot)
+
+
+def sesiones(cantidad: int = 2, cotizaciones_previas: int = 0):
+    """
+    Base falsa con 20 clientes y un DBManager con sesión iniciada por cada uno de los
+    primeros 'cantidad' comerciales.
+
+    Returns:
+        (base, usuarios, sesiones)
+    """
+    base = BaseFalsa()
+    usuarios = poblar_base(base, comerciales=cantidad, clientes=20, cotizaciones_previas=cotizaciones_previas)
+    dbs = []
+    for usuario in usuarios[:cantidad]:
+        cliente = ClienteSupabaseFalso(base)
+        cliente.auth.sign_in_with_password({'email': usuario['email'], 'password': CLAVE_USUARIOS})
+        dbs.append(DBManager(cliente))
+    return base, usuarios, dbs
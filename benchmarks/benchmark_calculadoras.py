@@ -0,0 +1,292 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Micro-benchmarks del camino crítico de precios con salidas doradas (golden).
+
+Cubre:
+    - CalculadoraDesperdicio.calcular_todas_opciones (etiqueta y manga)
+    - CalculadoraCostosEscala.calcular_costos_por_escala (1, 10 y 100 escalas,
+      etiqueta y manga, con y sin unidad de montaje elegida)
+    - CalculadoraLitografia.generar_reporte_completo
+    - Generación de PDF (CotizacionPDF.generar_pdf)
+
+Cada caso guarda sus valores numéricos en benchmarks/golden_calculadoras.json. Si una
+optimización cambia un precio, el benchmark falla (código de salida 1) antes de
+reportar tiempos. Los tiempos se emiten en JSON para compararlos entre commits.
+
+Uso (desde la raíz del repositorio):
+    python benchmarks/benchmark_calculadoras.py                        # verificar golden + tiempos
+    python benchmarks/benchmark_calculadoras.py --salida base.json     # guardar tiempos
+    python benchmarks/benchmark_calculadoras.py --comparar base.json   # comparar contra otro commit
+    python benchmarks/benchmark_calculadoras.py --actualizar-golden    # regenerar golden (cambio intencional de precios)
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from typing import Any, Callable, Dict, List, Tuple
+
+sys.path.append('.')
+
+from src.logic.calculators.calculadora_desperdicios import CalculadoraDesperdicio
+from src.logic.calculators.calculadora_costos_escala import CalculadoraCostosEscala, DatosEscala
+from src.logic.calculators.calculadora_litografia import CalculadoraLitografia, DatosLitografia
+from src.config.constants import GAP_AVANCE_ETIQUETAS, GAP_AVANCE_MANGAS
+
+RUTA_GOLDEN = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'golden_calculadoras.json')
+TOLERANCIA_RELATIVA = 1e-9
+
+# (nombre, es_manga, ancho, avance, pistas, tintas) - anchos de manga ya ajustados como en la app
+PRODUCTOS = [
+    ('etiqueta', False, 80.0, 120.0, 2, 4),
+    ('manga', True, 180.0, 200.0, 1, 5),
+]
+ESCALAS = {
+    1: [1000],
+    10: [1000 * i for i in range(1, 11)],
+    100: [500 * i for i in range(1, 101)],
+}
+
+
+@contextlib.contextmanager
+def _silencio():
+    """Las calculadoras imprimen debug en cada paso; se descarta para no medir la terminal"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        yield
+
+
+def _num(valor: Any) -> Any:
+    """Normaliza valores numpy y anidados a tipos JSON"""
+    if isinstance(valor, dict):
+        return {k: _num(v) for k, v in valor.items()}
+    if isinstance(valor, (list, tuple)):
+        return [_num(v) for v in valor]
+    if isinstance(valor, bool) or valor is None or isinstance(valor, str):
+        return valor
+    return float(valor)
+
+
+# --- Casos ---
+
+def _caso_desperdicio(es_manga: bool, avance: float) -> Callable[[], Any]:
+    def correr():
+        calculadora = CalculadoraDesperdicio(es_manga=es_manga)
+        opciones = calculadora.calcular_todas_opciones(avance)
+        return [[op.dientes, op.repeticiones, op.desperdicio] for op in opciones[:5]] + [len(opciones)]
+    return correr
+
+
+def _datos_escala(es_manga: bool, ancho: float, avance: float, pistas: int, escalas: List[int],
+                  unidad: Any) -> DatosEscala:
+    return DatosEscala(
+        escalas=escalas,
+        pistas=pistas,
+        ancho=ancho,
+        avance=avance,
+        avance_total=avance + (GAP_AVANCE_MANGAS if es_manga else GAP_AVANCE_ETIQUETAS),
+        desperdicio=0,
+        rentabilidad=45.0 if es_manga else 40.0,
+        porcentaje_desperdicio=30.0 if es_manga else 10.0,
+        unidad_montaje_dientes=unidad
+    )
+
+
+def _caso_costos(es_manga: bool, ancho: float, avance: float, pistas: int, tintas: int,
+                 escalas: List[int], unidad: Any) -> Callable[[], Any]:
+    def correr():
+        datos = _datos_escala(es_manga, ancho, avance, pistas, escalas, unidad)
+        resultados = CalculadoraCostosEscala().calcular_costos_por_escala(
+            datos, tintas, None, None, 1800.0, 300.0, es_manga, 1
+        )
+        return [r['valor_unidad'] for r in resultados]
+    return correr
+
+
+def _caso_litografia(es_manga: bool, ancho: float, avance: float, pistas: int, tintas: int) -> Callable[[], Any]:
+    def correr():
+        datos = DatosLitografia(ancho=ancho, avance=avance, pistas=pistas)
+        reporte = CalculadoraLitografia().generar_reporte_completo(datos, tintas, es_manga)
+        return {
+            'ancho_total': reporte['ancho_total'][0],
+            'precio_plancha': reporte['precio_plancha']['precio'],
+            'valor_troquel': reporte['valor_troquel']['valor'],
+            'area_etiqueta': reporte['area_etiqueta']['area'],
+            'unidad_montaje_sugerida': reporte['unidad_montaje_sugerida'],
+        }
+    return correr
+
+
+def _datos_pdf() -> Dict[str, Any]:
+    """Datos de cotización equivalentes a get_datos_completos_cotizacion"""
+    return {
+        'id': 1,
+        'consecutivo': 1234,
+        'nombre_cliente': 'CLIENTE BENCHMARK S.A.S.',
+        'identificador': 'ET 80X120 4T',
+        'material': {'nombre': 'Semibrillante'},
+        'adhesivo_tipo': 'Permanente',
+        'acabado': {'id': 10, 'nombre': 'Sin acabado'},
+        'num_tintas': 4,
+        'num_rollos': 1000,
+        'es_manga': False,
+        'ancho': 80.0,
+        'avance': 120.0,
+        'planchas_x_separado': False,
+        'valor_plancha_separado': None,
+        'politica_entrega': 'Estándar',
+        'politica_cartera': 'Pago a 30 días',
+        'comercial': {'nombre': 'Comercial Benchmark', 'email': 'comercial@example.com', 'celular': '3000000000'},
+        'resultados': [{'escala': e, 'valor_unidad': 100.0 + e / 1000.0} for e in ESCALAS[10]],
+    }
+
+
+def _caso_pdf() -> Callable[[], Any]:
+    from src.pdf.pdf_generator import CotizacionPDF
+
+    def correr():
+        pdf_bytes = CotizacionPDF().generar_pdf(_datos_pdf())
+        # El contenido cambia con la fecha; solo se verifica que sea un PDF
+        return {'es_pdf': bool(pdf_bytes) and pdf_bytes[:4] == b'%PDF'}
+    return correr
+
+
+def construir_casos() -> List[Tuple[str, Callable[[], Any], int]]:
+    """Lista de (nombre, función, repeticiones)"""
+    casos = []
+    for nombre, es_manga, _, avance, _, _ in PRODUCTOS:
+        casos.append((f"desperdicio/{nombre}/avance_{avance:g}", _caso_desperdicio(es_manga, avance), 50))
+    for nombre, es_manga, ancho, avance, pistas, tintas in PRODUCTOS:
+        unidad_elegida = CalculadoraDesperdicio(es_manga=es_manga).calcular_todas_opciones(avance)[1].dientes
+        for n_escalas, escalas in ESCALAS.items():
+            for etiqueta_unidad, unidad in (('global', None), (f"unidad_{unidad_elegida:g}", unidad_elegida)):
+                casos.append((
+                    f"costos_por_escala/{nombre}/{n_escalas}_escalas/{etiqueta_unidad}",
+                    _caso_costos(es_manga, ancho, avance, pistas, tintas, escalas, unidad),
+                    20 if n_escalas < 100 else 5
+                ))
+    for nombre, es_manga, ancho, avance, pistas, tintas in PRODUCTOS:
+        casos.append((f"litografia_reporte/{nombre}", _caso_litografia(es_manga, ancho, avance, pistas, tintas), 20))
+    casos.append(("pdf/cotizacion", _caso_pdf(), 5))
+    return casos
+
+
+# --- Golden ---
+
+def _iguales(esperado: Any, obtenido: Any) -> bool:
+    if isinstance(esperado, dict):
+        return isinstance(obtenido, dict) and esperado.keys() == obtenido.keys() and \
+            all(_iguales(esperado[k], obtenido[k]) for k in esperado)
+    if isinstance(esperado, list):
+        return isinstance(obtenido, list) and len(esperado) == len(obtenido) and \
+            all(_iguales(e, o) for e, o in zip(esperado, obtenido))
+    if isinstance(esperado, float) and isinstance(obtenido, float):
+        return abs(esperado - obtenido) <= TOLERANCIA_RELATIVA * max(1.0, abs(esperado))
+    return esperado == obtenido
+
+
+def _commit_actual() -> str:
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], text=True).strip()
+    except Exception:
+        return 'desconocido'
+
+
+# --- Ejecución ---
+
+def medir(funcion: Callable[[], Any], repeticiones: int) -> Tuple[Any, Dict[str, float]]:
+    """Ejecuta una vez para obtener la salida y luego mide las repeticiones (en ms)"""
+    with _silencio():
+        salida = _num(funcion())
+        tiempos = []
+        for _ in range(repeticiones):
+            inicio = time.perf_counter()
+            funcion()
+            tiempos.append((time.perf_counter() - inicio) * 1000)
+    return salida, {
+        'repeticiones': repeticiones,
+        'min_ms': min(tiempos),
+        'mediana_ms': statistics.median(tiempos),
+        'max_ms': max(tiempos),
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmarks de calculadoras con salidas doradas")
+    parser.add_argument('--salida', help="Archivo JSON donde guardar los tiempos")
+    parser.add_argument('--comparar', help="JSON de tiempos de otro commit para comparar medianas")
+    parser.add_argument('--actualizar-golden', action='store_true', help="Regenerar las salidas doradas")
+    parser.add_argument('--filtro', default='', help="Ejecutar solo casos cuyo nombre contenga este texto")
+    args = parser.parse_args()
+
+    golden = {}
+    if os.path.exists(RUTA_GOLDEN) and not args.actualizar_golden:
+        with open(RUTA_GOLDEN, encoding='utf-8') as f:
+            golden = json.load(f)
+
+    resultados, salidas, diferencias = {}, {}, []
+    for nombre, funcion, repeticiones in construir_casos():
+        if args.filtro not in nombre:
+            continue
+        salida, tiempos = medir(funcion, repeticiones)
+        salidas[nombre] = salida
+        resultados[nombre] = tiempos
+        if not args.actualizar_golden:
+            if nombre not in golden:
+                diferencias.append(f"{nombre}: sin salida dorada (ejecutar con --actualizar-golden)")
+            elif not _iguales(golden[nombre], salida):
+                diferencias.append(f"{nombre}: la salida cambió\n  esperado: {golden[nombre]}\n  obtenido: {salida}")
+        print(f"{nombre:<60} mediana {tiempos['mediana_ms']:9.3f} ms  (min {tiempos['min_ms']:.3f})", file=sys.stderr)
+
+    if args.actualizar_golden:
+        golden_nuevo = dict(golden)
+        if os.path.exists(RUTA_GOLDEN):
+            with open(RUTA_GOLDEN, encoding='utf-8') as f:
+                golden_nuevo = json.load(f)
+        golden_nuevo.update(salidas)
+        with open(RUTA_GOLDEN, 'w', encoding='utf-8') as f:
+            json.dump(golden_nuevo, f, indent=2, sort_keys=True, ensure_ascii=False)
+            f.write('\n')
+        print(f"Salidas doradas actualizadas en {RUTA_GOLDEN}", file=sys.stderr)
+
+    reporte = {
+        'commit': _commit_actual(),
+        'python': platform.python_version(),
+        'plataforma': platform.platform(),
+        'benchmarks': resultados,
+    }
+    if args.comparar:
+        with open(args.comparar, encoding='utf-8') as f:
+            base = json.load(f).get('benchmarks', {})
+        reporte['comparacion'] = {
+            nombre: {
+                'base_mediana_ms': base[nombre]['mediana_ms'],
+                'mediana_ms': tiempos['mediana_ms'],
+                'razon': tiempos['mediana_ms'] / base[nombre]['mediana_ms'] if base[nombre]['mediana_ms'] else None,
+            }
+            for nombre, tiempos in resultados.items() if nombre in base
+        }
+
+    texto = json.dumps(reporte, indent=2, ensure_ascii=False)
+    if args.salida:
+        with open(args.salida, 'w', encoding='utf-8') as f:
+            f.write(texto + '\n')
+    print(texto)
+
+    if diferencias:
+        print("\nERROR: salidas distintas a las doradas:", file=sys.stderr)
+        for diferencia in diferencias:
+            print(f"- {diferencia}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,149 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark de memoria de los modelos usados en listados de cotizaciones.
+
+Compara, para N filas de listado (por defecto 10.000 y 100.000):
+    - lista de dicts (lo que devuelve PostgREST)
+    - lista de Cotizacion (modelo completo)
+    - lista de CotizacionResumen (NamedTuple)
+    - LoteCotizaciones (una lista por columna)
+y, para N escalas con dos precios cada una, Escala/PrecioEscala frente a
+EscalaCompacta/PrecioEscalaCompacto.
+
+La memoria se mide con tracemalloc (bytes vivos tras construir la estructura, con los
+datos de origen ya asignados fuera de la medición). Los valores de texto de las filas
+son distintos en cada fila, como en la base real, para que no se compartan cadenas.
+
+Uso (desde la raíz del repositorio):
+    python benchmarks/benchmark_memoria_listados.py
+    python benchmarks/benchmark_memoria_listados.py --filas 10000 100000 --salida memoria.json
+"""
+
+import argparse
+import gc
+import json
+import platform
+import subprocess
+import sys
+import tracemalloc
+from typing import Any, Callable, Dict, List
+
+sys.path.append('.')
+
+from src.data.models import (
+    Cotizacion, CotizacionResumen, LoteCotizaciones,
+    Escala, PrecioEscala, EscalaCompacta, PrecioEscalaCompacto,
+)
+
+FILAS_POR_DEFECTO = [10_000, 100_000]
+
+
+def _filas_listado(n: int) -> List[Dict[str, Any]]:
+    """Filas con la forma de get_visible_cotizaciones_list"""
+    return [
+        {
+            'id': i,
+            'numero_cotizacion': i,
+            'identificador': f"ET PELB {50 + i % 50}X{40 + i % 30}MM 4T LAM RX{1000 + i % 5} CLIENTE{i % 997} REF{i} {i}",
+            'referencia': f"Referencia de prueba {i}",
+            'cliente_nombre': f"CLIENTE {i % 997} S.A.S",
+            'comercial_nombre': f"Comercial {i % 23}",
+            'fecha_creacion': f"2025-{1 + i % 12:02d}-{1 + i % 28:02d}T10:00:00+00:00",
+            'estado_id': 1 + i % 3,
+            'ajustes_modificados_admin': i % 7 == 0,
+            'id_usuario': f"00000000-0000-0000-0000-{i % 23:012d}",
+        }
+        for i in range(n)
+    ]
+
+
+def _cotizaciones(filas: List[Dict[str, Any]]) -> List[Cotizacion]:
+    return [
+        Cotizacion(
+            id=f['id'], numero_cotizacion=f['numero_cotizacion'], identificador=f['identificador'],
+            fecha_creacion=f['fecha_creacion'], estado_id=f['estado_id'], id_usuario=f['id_usuario'],
+        )
+        for f in filas
+    ]
+
+
+def _escalas(n: int) -> List[Escala]:
+    escalas = []
+    for i in range(n):
+        escala = Escala(id=i, cotizacion_id=i // 4, escala=1000 * (1 + i % 10), valor_unidad=12.5 + i % 100,
+                        metros=100.0 + i, tiempo_horas=1.5, montaje=20000.0, mo_y_maq=15000.0 + i,
+                        tintas=3000.0, papel_lam=8000.0, desperdicio_total=500.0)
+        escala.precios = [PrecioEscala(id=2 * i, escala_id=i, precio=12.5 + i % 100),
+                          PrecioEscala(id=2 * i + 1, escala_id=i, precio=11.0 + i % 100, tipo_precio='especial')]
+        escalas.append(escala)
+    return escalas
+
+
+def _escalas_compactas(escalas: List[Escala]) -> List[EscalaCompacta]:
+    return [EscalaCompacta.from_escala(escala) for escala in escalas]
+
+
+def medir_bytes(construir: Callable[[], Any]) -> int:
+    """Bytes que siguen asignados mientras vive el resultado de construir()"""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        antes = tracemalloc.get_traced_memory()[0]
+        resultado = construir()
+        despues = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    del resultado
+    return despues - antes
+
+
+def medir(n: int) -> Dict[str, Dict[str, Any]]:
+    # Los dicts se miden creándolos; el resto se construye desde dicts ya existentes,
+    # así que solo cuenta la estructura nueva (las cadenas se comparten con los dicts)
+    filas = _filas_listado(n)
+    escalas = _escalas(n)
+    casos = {
+        'dicts': lambda: _filas_listado(n),
+        'cotizacion': lambda: _cotizaciones(filas),
+        'resumen_namedtuple': lambda: [CotizacionResumen.from_dict(f) for f in filas],
+        'lote_columnar': lambda: LoteCotizaciones.from_filas(filas),
+        'escala': lambda: _escalas(n),
+        'escala_compacta': lambda: _escalas_compactas(escalas),
+    }
+    resultados = {nombre: {'bytes': medir_bytes(construir)} for nombre, construir in casos.items()}
+    for nombre, datos in resultados.items():
+        datos['bytes_por_fila'] = round(datos['bytes'] / n, 1)
+    return resultados
+
+
+def _commit_actual() -> str:
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], text=True).strip()
+    except Exception:
+        return 'desconocido'
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark de memoria de modelos de listado")
+    parser.add_argument('--filas', type=int, nargs='+', default=FILAS_POR_DEFECTO, help="Tamaños a medir")
+    parser.add_argument('--salida', help="Guardar el reporte JSON en este archivo")
+    args = parser.parse_args()
+
+    reporte = {
+        'commit': _commit_actual(),
+        'python': platform.python_version(),
+        'plataforma': platform.platform(),
+        'benchmarks': {str(n): medir(n) for n in args.filas},
+    }
+    texto = json.dumps(reporte, indent=2, ensure_ascii=False)
+    if args.salida:
+        with open(args.salida, 'w', encoding='utf-8') as f:
+            f.write(texto + '\n')
+    print(texto)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,453 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Prueba de carga: N comerciales virtuales concurrentes contra un Supabase falso en proceso.
+
+Cada usuario virtual es un hilo con su propio session_state, su cliente, su DBManager y
+su CotizacionManager (como una sesión de Streamlit). Tras iniciar sesión repite el
+recorrido de un comercial:
+
+    login      AuthManager.login (perfil por RPC y caché de perfiles)
+    cotizar    grafo de cálculo con caché compartida + preparar_nueva_cotizacion_model
+    guardar    CotizacionManager.guardar_nueva_cotizacion (referencia, RPC crear_cotizacion, escalas)
+    editar     CotizacionManager.actualizar_cotizacion_existente (upsert_calculos_escala);
+               solo en una fracción de los recorridos (--fraccion-edicion)
+    pdf        get_datos_completos_cotizacion + generar_bytes_pdf_cotizacion
+    dashboard  carga de datos del dashboard + búsqueda en el índice de cotizaciones
+
+La base (benchmarks/supabase_falso.py) agrega a cada petición la latencia configurada y
+puede inyectar fallos; DBManager reintenta los de conexión como con la base real. Se
+reporta, por paso y por recorrido completo, cantidad, errores, rendimiento (por
+segundo) y latencias p50/p95/p99 en ms. La salida de las calculadoras y la bitácora se
+descartan durante la prueba (--nivel-bitacora para ver la bitácora).
+
+Uso (desde la raíz del repositorio):
+    python benchmarks/prueba_carga.py --usuarios 20 --duracion 60
+    python benchmarks/prueba_carga.py --usuarios 50 --iteraciones 5 --latencia-ms 40 --variacion-ms 15
+    python benchmarks/prueba_carga.py --usuarios 20 --duracion 60 --fallos 0.02 --salida carga.json
+"""
+
+import argparse
+import contextlib
+import json
+import logging
+import os
+import platform
+import random
+import subprocess
+import sys
+import threading
+import time
+import uuid
+from collections import defaultdict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+sys.path.append('.')
+
+import streamlit as st
+import streamlit.logger
+
+# Sin servidor (modo "bare") Streamlit avisa en cada llamada que no hay contexto de script
+streamlit.logger.set_log_level('error')
+
+from benchmarks.supabase_falso import (
+    BaseFalsa, ClienteSupabaseFalso, ConfiguracionRed, poblar_base, FALLO_CONEXION, FALLO_API,
+    ID_SIN_ADHESIVO, MATERIALES_MANGA,
+)
+from src.auth.auth_manager import AuthManager
+from src.data.database import DBManager
+from src.logic.cotizacion_manager import CotizacionManager
+from src.logic.grafo_cotizacion import construir_grafo_cotizacion, entradas_desde_formulario
+from src.logic.cache_calculos import evaluar_con_cache
+from src.pdf.pdf_generator import generar_bytes_pdf_cotizacion
+from src.ui.dashboard_view import _load_dashboard_data
+
+PASOS = ('login', 'cotizar', 'guardar', 'editar', 'pdf', 'dashboard')
+RECORRIDO = 'recorrido'
+PERCENTILES = (50, 95, 99)
+
+# Opciones del formulario que eligen los usuarios virtuales (valores discretos, como en
+# la calculadora: configuraciones repetidas entre comerciales aciertan en la caché)
+ANCHOS = (50.0, 60.0, 80.0, 100.0, 120.0)
+AVANCES = (60.0, 80.0, 100.0, 120.0, 150.0)
+ESCALAS = ([1000, 2000, 5000], [1000, 5000, 10000, 20000], [500, 1000, 3000, 5000, 10000])
+ACABADOS_ETIQUETA = (1, 2, 3, 4, 10)
+
+
+class EstadoSesionPorHilo:
+    """
+    Sustituto de st.session_state con un estado por hilo. Fuera de un servidor de
+    Streamlit session_state es un único dict del proceso; cada usuario virtual necesita
+    el suyo (DBManager, la caché de datos y SessionManager lo leen).
+    """
+
+    def __init__(self):
+        object.__setattr__(self, '_local', threading.local())
+
+    @property
+    def _datos(self) -> Dict[str, Any]:
+        local = object.__getattribute__(self, '_local')
+        if not hasattr(local, 'datos'):
+            local.datos = {}
+        return local.datos
+
+    def __getattr__(self, clave: str) -> Any:
+        try:
+            return self._datos[clave]
+        except KeyError:
+            raise AttributeError(f"st.session_state has no attribute \"{clave}\"")
+
+    def __setattr__(self, clave: str, valor: Any) -> None:
+        self._datos[clave] = valor
+
+    def __delattr__(self, clave: str) -> None:
+        del self._datos[clave]
+
+    def __getitem__(self, clave: str) -> Any:
+        return self._datos[clave]
+
+    def __setitem__(self, clave: str, valor: Any) -> None:
+        self._datos[clave] = valor
+
+    def __delitem__(self, clave: str) -> None:
+        del self._datos[clave]
+
+    def __contains__(self, clave: object) -> bool:
+        return clave in self._datos
+
+    def __iter__(self):
+        return iter(list(self._datos))
+
+    def __len__(self) -> int:
+        return len(self._datos)
+
+    def get(self, clave: str, defecto: Any = None) -> Any:
+        return self._datos.get(clave, defecto)
+
+    def setdefault(self, clave: str, defecto: Any = None) -> Any:
+        return self._datos.setdefault(clave, defecto)
+
+    def pop(self, clave: str, *defecto: Any) -> Any:
+        return self._datos.pop(clave, *defecto)
+
+    def keys(self):
+        return self._datos.keys()
+
+    def items(self):
+        return self._datos.items()
+
+    def clear(self) -> None:
+        self._datos.clear()
+
+
+@contextlib.contextmanager
+def sesiones_aisladas():
+    """Reemplaza st.session_state por un estado por hilo mientras dura la prueba"""
+    original = st.session_state
+    st.session_state = EstadoSesionPorHilo()
+    try:
+        yield
+    finally:
+        st.session_state = original
+
+
+@contextlib.contextmanager
+def sin_salida(nivel_bitacora: str):
+    """Descarta los print y trazas de calculadoras y PDF y sube el nivel de la bitácora"""
+    bitacora = logging.getLogger('cotizador')
+    nivel_anterior = bitacora.level
+    bitacora.setLevel(nivel_bitacora)
+    with open(os.devnull, 'w') as nulo, contextlib.redirect_stdout(nulo), contextlib.redirect_stderr(nulo):
+        try:
+            yield
+        finally:
+            bitacora.setLevel(nivel_anterior)
+
+
+class RegistroLatencias:
+    """Duraciones y errores por paso, compartidos por todos los usuarios virtuales"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.duraciones: Dict[str, List[float]] = defaultdict(list)
+        self.errores: Dict[str, int] = defaultdict(int)
+        self.ejemplos_error: Dict[str, str] = {}
+
+    def registrar(self, paso: str, segundos: float, error: Optional[str] = None) -> None:
+        with self._lock:
+            if error is None:
+                self.duraciones[paso].append(segundos)
+            else:
+                self.errores[paso] += 1
+                self.ejemplos_error.setdefault(paso, error)
+
+    def resumen(self, segundos_totales: float) -> Dict[str, Dict[str, Any]]:
+        resumen = {}
+        for paso in PASOS + (RECORRIDO,):
+            duraciones = sorted(self.duraciones.get(paso, []))
+            errores = self.errores.get(paso, 0)
+            if not duraciones and not errores:
+                continue
+            datos = {
+                'ok': len(duraciones),
+                'errores': errores,
+                'por_segundo': round(len(duraciones) / segundos_totales, 2) if segundos_totales else 0.0,
+                'media_ms': round(sum(duraciones) / len(duraciones) * 1000, 1) if duraciones else None,
+            }
+            for p in PERCENTILES:
+                datos[f"p{p}_ms"] = round(percentil(duraciones, p) * 1000, 1) if duraciones else None
+            if paso in self.ejemplos_error:
+                datos['ejemplo_error'] = self.ejemplos_error[paso]
+            resumen[paso] = datos
+        return resumen
+
+
+def percentil(ordenados: List[float], p: float) -> float:
+    """Percentil por rango más cercano sobre una lista ya ordenada"""
+    indice = max(0, min(len(ordenados) - 1, int(round(p / 100.0 * len(ordenados) + 0.5)) - 1))
+    return ordenados[indice]
+
+
+class FalloPaso(Exception):
+    """Un paso terminó sin excepción pero con resultado fallido (p. ej. success=False)"""
+
+
+class UsuarioVirtual:
+    """Un comercial que repite el recorrido cotizar → guardar → (editar) → pdf → dashboard"""
+
+    def __init__(self, indice: int, usuario: Dict[str, Any], base: BaseFalsa, registro: RegistroLatencias,
+                 clientes: int, fraccion_edicion: float, pausa: float, semilla: int):
+        self.indice = indice
+        self.usuario = usuario
+        self.base = base
+        self.registro = registro
+        self.clientes = clientes
+        self.fraccion_edicion = fraccion_edicion
+        self.pausa = pausa
+        self.azar = random.Random(semilla + indice)
+        self.form_data: Dict[str, Any] = {}
+        self.cotizacion_model = None
+        self.datos_calculo: Dict[str, Any] = {}
+        self.cotizacion_id: Optional[int] = None
+        self.referencia = ''
+        self.cliente_id = 0
+
+    def _medir(self, paso: str, funcion: Callable[[], Any]) -> bool:
+        inicio = time.perf_counter()
+        try:
+            funcion()
+        except Exception as e:
+            self.registro.registrar(paso, time.perf_counter() - inicio, f"{type(e).__name__}: {e}")
+            return False
+        self.registro.registrar(paso, time.perf_counter() - inicio)
+        if self.pausa:
+            time.sleep(self.azar.uniform(0.5, 1.5) * self.pausa)
+        return True
+
+    # --- Pasos ---
+
+    def login(self) -> None:
+        cliente = ClienteSupabaseFalso(self.base)
+        st.session_state.supabase = cliente
+        auth = AuthManager(cliente)
+        exito, mensaje = auth.login(self.usuario['email'], self.usuario['clave'])
+        if not exito:
+            raise FalloPaso(mensaje)
+        st.session_state.db = DBManager(cliente)
+        st.session_state.cotizacion_manager = CotizacionManager(st.session_state.db)
+
+    def cotizar(self) -> None:
+        azar = self.azar
+        es_manga = azar.random() < 0.3
+        material_id = azar.choice(MATERIALES_MANGA) if es_manga else azar.randint(1, 4)
+        adhesivo_id = ID_SIN_ADHESIVO if es_manga else azar.randint(1, 3)
+        ancho = azar.choice(ANCHOS)
+        # Pistas que caben en el ancho máximo de máquina
+        pistas = 1 if es_manga else azar.randint(1, 3 if ancho <= 80 else 2)
+        mat_adh = self.base.buscar('material_adhesivo', material_id=material_id, adhesivo_id=adhesivo_id)
+        form_data = {
+            'ancho': ancho, 'avance': azar.choice(AVANCES), 'pistas': pistas,
+            'es_manga': es_manga, 'num_tintas': azar.randint(0, 6),
+            'acabado_id': 10 if es_manga else azar.choice(ACABADOS_ETIQUETA),
+            'material_id': material_id, 'adhesivo_id': adhesivo_id, 'material_adhesivo_id': mat_adh['id'],
+            'tiene_troquel': azar.random() < 0.5, 'planchas_separadas': azar.random() < 0.2,
+            'unidad_montaje_dientes': None, 'tipo_grafado_id': 1 if es_manga else None,
+            'tipo_grafado_nombre': 'Sin grafado' if es_manga else None,
+            'escalas': azar.choice(ESCALAS), 'num_paquetes': 1000, 'tipo_producto_id': 2 if es_manga else 1,
+        }
+        if 'grafo_cotizacion' not in st.session_state:
+            st.session_state.grafo_cotizacion = construir_grafo_cotizacion(st.session_state.db)
+        valores = evaluar_con_cache(st.session_state.grafo_cotizacion, entradas_desde_formulario(form_data, {}))
+
+        geometria = valores['geometria']
+        acabado = valores['acabado']
+        self.datos_calculo = {
+            'valor_material': valores['valor_material'], 'valor_plancha': valores['plancha']['valor'],
+            'valor_acabado': acabado.valor if acabado else 0, 'valor_troquel': valores['troquel']['valor'],
+            'rentabilidad': valores['rentabilidad'], 'avance': geometria.avance, 'ancho': form_data['ancho'],
+            'unidad_z_dientes': valores['mejor_opcion'].dientes, 'existe_troquel': geometria.troquel_existe,
+            'planchas_x_separado': geometria.planchas_por_separado, 'num_tintas': form_data['num_tintas'],
+            'numero_pistas': geometria.pistas, 'num_paquetes_rollos': form_data['num_paquetes'],
+            'tipo_producto_id': form_data['tipo_producto_id'], 'tipo_grafado_id': form_data['tipo_grafado_id'],
+            'altura_grafado': None, 'valor_plancha_separado': None, 'acabado_id': form_data['acabado_id'],
+            'parametros_especiales': {'curva_precio': valores['curva_precio'].to_dict()},
+        }
+        self.cotizacion_model = st.session_state.cotizacion_manager.preparar_nueva_cotizacion_model(
+            material_adhesivo_id=form_data['material_adhesivo_id'], acabado_id=form_data['acabado_id'],
+            num_tintas=form_data['num_tintas'], num_paquetes_rollos=form_data['num_paquetes'], es_manga=es_manga,
+            tipo_grafado=form_data['tipo_grafado_nombre'], valor_troquel=self.datos_calculo['valor_troquel'],
+            valor_plancha_separado=None, planchas_x_separado=geometria.planchas_por_separado,
+            existe_troquel=geometria.troquel_existe, numero_pistas=geometria.pistas, avance=geometria.avance,
+            ancho=form_data['ancho'], tipo_producto_id=form_data['tipo_producto_id'], altura_grafado=None,
+            escalas_resultados=[dict(r) for r in valores['resultados']],
+            **({'tipo_grafado_id': form_data['tipo_grafado_id']} if es_manga else {}),
+        )
+        self.form_data = form_data
+
+    def guardar(self) -> None:
+        self.cliente_id = self.azar.randint(1, self.clientes)
+        self.referencia = f"Referencia carga {self.indice}-{uuid.uuid4().hex[:8]}"
+        exito, mensaje, cotizacion_id = st.session_state.cotizacion_manager.guardar_nueva_cotizacion(
+            self.cotizacion_model, self.cliente_id, self.referencia, self.usuario['id'],
+            dict(self.datos_calculo), False
+        )
+        if not exito or not cotizacion_id:
+            raise FalloPaso(mensaje)
+        self.cotizacion_id = cotizacion_id
+
+    def editar(self) -> None:
+        exito, mensaje = st.session_state.cotizacion_manager.actualizar_cotizacion_existente(
+            cotizacion_id=self.cotizacion_id, cotizacion_model=self.cotizacion_model, cliente_id=self.cliente_id,
+            referencia_descripcion=self.referencia, comercial_id=self.usuario['id'],
+            datos_calculo=dict(self.datos_calculo), modificado_por=self.usuario['id'], es_recotizacion=False,
+        )
+        if not exito:
+            raise FalloPaso(mensaje)
+
+    def pdf(self) -> None:
+        datos = st.session_state.db.get_datos_completos_cotizacion(self.cotizacion_id)
+        if not datos:
+            raise FalloPaso(f"Sin datos completos para la cotización {self.cotizacion_id}")
+        if not generar_bytes_pdf_cotizacion(datos):
+            raise FalloPaso(f"No se generó el PDF de la cotización {self.cotizacion_id}")
+
+    def dashboard(self) -> None:
+        df = _load_dashboard_data(st.session_state.db)
+        if df.empty:
+            raise FalloPaso("Dashboard sin cotizaciones")
+        st.session_state.db.buscar_cotizaciones('referencia')
+
+    # --- Recorrido ---
+
+    def correr(self, inicio: threading.Barrier, duracion: Optional[float], iteraciones: Optional[int]) -> None:
+        inicio.wait()
+        fin = time.perf_counter() + duracion if duracion is not None else float('inf')
+        if not self._medir('login', self.login):
+            return
+        hechas = 0
+        while time.perf_counter() < fin and (iteraciones is None or hechas < iteraciones):
+            comienzo = time.perf_counter()
+            completo = self._medir('cotizar', self.cotizar) and self._medir('guardar', self.guardar)
+            if completo and self.azar.random() < self.fraccion_edicion:
+                completo = self._medir('editar', self.editar)
+            completo = completo and self._medir('pdf', self.pdf)
+            completo = self._medir('dashboard', self.dashboard) and completo
+            self.registro.registrar(RECORRIDO, time.perf_counter() - comienzo, None if completo else 'paso con error')
+            hechas += 1
+
+
+def ejecutar(usuarios: int, duracion: Optional[float], iteraciones: Optional[int], red: ConfiguracionRed,
+             clientes: int, cotizaciones_previas: int, fraccion_edicion: float, pausa: float,
+             nivel_bitacora: str, semilla: int) -> Tuple[Dict[str, Any], Dict[str, Any], float]:
+    """Corre la prueba y devuelve (resumen por paso, estadísticas de la base, segundos)"""
+    base = BaseFalsa(red)
+    cuentas = poblar_base(base, comerciales=usuarios, clientes=clientes, cotizaciones_previas=cotizaciones_previas)
+    registro = RegistroLatencias()
+    barrera = threading.Barrier(usuarios + 1)
+    with sesiones_aisladas(), sin_salida(nivel_bitacora):
+        hilos = [
+            threading.Thread(
+                target=UsuarioVirtual(i, cuentas[i], base, registro, clientes, fraccion_edicion, pausa, semilla).correr,
+                args=(barrera, duracion, iteraciones), name=f"usuario-virtual-{i}", daemon=True
+            )
+            for i in range(usuarios)
+        ]
+        for hilo in hilos:
+            hilo.start()
+        barrera.wait()
+        comienzo = time.perf_counter()
+        for hilo in hilos:
+            hilo.join()
+        segundos = time.perf_counter() - comienzo
+    return registro.resumen(segundos), base.estadisticas(), segundos
+
+
+def _commit_actual() -> str:
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], text=True,
+                                       stderr=subprocess.DEVNULL).strip()
+    except Exception:
+        return 'desconocido'
+
+
+def _imprimir(resumen: Dict[str, Dict[str, Any]], servidor: Dict[str, Any], segundos: float, usuarios: int) -> None:
+    print(f"\n{usuarios} usuarios virtuales · {segundos:.1f} s · "
+          f"{servidor['peticiones']} peticiones a la base ({servidor['peticiones'] / segundos:.0f}/s) · "
+          f"{servidor['fallos_inyectados']} fallos inyectados\n")
+    columnas = ('ok', 'errores', 'por_segundo', 'media_ms') + tuple(f"p{p}_ms" for p in PERCENTILES)
+    print(f"{'paso':<11}" + ''.join(f"{c:>12}" for c in columnas))
+    for paso, datos in resumen.items():
+        celdas = ''.join(f"{'-' if datos[c] is None else datos[c]:>12}" for c in columnas)
+        print(f"{paso:<11}{celdas}")
+    errores = {paso: datos['ejemplo_error'] for paso, datos in resumen.items() if 'ejemplo_error' in datos}
+    if errores:
+        print("\nPrimer error por paso:")
+        for paso, error in errores.items():
+            print(f"  {paso}: {error[:160]}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--usuarios', type=int, default=10, help='usuarios virtuales concurrentes')
+    parser.add_argument('--duracion', type=float, default=None, help='segundos de prueba (por defecto 30 si no hay --iteraciones)')
+    parser.add_argument('--iteraciones', type=int, default=None, help='recorridos por usuario')
+    parser.add_argument('--latencia-ms', type=float, default=25.0, help='latencia media por petición a la base')
+    parser.add_argument('--variacion-ms', type=float, default=10.0, help='desviación estándar de la latencia')
+    parser.add_argument('--fallos', type=float, default=0.0, help='fracción de peticiones que fallan (0-1)')
+    parser.add_argument('--tipo-fallo', choices=(FALLO_CONEXION, FALLO_API), default=FALLO_CONEXION)
+    parser.add_argument('--clientes', type=int, default=200, help='clientes en la base')
+    parser.add_argument('--cotizaciones-previas', type=int, default=20, help='cotizaciones previas por comercial')
+    parser.add_argument('--fraccion-edicion', type=float, default=0.2, help='fracción de recorridos que editan la cotización')
+    parser.add_argument('--pausa', type=float, default=0.0, help='segundos de pausa media entre pasos (tiempo de usuario)')
+    parser.add_argument('--semilla', type=int, default=1)
+    parser.add_argument('--nivel-bitacora', default='CRITICAL', help='nivel de la bitácora del cotizador durante la prueba')
+    parser.add_argument('--salida', help='guardar el resultado en JSON')
+    args = parser.parse_args()
+
+    duracion = args.duracion if args.duracion is not None or args.iteraciones is not None else 30.0
+    red = ConfiguracionRed(latencia_ms=args.latencia_ms, variacion_ms=args.variacion_ms,
+                           tasa_fallos=args.fallos, tipo_fallo=args.tipo_fallo, semilla=args.semilla)
+    resumen, servidor, segundos = ejecutar(
+        args.usuarios, duracion, args.iteraciones, red, args.clientes, args.cotizaciones_previas,
+        args.fraccion_edicion, args.pausa, args.nivel_bitacora.upper(), args.semilla
+    )
+    _imprimir(resumen, servidor, segundos, args.usuarios)
+
+    if args.salida:
+        resultado = {
+            'commit': _commit_actual(),
+            'python': platform.python_version(),
+            'configuracion': {k: v for k, v in vars(args).items() if k != 'salida'},
+            'segundos': round(segundos, 2),
+            'pasos': resumen,
+            'base': servidor,
+        }
+        with open(args.salida, 'w', encoding='utf-8') as f:
+            json.dump(resultado, f, indent=2, ensure_ascii=False)
+        print(f"\nResultado guardado en {args.salida}")
+    return 1 if resumen.get(RECORRIDO, {}).get('errores') and not args.fallos else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,224 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Reproduce el corpus de cálculos reales (src/logic/corpus_calculos.py) con las
+calculadoras actuales.
+
+Cada registro del corpus trae las entradas del grafo, los precios que se leyeron de la BD
+y las salidas que se obtuvieron en producción. Aquí se arma un grafo de cotización nuevo
+por registro con una BD en memoria que devuelve esos mismos precios, se evalúa y:
+
+    - se comparan las salidas (DatosEscala, montaje, troquel, plancha, resultados por
+      escala) contra las guardadas; una diferencia mayor que la tolerancia es una deriva
+      y el script termina con código 1;
+    - se mide el tiempo del cálculo completo (mejor de --repeticiones) y se reportan
+      p50/p95/p99 y los cálculos más lentos.
+
+A diferencia de los casos sintéticos de test_repeticiones.py, el corpus refleja las
+configuraciones que los comerciales cotizan de verdad.
+
+Uso (desde la raíz del repositorio):
+    python benchmarks/reproducir_corpus.py                                # corpus_calculos.jsonl
+    python benchmarks/reproducir_corpus.py --corpus otro.jsonl --repeticiones 5
+    python benchmarks/reproducir_corpus.py --tolerancia 1e-6 --salida replay.json
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import math
+import os
+import platform
+import subprocess
+import sys
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+sys.path.append('.')
+
+from src.data.models import Acabado
+from src.logic.corpus_calculos import ARCHIVO_CORPUS, VERSION_FORMATO, salidas_calculo
+from src.logic.grafo_cotizacion import construir_grafo_cotizacion
+
+TOLERANCIA_RELATIVA = 1e-9
+TOLERANCIA_ABSOLUTA = 1e-9
+MAX_DIFERENCIAS_MOSTRADAS = 5
+
+
+class BDCorpus:
+    """BD mínima para el grafo de cotización: devuelve los precios guardados en el registro"""
+
+    def __init__(self, precios: Dict[str, Any]):
+        self.precios = precios
+
+    def get_material_adhesivo_valor(self, material_id: int, adhesivo_id: int) -> Optional[float]:
+        return self.precios.get('valor_material_base')
+
+    def get_acabado(self, acabado_id: int) -> Optional[Acabado]:
+        valor = self.precios.get('valor_acabado')
+        return Acabado(id=acabado_id, valor=valor) if valor is not None else None
+
+
+@contextlib.contextmanager
+def _silencio():
+    """Las calculadoras imprimen debug en cada paso; se descarta para no medir la terminal"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        yield
+
+
+def diferencias(esperado: Any, obtenido: Any, ruta: str, tol_rel: float, tol_abs: float) -> List[str]:
+    """Rutas donde las salidas difieren (números fuera de tolerancia o estructura distinta)"""
+    if isinstance(esperado, dict) and isinstance(obtenido, dict):
+        encontradas = []
+        for clave in sorted(set(esperado) | set(obtenido)):
+            if clave not in esperado or clave not in obtenido:
+                encontradas.append(f"{ruta}.{clave}: {'nuevo' if clave not in esperado else 'ya no existe'}")
+            else:
+                encontradas += diferencias(esperado[clave], obtenido[clave], f"{ruta}.{clave}", tol_rel, tol_abs)
+        return encontradas
+    if isinstance(esperado, list) and isinstance(obtenido, list):
+        if len(esperado) != len(obtenido):
+            return [f"{ruta}: {len(esperado)} elementos -> {len(obtenido)}"]
+        encontradas = []
+        for i, (a, b) in enumerate(zip(esperado, obtenido)):
+            encontradas += diferencias(a, b, f"{ruta}[{i}]", tol_rel, tol_abs)
+        return encontradas
+    if isinstance(esperado, float) and isinstance(obtenido, float):
+        if math.isclose(esperado, obtenido, rel_tol=tol_rel, abs_tol=tol_abs):
+            return []
+        return [f"{ruta}: {esperado!r} -> {obtenido!r}"]
+    return [] if esperado == obtenido else [f"{ruta}: {esperado!r} -> {obtenido!r}"]
+
+
+def reproducir(registro: Dict[str, Any], repeticiones: int) -> Tuple[Dict[str, Any], float]:
+    """Evalúa el registro con las calculadoras actuales: (salidas, mejor tiempo en segundos)"""
+    mejor = float('inf')
+    valores = None
+    for _ in range(repeticiones):
+        # Grafo nuevo en cada repetición: uno ya evaluado memoriza y no recalcularía nada
+        grafo = construir_grafo_cotizacion(BDCorpus(registro['precios']))
+        inicio = time.perf_counter()
+        with _silencio():
+            valores = grafo.evaluar(registro['entradas'])
+        mejor = min(mejor, time.perf_counter() - inicio)
+    return salidas_calculo(valores), mejor
+
+
+def leer_corpus(ruta: str) -> List[Dict[str, Any]]:
+    registros = []
+    with open(ruta, encoding='utf-8') as f:
+        for numero, linea in enumerate(f, 1):
+            if not linea.strip():
+                continue
+            try:
+                registro = json.loads(linea)
+            except ValueError:
+                print(f"Línea {numero}: JSON inválido, se omite")
+                continue
+            if registro.get('version') != VERSION_FORMATO:
+                print(f"Línea {numero}: versión de formato {registro.get('version')} no soportada, se omite")
+                continue
+            registros.append(registro)
+    return registros
+
+
+def percentil(ordenados: List[float], p: float) -> float:
+    """Percentil por rango más cercano sobre una lista ya ordenada"""
+    indice = max(0, min(len(ordenados) - 1, int(round(p / 100.0 * len(ordenados) + 0.5)) - 1))
+    return ordenados[indice]
+
+
+def _commit_actual() -> str:
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], text=True,
+                                       stderr=subprocess.DEVNULL).strip()
+    except Exception:
+        return 'desconocido'
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--corpus', default=ARCHIVO_CORPUS, help='archivo JSON lines del corpus')
+    parser.add_argument('--repeticiones', type=int, default=3, help='evaluaciones por registro (se toma la mejor)')
+    parser.add_argument('--tolerancia', type=float, default=TOLERANCIA_RELATIVA, help='tolerancia relativa')
+    parser.add_argument('--tolerancia-absoluta', type=float, default=TOLERANCIA_ABSOLUTA)
+    parser.add_argument('--lentos', type=int, default=5, help='cálculos más lentos a mostrar')
+    parser.add_argument('--salida', help='guardar el reporte en JSON')
+    args = parser.parse_args()
+
+    if not os.path.exists(args.corpus):
+        print(f"No existe el corpus {args.corpus} (se genera con CORPUS_CALCULOS_ACTIVO=1 en la aplicación)")
+        return 2
+    registros = leer_corpus(args.corpus)
+    print(f"Reproduciendo {len(registros)} cálculos de {args.corpus}...")
+
+    tiempos: List[Tuple[float, Dict[str, Any]]] = []
+    derivas: List[Dict[str, Any]] = []
+    errores: List[Dict[str, Any]] = []
+    for registro in registros:
+        try:
+            salidas, segundos = reproducir(registro, max(1, args.repeticiones))
+        except Exception as e:
+            errores.append({'clave': registro['clave'], 'error': f"{type(e).__name__}: {e}"})
+            continue
+        tiempos.append((segundos, registro))
+        encontradas = diferencias(registro['salidas'], salidas, 'salidas', args.tolerancia, args.tolerancia_absoluta)
+        if encontradas:
+            derivas.append({'clave': registro['clave'], 'diferencias': len(encontradas),
+                            'primeras': encontradas[:MAX_DIFERENCIAS_MOSTRADAS]})
+
+    duraciones = sorted(t for t, _ in tiempos)
+    resumen = {
+        'registros': len(registros),
+        'reproducidos': len(tiempos),
+        'con_deriva': len(derivas),
+        'errores': len(errores),
+    }
+    if duraciones:
+        resumen.update({
+            'media_ms': round(sum(duraciones) / len(duraciones) * 1000, 3),
+            'p50_ms': round(percentil(duraciones, 50) * 1000, 3),
+            'p95_ms': round(percentil(duraciones, 95) * 1000, 3),
+            'p99_ms': round(percentil(duraciones, 99) * 1000, 3),
+            'total_s': round(sum(duraciones), 3),
+        })
+    print(json.dumps(resumen, indent=2, ensure_ascii=False))
+
+    lentos = sorted(tiempos, key=lambda t: t[0], reverse=True)[:args.lentos]
+    if lentos:
+        print("\nCálculos más lentos:")
+        for segundos, registro in lentos:
+            entradas = registro['entradas']
+            print(f"  {segundos * 1000:8.2f} ms  {registro['clave'][:12]}  "
+                  f"{'manga' if entradas.get('es_manga') else 'etiqueta'} {entradas.get('ancho')}x{entradas.get('avance')} "
+                  f"{entradas.get('pistas')} pistas, {entradas.get('num_tintas')} tintas, "
+                  f"{len(entradas.get('escalas') or [])} escalas")
+    for deriva in derivas:
+        print(f"\nDERIVA {deriva['clave'][:12]} ({deriva['diferencias']} diferencias):")
+        for diferencia in deriva['primeras']:
+            print(f"  {diferencia}")
+    for error in errores:
+        print(f"\nERROR {error['clave'][:12]}: {error['error']}")
+
+    if args.salida:
+        reporte = {
+            'commit': _commit_actual(),
+            'python': platform.python_version(),
+            'corpus': args.corpus,
+            'tolerancia': args.tolerancia,
+            'resumen': resumen,
+            'derivas': derivas,
+            'errores': errores,
+            'tiempos_ms': {registro['clave']: round(t * 1000, 3) for t, registro in tiempos},
+        }
+        with open(args.salida, 'w', encoding='utf-8') as f:
+            json.dump(reporte, f, indent=2, ensure_ascii=False)
+        print(f"\nReporte guardado en {args.salida}")
+
+    return 1 if derivas or errores else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
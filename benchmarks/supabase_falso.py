@@ -0,0 +1,844 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Supabase falso en proceso para pruebas de carga (ver benchmarks/prueba_carga.py).
+
+Reproduce la superficie de PostgREST y de RPC que usa DBManager sobre tablas en memoria
+compartidas por todos los clientes:
+
+    base = BaseFalsa(ConfiguracionRed(latencia_ms=30, variacion_ms=10, tasa_fallos=0.01))
+    usuarios = poblar_base(base, comerciales=20)
+    cliente = ClienteSupabaseFalso(base)          # uno por sesión, como crear_cliente_compartido
+    cliente.auth.sign_in_with_password({'email': ..., 'password': CLAVE_USUARIOS})
+    db = DBManager(cliente)
+
+    - Consultas: table()/from_() con select (incluye recursos embebidos como
+      'cliente:clientes(*)' o 'referencias_cliente(descripcion, clientes(nombre))'),
+      eq/neq/gt/gte/lt/lte/in_/is_/like/ilike/or_, order, limit, range, single,
+      maybe_single, insert, update, upsert y delete.
+    - RPC: las funciones SQL del cotizador que usan los recorridos (crear_cotizacion,
+      get_cotizacion_details_for_edit, upsert_calculos_escala, get_referencia_cliente_details,
+      get_visible_cotizaciones_for_dashboard...). Las de visibilidad aplican la regla de
+      RLS de la base real: un comercial ve sus cotizaciones y un administrador todas.
+    - Red: cada execute() espera latencia_ms ± variacion_ms y, con probabilidad
+      tasa_fallos, falla como la red (httpx.RemoteProtocolError, que DBManager reintenta)
+      o como PostgREST (postgrest.APIError, que no se reintenta).
+
+No pasa por httpx ni por postgrest-py: mide la aplicación (DBManager, CotizacionManager,
+calculadoras, PDF) con una base de latencia controlada, no el cliente HTTP. Las tablas
+sin RPC no aplican RLS.
+"""
+
+import copy
+import itertools
+import random
+import re
+import threading
+import time
+import uuid
+from collections import Counter
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import httpx
+from postgrest import APIError
+
+CLAVE_USUARIOS = 'clave-prueba-carga'
+
+# Fallos que se pueden inyectar
+FALLO_CONEXION = 'conexion'
+FALLO_API = 'api'
+
+# Claves foráneas que no siguen la convención <tabla en singular>_id
+RELACIONES = {
+    ('referencias_cliente', 'perfiles'): 'id_usuario',
+    ('cotizaciones', 'perfiles'): 'id_usuario',
+    ('cotizacion_escalas', 'cotizaciones'): 'cotizacion_id',
+}
+
+# Campos que crear_cotizacion guarda en calculos_escala_cotizacion y no en cotizaciones
+CAMPOS_SOLO_CALCULO = ('valor_material', 'valor_plancha', 'valor_acabado', 'rentabilidad', 'unidad_z_dientes')
+CAMPOS_CALCULO = CAMPOS_SOLO_CALCULO + (
+    'valor_troquel', 'avance', 'ancho', 'existe_troquel', 'planchas_x_separado', 'num_tintas',
+    'numero_pistas', 'num_paquetes_rollos', 'tipo_producto_id', 'tipo_grafado_id',
+)
+
+
+def _ahora() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+@dataclass
+class ConfiguracionRed:
+    """Latencia y fallos simulados por petición (execute)"""
+    latencia_ms: float = 0.0
+    variacion_ms: float = 0.0
+    tasa_fallos: float = 0.0
+    tipo_fallo: str = FALLO_CONEXION
+    semilla: Optional[int] = None
+
+
+class Respuesta:
+    """Respuesta con la forma de postgrest.APIResponse (data, count)"""
+    __slots__ = ('data', 'count')
+
+    def __init__(self, data: Any, count: Optional[int] = None):
+        self.data = data
+        self.count = count
+
+    def __repr__(self) -> str:
+        return f"Respuesta(data={self.data!r}, count={self.count!r})"
+
+
+class BaseFalsa:
+    """Tablas en memoria, funciones RPC y simulación de red compartidas por todos los clientes"""
+
+    def __init__(self, red: Optional[ConfiguracionRed] = None):
+        self.red = red or ConfiguracionRed()
+        self.tablas: Dict[str, List[Dict[str, Any]]] = {}
+        self.claves: Dict[str, str] = {}  # email -> contraseña
+        self._secuencias: Dict[str, 'itertools.count[int]'] = {}
+        self._lock = threading.RLock()
+        self._azar = random.Random(self.red.semilla)
+        self._azar_lock = threading.Lock()
+        self._peticiones: Counter = Counter()
+        self._fallos: Counter = Counter()
+        self.funciones: Dict[str, Callable[['BaseFalsa', Optional[str], Dict[str, Any]], Any]] = dict(FUNCIONES_RPC)
+
+    # --- Red ---
+
+    def simular_red(self, operacion: str) -> None:
+        """Espera la latencia de una petición y, según tasa_fallos, la hace fallar"""
+        with self._azar_lock:
+            espera = max(0.0, self._azar.gauss(self.red.latencia_ms, self.red.variacion_ms)) if self.red.variacion_ms \
+                else self.red.latencia_ms
+            falla = self.red.tasa_fallos > 0 and self._azar.random() < self.red.tasa_fallos
+        with self._lock:
+            self._peticiones[operacion] += 1
+            if falla:
+                self._fallos[operacion] += 1
+        if espera:
+            time.sleep(espera / 1000.0)
+        if falla:
+            if self.red.tipo_fallo == FALLO_API:
+                raise APIError({'message': f"Fallo inyectado en {operacion}", 'code': '500',
+                                'hint': None, 'details': None})
+            raise httpx.RemoteProtocolError(f"Server disconnected without sending a response ({operacion})")
+
+    def estadisticas(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'peticiones': sum(self._peticiones.values()),
+                'fallos_inyectados': sum(self._fallos.values()),
+                'por_operacion': dict(self._peticiones.most_common()),
+                'filas': {tabla: len(filas) for tabla, filas in self.tablas.items()},
+            }
+
+    # --- Datos ---
+
+    def tabla(self, nombre: str) -> List[Dict[str, Any]]:
+        return self.tablas.setdefault(nombre, [])
+
+    def insertar(self, nombre: str, fila: Dict[str, Any]) -> Dict[str, Any]:
+        """Inserta una fila (asigna id si falta) y devuelve la fila guardada"""
+        with self._lock:
+            fila = copy.deepcopy(fila)
+            if fila.get('id') is None:
+                fila['id'] = self.siguiente(nombre)
+            self.tabla(nombre).append(fila)
+            return fila
+
+    def siguiente(self, secuencia: str) -> int:
+        with self._lock:
+            if secuencia not in self._secuencias:
+                ids = [f['id'] for f in self.tablas.get(secuencia, []) if isinstance(f.get('id'), int)]
+                self._secuencias[secuencia] = itertools.count(max(ids, default=0) + 1)
+            return next(self._secuencias[secuencia])
+
+    def buscar(self, nombre: str, **filtros: Any) -> Optional[Dict[str, Any]]:
+        for fila in self.tablas.get(nombre, []):
+            if all(_iguales(fila.get(campo), valor) for campo, valor in filtros.items()):
+                return fila
+        return None
+
+    def rol_de(self, usuario_id: Optional[str]) -> Optional[str]:
+        perfil = self.buscar('perfiles', id=usuario_id) if usuario_id else None
+        rol = self.buscar('roles', id=perfil.get('rol_id')) if perfil else None
+        return rol['nombre'] if rol else None
+
+
+# --- Consultas PostgREST ---
+
+def _iguales(a: Any, b: Any) -> bool:
+    if a is None or b is None:
+        return a is b
+    if type(a) is type(b) or (isinstance(a, (int, float)) and isinstance(b, (int, float))):
+        return a == b
+    return str(a) == str(b)
+
+
+def _comparar(a: Any, b: Any) -> Tuple[Any, Any]:
+    """Par comparable con < / > (PostgREST recibe los filtros como texto)"""
+    if isinstance(a, (int, float)) and not isinstance(b, (int, float)):
+        try:
+            return a, float(b)
+        except (TypeError, ValueError):
+            pass
+    return (a, b) if type(a) is type(b) else (str(a), str(b))
+
+
+def _patron(texto: str, sin_mayusculas: bool) -> 're.Pattern[str]':
+    regex = '^' + '.*'.join(re.escape(parte).replace('_', '.') for parte in texto.replace('*', '%').split('%')) + '$'
+    return re.compile(regex, re.IGNORECASE | re.DOTALL if sin_mayusculas else re.DOTALL)
+
+
+def _valor(fila: Dict[str, Any], columna: str) -> Any:
+    """Valor de una columna; 'rol.nombre' entra en un recurso embebido"""
+    valor: Any = fila
+    for parte in columna.split('.'):
+        valor = valor.get(parte) if isinstance(valor, dict) else None
+    return valor
+
+
+def _cumple(fila: Dict[str, Any], columna: str, operador: str, esperado: Any) -> bool:
+    valor = _valor(fila, columna)
+    if operador == 'eq':
+        return _iguales(valor, esperado)
+    if operador == 'neq':
+        return not _iguales(valor, esperado)
+    if operador == 'is':
+        return valor is None if str(esperado).lower() == 'null' else _iguales(valor, esperado)
+    if operador == 'in':
+        return any(_iguales(valor, v) for v in esperado)
+    if operador in ('like', 'ilike'):
+        return valor is not None and bool(_patron(str(esperado), operador == 'ilike').match(str(valor)))
+    if valor is None:
+        return False
+    a, b = _comparar(valor, esperado)
+    return {'gt': a > b, 'gte': a >= b, 'lt': a < b, 'lte': a <= b}[operador]
+
+
+def _dividir(texto: str) -> List[str]:
+    """Divide por comas de primer nivel (fuera de paréntesis)"""
+    partes, nivel, actual = [], 0, ''
+    for caracter in texto:
+        if caracter == ',' and nivel == 0:
+            partes.append(actual.strip())
+            actual = ''
+            continue
+        nivel += caracter == '('
+        nivel -= caracter == ')'
+        actual += caracter
+    if actual.strip():
+        partes.append(actual.strip())
+    return partes
+
+
+def _parsear_select(texto: str) -> List[Any]:
+    """'*, rol:roles!inner(nombre)' -> ['*', ('rol', 'roles', True, ['nombre'])]"""
+    campos: List[Any] = []
+    for parte in _dividir(texto or '*'):
+        alias = None
+        if ':' in parte.split('(')[0]:
+            alias, parte = parte.split(':', 1)
+        if '(' in parte:
+            destino, resto = parte.split('(', 1)
+            interno = destino.endswith('!inner')
+            destino = destino.split('!')[0].strip()
+            campos.append(((alias or destino).strip(), destino, interno, _parsear_select(resto[:-1])))
+        else:
+            campos.append((alias.strip(), parte.strip()) if alias else parte.strip())
+    return campos
+
+
+def _singulares(tabla: str) -> List[str]:
+    return [tabla[:-2], tabla[:-1]] if tabla.endswith('es') else [tabla[:-1]]
+
+
+class ConsultaFalsa:
+    """Constructor de consultas con la interfaz encadenable de postgrest-py"""
+
+    def __init__(self, base: BaseFalsa, tabla: str):
+        self.base = base
+        self.nombre = tabla
+        self._operacion = 'select'
+        self._columnas: List[Any] = ['*']
+        self._contar = False
+        self._valores: Any = None
+        self._conflicto = 'id'
+        self._filtros: List[Tuple[str, str, Any]] = []
+        self._alternativas: List[List[Tuple[str, str, Any]]] = []
+        self._orden: List[Tuple[str, bool]] = []
+        self._desde = 0
+        self._limite: Optional[int] = None
+        self._uno: Optional[str] = None
+
+    # Operaciones
+    def select(self, *columnas: str, count: Optional[str] = None) -> 'ConsultaFalsa':
+        self._columnas = _parsear_select(','.join(columnas) if columnas else '*')
+        self._contar = count is not None
+        return self
+
+    def insert(self, valores: Any, **_opciones: Any) -> 'ConsultaFalsa':
+        self._operacion, self._valores = 'insert', valores
+        return self
+
+    def upsert(self, valores: Any, on_conflict: str = '', **_opciones: Any) -> 'ConsultaFalsa':
+        self._operacion, self._valores = 'upsert', valores
+        self._conflicto = on_conflict or 'id'
+        return self
+
+    def update(self, valores: Dict[str, Any], **_opciones: Any) -> 'ConsultaFalsa':
+        self._operacion, self._valores = 'update', valores
+        return self
+
+    def delete(self, **_opciones: Any) -> 'ConsultaFalsa':
+        self._operacion = 'delete'
+        return self
+
+    # Filtros
+    def _filtro(self, columna: str, operador: str, valor: Any) -> 'ConsultaFalsa':
+        self._filtros.append((columna, operador, valor))
+        return self
+
+    def eq(self, columna: str, valor: Any) -> 'ConsultaFalsa':
+        return self._filtro(columna, 'eq', valor)
+
+    def neq(self, columna: str, valor: Any) -> 'ConsultaFalsa':
+        return self._filtro(columna, 'neq', valor)
+
+    def gt(self, columna: str, valor: Any) -> 'ConsultaFalsa':
+        return self._filtro(columna, 'gt', valor)
+
+    def gte(self, columna: str, valor: Any) -> 'ConsultaFalsa':
+        return self._filtro(columna, 'gte', valor)
+
+    def lt(self, columna: str, valor: Any) -> 'ConsultaFalsa':
+        return self._filtro(columna, 'lt', valor)
+
+    def lte(self, columna: str, valor: Any) -> 'ConsultaFalsa':
+        return self._filtro(columna, 'lte', valor)
+
+    def in_(self, columna: str, valores: Any) -> 'ConsultaFalsa':
+        return self._filtro(columna, 'in', list(valores))
+
+    def is_(self, columna: str, valor: Any) -> 'ConsultaFalsa':
+        return self._filtro(columna, 'is', valor)
+
+    def like(self, columna: str, patron: str) -> 'ConsultaFalsa':
+        return self._filtro(columna, 'like', patron)
+
+    def ilike(self, columna: str, patron: str) -> 'ConsultaFalsa':
+        return self._filtro(columna, 'ilike', patron)
+
+    def or_(self, filtros: str, **_opciones: Any) -> 'ConsultaFalsa':
+        """'nombre.ilike.%x%,codigo.eq.5' (sin anidar and/or)"""
+        alternativas = []
+        for filtro in _dividir(filtros):
+            columna, operador, valor = filtro.split('.', 2)
+            if operador == 'in':
+                valor = [v.strip().strip('"') for v in valor.strip('()').split(',')]
+            alternativas.append((columna, operador, valor))
+        self._alternativas.append(alternativas)
+        return self
+
+    # Modificadores
+    def order(self, columna: str, desc: bool = False, **_opciones: Any) -> 'ConsultaFalsa':
+        self._orden.append((columna, desc))
+        return self
+
+    def limit(self, cantidad: int, **_opciones: Any) -> 'ConsultaFalsa':
+        self._limite = cantidad
+        return self
+
+    def range(self, desde: int, hasta: int, **_opciones: Any) -> 'ConsultaFalsa':
+        self._desde, self._limite = desde, hasta - desde + 1
+        return self
+
+    def single(self) -> 'ConsultaFalsa':
+        self._uno = 'single'
+        return self
+
+    def maybe_single(self) -> 'ConsultaFalsa':
+        self._uno = 'maybe_single'
+        return self
+
+    # Ejecución
+    def execute(self) -> Optional[Respuesta]:
+        self.base.simular_red(f"{self._operacion}:{self.nombre}")
+        with self.base._lock:
+            if self._operacion == 'select':
+                return self._seleccionar()
+            if self._operacion in ('insert', 'upsert'):
+                return Respuesta(self._insertar())
+            filas = [f for f in self.base.tabla(self.nombre) if self._coincide(f)]
+            if self._operacion == 'update':
+                for fila in filas:
+                    fila.update(copy.deepcopy(self._valores))
+            else:
+                ids = {id(f) for f in filas}
+                self.base.tablas[self.nombre] = [f for f in self.base.tabla(self.nombre) if id(f) not in ids]
+            return Respuesta(copy.deepcopy(filas))
+
+    def _coincide(self, fila: Dict[str, Any]) -> bool:
+        return (all(_cumple(fila, *filtro) for filtro in self._filtros)
+                and all(any(_cumple(fila, *filtro) for filtro in grupo) for grupo in self._alternativas))
+
+    def _seleccionar(self) -> Optional[Respuesta]:
+        filas = []
+        for fila in self.base.tabla(self.nombre):
+            completa = self._embeber(fila, self._columnas)
+            if completa is not None and self._coincide(completa):
+                filas.append(completa)
+        for columna, desc in reversed(self._orden):
+            # Los NULL van al final (PostgREST: nullslast por defecto en asc)
+            filas.sort(key=lambda f: ((v := _valor(f, columna)) is None, v if v is not None else 0), reverse=desc)
+        total = len(filas)
+        filas = filas[self._desde:self._desde + self._limite if self._limite is not None else None]
+        datos = [self._proyectar(f, self._columnas) for f in filas]
+        if self._uno:
+            if len(datos) > 1 or (not datos and self._uno == 'single'):
+                raise APIError({'message': 'JSON object requested, multiple (or no) rows returned',
+                                'code': 'PGRST116', 'hint': None,
+                                'details': f"The result contains {len(datos)} rows"})
+            return Respuesta(datos[0], total if self._contar else None) if datos else None
+        return Respuesta(datos, total if self._contar else None)
+
+    def _insertar(self) -> List[Dict[str, Any]]:
+        nuevas = self._valores if isinstance(self._valores, list) else [self._valores]
+        guardadas = []
+        claves = [c.strip() for c in self._conflicto.split(',')]
+        for valores in nuevas:
+            existente = None
+            if self._operacion == 'upsert' and all(valores.get(c) is not None for c in claves):
+                existente = self.base.buscar(self.nombre, **{c: valores[c] for c in claves})
+            if existente is not None:
+                existente.update(copy.deepcopy(valores))
+                guardadas.append(copy.deepcopy(existente))
+            else:
+                guardadas.append(copy.deepcopy(self.base.insertar(self.nombre, valores)))
+        return guardadas
+
+    def _embeber(self, fila: Dict[str, Any], columnas: List[Any], tabla: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Copia de la fila con los recursos embebidos; None si un !inner no tiene pareja"""
+        tabla = tabla or self.nombre
+        completa = dict(fila)
+        for campo in columnas:
+            if not isinstance(campo, tuple) or len(campo) != 4:
+                continue
+            alias, destino, interno, subcampos = campo
+            relacionado = self._relacionado(tabla, fila, alias, destino)
+            if isinstance(relacionado, list):
+                relacionado = [e for e in (self._embeber(r, subcampos, destino) for r in relacionado) if e is not None]
+                if interno and not relacionado:
+                    return None
+            elif relacionado is not None:
+                relacionado = self._embeber(relacionado, subcampos, destino)
+            if interno and relacionado is None:
+                return None
+            completa[alias] = relacionado
+        return completa
+
+    def _relacionado(self, tabla: str, fila: Dict[str, Any], alias: str, destino: str) -> Any:
+        """Fila referenciada (muchos a uno) o lista de filas que referencian a esta (uno a muchos)"""
+        candidatas = [RELACIONES.get((tabla, destino)), f"{alias}_id"] + [f"{s}_id" for s in _singulares(destino)]
+        for clave in candidatas:
+            if clave and clave in fila:
+                return self.base.buscar(destino, id=fila[clave]) if fila[clave] is not None else None
+        inversas = [RELACIONES.get((destino, tabla))] + [f"{s}_id" for s in _singulares(tabla)]
+        filas_destino = self.base.tabla(destino)
+        for clave in inversas:
+            if clave and filas_destino and clave in filas_destino[0]:
+                return [f for f in filas_destino if _iguales(f.get(clave), fila.get('id'))]
+        return None
+
+    def _proyectar(self, fila: Dict[str, Any], columnas: List[Any]) -> Dict[str, Any]:
+        salida: Dict[str, Any] = {}
+        embebidos = {campo[0] for campo in columnas if isinstance(campo, tuple) and len(campo) == 4}
+        for campo in columnas:
+            if campo == '*':
+                salida.update({k: copy.deepcopy(v) for k, v in fila.items() if k not in embebidos})
+            elif isinstance(campo, tuple) and len(campo) == 4:
+                alias, _, _, subcampos = campo
+                valor = fila.get(alias)
+                if isinstance(valor, list):
+                    salida[alias] = [self._proyectar(v, subcampos) for v in valor]
+                else:
+                    salida[alias] = self._proyectar(valor, subcampos) if valor is not None else None
+            elif isinstance(campo, tuple):
+                salida[campo[0]] = copy.deepcopy(fila.get(campo[1]))
+            else:
+                salida[campo] = copy.deepcopy(fila.get(campo))
+        return salida
+
+
+# --- RPC ---
+
+class LlamadaRpc:
+    def __init__(self, cliente: 'ClienteSupabaseFalso', nombre: str, parametros: Optional[Dict[str, Any]]):
+        self.cliente = cliente
+        self.nombre = nombre
+        self.parametros = copy.deepcopy(parametros or {})
+
+    def execute(self) -> Respuesta:
+        base = self.cliente.base
+        base.simular_red(f"rpc:{self.nombre}")
+        funcion = base.funciones.get(self.nombre)
+        if funcion is None:
+            raise APIError({'message': f"Could not find the function public.{self.nombre}", 'code': 'PGRST202',
+                            'hint': None, 'details': None})
+        with base._lock:
+            return Respuesta(copy.deepcopy(funcion(base, self.cliente.auth.usuario_id, self.parametros)))
+
+
+def _perfil_con_rol(base: BaseFalsa, perfil: Dict[str, Any]) -> Dict[str, Any]:
+    return {**perfil, 'rol_nombre': base.rol_de(perfil['id'])}
+
+
+def _rpc_perfil_actual(base: BaseFalsa, uid: Optional[str], _p: Dict[str, Any]) -> List[Dict[str, Any]]:
+    perfil = base.buscar('perfiles', id=uid)
+    return [_perfil_con_rol(base, perfil)] if perfil else []
+
+
+def _rpc_listar(tabla: str) -> Callable:
+    return lambda base, _uid, _p: list(base.tabla(tabla))
+
+
+def _rpc_crear_cotizacion(base: BaseFalsa, uid: Optional[str], p: Dict[str, Any]) -> List[Dict[str, Any]]:
+    datos = dict(p['datos'])
+    calculos = {campo: datos.get(campo) for campo in CAMPOS_CALCULO}
+    for campo in CAMPOS_SOLO_CALCULO:
+        datos.pop(campo, None)
+    fila = base.insertar('cotizaciones', {
+        **datos,
+        'numero_cotizacion': base.siguiente('numero_cotizacion'),
+        'estado_id': 1,
+        'id_usuario': uid,
+        'fecha_creacion': _ahora(),
+        'actualizado_en': _ahora(),
+        'identificador': None,
+    })
+    base.insertar('calculos_escala_cotizacion', {**calculos, 'cotizacion_id': fila['id'], 'parametros_especiales': None})
+    return [fila]
+
+
+def _rpc_actualizar_cotizacion(base: BaseFalsa, uid: Optional[str], p: Dict[str, Any]) -> List[Dict[str, Any]]:
+    fila = base.buscar('cotizaciones', id=p['p_cotizacion_id'])
+    if fila is None:
+        return []
+    fila.update(p['p_datos'])
+    fila.update({'modificado_por': uid, 'actualizado_en': _ahora()})
+    return [fila]
+
+
+def _rpc_upsert_calculos(base: BaseFalsa, _uid: Optional[str], p: Dict[str, Any]) -> List[Dict[str, Any]]:
+    valores = {clave[2:]: valor for clave, valor in p.items()}
+    fila = base.buscar('calculos_escala_cotizacion', cotizacion_id=valores['cotizacion_id'])
+    if fila is None:
+        fila = base.insertar('calculos_escala_cotizacion', {**valores, 'parametros_especiales': None})
+    else:
+        fila.update(valores)
+    return [fila]
+
+
+def _detalle_cotizacion(base: BaseFalsa, cotizacion: Dict[str, Any]) -> Dict[str, Any]:
+    """Fila plana de get_cotizacion_details_for_edit (cotización + nombres de sus relaciones)"""
+    referencia = base.buscar('referencias_cliente', id=cotizacion.get('referencia_cliente_id')) or {}
+    cliente = base.buscar('clientes', id=referencia.get('cliente_id')) or {}
+    comercial = base.buscar('perfiles', id=referencia.get('id_usuario')) or {}
+    mat_adh = base.buscar('material_adhesivo', id=cotizacion.get('material_adhesivo_id')) or {}
+    material = base.buscar('materiales', id=mat_adh.get('material_id')) or {}
+    adhesivo = base.buscar('adhesivos', id=mat_adh.get('adhesivo_id')) or {}
+    acabado = base.buscar('acabados', id=cotizacion.get('acabado_id')) or {}
+    tipo_producto = base.buscar('tipo_producto', id=cotizacion.get('tipo_producto_id')) or {}
+    grafado = base.buscar('tipos_grafado', id=cotizacion.get('tipo_grafado_id')) or {}
+    foil = base.buscar('tipos_foil', id=cotizacion.get('tipo_foil_id')) or {}
+    return {
+        **cotizacion,
+        'cliente_id': cliente.get('id'), 'cliente_nombre': cliente.get('nombre'),
+        'cliente_codigo': cliente.get('codigo'), 'cliente_persona_contacto': cliente.get('persona_contacto'),
+        'cliente_correo_electronico': cliente.get('correo_electronico'), 'cliente_telefono': cliente.get('telefono'),
+        'comercial_id': comercial.get('id'), 'comercial_nombre': comercial.get('nombre'),
+        'referencia_descripcion': referencia.get('descripcion'),
+        'material_id': material.get('id'), 'material_nombre': material.get('nombre'),
+        'adhesivo_id': adhesivo.get('id'), 'adhesivo_tipo': adhesivo.get('tipo'), 'material_valor': mat_adh.get('valor'),
+        'acabado_nombre': acabado.get('nombre'), 'tipo_producto_nombre': tipo_producto.get('nombre'),
+        'tipo_grafado_nombre': grafado.get('nombre'), 'tipo_foil_nombre': foil.get('nombre'),
+    }
+
+
+def _visible(base: BaseFalsa, uid: Optional[str], cotizacion: Dict[str, Any]) -> bool:
+    """Regla RLS: el comercial dueño de la referencia o un administrador"""
+    if base.rol_de(uid) == 'administrador':
+        return True
+    referencia = base.buscar('referencias_cliente', id=cotizacion.get('referencia_cliente_id')) or {}
+    return uid is not None and uid in (cotizacion.get('id_usuario'), referencia.get('id_usuario'))
+
+
+def _rpc_detalle_cotizacion(base: BaseFalsa, uid: Optional[str], p: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    cotizacion = base.buscar('cotizaciones', id=p['p_cotizacion_id'])
+    if cotizacion is None or not _visible(base, uid, cotizacion):
+        return None
+    return _detalle_cotizacion(base, cotizacion)
+
+
+def _rpc_resumen_cotizaciones(base: BaseFalsa, uid: Optional[str], _p: Dict[str, Any]) -> List[Dict[str, Any]]:
+    filas = []
+    for cotizacion in base.tabla('cotizaciones'):
+        if not _visible(base, uid, cotizacion):
+            continue
+        detalle = _detalle_cotizacion(base, cotizacion)
+        filas.append({
+            'id': cotizacion['id'], 'numero_cotizacion': cotizacion.get('numero_cotizacion'),
+            'identificador': cotizacion.get('identificador'), 'fecha_creacion': cotizacion.get('fecha_creacion'),
+            'estado_id': cotizacion.get('estado_id'), 'id_motivo_rechazo': cotizacion.get('id_motivo_rechazo'),
+            'referencia': detalle['referencia_descripcion'], 'cliente_nombre': detalle['cliente_nombre'],
+            'id_usuario': cotizacion.get('id_usuario'), 'comercial_id': detalle['comercial_id'],
+            'comercial_nombre': detalle['comercial_nombre'],
+        })
+    return sorted(filas, key=lambda f: f['id'], reverse=True)
+
+
+def _rpc_detalle_referencia(base: BaseFalsa, _uid: Optional[str], p: Dict[str, Any]) -> List[Dict[str, Any]]:
+    referencia = base.buscar('referencias_cliente', id=p['p_referencia_id'])
+    if referencia is None:
+        return []
+    cliente = base.buscar('clientes', id=referencia['cliente_id']) or {}
+    perfil = base.buscar('perfiles', id=referencia.get('id_usuario')) or {}
+    return [{
+        **{f"ref_{k}": v for k, v in referencia.items()},
+        **{f"cliente_{k}": v for k, v in cliente.items() if k != 'id'},
+        'cliente_id': cliente.get('id'),
+        **{f"perfil_{k}": v for k, v in perfil.items()},
+    }]
+
+
+def _rpc_existe_referencia(base: BaseFalsa, _uid: Optional[str], p: Dict[str, Any]) -> bool:
+    return base.buscar('referencias_cliente', cliente_id=p['p_cliente_id'], descripcion=p['p_descripcion'],
+                       id_usuario=p['p_id_usuario']) is not None
+
+
+def _rpc_crear_referencia(base: BaseFalsa, _uid: Optional[str], p: Dict[str, Any]) -> int:
+    return base.insertar('referencias_cliente', {
+        'cliente_id': p['p_cliente_id'], 'descripcion': p['p_descripcion'], 'id_usuario': p['p_id_usuario'],
+        'creado_en': _ahora(), 'actualizado_en': _ahora(),
+    })['id']
+
+
+def _rpc_existe_identificador(base: BaseFalsa, _uid: Optional[str], p: Dict[str, Any]) -> bool:
+    return any(c.get('identificador') == p['p_identificador'] and not _iguales(c['id'], p['p_exclude_id'])
+               for c in base.tabla('cotizaciones'))
+
+
+FUNCIONES_RPC: Dict[str, Callable[[BaseFalsa, Optional[str], Dict[str, Any]], Any]] = {
+    'get_current_user_profile': _rpc_perfil_actual,
+    'get_all_materials': _rpc_listar('materiales'),
+    'get_all_acabados': _rpc_listar('acabados'),
+    'get_all_tipos_producto': _rpc_listar('tipo_producto'),
+    'get_tipos_grafado_manga': _rpc_listar('tipos_grafado'),
+    'crear_cotizacion': _rpc_crear_cotizacion,
+    'actualizar_cotizacion_rpc': _rpc_actualizar_cotizacion,
+    'upsert_calculos_escala': _rpc_upsert_calculos,
+    'get_cotizacion_details_for_edit': _rpc_detalle_cotizacion,
+    'get_visible_cotizaciones_for_dashboard': _rpc_resumen_cotizaciones,
+    'get_all_cotizaciones_overview': _rpc_resumen_cotizaciones,
+    'get_referencia_cliente_details': _rpc_detalle_referencia,
+    'check_referencia_exists': _rpc_existe_referencia,
+    'crear_referencia_cliente': _rpc_crear_referencia,
+    'check_identificador_exists': _rpc_existe_identificador,
+}
+
+
+# --- Cliente y autenticación ---
+
+@dataclass
+class UsuarioFalso:
+    id: str
+    email: str
+
+
+@dataclass
+class SesionFalsa:
+    user: UsuarioFalso
+    access_token: str
+    expires_at: int
+
+
+@dataclass
+class RespuestaAuth:
+    user: Optional[UsuarioFalso]
+    session: Optional[SesionFalsa]
+
+
+class AuthFalsa:
+    """Subconjunto de gotrue que usa AuthManager"""
+
+    DURACION_TOKEN = 3600
+
+    def __init__(self, base: BaseFalsa):
+        self.base = base
+        self._sesion: Optional[SesionFalsa] = None
+        self._oyentes: List[Callable] = []
+
+    @property
+    def usuario_id(self) -> Optional[str]:
+        return self._sesion.user.id if self._sesion else None
+
+    def sign_in_with_password(self, credenciales: Dict[str, str]) -> RespuestaAuth:
+        self.base.simular_red('auth:token')
+        email = credenciales.get('email')
+        perfil = self.base.buscar('perfiles', email=email)
+        if perfil is None or self.base.claves.get(email) != credenciales.get('password'):
+            raise APIError({'message': 'Invalid login credentials', 'code': '400', 'hint': None, 'details': None})
+        self._sesion = SesionFalsa(
+            user=UsuarioFalso(id=perfil['id'], email=email),
+            access_token=uuid.uuid4().hex,
+            expires_at=int(time.time()) + self.DURACION_TOKEN,
+        )
+        self._notificar('SIGNED_IN')
+        return RespuestaAuth(user=self._sesion.user, session=self._sesion)
+
+    def sign_out(self) -> None:
+        self._sesion = None
+        self._notificar('SIGNED_OUT')
+
+    def get_session(self) -> Optional[SesionFalsa]:
+        return self._sesion
+
+    def get_user(self) -> Optional[RespuestaAuth]:
+        return RespuestaAuth(user=self._sesion.user, session=self._sesion) if self._sesion else None
+
+    def on_auth_state_change(self, oyente: Callable) -> None:
+        self._oyentes.append(oyente)
+
+    def _notificar(self, evento: str) -> None:
+        for oyente in self._oyentes:
+            oyente(evento, self._sesion)
+
+
+class ClienteSupabaseFalso:
+    """Cliente con la interfaz de supabase.Client sobre una BaseFalsa"""
+
+    def __init__(self, base: BaseFalsa):
+        self.base = base
+        self.auth = AuthFalsa(base)
+
+    def table(self, nombre: str) -> ConsultaFalsa:
+        return ConsultaFalsa(self.base, nombre)
+
+    from_ = table
+
+    def rpc(self, nombre: str, parametros: Optional[Dict[str, Any]] = None, **_opciones: Any) -> LlamadaRpc:
+        return LlamadaRpc(self, nombre, parametros)
+
+
+# --- Datos de prueba ---
+
+ID_ROL_ADMIN = 'rol-administrador'
+ID_ROL_COMERCIAL = 'rol-comercial'
+ID_SIN_ADHESIVO = 4  # igual que src/logic/grafo_cotizacion.py
+ACABADOS = [(1, 'Laminado brillante', 250.0, 'LAM'), (2, 'Laminado mate', 280.0, 'LMT'),
+            (3, 'UV total', 180.0, 'UVT'), (4, 'UV parcial', 220.0, 'UVP'),
+            (5, 'Hot stamping', 400.0, 'HS'), (6, 'Hot stamping + UV', 520.0, 'HSU'),
+            (10, 'Sin acabado', 0.0, 'SA')]
+MATERIALES = [(1, 'PELB', 'PELB'), (2, 'BOPP blanco', 'BOPPB'), (3, 'BOPP transparente', 'BOPPT'),
+              (4, 'Semibrillo', 'SB'), (5, 'PVC termoencogible', 'PVC'), (6, 'PETG termoencogible', 'PETG')]
+ADHESIVOS = [(1, 'Permanente'), (2, 'Removible'), (3, 'Congelación'), (ID_SIN_ADHESIVO, 'Sin adhesivo')]
+MATERIALES_MANGA = (5, 6)
+
+
+def poblar_base(base: BaseFalsa, comerciales: int, clientes: int = 200, cotizaciones_previas: int = 20,
+                administradores: int = 1, semilla: int = 7) -> List[Dict[str, Any]]:
+    """
+    Carga catálogos, clientes, referencias y cotizaciones previas. Devuelve los usuarios
+    (id, email, clave, rol) para iniciar sesión, primero los comerciales.
+    """
+    azar = random.Random(semilla)
+    ahora = datetime.now(timezone.utc)
+    base.tablas.update({
+        'roles': [{'id': ID_ROL_ADMIN, 'nombre': 'administrador'}, {'id': ID_ROL_COMERCIAL, 'nombre': 'comercial'}],
+        'materiales': [{'id': i, 'nombre': n, 'code': c} for i, n, c in MATERIALES],
+        'adhesivos': [{'id': i, 'tipo': t, 'descripcion': None, 'creado_en': None, 'actualizado_en': None}
+                      for i, t in ADHESIVOS],
+        'acabados': [{'id': i, 'nombre': n, 'valor': v, 'updated_at': None, 'code': c} for i, n, v, c in ACABADOS],
+        'tipo_producto': [{'id': 1, 'nombre': 'ETIQUETA', 'descripcion': None, 'creado_en': None, 'actualizado_en': None},
+                          {'id': 2, 'nombre': 'MANGA', 'descripcion': None, 'creado_en': None, 'actualizado_en': None}],
+        'tipos_grafado': [{'id': 1, 'nombre': 'Sin grafado'}, {'id': 2, 'nombre': 'Vertical Total'},
+                          {'id': 3, 'nombre': 'Horizontal Total'}, {'id': 4, 'nombre': 'Horizontal Total + Vertical'}],
+        'tipos_foil': [{'id': 1, 'nombre': 'Dorado'}, {'id': 2, 'nombre': 'Plateado'}],
+        'estados_cotizacion': [{'id': 1, 'estado': 'En negociación', 'motivo_rechazo_id': None},
+                               {'id': 2, 'estado': 'Aprobada', 'motivo_rechazo_id': None},
+                               {'id': 3, 'estado': 'Descartada', 'motivo_rechazo_id': None},
+                               {'id': 4, 'estado': 'Anulada', 'motivo_rechazo_id': None}],
+        'motivos_rechazo': [{'id': 1, 'motivo': 'Precio'}, {'id': 2, 'motivo': 'Tiempo de entrega'}],
+        'politicas_entrega': [{'id': 1, 'descripcion': 'Entrega a 15 días hábiles', 'created_at': None, 'updated_at': None}],
+        'politicas_cartera': [{'id': 1, 'descripcion': 'Se retiene despacho con mora de 16 a 30 días',
+                               'created_at': None, 'updated_at': None}],
+    })
+    base.tablas['material_adhesivo'] = [
+        {'id': None, 'material_id': m, 'adhesivo_id': a, 'valor': round(azar.uniform(1500, 4500), 2),
+         'code': f"{codigo}{a}"}
+        for m, _, codigo in MATERIALES for a, _ in ADHESIVOS
+        if (m in MATERIALES_MANGA) == (a == ID_SIN_ADHESIVO)
+    ]
+    for i, fila in enumerate(base.tablas['material_adhesivo'], start=1):
+        fila['id'] = i
+
+    usuarios = []
+    for i in range(comerciales + administradores):
+        es_admin = i >= comerciales
+        email = f"{'admin' if es_admin else 'comercial'}{i:03d}@prueba-carga.local"
+        perfil = {'id': str(uuid.UUID(int=i + 1)), 'nombre': f"{'Administrador' if es_admin else 'Comercial'} {i:03d}",
+                  'email': email, 'celular': 3000000000 + i, 'rol_id': ID_ROL_ADMIN if es_admin else ID_ROL_COMERCIAL,
+                  'updated_at': ahora.isoformat(), 'archivado': False}
+        base.tabla('perfiles').append(perfil)
+        base.claves[email] = CLAVE_USUARIOS
+        usuarios.append({'id': perfil['id'], 'email': email, 'clave': CLAVE_USUARIOS,
+                         'rol': 'administrador' if es_admin else 'comercial'})
+
+    for i in range(1, clientes + 1):
+        base.tabla('clientes').append({
+            'id': i, 'nombre': f"CLIENTE {i:04d} S.A.S", 'codigo': str(900000000 + i),
+            'persona_contacto': f"Contacto {i}", 'correo_electronico': f"compras{i}@cliente.local",
+            'telefono': str(6010000000 + i), 'creado_en': ahora.isoformat(), 'actualizado_en': ahora.isoformat(),
+        })
+
+    for usuario in usuarios[:comerciales]:
+        for j in range(cotizaciones_previas):
+            referencia = base.insertar('referencias_cliente', {
+                'cliente_id': azar.randint(1, clientes), 'descripcion': f"Referencia previa {j} {usuario['id'][-4:]}",
+                'id_usuario': usuario['id'], 'creado_en': ahora.isoformat(), 'actualizado_en': ahora.isoformat(),
+            })
+            mat_adh = azar.choice(base.tablas['material_adhesivo'])
+            es_manga = mat_adh['adhesivo_id'] == ID_SIN_ADHESIVO
+            cotizacion = base.insertar('cotizaciones', {
+                'referencia_cliente_id': referencia['id'], 'material_adhesivo_id': mat_adh['id'],
+                'acabado_id': 10 if es_manga else azar.choice((1, 2, 3, 4, 10)), 'tipo_foil_id': None,
+                'num_tintas': azar.randint(0, 6), 'num_paquetes_rollos': 1000, 'es_manga': es_manga,
+                'tipo_grafado_id': 1 if es_manga else None, 'valor_troquel': 0.0, 'valor_plancha_separado': None,
+                'planchas_x_separado': False, 'existe_troquel': True, 'numero_pistas': 1,
+                'tipo_producto_id': 2 if es_manga else 1, 'es_recotizacion': False, 'modificado_por': None,
+                'ancho': 80.0, 'avance': 100.0, 'identificador': f"ET PREVIA {referencia['id']}",
+                'numero_cotizacion': base.siguiente('numero_cotizacion'),
+                'fecha_creacion': (ahora - timedelta(days=azar.randint(0, 180))).isoformat(),
+                'actualizado_en': ahora.isoformat(), 'estado_id': azar.choice((1, 1, 2, 3)),
+                'id_usuario': usuario['id'], 'id_motivo_rechazo': None, 'altura_grafado': None,
+                'ajustes_modificados_admin': False,
+            })
+            base.insertar('calculos_escala_cotizacion', {
+                'cotizacion_id': cotizacion['id'], 'valor_material': mat_adh['valor'], 'valor_plancha': 0.0,
+                'valor_acabado': 0.0, 'valor_troquel': 0.0, 'rentabilidad': 0.4, 'avance': 100.0, 'ancho': 80.0,
+                'unidad_z_dientes': 80, 'existe_troquel': True, 'planchas_x_separado': False,
+                'num_tintas': cotizacion['num_tintas'], 'numero_pistas': 1, 'num_paquetes_rollos': 1000,
+                'tipo_producto_id': cotizacion['tipo_producto_id'], 'tipo_grafado_id': cotizacion['tipo_grafado_id'],
+                'parametros_especiales': None,
+            })
+            for escala in (1000, 5000, 10000):
+                base.insertar('cotizacion_escalas', {
+                    'cotizacion_id': cotizacion['id'], 'escala': escala, 'valor_unidad': 120.0, 'metros': 100.0,
+                    'tiempo_horas': 1.0, 'montaje': 50000.0, 'mo_y_maq': 20000.0, 'tintas': 1000.0,
+                    'papel_lam': 5000.0, 'desperdicio_total': 800.0, 'updated_at': ahora.isoformat(),
+                })
+    return usuarios
@@ -1,5 +1,7 @@
 import streamlit as st
-from supabase import create_client, Client
+from supabase import Client
+from src.data.conexion_supabase import crear_cliente_compartido
+from src.auth.cache_perfiles import cache_perfiles
 from typing import Optional, Dict, Any, Tuple
 import traceback
 
@@ -8,6 +10,18 @@ class AuthManager:
         """Initialize the AuthManager with an existing Supabase client."""
         self.supabase = supabase_client # Use the passed client
         self.initialize_session_state()
+        # Mantener la caché de perfiles alineada con el ciclo de vida del token
+        self.supabase.auth.on_auth_state_change(self._on_auth_event)
+
+    def _on_auth_event(self, event, session) -> None:
+        """Extiende la entrada de caché al refrescar el token y la descarta al cerrar sesión."""
+        try:
+            if event == "TOKEN_REFRESHED" and session and session.user:
+                cache_perfiles.extender(session.user.id, session.expires_at)
+            elif event == "SIGNED_OUT":
+                cache_perfiles.invalidar(st.session_state.get('user_id'))
+        except Exception as e:
+            print(f"Error actualizando caché de perfiles ({event}): {e}")
         
     def initialize_session_state(self) -> None:
         """Initialize session state variables for authentication."""
@@ -41,6 +55,8 @@ class AuthManager:
                 profile_response = self.supabase.rpc('get_current_user_profile').execute()
                 if profile_response.data and len(profile_response.data) > 0:
                     profile = profile_response.data[0]
+                    expira_en = response.session.expires_at if response.session else None
+                    cache_perfiles.guardar(user_id, profile, expira_en)
                     from src.utils.session_manager import SessionManager
                     SessionManager.full_init(user_id=user_id, usuario_rol=profile.get('rol_nombre'), perfil_usuario=profile)
                     st.session_state.user = email
@@ -69,6 +85,7 @@ class AuthManager:
     def logout(self) -> None:
         """Sign out the current user."""
         try:
+            cache_perfiles.invalidar(st.session_state.get('user_id'))
             self.supabase.auth.sign_out()
             from src.utils.session_manager import SessionManager
             SessionManager.full_clear()
@@ -150,6 +167,7 @@ class AuthManager:
                 profile_response = self.supabase.rpc('get_current_user_profile').execute()
                 if profile_response and profile_response.data:
                     profile = profile_response.data[0]
+                    cache_perfiles.guardar(user_id, profile)
                     from src.utils.session_manager import SessionManager
                     # Mantener email consistente en sesión si lo tenemos
                     new_email = update_fields.get('email', current_email)
@@ -181,8 +199,39 @@ class AuthManager:
             }
         return None
 
+    def get_perfil_actual(self) -> Optional[Dict]:
+        """
+        Perfil del usuario de la sesión. Sale de la caché mientras el token siga vigente;
+        si la entrada venció se vuelve a leer con get_current_user_profile.
+        """
+        user_id = st.session_state.get('user_id')
+        if not user_id:
+            return None
+        perfil = cache_perfiles.obtener(user_id)
+        if perfil:
+            return perfil
+        try:
+            session = self.supabase.auth.get_session()
+            if not session or not session.user or session.user.id != user_id:
+                print("get_perfil_actual: No hay sesión válida para el usuario actual")
+                return None
+            profile_response = self.supabase.rpc('get_current_user_profile').execute()
+            if profile_response.data:
+                perfil = profile_response.data[0]
+                cache_perfiles.guardar(user_id, perfil, session.expires_at)
+                st.session_state.usuario_rol = perfil.get('rol_nombre')
+                st.session_state.perfil_usuario = perfil
+                return perfil
+            return None
+        except Exception as e:
+            print(f"Error recargando perfil actual: {str(e)}")
+            return None
+
     def verify_user_role(self, user_id: str) -> Optional[Dict]:
         """Verifica y obtiene el rol del usuario"""
+        perfil_cache = cache_perfiles.obtener(user_id)
+        if perfil_cache:
+            return perfil_cache
         try:
             perfil = self.supabase.table('perfiles')\
                 .select('*')\
@@ -228,7 +277,7 @@ def create_login_ui() -> None:
                     supabase_url = st.secrets["SUPABASE_URL"]
                     supabase_key = st.secrets["SUPABASE_KEY"]
                     # Create client if not present (should ideally be created earlier)
-                    st.session_state.supabase = create_client(supabase_url, supabase_key)
+                    st.session_state.supabase = crear_cliente_compartido(supabase_url, supabase_key)
                 except KeyError:
                     st.error("Error: Credenciales de Supabase no encontradas. Verifique su archivo .streamlit/secrets.toml")
                     # Provide fallback for development if needed, but this path might indicate an issue
@@ -236,7 +285,7 @@ def create_login_ui() -> None:
                     supabase_key = st.text_input("SUPABASE_KEY", key="supabase_key_input_fallback", type="password")
                     if not supabase_url or not supabase_key:
                         return # Cannot proceed without credentials
-                    st.session_state.supabase = create_client(supabase_url, supabase_key)
+                    st.session_state.supabase = crear_cliente_compartido(supabase_url, supabase_key)
                 except Exception as e:
                      st.error(f"Error inicializando cliente Supabase en UI: {e}")
                      return
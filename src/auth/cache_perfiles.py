@@ -0,0 +1,103 @@
+"""
+Caché de perfiles y roles por usuario.
+
+El perfil (con rol_nombre) se carga una vez al hacer login mediante el RPC
+get_current_user_profile y queda en memoria, indexado por user_id. Cada entrada
+vence junto con el token de acceso de la sesión (expires_at de Supabase Auth):
+cuando el token se refresca la entrada se extiende, y al cerrar sesión o vencer
+el token se descarta, de modo que el rol se vuelve a verificar contra la base.
+
+Solo se guarda el perfil propio de cada usuario (el que él mismo leyó con su
+token), así que una consulta de otro usuario nunca se sirve desde aquí.
+"""
+import threading
+import time
+from typing import Dict, Any, Optional
+
+# Vigencia por defecto si no se conoce la expiración del token (Supabase usa 1 hora)
+TTL_POR_DEFECTO = 3600
+# Margen para descartar la entrada un poco antes de que venza el token
+MARGEN_EXPIRACION = 30
+
+
+class CachePerfiles:
+    """Perfiles de usuario en memoria con vencimiento atado al token"""
+
+    def __init__(self, ttl_por_defecto: float = TTL_POR_DEFECTO):
+        self.ttl_por_defecto = ttl_por_defecto
+        self._entradas: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self.aciertos = 0
+        self.fallos = 0
+
+    def _vencimiento(self, expira_en: Optional[float]) -> float:
+        if expira_en:
+            return float(expira_en) - MARGEN_EXPIRACION
+        return time.time() + self.ttl_por_defecto
+
+    def guardar(self, user_id: str, perfil: Dict[str, Any], expira_en: Optional[float] = None) -> None:
+        """
+        Guarda el perfil de un usuario.
+
+        Args:
+            user_id: ID del usuario (auth.uid())
+            perfil: Perfil con 'rol_nombre'
+            expira_en: Epoch en segundos en que vence el token (session.expires_at).
+                Si no se indica se conserva el vencimiento de la entrada anterior.
+        """
+        if not user_id or not perfil:
+            return
+        with self._lock:
+            anterior = self._entradas.get(user_id)
+            if expira_en is None and anterior:
+                vence = anterior['vence']
+            else:
+                vence = self._vencimiento(expira_en)
+            self._entradas[user_id] = {'perfil': dict(perfil), 'vence': vence}
+
+    def obtener(self, user_id: Optional[str]) -> Optional[Dict[str, Any]]:
+        """Perfil en caché o None si no existe o ya venció"""
+        if not user_id:
+            return None
+        with self._lock:
+            entrada = self._entradas.get(user_id)
+            if entrada and entrada['vence'] > time.time():
+                self.aciertos += 1
+                return dict(entrada['perfil'])
+            if entrada:
+                del self._entradas[user_id]
+            self.fallos += 1
+            return None
+
+    def obtener_rol(self, user_id: Optional[str]) -> Optional[str]:
+        perfil = self.obtener(user_id)
+        return perfil.get('rol_nombre') if perfil else None
+
+    def extender(self, user_id: str, expira_en: Optional[float]) -> None:
+        """Actualiza el vencimiento cuando se refresca el token"""
+        with self._lock:
+            entrada = self._entradas.get(user_id)
+            if entrada:
+                entrada['vence'] = self._vencimiento(expira_en)
+
+    def invalidar(self, user_id: Optional[str]) -> None:
+        with self._lock:
+            self._entradas.pop(user_id, None)
+
+    def limpiar(self) -> None:
+        with self._lock:
+            self._entradas.clear()
+
+    def estadisticas(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.aciertos + self.fallos
+            return {
+                'entradas': len(self._entradas),
+                'aciertos': self.aciertos,
+                'fallos': self.fallos,
+                'tasa_aciertos': self.aciertos / total if total else 0.0,
+            }
+
+
+# Instancia única del proceso
+cache_perfiles = CachePerfiles()
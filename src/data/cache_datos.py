@@ -0,0 +1,172 @@
+"""
+Caché de lecturas de la capa de datos, compartida por el proceso y separada por principal.
+
+Las lecturas de DBManager pasan por RLS, así que el mismo método devuelve datos distintos
+según quién pregunta. Un st.cache_resource / st.cache_data global guarda lo que leyó el
+primer usuario y se lo sirve a todos. Aquí la clave de cada entrada incluye:
+
+    (dominio, versión del dominio, principal, función, argumentos)
+
+    - principal: (rol, user_id) de la sesión dueña del DBManager. Sin principal (sesión
+      sin login, hilos de la cola de trabajos) no se usa la caché.
+    - versión del dominio: contador que sube con cada escritura del dominio ('catalogo',
+      'referencias'...). Al cambiar un precio se llama invalidar('catalogo') y todas las
+      entradas anteriores dejan de coincidir para todas las sesiones del proceso; las
+      entradas viejas salen por LRU o por vencimiento.
+
+Cada entrada vence a los 'ttl' segundos (los cambios hechos fuera de la aplicación se
+ven a lo sumo con ese atraso) y el total de entradas está acotado (se descarta la menos
+usada). estadisticas() reporta aciertos, fallos y tasa de aciertos por dominio.
+
+Uso en DBManager:
+
+    @cache_por_principal('catalogo', ttl=600)
+    def get_adhesivos_for_material(self, material_id): ...
+
+    # después de escribir
+    cache_datos.invalidar('catalogo')
+
+Los resultados se comparten entre las llamadas del mismo principal: quien los recibe no
+debe modificarlos. Los None no se guardan (en DBManager suelen indicar un error).
+"""
+import functools
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+from src.utils.bitacora import obtener_bitacora
+
+log = obtener_bitacora('datos.cache')
+
+MAX_ENTRADAS = 2048
+TTL_POR_DEFECTO = 300  # segundos
+
+CATALOGO = 'catalogo'        # materiales, adhesivos, acabados, material_adhesivo, tipos
+REFERENCIAS = 'referencias'  # referencias_cliente
+CLIENTES = 'clientes'        # índices de búsqueda de clientes (DBManager.get_indice_clientes)
+COTIZACIONES = 'cotizaciones'  # índices de búsqueda de cotizaciones (DBManager.get_indice_cotizaciones)
+
+Principal = Tuple[str, str]  # (rol, user_id)
+
+
+class CacheDatos:
+    """Entradas con vencimiento, LRU acotado y versión por dominio"""
+
+    def __init__(self, max_entradas: int = MAX_ENTRADAS):
+        self.max_entradas = max_entradas
+        self._entradas: 'OrderedDict[Hashable, Tuple[float, Any]]' = OrderedDict()  # clave -> (vence, valor)
+        self._versiones: Dict[str, int] = {}
+        self._contadores: Dict[str, Dict[str, int]] = {}
+        self._lock = threading.Lock()
+
+    def _contador(self, dominio: str) -> Dict[str, int]:
+        contador = self._contadores.get(dominio)
+        if contador is None:
+            contador = self._contadores[dominio] = {'aciertos': 0, 'fallos': 0, 'vencidas': 0, 'descartadas': 0}
+        return contador
+
+    def version(self, dominio: str) -> int:
+        with self._lock:
+            return self._versiones.get(dominio, 0)
+
+    def _clave(self, dominio: str, principal: Principal, nombre: str, argumentos: Hashable) -> Hashable:
+        return (dominio, self._versiones.get(dominio, 0), principal, nombre, argumentos)
+
+    def obtener_o_calcular(self, dominio: str, principal: Optional[Principal], nombre: str,
+                           argumentos: Hashable, calcular: Callable[[], Any], ttl: float = TTL_POR_DEFECTO,
+                           guardar_vacios: bool = True) -> Any:
+        """
+        Valor en caché para (dominio, principal, nombre, argumentos) o el resultado de
+        calcular(), que se guarda si no es None (ni vacío, con guardar_vacios=False).
+        Sin principal siempre calcula.
+        """
+        if principal is None:
+            return calcular()
+        ahora = time.monotonic()
+        with self._lock:
+            clave = self._clave(dominio, principal, nombre, argumentos)
+            contador = self._contador(dominio)
+            entrada = self._entradas.get(clave)
+            if entrada is not None:
+                if entrada[0] > ahora:
+                    self._entradas.move_to_end(clave)
+                    contador['aciertos'] += 1
+                    return entrada[1]
+                del self._entradas[clave]
+                contador['vencidas'] += 1
+            contador['fallos'] += 1
+
+        # Se calcula fuera del lock: dos sesiones con el mismo fallo pueden consultar a la
+        # vez, pero una consulta lenta no bloquea las lecturas de los demás
+        valor = calcular()
+        if valor is None or (not guardar_vacios and not valor):
+            return valor
+        with self._lock:
+            # Si el dominio se invalidó mientras se calculaba, el valor ya no es vigente
+            if clave[1] == self._versiones.get(dominio, 0):
+                self._entradas[clave] = (ahora + ttl, valor)
+                self._entradas.move_to_end(clave)
+                while len(self._entradas) > self.max_entradas:
+                    clave_vieja, _ = self._entradas.popitem(last=False)
+                    self._contador(clave_vieja[0])['descartadas'] += 1
+        return valor
+
+    def invalidar(self, *dominios: str) -> Dict[str, int]:
+        """
+        Sube la versión de los dominios: sus entradas actuales dejan de servirse.
+
+        Returns:
+            Dict[str, int]: Nueva versión de cada dominio
+        """
+        with self._lock:
+            for dominio in dominios:
+                self._versiones[dominio] = self._versiones.get(dominio, 0) + 1
+            # Quitar ya las entradas obsoletas para no ocupar el límite con ellas
+            for clave in [c for c in self._entradas if c[0] in dominios]:
+                del self._entradas[clave]
+            versiones = {dominio: self._versiones[dominio] for dominio in dominios}
+        log.info('Caché de datos invalidada: %s', ', '.join(dominios))
+        return versiones
+
+    def limpiar(self) -> None:
+        with self._lock:
+            self._entradas.clear()
+
+    def estadisticas(self) -> Dict[str, Any]:
+        """Entradas totales y, por dominio, versión, aciertos, fallos y tasa de aciertos"""
+        with self._lock:
+            por_dominio = {}
+            for dominio in set(self._contadores) | set(self._versiones):
+                contador = dict(self._contador(dominio))
+                total = contador['aciertos'] + contador['fallos']
+                contador['tasa_aciertos'] = contador['aciertos'] / total if total else 0.0
+                contador['version'] = self._versiones.get(dominio, 0)
+                contador['entradas'] = sum(1 for c in self._entradas if c[0] == dominio)
+                por_dominio[dominio] = contador
+            return {'entradas': len(self._entradas), 'max_entradas': self.max_entradas, 'dominios': por_dominio}
+
+
+# Instancia única del proceso
+cache_datos = CacheDatos()
+
+
+def cache_por_principal(dominio: str, ttl: float = TTL_POR_DEFECTO, guardar_vacios: bool = True) -> Callable:
+    """
+    Decorador para métodos de DBManager: guarda el resultado por (principal de la sesión,
+    argumentos). El principal sale de self.principal() (ver DBManager.principal).
+    Los argumentos deben ser hashables. metodo.clear() invalida el dominio completo.
+    """
+    def decorador(metodo: Callable) -> Callable:
+        nombre = metodo.__qualname__
+
+        @functools.wraps(metodo)
+        def envoltura(self, *args, **kwargs):
+            argumentos = (args, tuple(sorted(kwargs.items())))
+            return cache_datos.obtener_o_calcular(
+                dominio, self.principal(), nombre, argumentos,
+                lambda: metodo(self, *args, **kwargs), ttl, guardar_vacios,
+            )
+        envoltura.clear = lambda: cache_datos.invalidar(dominio)
+        return envoltura
+    return decorador
@@ -0,0 +1,222 @@
+"""
+Gestor de conexiones a Supabase compartido por todo el proceso.
+
+Antes cada sesión de Streamlit creaba su propio cliente con `create_client(...)`, y cada
+cliente abría su propio pool HTTP (un handshake TLS por usuario y conexiones que no se
+compartían). Aquí se mantiene un único `httpx.Client` con keep-alive para el proceso y
+cada sesión recibe un cliente Supabase liviano que lo reutiliza.
+
+El token del usuario NO vive en el pool: cada cliente de sesión guarda sus propios
+encabezados (apikey + Authorization) y postgrest/auth los envían en cada petición, así
+que las políticas RLS siguen aplicándose por usuario.
+"""
+import threading
+import time
+import weakref
+from typing import Dict, Any, Optional
+
+import httpx
+from supabase import create_client, Client, ClientOptions
+
+from src.utils import perfilador
+from src.utils.bitacora import obtener_bitacora
+
+log = obtener_bitacora('datos.conexion')
+
+# Límites del pool compartido
+MAX_CONEXIONES = 50
+MAX_CONEXIONES_KEEPALIVE = 20
+KEEPALIVE_EXPIRY = 60.0  # segundos que una conexión inactiva se mantiene abierta
+TIMEOUT_PETICION = 120.0  # mismo timeout por defecto de postgrest
+
+
+class _CuerpoContado(httpx.SyncByteStream):
+    """Cuerpo de respuesta que suma los bytes leídos al tramo del perfilador"""
+
+    def __init__(self, cuerpo: httpx.SyncByteStream, destino: 'perfilador.Tramo'):
+        self._cuerpo = cuerpo
+        self._destino = destino
+
+    def __iter__(self):
+        for bloque in self._cuerpo:
+            perfilador.registrar_peticion(self._destino, bytes_recibidos=len(bloque), nueva=False)
+            yield bloque
+
+    def close(self) -> None:
+        self._cuerpo.close()
+
+
+class TransporteMedido(httpx.HTTPTransport):
+    """
+    Transporte httpx que registra cuántas peticiones abren una conexión nueva
+    (handshake TCP/TLS) y cuántas reutilizan una conexión del pool. Con una traza del
+    perfilador activa en el hilo, también cuenta la petición y sus bytes en el tramo actual.
+    """
+
+    def __init__(self, metricas: 'MetricasPool', **kwargs):
+        super().__init__(**kwargs)
+        self.metricas = metricas
+        self._conocidas = weakref.WeakSet()
+        self._lock = threading.Lock()
+
+    def _conexiones(self):
+        return list(self._pool.connections)
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        self.metricas.registrar_inicio()
+        try:
+            response = super().handle_request(request)
+        except Exception:
+            self.metricas.registrar_fin(nueva=False, en_uso=0, abiertas=0, error=True)
+            raise
+
+        conexiones = self._conexiones()
+        with self._lock:
+            nuevas = [c for c in conexiones if c not in self._conocidas]
+            for conexion in nuevas:
+                self._conocidas.add(conexion)
+        en_uso = sum(1 for c in conexiones if not c.is_idle())
+        self.metricas.registrar_fin(nueva=bool(nuevas), en_uso=en_uso, abiertas=len(conexiones))
+
+        destino = perfilador.tramo_actual()
+        if destino is not None:
+            try:
+                enviados = len(request.content)
+            except httpx.RequestNotRead:
+                enviados = 0
+            perfilador.registrar_peticion(destino, bytes_enviados=enviados)
+            response.stream = _CuerpoContado(response.stream, destino)
+        return response
+
+
+class MetricasPool:
+    """Contadores de utilización y reutilización del pool compartido"""
+
+    def __init__(self, max_conexiones: int):
+        self.max_conexiones = max_conexiones
+        self._lock = threading.Lock()
+        self.peticiones = 0
+        self.peticiones_en_curso = 0
+        self.errores = 0
+        self.conexiones_nuevas = 0
+        self.conexiones_en_uso = 0
+        self.conexiones_abiertas = 0
+        self.pico_en_uso = 0
+        self.sesiones_creadas = 0
+        self.inicio = time.time()
+
+    def registrar_inicio(self) -> None:
+        with self._lock:
+            self.peticiones_en_curso += 1
+
+    def registrar_fin(self, nueva: bool, en_uso: int, abiertas: int, error: bool = False) -> None:
+        with self._lock:
+            self.peticiones_en_curso -= 1
+            if error:
+                self.errores += 1
+                return
+            self.peticiones += 1
+            if nueva:
+                self.conexiones_nuevas += 1
+            self.conexiones_en_uso = en_uso
+            self.conexiones_abiertas = abiertas
+            self.pico_en_uso = max(self.pico_en_uso, en_uso)
+
+    def registrar_sesion(self) -> None:
+        with self._lock:
+            self.sesiones_creadas += 1
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Resumen de utilización y tasa de reutilización del pool"""
+        with self._lock:
+            reutilizadas = self.peticiones - self.conexiones_nuevas
+            return {
+                'peticiones': self.peticiones,
+                'peticiones_en_curso': self.peticiones_en_curso,
+                'errores': self.errores,
+                'conexiones_nuevas': self.conexiones_nuevas,
+                'conexiones_reutilizadas': reutilizadas,
+                'tasa_reutilizacion': reutilizadas / self.peticiones if self.peticiones else 0.0,
+                'conexiones_abiertas': self.conexiones_abiertas,
+                'conexiones_en_uso': self.conexiones_en_uso,
+                'pico_en_uso': self.pico_en_uso,
+                'max_conexiones': self.max_conexiones,
+                'utilizacion': self.conexiones_en_uso / self.max_conexiones if self.max_conexiones else 0.0,
+                'utilizacion_pico': self.pico_en_uso / self.max_conexiones if self.max_conexiones else 0.0,
+                'sesiones_creadas': self.sesiones_creadas,
+                'segundos_activo': time.time() - self.inicio,
+            }
+
+
+class GestorConexiones:
+    """
+    Pool HTTP único por proceso y fábrica de clientes Supabase por sesión.
+    """
+
+    def __init__(self, supabase_url: str, supabase_key: str,
+                 max_conexiones: int = MAX_CONEXIONES,
+                 max_keepalive: int = MAX_CONEXIONES_KEEPALIVE,
+                 keepalive_expiry: float = KEEPALIVE_EXPIRY,
+                 timeout: float = TIMEOUT_PETICION):
+        self.supabase_url = supabase_url
+        self.supabase_key = supabase_key
+        self.metricas = MetricasPool(max_conexiones)
+        limites = httpx.Limits(
+            max_connections=max_conexiones,
+            max_keepalive_connections=max_keepalive,
+            keepalive_expiry=keepalive_expiry
+        )
+        self.transporte = TransporteMedido(self.metricas, limits=limites)
+        # Sin encabezados por defecto: apikey/Authorization los pone cada cliente de sesión
+        self.http_client = httpx.Client(
+            transport=self.transporte,
+            timeout=httpx.Timeout(timeout),
+            follow_redirects=True
+        )
+        log.info('Pool Supabase compartido creado (max=%s, keepalive=%s)', max_conexiones, max_keepalive)
+
+    def crear_cliente(self) -> Client:
+        """
+        Cliente Supabase para una sesión. Conserva su propia sesión de auth (y por lo
+        tanto su token) pero todas las peticiones salen por el pool compartido.
+        """
+        opciones = ClientOptions(httpx_client=self.http_client)
+        cliente = create_client(self.supabase_url, self.supabase_key, options=opciones)
+        self.metricas.registrar_sesion()
+        return cliente
+
+    def estadisticas(self) -> Dict[str, Any]:
+        return self.metricas.to_dict()
+
+    def cerrar(self) -> None:
+        self.http_client.close()
+
+
+_gestores: Dict[tuple, GestorConexiones] = {}
+_lock_gestores = threading.Lock()
+
+
+def obtener_gestor_conexiones(supabase_url: str, supabase_key: str) -> GestorConexiones:
+    """Devuelve el gestor del proceso para (url, key), creándolo la primera vez"""
+    clave = (supabase_url, supabase_key)
+    with _lock_gestores:
+        gestor = _gestores.get(clave)
+        if gestor is None:
+            gestor = GestorConexiones(supabase_url, supabase_key)
+            _gestores[clave] = gestor
+        return gestor
+
+
+def crear_cliente_compartido(supabase_url: str, supabase_key: str) -> Client:
+    """Atajo: cliente de sesión sobre el pool compartido del proceso"""
+    return obtener_gestor_conexiones(supabase_url, supabase_key).crear_cliente()
+
+
+def estadisticas_pool(supabase_url: Optional[str] = None, supabase_key: Optional[str] = None) -> Dict[str, Any]:
+    """Estadísticas del gestor indicado o, sin argumentos, del primero creado"""
+    with _lock_gestores:
+        if supabase_url is not None:
+            gestor = _gestores.get((supabase_url, supabase_key))
+        else:
+            gestor = next(iter(_gestores.values()), None)
+    return gestor.estadisticas() if gestor else {}
@@ -2,54 +2,43 @@ from typing import List, Optional, Dict, Any, Tuple
 from src.data.models import (
     Cotizacion, Material, Acabado, Cliente, Escala, ReferenciaCliente,
     TipoProducto, PrecioEscala, TipoGrafado, EstadoCotizacion, MotivoRechazo,
-    Adhesivo, TipoFoil, PoliticasEntrega, PoliticasCartera
+    Adhesivo, TipoFoil, PoliticasEntrega, PoliticasCartera, CotizacionResumen
 )
 import os
-import logging
 from datetime import datetime
-from dateutil.parser import isoparse
 from decimal import Decimal
 import streamlit as st
-import traceback
 import postgrest
 import httpx
 import time
 from supabase import create_client, Client, PostgrestAPIError
 import json
 import math
+import dataclasses
+from src.auth.cache_perfiles import cache_perfiles
+from src.data.indice_clientes import IndiceClientes, LIMITE_RESULTADOS
+from src.data.indice_cotizaciones import IndiceCotizaciones
+from src.data.cache_datos import cache_datos, cache_por_principal, CATALOGO, CLIENTES, COTIZACIONES, REFERENCIAS, Principal
+from src.data.decodificador_filas import (
+    decodificar_filas, construir_modelos, parsear_fecha, FECHA, ENTERO, NUMERO, BOOLEANO
+)
+from src.utils.perfilador import instrumentar_clase, DB
+from src.utils.metricas import latencia_por_metodo, DB_LATENCIA, DB_REINTENTOS, DB_FALLIDAS
+from src.utils.bitacora import obtener_bitacora, Sensible
+
+log = obtener_bitacora('datos')
 
+# Cada método público es un tramo del perfilador de reruns (src/utils/perfilador.py)
+# y una observación del histograma de latencia (src/utils/metricas.py)
+@latencia_por_metodo(DB_LATENCIA, excluir=('principal',))
+@instrumentar_clase(DB, excluir=('principal',))
 class DBManager:
     def _parse_timestamptz(self, value: Any) -> Optional[datetime]:
         """Parsea un timestamptz ISO de Postgres a datetime de forma tolerante.
         Acepta fracciones con 1-6 dígitos y ajusta 'Z' a '+00:00'.
+        Para columnas completas usar decodificar_filas (src/data/decodificador_filas.py).
         """
-        try:
-            if value is None:
-                return None
-            if isinstance(value, datetime):
-                return value
-            v = str(value).replace('Z', '+00:00')
-            try:
-                return datetime.fromisoformat(v)
-            except Exception:
-                # Normalizar microsegundos a 6 dígitos antes del timezone
-                if '.' in v:
-                    head, _, tail = v.partition('.')
-                    digits = []
-                    tz_part = ''
-                    for ch in tail:
-                        if ch.isdigit() and len(digits) < 6:
-                            digits.append(ch)
-                        else:
-                            tz_part = tail[len(digits):]
-                            break
-                    micros = ''.join(digits).ljust(6, '0')
-                    new_v = f"{head}.{micros}{tz_part}"
-                    return datetime.fromisoformat(new_v)
-                # Sin fracción, intentar parseo directo
-                return datetime.fromisoformat(v)
-        except Exception:
-            return None
+        return parsear_fecha(value)
     # --- INICIO DEFINICIÓN CAMPOS ACTUALIZABLES ---
     CAMPOS_COTIZACION_ACTUALIZABLES = {
         'material_adhesivo_id', 'acabado_id', 'tipo_foil_id', 'num_tintas', 'num_paquetes_rollos',
@@ -60,22 +49,50 @@ class DBManager:
         'identificador'  # <--- AÑADIR ESTA LÍNEA
     }
     # --- FIN DEFINICIÓN CAMPOS ACTUALIZABLES ---
+
+    # Tipos de columna para decodificar_filas / construir_modelos (solo las que no son texto)
+    TIPOS_CLIENTE = {'id': ENTERO, 'creado_en': FECHA, 'actualizado_en': FECHA}
+    TIPOS_REFERENCIA = {'id': ENTERO, 'cliente_id': ENTERO, 'creado_en': FECHA,
+                        'actualizado_en': FECHA, 'tiene_cotizacion': BOOLEANO}
+    TIPOS_ESCALA = {
+        'id': ENTERO, 'cotizacion_id': ENTERO, 'escala': ENTERO, 'valor_unidad': NUMERO,
+        'metros': NUMERO, 'tiempo_horas': NUMERO, 'montaje': NUMERO, 'mo_y_maq': NUMERO,
+        'tintas': NUMERO, 'papel_lam': NUMERO, 'desperdicio_total': NUMERO, 'updated_at': FECHA,
+    }
+    TIPOS_ADHESIVO = {'id': ENTERO, 'creado_en': FECHA, 'actualizado_en': FECHA}
+    TIPOS_POLITICA = {'id': ENTERO, 'created_at': FECHA, 'updated_at': FECHA}
     
+    # Los índices de búsqueda se arman por sesión (RLS). Se reconstruyen cuando otra sesión
+    # del proceso escribe en su dominio de cache_datos o cuando vencen (cambios hechos
+    # fuera de la aplicación o desde otro proceso).
+    TTL_INDICES = 120  # segundos
+
     def __init__(self, supabase_client):
         self.supabase = supabase_client
+        self._indice_clientes: Optional[IndiceClientes] = None
+        self._sello_clientes: Optional[Tuple[int, float]] = None  # (versión del dominio, vence)
+        self._indice_cotizaciones: Optional[IndiceCotizaciones] = None
+        self._sello_cotizaciones: Optional[Tuple[int, float]] = None
+
+    def principal(self) -> Optional[Principal]:
+        """
+        (rol, user_id) de la sesión dueña de este DBManager, para las claves de la caché
+        de datos (ver src/data/cache_datos.py). None si no hay usuario o rol (sin caché).
+        """
+        try:
+            user_id = st.session_state.get('user_id')
+            rol = st.session_state.get('usuario_rol')
+        except Exception:
+            return None  # Fuera del hilo del script (p. ej. cola de trabajos)
+        if not user_id or not rol:
+            return None
+        return rol, str(user_id)
     
     def _parse_dt(self, value):
         """Parsea de forma segura timestamps ISO (o devuelve el datetime si ya lo es).
         Retorna None si value es falsy o si el parseo falla.
         """
-        if not value:
-            return None
-        if isinstance(value, datetime):
-            return value
-        try:
-            return isoparse(value)
-        except Exception:
-            return None
+        return parsear_fecha(value)
         
     def _generar_identificador(self, tipo_producto: str, material_code: str, ancho: float, avance: float,
                            num_pistas: int, num_tintas: int, acabado_code: str, num_paquetes_rollos: int,
@@ -140,31 +157,31 @@ class DBManager:
         tintas_str_final = f"{num_tintas}T"
         acabado_para_id = "" # Código del acabado que irá en el identificador
 
-        print(f"--- DEBUG IDENTIFICADOR ---")
-        print(f"Input tipo_producto: {tipo_producto}")
-        print(f"Input material_code: {material_code}")
-        print(f"Input ancho: {ancho}, avance: {avance}")
-        print(f"Input num_tintas: {num_tintas}")
-        print(f"Input acabado_code: '{acabado_code}'") # Mostrar comillas para ver espacios
-        print(f"Input es_manga: {es_manga}")
+        log.debug('--- DEBUG IDENTIFICADOR ---')
+        log.debug('Input tipo_producto: %s', tipo_producto)
+        log.debug('Input material_code: %s', material_code)
+        log.debug('Input ancho: %s, avance: %s', ancho, avance)
+        log.debug('Input num_tintas: %s', num_tintas)
+        log.debug("Input acabado_code: '%s'", acabado_code) # Mostrar comillas para ver espacios
+        log.debug('Input es_manga: %s', es_manga)
 
         if not es_manga: # Lógica de acabado y modificación de tintas solo para etiquetas
             if acabado_code:
                 acabado_code_upper = acabado_code.upper()
-                print(f"acabado_code_upper: '{acabado_code_upper}'")
+                log.debug("acabado_code_upper: '%s'", acabado_code_upper)
                 
                 is_foil_with_base = "FOIL" in acabado_code_upper and "+" in acabado_code_upper
                 is_just_foil = acabado_code_upper == "FOIL"
-                print(f"is_foil_with_base: {is_foil_with_base}")
-                print(f"is_just_foil: {is_just_foil}")
+                log.debug('is_foil_with_base: %s', is_foil_with_base)
+                log.debug('is_just_foil: %s', is_just_foil)
 
                 if is_foil_with_base:
-                    print("Branch: is_foil_with_base")
+                    log.debug('Branch: is_foil_with_base')
                     parts = acabado_code_upper.split('+')
-                    print(f"parts: {parts}")
+                    log.debug('parts: %s', parts)
                     # Extraer las partes del código que no son "FOIL"
                     base_code_parts = [p.strip() for p in parts if p.strip() != "FOIL"]
-                    print(f"base_code_parts: {base_code_parts}")
+                    log.debug('base_code_parts: %s', base_code_parts)
                     
                     if base_code_parts:
                         tintas_str_final = f"{num_tintas}T+FOIL"
@@ -173,19 +190,19 @@ class DBManager:
                         tintas_str_final = f"{num_tintas}T+FOIL"
                         acabado_para_id = "" # No hay código de acabado base para mostrar
                 elif is_just_foil:
-                    print("Branch: is_just_foil")
+                    log.debug('Branch: is_just_foil')
                     tintas_str_final = f"{num_tintas}T+FOIL"
                     acabado_para_id = "" # No hay nombre de acabado, solo el efecto foil
                 else: # Acabado normal (no FOIL o no sigue los patrones FOIL especiales)
-                    print("Branch: acabado_normal")
+                    log.debug('Branch: acabado_normal')
                     acabado_para_id = acabado_code.split('-')[0].strip()
             else:
-                print("No acabado_code para etiqueta.")
+                log.debug('No acabado_code para etiqueta.')
         else:
-            print("Es manga, no se aplica lógica de FOIL para identificador de acabado/tintas.")
+            log.debug('Es manga, no se aplica lógica de FOIL para identificador de acabado/tintas.')
         
-        print(f"Intermedio tintas_str_final: {tintas_str_final}")
-        print(f"Intermedio acabado_para_id: '{acabado_para_id}'")
+        log.debug('Intermedio tintas_str_final: %s', tintas_str_final)
+        log.debug("Intermedio acabado_para_id: '%s'", acabado_para_id)
         
         # Obtener partes limpias de cliente y referencia (como en el código original)
         cliente_limpio = cliente.split('(')[0].strip().upper() if cliente else ""
@@ -218,9 +235,9 @@ class DBManager:
         
         # Convertir a mayúsculas (como en el código original)
         identificador_final = identificador.upper()
-        print(f"Partes finales del identificador antes de unir: {identificador_parts}")
-        print(f"Identificador generado: {identificador_final}") # Mantener el print del código original
-        print(f"--- FIN DEBUG IDENTIFICADOR ---")
+        log.debug('Partes finales del identificador antes de unir: %s', identificador_parts)
+        log.debug('Identificador generado: %s', identificador_final) # Mantener el print del código original
+        log.debug('--- FIN DEBUG IDENTIFICADOR ---')
         
         return identificador_final
     
@@ -251,35 +268,38 @@ class DBManager:
                     # Treat None result like a retryable error
                     last_error = ConnectionError(f"{operation_name} returned None on attempt {attempt + 1}")
                     if attempt < max_retries - 1:
-                        print(f"Operation {operation_name} returned None (intento {attempt + 1}/{max_retries}).")
-                        print(f"Reintentando en {delay} segundos...")
+                        log.warning('Operation %s returned None (intento %s/%s).', operation_name, attempt + 1, max_retries)
+                        log.warning('Reintentando en %s segundos...', delay)
+                        DB_REINTENTOS.inc(operacion=operation_name, motivo='resultado_vacio')
                         time.sleep(delay)
                         delay *= 2
                         continue # Go to next attempt
                     else:
                         # If it's the last attempt and still None, loop will end, error raised below
-                        print(f"Operation {operation_name} returned None after {max_retries} attempts.")
+                        log.warning('Operation %s returned None after %s attempts.', operation_name, max_retries)
                 else:
                     return result # Return the valid result (not None)
                     
             except httpx.RemoteProtocolError as e:
                 last_error = e
                 if attempt < max_retries - 1:
-                    print(f"Error de conexión en {operation_name} (intento {attempt + 1}/{max_retries}): {str(e)}")
+                    log.error('Error de conexión en %s (intento %s/%s): %s', operation_name, attempt + 1, max_retries, str(e))
                     # Log more details if available (optional)
                     # print(f"Detalles del error: {e.__dict__}") 
-                    print(f"Reintentando en {delay} segundos...")
+                    log.warning('Reintentando en %s segundos...', delay)
+                    DB_REINTENTOS.inc(operacion=operation_name, motivo='conexion')
                     time.sleep(delay)
                     delay *= 2  # Backoff exponencial
                 continue # Go to next attempt
             except Exception as e:
                 # For other non-retryable errors, raise immediately
-                print(f"Error no recuperable en {operation_name} (intento {attempt + 1}): {type(e).__name__} - {e}")
+                log.error('Error no recuperable en %s (intento %s): %s - %s', operation_name, attempt + 1, type(e).__name__, e)
                 raise e
 
         # If loop finishes without returning, it means all retries failed
         error_msg = f"Error persistente en {operation_name} después de {max_retries} intentos: {str(last_error)}"
-        print(error_msg)
+        log.error(error_msg)
+        DB_FALLIDAS.inc(operacion=operation_name)
         # Raise the last recorded error (either ConnectionError for None or httpx error)
         if last_error:
             raise last_error
@@ -316,13 +336,13 @@ class DBManager:
                         new_dict[k] = int(v)
                     except (ValueError, TypeError):
                         new_dict[k] = None # O manejar el error como prefieras
-                        print(f"Advertencia: No se pudo convertir '{k}' a entero: {v}")
+                        log.warning("Advertencia: No se pudo convertir '%s' a entero: %s", k, v)
                 elif k in campos_numericos and v != '':
                     try:
                         new_dict[k] = float(v)
                     except (ValueError, TypeError):
                         new_dict[k] = None
-                        print(f"Advertencia: No se pudo convertir '{k}' a float: {v}")
+                        log.warning("Advertencia: No se pudo convertir '%s' a float: %s", k, v)
                 else:
                     # Si no requiere conversión específica (y está en la lista permitida)
                     new_dict[k] = v 
@@ -336,7 +356,7 @@ class DBManager:
         """Crea una nueva cotización."""
         def _operation():
             # 1. Preparar datos iniciales (sin identificador ni número de cotización predefinido)
-            print("\\\\nPreparando datos iniciales para la inserción...")
+            log.debug('Preparando datos iniciales para la inserción...')
             # Eliminar campos que asignará la BD o que se usarán después
             datos_cotizacion.pop('id', None) # <-- AÑADIR ESTA LÍNEA
             datos_cotizacion.pop('identificador', None)
@@ -370,32 +390,24 @@ class DBManager:
                     try:
                         datos_cotizacion[key] = float(datos_cotizacion[key])
                     except (TypeError, ValueError):
-                        print(f"Error convirtiendo {key} a float")
+                        log.error('Error convirtiendo %s a float', key)
                         datos_cotizacion[key] = 0.0
             
 
             
             
-            print("\\nDatos para la llamada RPC inicial:")
-            # Incluir altura_grafado si existe y no es None
-            if 'altura_grafado' in datos_cotizacion and datos_cotizacion['altura_grafado'] is not None:
-                print(f"  altura_grafado: {datos_cotizacion['altura_grafado']}")
-            
-            for k, v in datos_cotizacion.items():
-                # Evitar imprimir altura_grafado dos veces si ya se imprimió arriba
-                if k != 'altura_grafado' or ('altura_grafado' in datos_cotizacion and datos_cotizacion['altura_grafado'] is None):
-                     print(f"  {k}: {v}")
+            log.debug('Datos para la llamada RPC inicial: %s', datos_cotizacion)
             
             # 2. Llamar a la función RPC para crear la cotización (la BD asigna numero_cotizacion)
             try:
-                print("\\nLlamando a la función RPC crear_cotizacion...")
+                log.debug('Llamando a la función RPC crear_cotizacion...')
                 result = self.supabase.rpc('crear_cotizacion', {'datos': datos_cotizacion}).execute()
 
                 if not result or not hasattr(result, 'data'):
-                    print("Error: No se recibió respuesta válida del servidor")
+                    log.error('Error: No se recibió respuesta válida del servidor')
                     raise ValueError("No se recibió respuesta válida del servidor al crear cotización")
 
-                print(f"Respuesta RPC recibida: {result.data}")
+                log.debug('Respuesta RPC recibida: %s', result.data)
                 
                 # Extraer los datos de la cotización creada
                 cotizacion_creada_data = None
@@ -405,22 +417,22 @@ class DBManager:
                      cotizacion_creada_data = result.data
 
                 if not cotizacion_creada_data or 'id' not in cotizacion_creada_data or 'numero_cotizacion' not in cotizacion_creada_data:
-                    print("Error: La respuesta RPC no contiene ID o numero_cotizacion válido")
-                    print(f"Datos recibidos: {cotizacion_creada_data}")
+                    log.error('Error: La respuesta RPC no contiene ID o numero_cotizacion válido')
+                    log.debug('Datos recibidos: %s', cotizacion_creada_data)
                     raise ValueError("Respuesta inválida de RPC crear_cotizacion")
                 
                 cotizacion_id = cotizacion_creada_data['id']
                 numero_cotizacion_final = cotizacion_creada_data['numero_cotizacion']
-                print(f"Cotización creada con ID: {cotizacion_id}, Número Consecutivo Final: {numero_cotizacion_final}")
+                log.debug('Cotización creada con ID: %s, Número Consecutivo Final: %s', cotizacion_id, numero_cotizacion_final)
 
             except Exception as e:
-                print(f"Error durante la creación inicial de cotización vía RPC: {e}")
-                print(f"Tipo de error: {type(e)}")
-                print(f"Detalles del error: {str(e)}")
+                log.error('Error durante la creación inicial de cotización vía RPC: %s', e)
+                log.error('Tipo de error: %s', type(e))
+                log.error('Detalles del error: %s', str(e))
                 raise e # Re-lanzar para que _retry_operation pueda manejarlo si es necesario
 
             # 3. Obtener datos necesarios para generar el identificador (ya que no estaban en cotizacion_creada_data)
-            print("\\nObteniendo datos adicionales para generar el identificador final...")
+            log.debug('Obteniendo datos adicionales para generar el identificador final...')
             try:
                 # Obtener IDs finales desde la respuesta de la RPC
                 material_adhesivo_id_final = cotizacion_creada_data.get('material_adhesivo_id')
@@ -455,12 +467,12 @@ class DBManager:
                 referencia_descripcion = referencia.descripcion
 
             except Exception as e:
-                 print(f"Error obteniendo datos para el identificador post-inserción: {e}")
+                 log.error('Error obteniendo datos para el identificador post-inserción: %s', e)
                  # Considerar si fallar aquí o intentar continuar sin identificador
                  raise ValueError(f"Fallo al obtener datos para identificador: {e}")
 
             # 4. Generar el identificador AHORA con el número final
-            print(f"\\nGenerando identificador con número final {numero_cotizacion_final}...")
+            log.debug('Generando identificador con número final %s...', numero_cotizacion_final)
             identificador_final = ""
             try:
                 # Obtener otros datos necesarios del diccionario original o de la respuesta RPC
@@ -483,24 +495,24 @@ class DBManager:
                     referencia=referencia_descripcion, # Usar descripción correcta
                     numero_cotizacion=numero_cotizacion_final # Usar el número final de la BD
                 )
-                print(f"Identificador final generado: {identificador_final}")
+                log.debug('Identificador final generado: %s', identificador_final)
             except Exception as e:
-                print(f"Error generando identificador final: {e}")
+                log.error('Error generando identificador final: %s', e)
                 # Decidir qué hacer: continuar sin identificador o fallar?
                 # Por ahora, continuamos pero registramos el error. El campo será "" o el valor por defecto.
                 # Loguear la advertencia en lugar de usar st.warning directamente en backend
-                logging.warning(f"No se pudo generar el identificador para la cotización {cotizacion_id}. Error: {e}", exc_info=True)
+                log.warning('No se pudo generar el identificador para la cotización %s. Error: %s', cotizacion_id, e, exc_info=True)
                 # Considerar lanzar una excepción específica si la generación del ID es crítica
                 # raise IdentificadorGenerationError(f"Fallo al generar identificador: {e}") from e
 
 
             # 5. Actualizar la cotización con el identificador generado
             if identificador_final:
-                print(f"\\nActualizando cotización {cotizacion_id} con el identificador final...")
+                log.debug('Actualizando cotización %s con el identificador final...', cotizacion_id)
                 try:
-                    print(f"DEBUG - Intentando actualizar identificador. Cotización ID: {cotizacion_id}, Identificador: {identificador_final}")
+                    log.debug('DEBUG - Intentando actualizar identificador. Cotización ID: %s, Identificador: %s', cotizacion_id, identificador_final)
                     update_response = self.supabase.table('cotizaciones').update({"identificador": identificador_final}).eq('id', cotizacion_id).execute()
-                    print(f"DEBUG - Respuesta completa: {update_response}")
+                    log.debug('DEBUG - Respuesta completa: %s', update_response)
                     
                     # --- Verificar si hubo error explícito ---
                     update_successful = True # Asumir éxito por defecto
@@ -508,27 +520,27 @@ class DBManager:
                     if hasattr(update_response, 'error') and update_response.error:
                          update_successful = False
                          update_error = update_response.error
-                         print(f"Error DETECTADO en respuesta de Supabase: {update_error}")
+                         log.error('Error DETECTADO en respuesta de Supabase: %s', update_error)
                     # Comprobación adicional por si la estructura cambia o el error está en data
                     elif not update_response.data and (not hasattr(update_response, 'status_code') or update_response.status_code < 200 or update_response.status_code >= 300):
                          update_successful = False
-                         print(f"Error: Respuesta sin datos y con código de estado de error: {getattr(update_response, 'status_code', 'N/A')}")
+                         log.error('Error: Respuesta sin datos y con código de estado de error: %s', getattr(update_response, 'status_code', 'N/A'))
                     # Ausencia de error explícito se considera éxito.
 
                     if not update_successful:
-                        print(f"Error: No se pudo actualizar la cotización {cotizacion_id} con el identificador.")
+                        log.error('Error: No se pudo actualizar la cotización %s con el identificador.', cotizacion_id)
                         # Imprimir más detalles de diagnóstico
                         if update_error: # Usar el error capturado
-                            print(f"Error detallado: {update_error}")
+                            log.error('Error detallado: %s', update_error)
                         # Usar logging en lugar de st.warning
-                        logging.warning(f"Cotización {cotizacion_id} creada, pero falló la actualización del identificador. Error: {update_error}") 
+                        log.warning('Cotización %s creada, pero falló la actualización del identificador. Error: %s', cotizacion_id, update_error) 
                     else:
-                        print("Identificador actualizado correctamente.")
+                        log.debug('Identificador actualizado correctamente.')
                         # Actualizar el diccionario de datos devuelto para que incluya el identificador
                         cotizacion_creada_data['identificador'] = identificador_final
 
                 except Exception as e:
-                    print(f"Error actualizando identificador para cotización {cotizacion_id}: {e}")
+                    log.error('Error actualizando identificador para cotización %s: %s', cotizacion_id, e)
                     st.warning(f"Cotización {cotizacion_id} creada, pero falló la actualización del identificador. Error: {e}")
             
             # 6. Devolver los datos de la cotización creada (incluyendo id y numero_cotizacion_final)
@@ -536,10 +548,12 @@ class DBManager:
 
         try:
             # Usar _retry_operation para manejar posibles reintentos en la operación completa
-            return self._retry_operation("crear cotización y generar ID", _operation)
+            cotizacion_creada = self._retry_operation("crear cotización y generar ID", _operation)
+            if cotizacion_creada:
+                self._reindexar_cotizacion(cotizacion_creada.get('id'))
+            return cotizacion_creada
         except Exception as e:
-            print(f"Error final en el proceso de crear cotización: {str(e)}")
-            traceback.print_exc()
+            log.error('Error final en el proceso de crear cotización: %s', str(e), exc_info=True)
             return None # O devolver una estructura de error
 
     def actualizar_cotizacion(self, cotizacion_id: int, datos_cotizacion: Dict) -> Tuple[bool, str]:
@@ -554,17 +568,17 @@ class DBManager:
             Tuple[bool, str]: (éxito, mensaje)
         """
         try:
-            print(f"\n=== ACTUALIZANDO COTIZACIÓN {cotizacion_id} VÍA RPC ===") # Mensaje actualizado
-            print("Datos a actualizar (antes de limpiar):", datos_cotizacion)
+            log.debug('=== ACTUALIZANDO COTIZACIÓN %s VÍA RPC ===', cotizacion_id) # Mensaje actualizado
+            log.debug('Datos a actualizar (antes de limpiar): %s', datos_cotizacion)
             
             # --- INICIO: Log especial para ajustes_modificados_admin ---
             flag_ajustes_admin = datos_cotizacion.get('ajustes_modificados_admin')
-            print(f"🚩 Flag ajustes_modificados_admin en datos recibidos: {flag_ajustes_admin} (tipo: {type(flag_ajustes_admin).__name__})")
+            log.debug('🚩 Flag ajustes_modificados_admin en datos recibidos: %s (tipo: %s)', flag_ajustes_admin, type(flag_ajustes_admin).__name__)
             # --- FIN: Log especial ---
             
             # --- INICIO: Extraer identificador si existe ---
             identificador = datos_cotizacion.get('identificador')
-            print(f"🏷️ Identificador para posible actualización posterior: {identificador}")
+            log.debug('🏷️ Identificador para posible actualización posterior: %s', identificador)
             # --- FIN: Extraer identificador ---
             
             # Validar estado y motivo de rechazo (si aplica)
@@ -575,15 +589,13 @@ class DBManager:
             
             # Limpiar datos ANTES de enviar a RPC
             datos_limpios = self._limpiar_datos(datos_cotizacion)
-            print("\nDatos limpios a enviar a RPC:")
-            for k, v in datos_limpios.items():
-                print(f"  {k}: {v}")
+            log.debug('Datos limpios a enviar a RPC: %s', datos_limpios)
                 
             # --- INICIO: Log especial post-limpieza ---
             if 'ajustes_modificados_admin' in datos_limpios:
-                print(f"🚩 Flag ajustes_modificados_admin (después de limpieza): {datos_limpios['ajustes_modificados_admin']}")
+                log.debug('🚩 Flag ajustes_modificados_admin (después de limpieza): %s', datos_limpios['ajustes_modificados_admin'])
             else:
-                print("❌ ERROR: Flag ajustes_modificados_admin ELIMINADO durante limpieza!")
+                log.error('❌ ERROR: Flag ajustes_modificados_admin ELIMINADO durante limpieza!')
             # --- FIN: Log especial ---
                 
             # --- AÑADIR CAMPOS DE AUDITORÍA ---
@@ -593,12 +605,12 @@ class DBManager:
             if user_id:
                 datos_limpios['modificado_por'] = user_id
             else:
-                 print("ADVERTENCIA: No se encontró user_id en session_state para auditoría (RPC). La RPC debería usar auth.uid().")
+                 log.warning('ADVERTENCIA: No se encontró user_id en session_state para auditoría (RPC). La RPC debería usar auth.uid().')
             # datos_limpios['actualizado_en'] = datetime.now().isoformat() # La RPC debería usar now()
             # ---------------------------------
             
             # --- LLAMADA A RPC --- 
-            print(f"\nLlamando a RPC 'actualizar_cotizacion_rpc' para ID {cotizacion_id}...")
+            log.debug("Llamando a RPC 'actualizar_cotizacion_rpc' para ID %s...", cotizacion_id)
             
             # Llamar a la RPC solo con los parámetros que acepta
             response = self.supabase.rpc(
@@ -610,7 +622,7 @@ class DBManager:
             # Verificar la respuesta de la RPC
             # Asumimos que la RPC devuelve la fila actualizada (o al menos el ID) si tiene éxito
             if response.data and isinstance(response.data, list) and len(response.data) > 0:
-                print(f"RPC actualizar_cotizacion_rpc exitosa. Fila actualizada: {response.data[0]}")
+                log.info('RPC actualizar_cotizacion_rpc exitosa. Fila actualizada: %s', response.data[0])
                 
                 # FASE 2: Verificar si necesitamos actualizar manualmente algunos campos
                 # Para esto realizamos un segundo paso de actualización directa solo si es necesario
@@ -623,7 +635,7 @@ class DBManager:
                 
                 # Si tenemos identificador a actualizar y no coincide con la respuesta, añadirlo a la lista
                 if identificador and (respuesta_identificador is None or respuesta_identificador != identificador):
-                    print(f"⚠️ Identificador no actualizado por RPC. Programando actualización manual: '{respuesta_identificador}' → '{identificador}'")
+                    log.warning("⚠️ Identificador no actualizado por RPC. Programando actualización manual: '%s' → '%s'", respuesta_identificador, identificador)
                     updates_pendientes['identificador'] = identificador
                 
                 # 2. Verificar si el flag ajustes_modificados_admin se actualizó correctamente
@@ -636,12 +648,12 @@ class DBManager:
                     
                     # Si el flag enviado es True pero no se aplicó correctamente, añadirlo a la lista
                     if flag_enviado is True and respuesta_flag is not True:
-                        print(f"⚠️ Flag ajustes_modificados_admin no actualizado por RPC. Programando actualización manual: {respuesta_flag} → True")
+                        log.warning('⚠️ Flag ajustes_modificados_admin no actualizado por RPC. Programando actualización manual: %s → True', respuesta_flag)
                         updates_pendientes['ajustes_modificados_admin'] = True
                 
                 # 3. Si tenemos actualizaciones pendientes, hacerlas en una sola operación
                 if updates_pendientes:
-                    print(f"Realizando actualización manual para campos: {list(updates_pendientes.keys())}")
+                    log.debug('Realizando actualización manual para campos: %s', list(updates_pendientes.keys()))
                     try:
                         # Actualizar directamente en la tabla cotizaciones
                         update_result = self.supabase.table('cotizaciones') \
@@ -650,16 +662,17 @@ class DBManager:
                 .execute()
             
                         if hasattr(update_result, 'error') and update_result.error:
-                            print(f"❌ Error en actualización manual: {update_result.error}")
+                            log.error('❌ Error en actualización manual: %s', update_result.error)
                         else:
-                            print(f"✅ Actualización manual completada con éxito.")
+                            log.info('✅ Actualización manual completada con éxito.')
                     except Exception as e_update:
-                        print(f"❌ Error en la actualización manual: {e_update}")
+                        log.error('❌ Error en la actualización manual: %s', e_update)
                 
+                self._reindexar_cotizacion(cotizacion_id)
                 return True, "✅ Cotización actualizada exitosamente (vía RPC)"
             # Algunas RPC pueden devolver un solo objeto
             elif response.data and isinstance(response.data, dict) and response.data:
-                print(f"RPC actualizar_cotizacion_rpc exitosa. Respuesta: {response.data}")
+                log.info('RPC actualizar_cotizacion_rpc exitosa. Respuesta: %s', response.data)
                  
                 # FASE 2: Verificar si necesitamos actualizar manualmente algunos campos
                 updates_pendientes = {}
@@ -669,7 +682,7 @@ class DBManager:
                 
                 # Si tenemos identificador a actualizar y no coincide con la respuesta, añadirlo a la lista
                 if identificador and (respuesta_identificador is None or respuesta_identificador != identificador):
-                    print(f"⚠️ Identificador no actualizado por RPC. Programando actualización manual: '{respuesta_identificador}' → '{identificador}'")
+                    log.warning("⚠️ Identificador no actualizado por RPC. Programando actualización manual: '%s' → '%s'", respuesta_identificador, identificador)
                     updates_pendientes['identificador'] = identificador
                 
                 # 2. Verificar si el flag ajustes_modificados_admin se actualizó correctamente
@@ -679,12 +692,12 @@ class DBManager:
                     
                     # Si el flag enviado es True pero no se aplicó correctamente, añadirlo a la lista
                     if flag_enviado is True and respuesta_flag is not True:
-                        print(f"⚠️ Flag ajustes_modificados_admin no actualizado por RPC. Programando actualización manual: {respuesta_flag} → True")
+                        log.warning('⚠️ Flag ajustes_modificados_admin no actualizado por RPC. Programando actualización manual: %s → True', respuesta_flag)
                         updates_pendientes['ajustes_modificados_admin'] = True
                 
                 # 3. Si tenemos actualizaciones pendientes, hacerlas en una sola operación
                 if updates_pendientes:
-                    print(f"Realizando actualización manual para campos: {list(updates_pendientes.keys())}")
+                    log.debug('Realizando actualización manual para campos: %s', list(updates_pendientes.keys()))
                     try:
                         # Actualizar directamente en la tabla cotizaciones
                         update_result = self.supabase.table('cotizaciones') \
@@ -693,18 +706,19 @@ class DBManager:
                             .execute()
                         
                         if hasattr(update_result, 'error') and update_result.error:
-                            print(f"❌ Error en actualización manual: {update_result.error}")
+                            log.error('❌ Error en actualización manual: %s', update_result.error)
                         else:
-                            print(f"✅ Actualización manual completada con éxito.")
+                            log.info('✅ Actualización manual completada con éxito.')
                     except Exception as e_update:
-                        print(f"❌ Error en la actualización manual: {e_update}")
+                        log.error('❌ Error en la actualización manual: %s', e_update)
                 
+                self._reindexar_cotizacion(cotizacion_id)
                 return True, "✅ Cotización actualizada exitosamente (vía RPC)"
             else:
                 # Si no hay datos, verificar si hay un error explícito
                 error_info = getattr(response, 'error', None)
                 error_msg_rpc = f"Error RPC: {error_info}" if error_info else "La RPC de actualización no devolvió datos confirmatorios."
-                print(f"Error en RPC update: {error_msg_rpc}") 
+                log.error('Error en RPC update: %s', error_msg_rpc) 
                 # Intentar extraer un mensaje más útil del error si es posible
                 detailed_error = ""                
                 if error_info and hasattr(error_info, 'message'):
@@ -717,31 +731,30 @@ class DBManager:
             
         except Exception as e: # Capturar errores generales
             error_msg = str(e)
-            print(f"Error al actualizar cotización vía RPC (bloque except general): {error_msg}")
-            traceback.print_exc()
+            log.error('Error al actualizar cotización vía RPC (bloque except general): %s', error_msg, exc_info=True)
             return False, f"❌ Error técnico al actualizar vía RPC: {error_msg}"
 
     def guardar_cotizacion_escalas(self, cotizacion_id: int, escalas: List[Escala]) -> bool:
         """Guarda las escalas de una cotización"""
         def _operation():
             if not cotizacion_id:
-                print("Error: cotizacion_id es requerido")
+                log.error('Error: cotizacion_id es requerido')
                 return False
-            print(f"\n=== INICIO GUARDAR_COTIZACION_ESCALAS para cotización {cotizacion_id} ===")
-            print(f"Número de escalas a guardar: {len(escalas)}")
+            log.debug('=== INICIO GUARDAR_COTIZACION_ESCALAS para cotización %s ===', cotizacion_id)
+            log.debug('Número de escalas a guardar: %s', len(escalas))
             
             # Eliminar escalas anteriores si existen
-            print("Eliminando escalas anteriores...")
+            log.debug('Eliminando escalas anteriores...')
             delete_result = self.supabase.from_('cotizacion_escalas') \
                 .delete() \
                 .eq('cotizacion_id', cotizacion_id) \
                 .execute()
-            print(f"Resultado de eliminación: {delete_result.data if hasattr(delete_result, 'data') else 'No data'}")
+            log.debug('Resultado de eliminación: %s', delete_result.data if hasattr(delete_result, 'data') else 'No data')
             
             # Preparar datos de las escalas
             escalas_data = []
             for escala in escalas:
-                print(f"\nProcesando escala: {escala}")
+                log.debug('Procesando escala: %s', escala)
                 datos_escala = {
                     'cotizacion_id': cotizacion_id,
                     'escala': escala.escala,
@@ -754,19 +767,19 @@ class DBManager:
                     'papel_lam': escala.papel_lam,
                     'desperdicio_total': escala.desperdicio_total
                 }
-                print("Datos de escala a insertar:", datos_escala)
+                log.debug('Datos de escala a insertar: %s', datos_escala)
                 escalas_data.append(datos_escala)
             
             if escalas_data:
-                print(f"\nInsertando {len(escalas_data)} escalas...")
+                log.debug('Insertando %s escalas...', len(escalas_data))
                 insert_result = self.supabase.from_('cotizacion_escalas') \
                     .insert(escalas_data) \
                     .execute()
-                print(f"Resultado de inserción: {insert_result.data if hasattr(insert_result, 'data') else 'No data'}")
+                log.debug('Resultado de inserción: %s', insert_result.data if hasattr(insert_result, 'data') else 'No data')
                 
                 # --- CORRECCIÓN: Verificar si hubo un error en la respuesta, no solo si .data está vacío --- 
                 if hasattr(insert_result, 'error') and insert_result.error:
-                    print(f"Error durante la inserción de escalas: {insert_result.error}")
+                    log.error('Error durante la inserción de escalas: %s', insert_result.error)
                     return False # Hubo un error
                 # Ya no necesitamos la condición 'if not insert_result.data:' aquí
                 # porque una inserción exitosa puede no devolver datos.
@@ -774,18 +787,17 @@ class DBManager:
                 # --- FIN CORRECCIÓN ---
                     
                 # Este log ahora es más informativo
-                print(f"Inserción de escalas completada (sin errores reportados por Supabase).") 
+                log.debug('Inserción de escalas completada (sin errores reportados por Supabase).') 
             else:
-                print("No hay escalas para insertar")
+                log.debug('No hay escalas para insertar')
             
-            print("=== FIN GUARDAR_COTIZACION_ESCALAS ===\n")
+            log.debug('=== FIN GUARDAR_COTIZACION_ESCALAS ===')
             return True
 
         try:
             return self._retry_operation("guardar escalas de cotización", _operation)
         except Exception as e:
-            print(f"Error al guardar escalas: {e}")
-            traceback.print_exc()
+            log.error('Error al guardar escalas: %s', e, exc_info=True)
             return False
 
     def get_clientes_by_comercial(self, comercial_id: str) -> List[Cliente]:
@@ -819,20 +831,10 @@ class DBManager:
                     .order('nombre', desc=False)\
                     .execute()
 
-                return [Cliente(
-                    id=cliente['id'],
-                    nombre=cliente['nombre'],
-                    codigo=cliente.get('codigo'),
-                    persona_contacto=cliente.get('persona_contacto'),
-                    correo_electronico=cliente.get('correo_electronico'),
-                    telefono=cliente.get('telefono'),
-                    creado_en=self._parse_timestamptz(cliente.get('creado_en')),
-                    actualizado_en=self._parse_timestamptz(cliente.get('actualizado_en'))
-                ) for cliente in clientes.data] if clientes.data else []
+                return construir_modelos(Cliente, clientes.data, self.TIPOS_CLIENTE)
 
             except Exception as e:
-                print(f"Error obteniendo clientes por comercial: {str(e)}")
-                traceback.print_exc()
+                log.error('Error obteniendo clientes por comercial: %s', str(e), exc_info=True)
                 return []
 
         return self._retry_operation(
@@ -843,41 +845,30 @@ class DBManager:
     def get_materiales(self) -> List[Material]:
         """Obtiene todos los materiales disponibles usando RPC."""
         def _operation():
-            print("\n=== DEBUG: Llamando RPC get_all_materials ===")
+            log.debug('=== DEBUG: Llamando RPC get_all_materials ===')
             response = self.supabase.rpc('get_all_materials').execute()
             
             if response is None:
-                 print("ERROR: La respuesta de Supabase RPC fue None en get_materiales.")
+                 log.error('ERROR: La respuesta de Supabase RPC fue None en get_materiales.')
                  raise ConnectionError("Supabase RPC devolvió None en get_materiales")
             
             if not response.data:
-                logging.warning("No se encontraron materiales (vía RPC)")
+                log.warning('No se encontraron materiales (vía RPC)')
                 return []
             
-            materiales = []
             # La respuesta RPC ya debería tener la estructura deseada (incluyendo adhesivo_tipo)
-            for item in response.data:
-                # Crear el objeto Material directamente desde el item devuelto por RPC
-                try:
-                    materiales.append(Material(**item)) 
-                except TypeError as te:
-                    print(f"Error creando objeto Material desde RPC data: {te}")
-                    print(f"Datos del item problemático: {item}")
-                    # Opcional: continuar con los siguientes o lanzar error
-                    continue 
-                    
-            print(f"Materiales obtenidos vía RPC: {len(materiales)}")
+            materiales = construir_modelos(Material, response.data)
+            log.debug('Materiales obtenidos vía RPC: %s', len(materiales))
             return materiales
 
         try:
             # Usar _retry_operation con la función RPC
             return self._retry_operation("obtener materiales (RPC)", _operation)
         except ConnectionError as ce:
-             print(f"Error de conexión persistente en get_materiales (RPC): {ce}")
+             log.error('Error de conexión persistente en get_materiales (RPC): %s', ce)
              raise # Re-lanzar para que la app lo maneje si es necesario
         except Exception as e:
-            logging.error(f"Error al obtener materiales (RPC): {str(e)}")
-            traceback.print_exc()
+            log.error('Error al obtener materiales (RPC): %s', str(e), exc_info=True)
             raise
 
     def get_material(self, material_id: int) -> Optional[Material]:
@@ -894,7 +885,7 @@ class DBManager:
                 # Crear el objeto Material directamente
                 return Material(**response.data)
             else:
-                print(f"No se encontró material con ID {material_id} (o hubo un error)")
+                log.warning('No se encontró material con ID %s (o hubo un error)', material_id)
                 return None
             
             # --- Lógica anterior eliminada --- 
@@ -919,12 +910,10 @@ class DBManager:
             
         except PostgrestAPIError as api_error:
             # Capturar específicamente APIError para ver detalles
-            print(f"Error de API Supabase al obtener material: {api_error}")
-            traceback.print_exc()
+            log.error('Error de API Supabase al obtener material: %s', api_error, exc_info=True)
             return None
         except Exception as e:
-            print(f"Error general al obtener material: {e}")
-            traceback.print_exc()
+            log.error('Error general al obtener material: %s', e, exc_info=True)
             return None
 
     def get_material_code(self, material_id: int) -> str:
@@ -935,45 +924,36 @@ class DBManager:
                 return response.data[0]['code']
             return ""
         except Exception as e:
-            print(f"Error al obtener código de material: {e}")
+            log.error('Error al obtener código de material: %s', e)
             return ""
 
     def get_acabados(self) -> List[Acabado]:
         """Obtiene todos los acabados disponibles usando RPC."""
         def _operation():
-            print("\n=== DEBUG: Llamando RPC get_all_acabados ===")
+            log.debug('=== DEBUG: Llamando RPC get_all_acabados ===')
             response = self.supabase.rpc('get_all_acabados').execute()
             
             if response is None:
-                 print("ERROR: La respuesta de Supabase RPC fue None en get_acabados.")
+                 log.error('ERROR: La respuesta de Supabase RPC fue None en get_acabados.')
                  raise ConnectionError("Supabase RPC devolvió None en get_acabados")
             
             if not response.data:
-                logging.warning("No se encontraron acabados (vía RPC)")
+                log.warning('No se encontraron acabados (vía RPC)')
                 return []
                 
             # Crear objetos Acabado directamente desde la respuesta RPC
-            acabados = []
-            for item in response.data:
-                 try:
-                     acabados.append(Acabado(**item))
-                 except TypeError as te:
-                    print(f"Error creando objeto Acabado desde RPC data: {te}")
-                    print(f"Datos del item problemático: {item}")
-                    continue
-                    
-            print(f"Acabados obtenidos vía RPC: {len(acabados)}")        
+            acabados = construir_modelos(Acabado, response.data, {'valor': NUMERO, 'updated_at': FECHA})
+            log.debug('Acabados obtenidos vía RPC: %s', len(acabados))        
             return acabados
             
         try:
             # Usar _retry_operation con la función RPC
             return self._retry_operation("obtener acabados (RPC)", _operation)
         except ConnectionError as ce:
-             print(f"Error de conexión persistente en get_acabados (RPC): {ce}")
+             log.error('Error de conexión persistente en get_acabados (RPC): %s', ce)
              raise
         except Exception as e:
-            logging.error(f"Error al obtener acabados (RPC): {str(e)}")
-            traceback.print_exc()
+            log.error('Error al obtener acabados (RPC): %s', str(e), exc_info=True)
             raise
 
     def get_acabado(self, acabado_id: int) -> Optional[Acabado]:
@@ -981,13 +961,13 @@ class DBManager:
         try:
             # Validar que acabado_id no sea None y sea un entero válido
             if acabado_id is None or not isinstance(acabado_id, int):
-                print(f"ID de acabado inválido: {acabado_id}")
+                log.debug('ID de acabado inválido: %s', acabado_id)
                 return None
                 
             response = self.supabase.from_('acabados').select('*').eq('id', acabado_id).execute()
             
             if not response.data or len(response.data) == 0:
-                print(f"No se encontró acabado con ID {acabado_id}")
+                log.warning('No se encontró acabado con ID %s', acabado_id)
                 return None
             
             # Crear y retornar un objeto Acabado
@@ -995,8 +975,7 @@ class DBManager:
             return Acabado(**acabado_data)
             
         except Exception as e:
-            print(f"Error al obtener acabado: {e}")
-            traceback.print_exc()
+            log.error('Error al obtener acabado: %s', e, exc_info=True)
             return None
 
     def get_acabado_code(self, acabado_id: int) -> str:
@@ -1007,44 +986,38 @@ class DBManager:
                 return response.data[0]['code']
             return ""
         except Exception as e:
-            print(f"Error al obtener código de acabado: {e}")
+            log.error('Error al obtener código de acabado: %s', e)
             return ""
 
     def get_tipos_producto(self) -> List[TipoProducto]:
         """Obtiene todos los tipos de producto disponibles usando RPC."""
         def _operation():
-            print("\n=== DEBUG: Llamando RPC get_all_tipos_producto ===")
+            log.debug('=== DEBUG: Llamando RPC get_all_tipos_producto ===')
             response = self.supabase.rpc('get_all_tipos_producto').execute()
 
             if response is None:
-                 print("ERROR: La respuesta de Supabase RPC fue None en get_tipos_producto.")
+                 log.error('ERROR: La respuesta de Supabase RPC fue None en get_tipos_producto.')
                  raise ConnectionError("Supabase RPC devolvió None en get_tipos_producto")
             
             if not response.data:
-                print("No se encontraron tipos de producto (vía RPC)")
+                log.warning('No se encontraron tipos de producto (vía RPC)')
                 return []
             
-            tipos_producto = []
-            for item in response.data:
-                try:
-                    tipos_producto.append(TipoProducto(**item))
-                except TypeError as te:
-                    print(f"Error creando objeto TipoProducto desde RPC data: {te}")
-                    print(f"Datos del item problemático: {item}")
-                    continue
+            tipos_producto = construir_modelos(
+                TipoProducto, response.data, {'creado_en': FECHA, 'actualizado_en': FECHA}
+            )
             
-            print(f"Se encontraron {len(tipos_producto)} tipos de producto (vía RPC)")
+            log.debug('Se encontraron %s tipos de producto (vía RPC)', len(tipos_producto))
             return tipos_producto
             
         try:
              # Usar _retry_operation con la función RPC
             return self._retry_operation("obtener tipos producto (RPC)", _operation)
         except ConnectionError as ce:
-             print(f"Error de conexión persistente en get_tipos_producto (RPC): {ce}")
+             log.error('Error de conexión persistente en get_tipos_producto (RPC): %s', ce)
              raise # Re-lanzar para que la app lo maneje si es necesario
         except Exception as e:
-            print(f"Error al obtener tipos de producto (RPC): {e}")
-            traceback.print_exc()
+            log.error('Error al obtener tipos de producto (RPC): %s', e, exc_info=True)
             raise # O return [] si prefieres no detener la app
 
     def get_tipo_producto(self, tipo_producto_id: int) -> Optional[TipoProducto]:
@@ -1054,71 +1027,52 @@ class DBManager:
             response = self.supabase.from_('tipo_producto').select('*').eq('id', tipo_producto_id).execute()
             
             if not response.data or len(response.data) == 0:
-                print(f"No se encontró tipo de producto con ID {tipo_producto_id}")
+                log.warning('No se encontró tipo de producto con ID %s', tipo_producto_id)
                 return None
             
             # Crear y retornar un objeto TipoProducto
             return TipoProducto(**response.data[0])
             
         except Exception as e:
-            print(f"Error al obtener tipo de producto: {e}")
-            traceback.print_exc()
+            log.error('Error al obtener tipo de producto: %s', e, exc_info=True)
             return None
 
     def get_tipos_grafado(self) -> List[TipoGrafado]:
         """Obtiene los tipos de grafado disponibles para mangas usando RPC."""
         # TODO: Cambiar a RPC si las consultas SELECT directas fallan. <- Cambiado a RPC
         def _operation():
-            print("\n=== DEBUG: Llamando RPC get_tipos_grafado_manga ===") # Cambiado nombre RPC
+            log.debug('=== DEBUG: Llamando RPC get_tipos_grafado_manga ===') # Cambiado nombre RPC
             response = self.supabase.rpc('get_tipos_grafado_manga').execute() # Cambiado nombre RPC
 
             if response is None:
-                 print("ERROR: La respuesta de Supabase RPC fue None en get_tipos_grafado.")
+                 log.error('ERROR: La respuesta de Supabase RPC fue None en get_tipos_grafado.')
                  raise ConnectionError("Supabase RPC devolvió None en get_tipos_grafado")
             
             if not response.data:
-                print("No se encontraron tipos de grafado para mangas (vía RPC)") # Mensaje actualizado
+                log.warning('No se encontraron tipos de grafado para mangas (vía RPC)') # Mensaje actualizado
                 return []
              
-            tipos_grafado = []
-            for item in response.data:
-                try:
-                    # Usar from_dict si existe y maneja la conversión
-                    if hasattr(TipoGrafado, 'from_dict'):
-                        tipos_grafado.append(TipoGrafado.from_dict(item))
-                    else:
-                        # Si no hay from_dict, intentar instanciar directamente
-                        tipos_grafado.append(TipoGrafado(**item))
-                except TypeError as te:
-                    print(f"Error creando objeto TipoGrafado desde RPC data: {te}")
-                    print(f"Datos del item problemático: {item}")
-                    continue # Saltar este item y continuar con los siguientes
-                except Exception as e:
-                     print(f"Error inesperado creando TipoGrafado desde RPC data: {e}")
-                     print(f"Datos del item problemático: {item}")
-                     continue
+            tipos_grafado = construir_modelos(TipoGrafado, response.data)
 
-            print(f"Se encontraron {len(tipos_grafado)} tipos de grafado para mangas (vía RPC)") # Mensaje actualizado
+            log.debug('Se encontraron %s tipos de grafado para mangas (vía RPC)', len(tipos_grafado)) # Mensaje actualizado
             return tipos_grafado
             
         try:
              # Usar _retry_operation con la función RPC
             return self._retry_operation("obtener tipos grafado manga (RPC)", _operation) # Nombre operación actualizado
         except ConnectionError as ce:
-             print(f"Error de conexión persistente en get_tipos_grafado (RPC): {ce}")
+             log.error('Error de conexión persistente en get_tipos_grafado (RPC): %s', ce)
              raise # Re-lanzar para que la app lo maneje si es necesario
         except Exception as e:
-            print(f"Error al obtener tipos de grafado para mangas (RPC): {e}") # Mensaje actualizado
-            traceback.print_exc()
+            log.error('Error al obtener tipos de grafado para mangas (RPC): %s', e, exc_info=True) # Mensaje actualizado
             raise # O return [] si prefieres no detener la app
 
+    @cache_por_principal(CATALOGO, ttl=600, guardar_vacios=False)  # la sección de acabados se redibuja en cada cambio
     def get_tipos_foil(self) -> List[TipoFoil]:
         """Obtiene la lista de tipos de foil disponibles."""
         def _operation():
             response = self.supabase.table('tipos_foil').select('*').execute()
-            if response.data:
-                return [TipoFoil.from_dict(item) for item in response.data]
-            return []
+            return construir_modelos(TipoFoil, response.data)
         return self._retry_operation("get_tipos_foil", _operation)
 
     def get_tipos_grafado_id_by_name(self, grafado_name: str) -> Optional[int]:
@@ -1136,15 +1090,20 @@ class DBManager:
             if response.data and len(response.data) > 0:
                 return response.data[0]['id']
             else:
-                print(f"Advertencia: No se encontró ID para el tipo de grafado con nombre: '{grafado_name}'")
+                log.warning("Advertencia: No se encontró ID para el tipo de grafado con nombre: '%s'", grafado_name)
                 return None
         except Exception as e:
-            print(f"Error al obtener ID de tipo de grafado por nombre '{grafado_name}': {e}")
-            traceback.print_exc()
+            log.error("Error al obtener ID de tipo de grafado por nombre '%s': %s", grafado_name, e, exc_info=True)
             return None
 
     def get_perfil(self, user_id: str) -> Optional[Dict]:
         """Obtiene el perfil del usuario con su rol (incluyendo el nombre del rol)"""
+        # El perfil propio sale de la caché de login; perfiles de terceros siempre van a la BD (RLS)
+        es_propio = user_id is not None and user_id == st.session_state.get('user_id')
+        if es_propio:
+            perfil_cache = cache_perfiles.obtener(user_id)
+            if perfil_cache:
+                return perfil_cache
         try:
             # Hacemos join con la tabla de roles para obtener el nombre del rol
             response = self.supabase.from_('perfiles') \
@@ -1157,23 +1116,25 @@ class DBManager:
                 # Extraer el nombre del rol del join
                 if 'rol' in perfil and perfil['rol'] and 'nombre' in perfil['rol']:
                     perfil['rol_nombre'] = perfil['rol']['nombre']
+                if es_propio:
+                    cache_perfiles.guardar(user_id, perfil)
                 return perfil
             return None
         except Exception as e:
-            print(f"Error obteniendo perfil: {str(e)}")
+            log.error('Error obteniendo perfil: %s', str(e))
             return None
 
     def get_perfiles_by_role(self, role_name: str) -> List[Dict]:
         """Obtiene los perfiles (id, nombre) asociados a un rol específico."""
         try:
-            print(f"\n=== INICIO GET_PERFILES_BY_ROLE para rol: {role_name} ===")
-            print(f"Intentando ejecutar RPC 'get_perfiles_by_role' con parámetro: {role_name}")
+            log.debug('=== INICIO GET_PERFILES_BY_ROLE para rol: %s ===', role_name)
+            log.debug("Intentando ejecutar RPC 'get_perfiles_by_role' con parámetro: %s", role_name)
             
             # Obtener el token JWT actual para debugging
             auth = self.supabase.auth.get_session()
-            print(f"Estado de autenticación: {'Autenticado' if auth else 'No autenticado'}")
+            log.debug('Estado de autenticación: %s', 'Autenticado' if auth else 'No autenticado')
             if auth:
-                print(f"Role claim en JWT: {auth.user.role if auth.user else 'No role claim'}")
+                log.debug('Role claim en JWT: %s', auth.user.role if auth.user else 'No role claim')
             
             response = self.supabase.rpc(
                 'get_perfiles_by_role',
@@ -1181,34 +1142,33 @@ class DBManager:
             ).execute()
 
             # Log detallado de la respuesta
-            print(f"Respuesta RPC completa: {response}")
-            print(f"Tipo de response: {type(response)}")
-            print(f"Atributos de response: {dir(response)}")
+            log.debug('Respuesta RPC completa: %s', response)
+            log.debug('Tipo de response: %s', type(response))
+            log.debug('Atributos de response: %s', dir(response))
             if hasattr(response, 'error'):
-                print(f"Error en response: {response.error}")
-            print(f"Tipo de response.data: {type(response.data)}")
-            print(f"Contenido de response.data: {response.data}")
+                log.error('Error en response: %s', response.error)
+            log.debug('Tipo de response.data: %s', type(response.data))
+            log.debug('Contenido de response.data: %s', response.data)
 
             if response.data:
-                print(f"Perfiles encontrados para rol '{role_name}': {len(response.data)}")
-                print("=== FIN GET_PERFILES_BY_ROLE (con datos) ===\n")
+                log.debug("Perfiles encontrados para rol '%s': %s", role_name, len(response.data))
+                log.debug('=== FIN GET_PERFILES_BY_ROLE (con datos) ===')
                 # Asegurarse de que la respuesta sea una lista de diccionarios
                 if isinstance(response.data, list) and all(isinstance(item, dict) for item in response.data):
                     return response.data
                 else:
-                    print(f"ERROR: Formato inesperado en response.data: {type(response.data)}")
+                    log.error('ERROR: Formato inesperado en response.data: %s', type(response.data))
                     return []
             else:
                 # Podría ser que no haya usuarios con ese rol, lo cual no es un error
-                print(f"No se encontraron perfiles para el rol '{role_name}'.")
-                print("=== FIN GET_PERFILES_BY_ROLE (sin datos) ===\n")
+                log.warning("No se encontraron perfiles para el rol '%s'.", role_name)
+                log.debug('=== FIN GET_PERFILES_BY_ROLE (sin datos) ===')
                 return []
 
         except Exception as e:
-            print(f"Error general en get_perfiles_by_role: {e}")
-            print(f"Traceback completo:")
-            traceback.print_exc()
-            print("=== FIN GET_PERFILES_BY_ROLE (con error) ===\n")
+            log.error('Error general en get_perfiles_by_role: %s', e)
+            log.debug('Traceback completo:', exc_info=True)
+            log.error('=== FIN GET_PERFILES_BY_ROLE (con error) ===')
             return []
 
     def get_comercial_default(self) -> Optional[str]:
@@ -1227,17 +1187,17 @@ class DBManager:
                 return response.data[0]['id']
             
             # Fallback si no se encuentra un comercial
-            print("Advertencia: No se encontró un perfil con rol 'comercial'. Usando fallback.")
+            log.warning("Advertencia: No se encontró un perfil con rol 'comercial'. Usando fallback.")
             # Considera retornar None o manejar este caso de forma diferente
             return 'faf071b9-a885-4d8a-b65e-6a3b3785334a' # Manteniendo fallback anterior, pero es cuestionable
         except Exception as e:
-            print(f"Error al obtener comercial por defecto: {e}")
+            log.error('Error al obtener comercial por defecto: %s', e)
             return 'faf071b9-a885-4d8a-b65e-6a3b3785334a' # ID de comercial por defecto
 
     def get_clientes(self) -> List[Cliente]:
         """Obtiene clientes sujetos a RLS (admin ve todos; comercial solo los propios)."""
         def _operation():
-            print("\n=== DEBUG: Consultando clientes con RLS activo ===")
+            log.debug('=== DEBUG: Consultando clientes con RLS activo ===')
             response = (
                 self.supabase
                 .from_('clientes')
@@ -1247,35 +1207,71 @@ class DBManager:
             )
 
             if response is None:
-                print("ERROR: La respuesta de Supabase fue None en get_clientes.")
+                log.error('ERROR: La respuesta de Supabase fue None en get_clientes.')
                 raise ConnectionError("Supabase devolvió None en get_clientes")
 
             if not response.data:
-                print("No se encontraron clientes (RLS)")
+                log.warning('No se encontraron clientes (RLS)')
                 return []
 
-            clientes: List[Cliente] = []
-            for item in response.data:
-                try:
-                    clientes.append(Cliente(**item))
-                except TypeError as te:
-                    print(f"Error creando objeto Cliente desde datos: {te}")
-                    print(f"Datos del item problemático: {item}")
-                    continue
+            clientes: List[Cliente] = construir_modelos(Cliente, response.data, self.TIPOS_CLIENTE)
 
-            print(f"Se encontraron {len(clientes)} clientes (RLS)")
+            log.debug('Se encontraron %s clientes (RLS)', len(clientes))
             return clientes
 
         try:
             return self._retry_operation("obtener clientes (RLS)", _operation)
         except ConnectionError as ce:
-            print(f"Error de conexión persistente en get_clientes: {ce}")
+            log.error('Error de conexión persistente en get_clientes: %s', ce)
             raise
         except Exception as e:
-            print(f"Error al obtener clientes: {str(e)}")
-            traceback.print_exc()
+            log.error('Error al obtener clientes: %s', str(e), exc_info=True)
             raise
 
+    def _sellar_indice(self, dominio: str) -> Tuple[int, float]:
+        """Sello de un índice que se va a construir (tomarlo antes de leer las filas)"""
+        return cache_datos.version(dominio), time.monotonic() + self.TTL_INDICES
+
+    @staticmethod
+    def _indice_vigente(sello: Optional[Tuple[int, float]], dominio: str) -> bool:
+        """Nadie escribió en el dominio desde que se armó el índice y no venció"""
+        return sello is not None and sello[0] == cache_datos.version(dominio) and time.monotonic() < sello[1]
+
+    @staticmethod
+    def _escritura_indice(sello: Optional[Tuple[int, float]], dominio: str) -> Optional[Tuple[int, float]]:
+        """
+        Registra una escritura de esta sesión en el dominio: los índices de las demás
+        sesiones se reconstruirán. Devuelve el sello del índice propio, que ya se
+        actualizó en memoria: sigue vigente solo si nadie más escribió desde que se armó.
+        """
+        version = cache_datos.invalidar(dominio)[dominio]
+        if sello is not None and sello[0] == version - 1:
+            return version, sello[1]
+        return None
+
+    def get_indice_clientes(self) -> IndiceClientes:
+        """
+        Índice de búsqueda con los clientes visibles para el usuario (RLS).
+        Se construye en la primera llamada, se mantiene al crear/editar clientes y se
+        reconstruye cuando otra sesión los cambia o vence (TTL_INDICES).
+        """
+        if self._indice_clientes is None or not self._indice_vigente(self._sello_clientes, CLIENTES):
+            inicio = time.perf_counter()
+            sello = self._sellar_indice(CLIENTES)
+            self._indice_clientes = IndiceClientes(self.get_clientes())
+            self._sello_clientes = sello
+            log.debug('Índice de clientes construido: %s clientes en %.1f ms', len(self._indice_clientes), (time.perf_counter() - inicio) * 1000)
+        return self._indice_clientes
+
+    def buscar_clientes(self, texto: str = '', limite: int = LIMITE_RESULTADOS) -> List[Cliente]:
+        """Busca clientes por nombre o NIT/CC en el índice (máximo 'limite' resultados)"""
+        return self.get_indice_clientes().buscar(texto, limite)
+
+    def invalidar_indice_clientes(self) -> None:
+        """Fuerza a reconstruir el índice de clientes en la próxima búsqueda"""
+        self._indice_clientes = None
+        self._sello_clientes = None
+
     def get_cliente(self, cliente_id: int) -> Optional[Cliente]:
         """Obtiene un cliente específico por su ID."""
         try:
@@ -1283,7 +1279,7 @@ class DBManager:
             response = self.supabase.from_('clientes').select('*').eq('id', cliente_id).execute()
             
             if not response.data or len(response.data) == 0:
-                print(f"No se encontró cliente con ID {cliente_id}")
+                log.warning('No se encontró cliente con ID %s', cliente_id)
                 return None
                 
             # Crear y retornar un objeto Cliente
@@ -1291,8 +1287,7 @@ class DBManager:
             return Cliente(**cliente_data)
             
         except Exception as e:
-            print(f"Error al obtener cliente: {e}")
-            traceback.print_exc()
+            log.error('Error al obtener cliente: %s', e, exc_info=True)
             return None
 
     def actualizar_cliente(self, cliente_id: int, cambios: Dict[str, Any]) -> bool:
@@ -1308,14 +1303,14 @@ class DBManager:
             try:
                 codigo_limpio = str(data['codigo']).strip().replace('-', '').replace('.', '')
                 if not codigo_limpio.isdigit():
-                    print("actualizar_cliente: 'codigo' debe ser numérico")
+                    log.debug("actualizar_cliente: 'codigo' debe ser numérico")
                     return False
                 data['codigo'] = int(codigo_limpio)
             except Exception as e_norm:
-                print(f"Error normalizando 'codigo' en actualizar_cliente: {e_norm}")
+                log.error("Error normalizando 'codigo' en actualizar_cliente: %s", e_norm)
                 return False
         if not data:
-            print("No hay campos válidos para actualizar en cliente")
+            log.debug('No hay campos válidos para actualizar en cliente')
             return False
         try:
             # Nota: el cliente Python no soporta encadenar .select después de update
@@ -1327,30 +1322,35 @@ class DBManager:
                 .execute()
             )
             # Si RLS bloquea, se lanzará APIError y caerá en except
-            return resp is not None
+            if resp is None:
+                return False
+            if self._indice_clientes is not None:
+                cliente = self._indice_clientes.obtener(cliente_id)
+                if cliente is not None:
+                    self._indice_clientes.agregar(dataclasses.replace(cliente, **data))
+            self._sello_clientes = self._escritura_indice(self._sello_clientes, CLIENTES)
+            return True
         except Exception as e:
-            print(f"Error actualizando cliente {cliente_id}: {e}")
-            traceback.print_exc()
+            log.error('Error actualizando cliente %s: %s', cliente_id, e, exc_info=True)
             return False
 
     def ejecutar_sql(self, query: str) -> Any:
         """Ejecuta una consulta SQL directamente en la base de datos"""
         try:
-            print(f"Ejecutando SQL: {query}")
+            log.debug('Ejecutando SQL: %s', query)
             response = self.supabase.rpc('execute_sql', {'query': query}).execute()
-            print(f"Respuesta: {response.data}")
+            log.debug('Respuesta: %s', response.data)
             return response.data
         except Exception as e:
-            print(f"Error al ejecutar SQL: {e}")
-            traceback.print_exc()
+            log.error('Error al ejecutar SQL: %s', e, exc_info=True)
             raise
 
     def crear_cliente(self, cliente: Cliente) -> Cliente:
         """
         Crea un nuevo cliente en la base de datos.
         """
-        print("\n=== INICIO CREAR CLIENTE ===")
-        print(f"Cliente recibido: {cliente.__dict__}")
+        log.debug('=== INICIO CREAR CLIENTE ===')
+        log.debug('Cliente recibido: %s', cliente.__dict__)
         
         try:
             # Validar campos requeridos
@@ -1381,9 +1381,7 @@ class DBManager:
                 'p_descripcion': 'Principal'
             }
             
-            print("\nDatos que se enviarán:")
-            for k, v in rpc_data.items():
-                print(f"  {k}: {v} (tipo: {type(v)})")
+            log.debug('Datos que se enviarán: %s', rpc_data)
             
             # Intentar crear cliente + referencia con RPC segura
             try:
@@ -1392,7 +1390,7 @@ class DBManager:
                     rpc_data
                 ).execute()
             except Exception as e_rpc:
-                print(f"Error llamando a crear_cliente_y_referencia: {e_rpc}")
+                log.error('Error llamando a crear_cliente_y_referencia: %s', e_rpc)
                 raise
 
             if not response or not response.data:
@@ -1416,24 +1414,94 @@ class DBManager:
                     correo_electronico=rpc_data['p_correo_electronico'],
                     telefono=rpc_data['p_telefono']
                 )
+            if self._indice_clientes is not None:
+                self._indice_clientes.agregar(cliente_creado)
+            self._sello_clientes = self._escritura_indice(self._sello_clientes, CLIENTES)
             return cliente_creado
                 
         except Exception as e:
-            print("\n!!! ERROR EN CREAR_CLIENTE !!!")
-            print(f"Tipo de error: {type(e)}")
-            print(f"Mensaje de error: {str(e)}")
+            log.error('!!! ERROR EN CREAR_CLIENTE !!!')
+            log.error('Tipo de error: %s', type(e))
+            log.error('Mensaje de error: %s', str(e))
             
             if 'rpc_data' in locals():
-                print("\nDatos que se intentaron insertar:")
-                for k, v in rpc_data.items():
-                    print(f"  {k}: {v} (tipo: {type(v)})")
-            
-            print("\nStack trace completo:")
-            import traceback
-            traceback.print_exc()
+                log.debug('Datos que se intentaron insertar: %s', rpc_data)
+            log.error('Traza de la excepción', exc_info=True)
             
             raise Exception(f"Error al crear cliente: {str(e)}")
 
+    # --- Importación masiva (src/logic/importacion_clientes.py) ---
+    PAGINA_CLAVES_REFERENCIAS = 1000
+
+    def listar_claves_referencias(self) -> List[Tuple[int, str, str]]:
+        """
+        (cliente_id, descripcion, id_usuario) de todas las referencias visibles (RLS),
+        leídas por páginas, para des-duplicar una importación sin consultar por fila.
+        """
+        def _leer_pagina(desde: int):
+            return (
+                self.supabase.from_('referencias_cliente')
+                .select('cliente_id, descripcion, id_usuario')
+                .order('id', desc=False)
+                .range(desde, desde + self.PAGINA_CLAVES_REFERENCIAS - 1)
+                .execute()
+            )
+
+        claves: List[Tuple[int, str, str]] = []
+        desde = 0
+        while True:
+            respuesta = self._retry_operation(
+                f"leer claves de referencias (desde {desde})", lambda: _leer_pagina(desde)
+            )
+            pagina = respuesta.data or []
+            claves.extend((fila['cliente_id'], fila.get('descripcion') or '', str(fila.get('id_usuario')))
+                          for fila in pagina)
+            if len(pagina) < self.PAGINA_CLAVES_REFERENCIAS:
+                break
+            desde += self.PAGINA_CLAVES_REFERENCIAS
+        log.debug('Claves de referencias leídas: %s', len(claves))
+        return claves
+
+    def crear_clientes_lote(self, clientes: List[Dict[str, Any]]) -> List[Cliente]:
+        """
+        Inserta varios clientes en un solo insert (sin referencia 'Principal'; la
+        importación la crea aparte con crear_referencias_lote). Solo administradores (RLS).
+        No se reintenta: un insert repetido tras un timeout podría duplicar clientes.
+
+        Args:
+            clientes: Dicts con nombre, codigo (int) y opcionalmente persona_contacto,
+                correo_electronico y telefono
+
+        Returns:
+            Los clientes creados, en el mismo orden
+
+        Raises:
+            Exception: Si el insert falla (el lote completo no se inserta)
+        """
+        if not clientes:
+            return []
+        response = self.supabase.table('clientes').insert(clientes).execute()
+        creados: List[Cliente] = construir_modelos(Cliente, response.data, self.TIPOS_CLIENTE)
+        if self._indice_clientes is not None:
+            for cliente in creados:
+                self._indice_clientes.agregar(cliente)
+        self._sello_clientes = self._escritura_indice(self._sello_clientes, CLIENTES)
+        return creados
+
+    def crear_referencias_lote(self, referencias: List[Dict[str, Any]]) -> List[ReferenciaCliente]:
+        """
+        Inserta varias referencias (cliente_id, descripcion, id_usuario) en un solo insert.
+        La existencia se comprueba antes en memoria (ver listar_claves_referencias), no
+        con check_referencia_exists por fila.
+
+        Raises:
+            Exception: Si el insert falla (el lote completo no se inserta)
+        """
+        if not referencias:
+            return []
+        response = self.supabase.table('referencias_cliente').insert(referencias).execute()
+        return construir_modelos(ReferenciaCliente, response.data, self.TIPOS_REFERENCIA)
+
     def get_referencias_cliente(self, cliente_id: int) -> List[ReferenciaCliente]:
         """Obtiene las referencias de un cliente que pertenecen al comercial actual.
         Debido a las políticas RLS, solo se retornarán las referencias donde id_comercial = auth.uid()"""
@@ -1443,32 +1511,15 @@ class DBManager:
                 '*'
             ).eq('cliente_id', cliente_id).execute()
             
-            referencias = []
-            if response.data: # Asegurarse que hay datos antes de iterar
-                for data in response.data:
-                    try:
-                        referencia = ReferenciaCliente(
-                            id=data['id'],
-                            cliente_id=data['cliente_id'],
-                            descripcion=data['descripcion'],
-                            creado_en=data['creado_en'],
-                            actualizado_en=data['actualizado_en'],
-                            id_usuario=data.get('id_usuario'), # Usar id_usuario
-                            tiene_cotizacion=data.get('tiene_cotizacion', False)
-                        )
-                        referencias.append(referencia)
-                    except Exception as e:
-                        print(f"Error creando objeto ReferenciaCliente desde datos: {data}. Error: {e}")
-                        continue # Saltar esta referencia si hay error
-            return referencias
+            return construir_modelos(ReferenciaCliente, response.data, self.TIPOS_REFERENCIA)
         except Exception as e:
-            print(f"Error general al obtener referencias del cliente: {e}")
+            log.error('Error general al obtener referencias del cliente: %s', e)
             return []
 
     def get_referencia_cliente(self, referencia_id: int) -> Optional[ReferenciaCliente]:
         """Obtiene una referencia de cliente por su ID usando una función RPC dedicada."""
         try:
-            print(f"\n--- DEBUG: get_referencia_cliente (RPC) para ID: {referencia_id} ---")
+            log.debug('--- DEBUG: get_referencia_cliente (RPC) para ID: %s ---', referencia_id)
             
             # Llamar a la nueva función RPC
             response = self.supabase.rpc(
@@ -1476,7 +1527,7 @@ class DBManager:
                 {'p_referencia_id': referencia_id}
             ).execute()
             
-            print(f"Respuesta RPC: {response.data}")
+            log.debug('Respuesta RPC: %s', response.data)
             
             # La RPC devuelve una lista con un diccionario si encuentra la referencia
             if response.data:
@@ -1494,7 +1545,7 @@ class DBManager:
                         telefono=data['cliente_telefono']
                         # creado_en y actualizado_en no vienen de la RPC, podrían añadirse si es necesario
                     )
-                print(f"Objeto Cliente creado: {cliente_obj}")
+                log.debug('Objeto Cliente creado: %s', cliente_obj)
                 
                 # Crear diccionario de perfil si existe
                 perfil_simple = None
@@ -1506,7 +1557,7 @@ class DBManager:
                         'celular': data['perfil_celular'] 
                         # rol_id y otros campos pueden añadirse si se necesitan
                     }
-                print(f"Datos del perfil obtenidos: {perfil_simple}")
+                log.debug('Datos del perfil obtenidos: %s', perfil_simple)
 
                 # Crear objeto ReferenciaCliente con relaciones
                 referencia_obj = ReferenciaCliente(
@@ -1521,16 +1572,15 @@ class DBManager:
                     cliente=cliente_obj, 
                     perfil=perfil_simple 
                 )
-                print(f"Objeto ReferenciaCliente final: {referencia_obj}")
-                print("--- FIN DEBUG: get_referencia_cliente (RPC) ---")
+                log.debug('Objeto ReferenciaCliente final: %s', referencia_obj)
+                log.debug('--- FIN DEBUG: get_referencia_cliente (RPC) ---')
                 return referencia_obj
                 
-            print("No se encontraron datos para la referencia vía RPC.")
-            print("--- FIN DEBUG: get_referencia_cliente (RPC) ---")
+            log.warning('No se encontraron datos para la referencia vía RPC.')
+            log.debug('--- FIN DEBUG: get_referencia_cliente (RPC) ---')
             return None
         except Exception as e:
-            print(f"Error al obtener referencia del cliente (RPC): {e}")
-            traceback.print_exc()
+            log.error('Error al obtener referencia del cliente (RPC): %s', e, exc_info=True)
             return None
     
 
@@ -1571,11 +1621,12 @@ class DBManager:
                 raise Exception("Error al crear la cotización")
             
             cotizacion_id = response_cot.data[0]['id']
+            self._reindexar_cotizacion(cotizacion_id)
             
             return referencia_id, cotizacion_id
             
         except Exception as e:
-            print(f"Error en crear_referencia_y_cotizacion: {str(e)}")
+            log.error('Error en crear_referencia_y_cotizacion: %s', str(e))
             return None
     
     def crear_referencia(self, referencia: ReferenciaCliente) -> Optional[ReferenciaCliente]:
@@ -1584,13 +1635,13 @@ class DBManager:
         def _operation():
             # Validar datos requeridos
             if not referencia.cliente_id or not referencia.descripcion:
-                print("Error: cliente_id y descripcion son requeridos")
+                log.error('Error: cliente_id y descripcion son requeridos')
                 return None
 
             # Usar el id_usuario del objeto ReferenciaCliente si se proporciona,
             # o intentar obtener el del usuario actual si no.
             if not referencia.id_usuario:
-                print("Advertencia: id_usuario no proporcionado en la referencia. Se intentará usar el usuario actual.")
+                log.warning('Advertencia: id_usuario no proporcionado en la referencia. Se intentará usar el usuario actual.')
                 # Es posible que necesites obtener el ID del usuario actual aquí si no viene en el objeto 'referencia'
                 # Ejemplo: current_user_id = self.supabase.auth.get_user().user.id (esto depende de tu flujo de autenticación)
                 # Por ahora, asumiremos que si no viene, es un error o se manejará antes.
@@ -1599,32 +1650,32 @@ class DBManager:
                 # return None
                 user_id_to_use = None # Define cómo obtenerlo si no viene
                 if user_id_to_use is None:
-                     print("Error crítico: No se pudo determinar el id_usuario para la referencia.")
+                     log.error('Error crítico: No se pudo determinar el id_usuario para la referencia.')
                 return None
             else:
                 user_id_to_use = referencia.id_usuario
 
             # Verificar que el usuario (id_usuario) tenga rol de comercial
             try:
-                print(f"\n=== Verificando perfil para usuario ID: {user_id_to_use} ===")
+                log.debug('=== Verificando perfil para usuario ID: %s ===', user_id_to_use)
                 # Usar la función que obtiene perfil por ID
                 perfil = self.get_perfil(user_id_to_use)
 
                 if not perfil:
                     error_msg = f"❌ No se pudo verificar el perfil del usuario con ID: {user_id_to_use}"
-                    print(error_msg)
+                    log.error(error_msg)
                     raise ValueError(error_msg)
 
                 # Asumiendo que get_perfil ahora devuelve rol_nombre
                 if perfil.get('rol_nombre') != 'comercial':
                     error_msg = f"❌ Se requiere rol de comercial. Rol del usuario {user_id_to_use}: {perfil.get('rol_nombre')}"
-                    print(error_msg)
+                    log.error(error_msg)
                     raise ValueError(error_msg)
 
-                print(f"✅ Usuario {user_id_to_use} verificado como comercial: {perfil.get('nombre')}")
+                log.info('✅ Usuario %s verificado como comercial: %s', user_id_to_use, Sensible(perfil.get('nombre')))
             except Exception as e:
                 error_msg = f"❌ Error al verificar rol de usuario {user_id_to_use}: {str(e)}"
-                print(error_msg)
+                log.error(error_msg)
                 raise ValueError(error_msg)
 
             # Preparar datos básicos
@@ -1634,9 +1685,7 @@ class DBManager:
                 'id_usuario': user_id_to_use
             }
 
-            print("\nDatos a insertar en referencias_cliente:")
-            for k, v in data.items():
-                print(f"  {k}: {v} (Tipo: {type(v)}) ")
+            log.debug('Datos a insertar en referencias_cliente: %s', data)
 
             # Verificar si ya existe una referencia con la misma descripción para este cliente y ese usuario objetivo
             existing = self.supabase.rpc(
@@ -1660,7 +1709,7 @@ class DBManager:
                         f"Descripción: {data['descripcion']}\n\n"
                         "Por favor, utiliza una descripción diferente para esta referencia."
                     )
-                    print(error_msg)
+                    log.error(error_msg)
                     raise ValueError(error_msg)
 
             # Insertar la referencia usando RPC (asegúrate que la RPC solo use id_usuario)
@@ -1678,7 +1727,7 @@ class DBManager:
                 # La RPC 'crear_referencia_cliente' debería devolver el ID
                 # O podrías necesitar obtener la referencia completa recién creada
                 referencia_id_creada = response.data # Ajusta según lo que devuelva la RPC
-                print(f"Referencia creada ID (respuesta RPC): {referencia_id_creada}")
+                log.debug('Referencia creada ID (respuesta RPC): %s', referencia_id_creada)
                 # Si la RPC devuelve el ID o la fila completa, extraer el ID para buscar la referencia
                 actual_id = referencia_id_creada['id'] if isinstance(referencia_id_creada, dict) else referencia_id_creada
                 return self.get_referencia_cliente(actual_id)
@@ -1689,18 +1738,16 @@ class DBManager:
         except postgrest.exceptions.APIError as e:
             if e.code == '42501':  # Código de error para violación de RLS
                 error_msg = "❌ No tienes permiso para crear referencias. Verifica que estés autenticado como comercial."
-                print(error_msg)
+                log.error(error_msg)
                 raise ValueError(error_msg)
-            print(f"Error al crear referencia (APIError): {e}")
-            traceback.print_exc()
+            log.error('Error al crear referencia (APIError): %s', e, exc_info=True)
             raise e
         except ValueError as ve:
             # Re-lanzar ValueError para mostrar mensajes específicos (ej: rol incorrecto, duplicado)
             raise ve
         except Exception as e:
             error_msg = f"❌ Error inesperado al crear la referencia: {str(e)}"
-            print(error_msg)
-            traceback.print_exc()
+            log.error(error_msg, exc_info=True)
             raise e
 
     def get_datos_completos_cotizacion(self, cotizacion_id: int) -> dict:
@@ -1719,18 +1766,18 @@ class DBManager:
             ValueError: Si cotizacion_id es None o no es un entero válido
         """
         try:
-            print("\n=== DEBUG GET_DATOS_COMPLETOS_COTIZACION (Refactorizado) ===")
-            print(f"Obteniendo datos para cotización ID: {cotizacion_id} usando obtener_cotizacion")
+            log.debug('=== DEBUG GET_DATOS_COMPLETOS_COTIZACION (Refactorizado) ===')
+            log.debug('Obteniendo datos para cotización ID: %s usando obtener_cotizacion', cotizacion_id)
 
             # Llamar a la función optimizada para obtener el objeto Cotizacion
             cotizacion = self.obtener_cotizacion(cotizacion_id)
 
             if not cotizacion:
-                print("No se encontró la cotización o no tienes permiso para verla (desde obtener_cotizacion)")
-                print("=== FIN GET_DATOS_COMPLETOS_COTIZACION (sin datos) ===\n")
+                log.warning('No se encontró la cotización o no tienes permiso para verla (desde obtener_cotizacion)')
+                log.debug('=== FIN GET_DATOS_COMPLETOS_COTIZACION (sin datos) ===')
                 return None
             
-            print("\nCotización obtenida, transformando a diccionario para PDF...")
+            log.debug('Cotización obtenida, transformando a diccionario para PDF...')
 
             # Extraer datos del objeto Cotizacion y sus relaciones
             referencia = cotizacion.referencia_cliente
@@ -1738,26 +1785,25 @@ class DBManager:
             perfil_comercial = referencia.perfil if referencia else None # Perfil es un dict
             
             # Obtener la política de cartera (similar a como se obtiene la política de entrega)
-            print("\n=== DEBUG OBTENCIÓN POLÍTICA DE CARTERA ===")
+            log.debug('=== DEBUG OBTENCIÓN POLÍTICA DE CARTERA ===')
             politica_cartera = None
             
             # Usar ID fijo para la política de cartera (ID 1)
             politica_id = 1  # Usar la primera política de cartera
             
             try:
-                print(f"Intentando obtener política de cartera con ID: {politica_id}")
+                log.debug('Intentando obtener política de cartera con ID: %s', politica_id)
                 politica_response = self.supabase.table('politicas_cartera').select('descripcion').eq('id', politica_id).maybe_single().execute()
                 
                 if politica_response.data and politica_response.data.get('descripcion'):
                     politica_cartera = politica_response.data['descripcion']
-                    print(f"Política de cartera encontrada (ID {politica_id}): {politica_cartera}")
+                    log.debug('Política de cartera encontrada (ID %s): %s', politica_id, politica_cartera)
                 else:
-                    print(f"Advertencia: No se encontró descripción para política de cartera con ID {politica_id}")
+                    log.warning('Advertencia: No se encontró descripción para política de cartera con ID %s', politica_id)
             except Exception as e:
-                print(f"Error al buscar política de cartera con ID {politica_id}: {str(e)}")
-                traceback.print_exc()
+                log.error('Error al buscar política de cartera con ID %s: %s', politica_id, str(e), exc_info=True)
                 
-            print("=== FIN DEBUG OBTENCIÓN POLÍTICA DE CARTERA ===\n")
+            log.debug('=== FIN DEBUG OBTENCIÓN POLÍTICA DE CARTERA ===')
             
             # --- INICIO CAMBIO: Obtener material correctamente ---
             # material = cotizacion.material # <-- ESTO FALLA
@@ -1770,11 +1816,11 @@ class DBManager:
                       # Usar el método existente para obtener el objeto Material completo
                       material_obj = self.get_material(material_id_from_join) 
                       if not material_obj:
-                           print(f"Advertencia: No se encontró el objeto Material para ID {material_id_from_join} obtenido de material_adhesivo_info")
+                           log.warning('Advertencia: No se encontró el objeto Material para ID %s obtenido de material_adhesivo_info', material_id_from_join)
                  else:
-                      print("Advertencia: material_adhesivo_info no contiene 'material_id'")
+                      log.warning("Advertencia: material_adhesivo_info no contiene 'material_id'")
             else:
-                 print("Advertencia: cotizacion.material_adhesivo es None")
+                 log.warning('Advertencia: cotizacion.material_adhesivo es None')
             # --- FIN CAMBIO ---
 
             acabado = cotizacion.acabado
@@ -1852,12 +1898,12 @@ class DBManager:
                     if temp_adhesivo_response.data and temp_adhesivo_response.data.get('tipo'):
                         adhesivo_tipo_final = temp_adhesivo_response.data['tipo']
                     else:
-                         print(f"Advertencia: No se encontró tipo para adhesivo_id {adhesivo_id_real}")
+                         log.warning('Advertencia: No se encontró tipo para adhesivo_id %s', adhesivo_id_real)
                 except Exception as e_adh:
-                    print(f"Error buscando tipo de adhesivo para ID {adhesivo_id_real}: {e_adh}")
+                    log.error('Error buscando tipo de adhesivo para ID %s: %s', adhesivo_id_real, e_adh)
 
             datos['adhesivo_tipo'] = adhesivo_tipo_final
-            print(f"  Adhesivo Tipo añadido al diccionario final: {adhesivo_tipo_final}")
+            log.debug('  Adhesivo Tipo añadido al diccionario final: %s', adhesivo_tipo_final)
             # --- FIN: Añadir Adhesivo Tipo ---
 
             # --- INICIO: Añadir Política de Entrega ---
@@ -1868,34 +1914,34 @@ class DBManager:
                 politica_response = self.supabase.table('politicas_entrega').select('descripcion').eq('id', 1).maybe_single().execute()
                 if politica_response.data and politica_response.data.get('descripcion'):
                     politica_entrega_descripcion = politica_response.data['descripcion']
-                    print(f"  Política de entrega encontrada (ID 1): {politica_entrega_descripcion}")
+                    log.debug('  Política de entrega encontrada (ID 1): %s', politica_entrega_descripcion)
                 else:
-                    print("  Advertencia: No se encontró descripción para política de entrega")
+                    log.warning('  Advertencia: No se encontró descripción para política de entrega')
             except Exception as e_pol:
-                print(f"  Error al buscar política de entrega: {e_pol}")
+                log.error('  Error al buscar política de entrega: %s', e_pol)
             
             # Agregar al diccionario final
             datos['politica_entrega'] = politica_entrega_descripcion or "Estándar"  # Valor por defecto si no se encuentra
             # --- FIN: Añadir Política de Entrega ---
 
-            print("\nDatos preparados para el PDF (desde objeto Cotizacion):")
+            log.debug('Datos preparados para el PDF (desde objeto Cotizacion):')
             # Imprimir solo algunos campos para no llenar el log
-            print(f"  ID: {datos.get('id')}")
-            print(f"  Consecutivo: {datos.get('consecutivo')}")
-            print(f"  Cliente: {datos.get('nombre_cliente')}")
-            print(f"  Referencia: {datos.get('descripcion')}")
-            print(f"  Identificador: {datos.get('identificador')}")
-            print(f"  Comercial: {datos.get('comercial', {}).get('nombre')}")
-            print(f"  Valor Material: {datos.get('valor_material')}")
-            print(f"  Valor Acabado: {datos.get('valor_acabado')}")
-            print(f"  Valor Troquel: {datos.get('valor_troquel')}")
-
-            print(f"  Política de Entrega: {datos.get('politica_entrega')}") # Imprimir política de entrega
+            log.debug('  ID: %s', datos.get('id'))
+            log.debug('  Consecutivo: %s', datos.get('consecutivo'))
+            log.debug('  Cliente: %s', Sensible(datos.get('nombre_cliente')))
+            log.debug('  Referencia: %s', datos.get('descripcion'))
+            log.debug('  Identificador: %s', datos.get('identificador'))
+            log.debug('  Comercial: %s', Sensible(datos.get('comercial', {}).get('nombre')))
+            log.debug('  Valor Material: %s', datos.get('valor_material'))
+            log.debug('  Valor Acabado: %s', datos.get('valor_acabado'))
+            log.debug('  Valor Troquel: %s', datos.get('valor_troquel'))
+
+            log.debug('  Política de Entrega: %s', datos.get('politica_entrega')) # Imprimir política de entrega
 
             # Procesar las escalas desde el objeto cotizacion.escalas
             datos['resultados'] = [] # Inicializar siempre la lista
             if cotizacion.escalas:
-                print(f"\nProcesando {len(cotizacion.escalas)} escalas...")
+                log.debug('Procesando %s escalas...', len(cotizacion.escalas))
                 for escala in cotizacion.escalas:
                     # Mantener la escala como está
                     escala_valor_original = escala.escala
@@ -1915,9 +1961,9 @@ class DBManager:
                             
                         # Aplicar redondeo hacia arriba
                         valor_unidad_redondeado = math.ceil(valor_unidad_float)
-                        print(f"  Valor unidad redondeado: {valor_unidad_original} → {valor_unidad_redondeado}")
+                        log.debug('  Valor unidad redondeado: %s → %s', valor_unidad_original, valor_unidad_redondeado)
                     except Exception as e_round:
-                        print(f"  Error al redondear valor_unidad '{valor_unidad_original}': {e_round}")
+                        log.error("  Error al redondear valor_unidad '%s': %s", valor_unidad_original, e_round)
                         valor_unidad_redondeado = valor_unidad_original
                         
                     resultado = {
@@ -1931,23 +1977,21 @@ class DBManager:
                         'papel_lam': escala.papel_lam,
                         'desperdicio': escala.desperdicio_total # Asegurarse que este es el campo correcto
                     }
-                    print(f"  Escala procesada: {resultado['escala']}, Valor unidad: {resultado['valor_unidad']}")
+                    log.debug('  Escala procesada: %s, Valor unidad: %s', resultado['escala'], resultado['valor_unidad'])
                     datos['resultados'].append(resultado)
-                print(f"Total de resultados añadidos: {len(datos['resultados'])}")
+                log.debug('Total de resultados añadidos: %s', len(datos['resultados']))
             else:
-                print("\nNo se encontraron escalas en el objeto Cotizacion")
+                log.warning('No se encontraron escalas en el objeto Cotizacion')
             
-            print("=== FIN GET_DATOS_COMPLETOS_COTIZACION (Refactorizado) ===\n")
+            log.debug('=== FIN GET_DATOS_COMPLETOS_COTIZACION (Refactorizado) ===')
             return datos
             
         except ValueError as ve:
             # Propagar errores de validación específicos
-            print(f"Error en get_datos_completos_cotizacion (Refactorizado): {str(ve)}")
-            traceback.print_exc()
+            log.error('Error en get_datos_completos_cotizacion (Refactorizado): %s', str(ve), exc_info=True)
             raise ve
         except Exception as e:
-            print(f"Error en get_datos_completos_cotizacion (Refactorizado): {e}")
-            traceback.print_exc()
+            log.error('Error en get_datos_completos_cotizacion (Refactorizado): %s', e, exc_info=True)
             return None
 
     def get_escala(self, escala_id: int) -> Optional[Escala]:
@@ -1956,7 +2000,7 @@ class DBManager:
             response = self.supabase.from_('cotizacion_escalas').select('*').eq('id', escala_id).execute()
             
             if not response.data or len(response.data) == 0:
-                print(f"No se encontró escala con ID {escala_id}")
+                log.warning('No se encontró escala con ID %s', escala_id)
                 return None
             
             # Crear y retornar un objeto Escala
@@ -1964,34 +2008,28 @@ class DBManager:
             return Escala(**escala_data)
             
         except Exception as e:
-            print(f"Error al obtener escala: {e}")
-            traceback.print_exc()
+            log.error('Error al obtener escala: %s', e, exc_info=True)
             return None
 
     def get_cotizacion_escalas(self, cotizacion_id: int) -> List[Escala]:
         """Obtiene todas las escalas asociadas a una cotización"""
         try:
-            print(f"\n=== INICIO GET_COTIZACION_ESCALAS para cotización {cotizacion_id} ===")
+            log.debug('=== INICIO GET_COTIZACION_ESCALAS para cotización %s ===', cotizacion_id)
             # Obtener las escalas
             response = self.supabase.from_('cotizacion_escalas').select('*').eq('cotizacion_id', cotizacion_id).execute()
             
             if not response.data:
-                print("No se encontraron escalas")
+                log.warning('No se encontraron escalas')
                 return []
             
-            escalas = []
-            for escala_data in response.data:
-                # Crear objeto Escala
-                escala = Escala.from_dict(escala_data)
-                escalas.append(escala)
+            escalas = construir_modelos(Escala, response.data, self.TIPOS_ESCALA)
             
-            print(f"Se encontraron {len(escalas)} escalas")
-            print("=== FIN GET_COTIZACION_ESCALAS ===\n")
+            log.debug('Se encontraron %s escalas', len(escalas))
+            log.debug('=== FIN GET_COTIZACION_ESCALAS ===')
             return escalas
             
         except Exception as e:
-            print(f"Error obteniendo escalas de cotización: {e}")
-            traceback.print_exc()
+            log.error('Error obteniendo escalas de cotización: %s', e, exc_info=True)
             return []
 
     def get_precios_escala(self, escala_id: int) -> List[PrecioEscala]:
@@ -2010,7 +2048,7 @@ class DBManager:
         #     print(f"Error obteniendo precios de escala: {e}")
         #     traceback.print_exc()
         #     return []
-        print(f"INFO: La función get_precios_escala para escala_id {escala_id} devuelve lista vacía (tabla precios_escala no existe).")
+        log.debug('INFO: La función get_precios_escala para escala_id %s devuelve lista vacía (tabla precios_escala no existe).', escala_id)
         return [] # Devuelve lista vacía para evitar error
 
     def referencia_tiene_cotizacion(self, referencia_id: int) -> bool:
@@ -2021,7 +2059,7 @@ class DBManager:
                 try:
                     referencia_id = int(referencia_id)
                 except (ValueError, TypeError):
-                    print(f"Error: referencia_id debe ser un entero, se recibió: {referencia_id} de tipo {type(referencia_id)}")
+                    log.error('Error: referencia_id debe ser un entero, se recibió: %s de tipo %s', referencia_id, type(referencia_id))
                     return False
             
             response = (
@@ -2034,7 +2072,7 @@ class DBManager:
             return response.data and len(response.data) > 0
             
         except Exception as e:
-            print(f"Error al verificar si la referencia tiene cotización: {str(e)}")
+            log.error('Error al verificar si la referencia tiene cotización: %s', str(e))
             return False
 
     def corregir_tipo_producto_id(self, cotizacion_id: int, tipo_producto_id: int) -> bool:
@@ -2049,8 +2087,8 @@ class DBManager:
             bool: True si la actualización fue exitosa, False en caso contrario
         """
         try:
-            print(f"\n=== CORRIGIENDO TIPO_PRODUCTO_ID PARA COTIZACIÓN {cotizacion_id} ===")
-            print(f"Nuevo valor para tipo_producto_id: {tipo_producto_id}")
+            log.debug('=== CORRIGIENDO TIPO_PRODUCTO_ID PARA COTIZACIÓN %s ===', cotizacion_id)
+            log.debug('Nuevo valor para tipo_producto_id: %s', tipo_producto_id)
             
             # Actualizar solo el campo tipo_producto_id
             response = (
@@ -2061,24 +2099,23 @@ class DBManager:
             )
             
             if not response.data:
-                print("No se recibió respuesta al actualizar la cotización")
+                log.debug('No se recibió respuesta al actualizar la cotización')
                 return False
                 
-            print(f"Cotización actualizada exitosamente: {response.data[0]}")
-            print(f"Nuevo tipo_producto_id: {response.data[0].get('tipo_producto_id')}")
+            log.info('Cotización actualizada exitosamente: %s', response.data[0])
+            log.debug('Nuevo tipo_producto_id: %s', response.data[0].get('tipo_producto_id'))
             return True
             
         except Exception as e:
-            print(f"Error al corregir tipo_producto_id: {str(e)}")
-            traceback.print_exc()
+            log.error('Error al corregir tipo_producto_id: %s', str(e), exc_info=True)
             return False
 
     def guardar_cotizacion(self, cotizacion: Cotizacion, datos_cotizacion: Dict = None) -> Tuple[bool, str]:
         """Guarda o actualiza una cotización y sus datos relacionados"""
         try:
-            print("\n=== INICIO GUARDAR_COTIZACION ===")
-            print(f"Cotización a guardar: {cotizacion}")
-            print(f"Datos adicionales: {datos_cotizacion}")
+            log.debug('=== INICIO GUARDAR_COTIZACION ===')
+            log.debug('Cotización a guardar: %s', cotizacion)
+            log.debug('Datos adicionales: %s', datos_cotizacion)
             
             # Verificar si es una actualización o una nueva cotización
             es_actualizacion = cotizacion.id is not None
@@ -2108,7 +2145,7 @@ class DBManager:
             
             # Si es una actualización
             if es_actualizacion:
-                print(f"Actualizando cotización existente con ID: {cotizacion.id}")
+                log.debug('Actualizando cotización existente con ID: %s', cotizacion.id)
                 response = self.supabase.from_('cotizaciones') \
                     .update(datos_cotizacion_base) \
                     .eq('id', cotizacion.id) \
@@ -2117,7 +2154,7 @@ class DBManager:
                 mensaje = "✅ Cotización actualizada exitosamente"
             else:
                 # Si es una nueva cotización
-                print("Creando nueva cotización")
+                log.debug('Creando nueva cotización')
                 response = self.supabase.from_('cotizaciones') \
                     .insert(datos_cotizacion_base) \
                     .execute()
@@ -2128,6 +2165,7 @@ class DBManager:
             
             if not response.data:
                 return False, "⚠️ No se pudo guardar la cotización en la base de datos"
+            self._reindexar_cotizacion(cotizacion.id)
             
             # Guardar las escalas si existen
             if cotizacion.escalas:
@@ -2160,12 +2198,11 @@ class DBManager:
                 if not self.guardar_calculos_escala(cotizacion.id, calculos_escala):
                     return False, "⚠️ La cotización se guardó, pero hubo un error al guardar los cálculos de escala"
             
-            print("=== FIN GUARDAR_COTIZACION ===\n")
+            log.debug('=== FIN GUARDAR_COTIZACION ===')
             return True, mensaje
             
         except Exception as e:
-            print(f"Error al guardar la cotización: {str(e)}")
-            traceback.print_exc()
+            log.error('Error al guardar la cotización: %s', str(e), exc_info=True)
             return False, f"❌ Error al guardar la cotización: {str(e)}"
 
     def guardar_calculos_escala(self, cotizacion_id: int, 
@@ -2178,7 +2215,7 @@ class DBManager:
                                 parametros_especiales: Optional[Dict[str, Any]] = None) -> bool:
         """Guarda o actualiza los cálculos de escala para una cotización"""
         try:
-            print("\nGuardando cálculos de escala actualizados...")
+            log.debug('Guardando cálculos de escala actualizados...')
             
             # Preparar parámetros para la RPC
             rpc_params = {
@@ -2200,18 +2237,18 @@ class DBManager:
                 'p_unidad_z_dientes': unidad_z_dientes
             }
             
-            print(f"\nLlamando a RPC 'upsert_calculos_escala' para cotizacion_id: {cotizacion_id}")
-            print(f"Parámetros RPC: {rpc_params}")
+            log.debug("Llamando a RPC 'upsert_calculos_escala' para cotizacion_id: %s", cotizacion_id)
+            log.debug('Parámetros RPC: %s', rpc_params)
             
             # Llamar a la RPC
             response = self.supabase.rpc('upsert_calculos_escala', rpc_params).execute()
             
             if response.data:
-                print("Cálculos de escala guardados exitosamente")
+                log.info('Cálculos de escala guardados exitosamente')
                 # Intentar guardar parametros_especiales si fueron provistos
                 if parametros_especiales:
                     try:
-                        print("Guardando parametros_especiales adjuntos...")
+                        log.debug('Guardando parametros_especiales adjuntos...')
                         _ = (
                             self.supabase
                             .from_('calculos_escala_cotizacion')
@@ -2221,15 +2258,14 @@ class DBManager:
                         )
                     except Exception as e_save_params:
                         # No bloquear el flujo si la columna no existe o no hay permisos
-                        print(f"ADVERTENCIA: No se pudieron guardar parametros_especiales: {e_save_params}")
+                        log.warning('ADVERTENCIA: No se pudieron guardar parametros_especiales: %s', e_save_params)
                 return True
             else:
-                print("No se recibió respuesta al guardar cálculos de escala")
+                log.debug('No se recibió respuesta al guardar cálculos de escala')
                 return False
                 
         except Exception as e:
-            print(f"Error de API (Postgrest) al guardar cálculos escala: {e}")
-            traceback.print_exc()
+            log.error('Error de API (Postgrest) al guardar cálculos escala: %s', e, exc_info=True)
             return False
 
     def guardar_parametros_especiales(self, cotizacion_id: int, parametros_especiales: Optional[Dict[str, Any]]) -> bool:
@@ -2248,13 +2284,13 @@ class DBManager:
             )
             return True
         except Exception as e:
-            print(f"ADVERTENCIA: No se pudieron guardar parametros_especiales (¿columna ausente?): {e}")
+            log.warning('ADVERTENCIA: No se pudieron guardar parametros_especiales (¿columna ausente?): %s', e)
             return False
 
     def get_cotizacion_por_referencia(self, referencia_id: int) -> Optional[Cotizacion]:
         """Obtiene la cotización asociada a una referencia"""
         try:
-            print(f"\n=== INICIO GET_COTIZACION_POR_REFERENCIA para referencia {referencia_id} ===")
+            log.debug('=== INICIO GET_COTIZACION_POR_REFERENCIA para referencia %s ===', referencia_id)
             
             # Obtener la cotización más reciente para esta referencia
             response = self.supabase.from_('cotizaciones') \
@@ -2265,7 +2301,7 @@ class DBManager:
                 .execute()
             
             if not response.data:
-                print("No se encontró cotización para esta referencia")
+                log.warning('No se encontró cotización para esta referencia')
                 return None
             
             cotizacion_data = response.data[0]
@@ -2313,18 +2349,17 @@ class DBManager:
             # Obtener y asignar las escalas
             cotizacion.escalas = self.get_cotizacion_escalas(cotizacion.id)
             
-            print("=== FIN GET_COTIZACION_POR_REFERENCIA ===\n")
+            log.debug('=== FIN GET_COTIZACION_POR_REFERENCIA ===')
             return cotizacion
             
         except Exception as e:
-            print(f"Error al obtener cotización por referencia: {e}")
-            traceback.print_exc()
+            log.error('Error al obtener cotización por referencia: %s', e, exc_info=True)
             return None
 
     def get_calculos_escala_cotizacion(self, cotizacion_id: int) -> Optional[Dict]:
         """Obtiene los cálculos de escala asociados a una cotización"""
         try:
-            print(f"\n=== INICIO GET_CALCULOS_ESCALA_COTIZACION para cotización {cotizacion_id} ===")
+            log.debug('=== INICIO GET_CALCULOS_ESCALA_COTIZACION para cotización %s ===', cotizacion_id)
             
             response = self.supabase.from_('calculos_escala_cotizacion') \
                 .select('*') \
@@ -2332,17 +2367,16 @@ class DBManager:
                 .execute()
             
             if not response.data:
-                print("No se encontraron cálculos de escala para esta cotización")
+                log.warning('No se encontraron cálculos de escala para esta cotización')
                 return None
             
             calculos = response.data[0]
-            print(f"Cálculos encontrados: {calculos}")
-            print("=== FIN GET_CALCULOS_ESCALA_COTIZACION ===\n")
+            log.debug('Cálculos encontrados: %s', calculos)
+            log.debug('=== FIN GET_CALCULOS_ESCALA_COTIZACION ===')
             return calculos
             
         except Exception as e:
-            print(f"Error al obtener cálculos de escala: {e}")
-            traceback.print_exc()
+            log.error('Error al obtener cálculos de escala: %s', e, exc_info=True)
             return None 
 
     def get_calculos_persistidos(self, cotizacion_id: int) -> Optional[Dict]:
@@ -2361,8 +2395,7 @@ class DBManager:
                 return None
             return calculos
         except Exception as e:
-            print(f"Error en get_calculos_persistidos: {e}")
-            traceback.print_exc()
+            log.error('Error en get_calculos_persistidos: %s', e, exc_info=True)
             return None
 
     # ============================
@@ -2372,15 +2405,9 @@ class DBManager:
         try:
             # Obtener solo el registro con ID=1 (único registro permitido)
             response = self.supabase.table('politicas_entrega').select('*').eq('id', 1).execute()
-            return [PoliticasEntrega(
-                id=item.get('id'),
-                descripcion=item.get('descripcion', ''),
-                created_at=self._parse_dt(item.get('created_at')),
-                updated_at=self._parse_dt(item.get('updated_at')),
-            ) for item in (response.data or [])]
+            return construir_modelos(PoliticasEntrega, response.data, self.TIPOS_POLITICA)
         except Exception as e:
-            print(f"Error al obtener políticas de entrega: {e}")
-            traceback.print_exc()
+            log.error('Error al obtener políticas de entrega: %s', e, exc_info=True)
             return []
 
     def get_politica_entrega(self, politica_id: int = 1) -> Optional[PoliticasEntrega]:
@@ -2397,8 +2424,7 @@ class DBManager:
                 updated_at=self._parse_dt(data.get('updated_at')),
             )
         except Exception as e:
-            print(f"Error al obtener política de entrega: {e}")
-            traceback.print_exc()
+            log.error('Error al obtener política de entrega: %s', e, exc_info=True)
             return None
 
     def create_politica_entrega(self, politica: PoliticasEntrega) -> bool:
@@ -2413,18 +2439,17 @@ class DBManager:
             
             if check_response.data and len(check_response.data) > 0:
                 # Si ya existe, actualizar en lugar de insertar
-                print("Ya existe un registro de política de entrega. Actualizando...")
+                log.debug('Ya existe un registro de política de entrega. Actualizando...')
                 resp = self.supabase.table('politicas_entrega').update(payload).eq('id', 1).execute()
             else:
                 # Si no existe, insertar con ID=1
-                print("No existe un registro de política de entrega. Creando nuevo...")
+                log.debug('No existe un registro de política de entrega. Creando nuevo...')
                 payload['id'] = 1
                 resp = self.supabase.table('politicas_entrega').insert(payload).execute()
             
             return bool(resp.data)
         except Exception as e:
-            print(f"Error al crear/actualizar política de entrega: {e}")
-            traceback.print_exc()
+            log.error('Error al crear/actualizar política de entrega: %s', e, exc_info=True)
             return False
 
     def update_politica_entrega(self, politica: PoliticasEntrega) -> bool:
@@ -2437,9 +2462,9 @@ class DBManager:
             # Verificar si la política con ID=1 existe antes de actualizar
             check = self.supabase.table('politicas_entrega').select('id').eq('id', 1).execute()
             if not check.data:
-                print("Error: No se encontró la política de entrega (ID=1)")
+                log.error('Error: No se encontró la política de entrega (ID=1)')
                 # Si no existe, intentar crearla
-                print("Intentando crear la política de entrega...")
+                log.debug('Intentando crear la política de entrega...')
                 payload['id'] = 1
                 resp = self.supabase.table('politicas_entrega').insert(payload).execute()
             else:
@@ -2447,19 +2472,18 @@ class DBManager:
                 resp = self.supabase.table('politicas_entrega').update(payload).eq('id', 1).execute()
             
             if not resp.data:
-                print("Error: No se recibió respuesta de la actualización/creación")
+                log.error('Error: No se recibió respuesta de la actualización/creación')
                 return False
                 
-            print("Actualización exitosa de política de entrega")
+            log.info('Actualización exitosa de política de entrega')
             return True
         except Exception as e:
-            print(f"Error al actualizar política de entrega: {e}")
-            traceback.print_exc()
+            log.error('Error al actualizar política de entrega: %s', e, exc_info=True)
             return False
 
     def delete_politica_entrega(self, politica_id: int) -> bool:
         # No permitimos eliminar el registro único
-        print("AVISO: No se permite eliminar la política de entrega. Solo se puede modificar.")
+        log.debug('AVISO: No se permite eliminar la política de entrega. Solo se puede modificar.')
         return False
 
     def get_cotizaciones_by_politica(self, politica_id: int) -> List[Dict[str, Any]]:
@@ -2474,50 +2498,36 @@ class DBManager:
     # ==========================
     def get_politicas_cartera(self) -> List[PoliticasCartera]:
         try:
-            print("\n=== DEBUG get_politicas_cartera ===")
-            print("Ejecutando consulta a politicas_cartera...")
+            log.debug('=== DEBUG get_politicas_cartera ===')
+            log.debug('Ejecutando consulta a politicas_cartera...')
             
             # Obtener solo el registro con ID=1 (único registro permitido)
             response = self.supabase.table('politicas_cartera').select('*').eq('id', 1).execute()
             
-            print(f"Respuesta recibida: {response}")
-            print(f"Datos en response.data: {response.data}")
-            
-            politicas = []
-            for item in (response.data or []):
-                print(f"\nProcesando item: {item}")
-                politica = PoliticasCartera(
-                    id=item.get('id'),
-                    descripcion=item.get('descripcion', ''),
-                    created_at=self._parse_dt(item.get('created_at')),
-                    updated_at=self._parse_dt(item.get('updated_at')),
-                )
-                print(f"Política creada: {politica}")
-                politicas.append(politica)
+            politicas = construir_modelos(PoliticasCartera, response.data, self.TIPOS_POLITICA)
             
-            print(f"\nTotal de políticas encontradas: {len(politicas)}")
-            print("=== FIN DEBUG ===\n")
+            log.debug('Total de políticas encontradas: %s', len(politicas))
+            log.debug('=== FIN DEBUG ===')
             return politicas
             
         except Exception as e:
-            print(f"Error al obtener políticas de cartera: {str(e)}")
-            traceback.print_exc()
+            log.error('Error al obtener políticas de cartera: %s', str(e), exc_info=True)
             return []
 
     def get_politica_cartera(self, politica_id: int = 1) -> Optional[PoliticasCartera]:
         try:
-            print(f"\n=== DEBUG get_politica_cartera(id={politica_id}) ===")
-            print("Ejecutando consulta...")
+            log.debug('=== DEBUG get_politica_cartera(id=%s) ===', politica_id)
+            log.debug('Ejecutando consulta...')
             
             # Siempre obtenemos el registro con ID=1, independientemente del ID proporcionado
             response = self.supabase.table('politicas_cartera').select('*').eq('id', 1).maybe_single().execute()
-            print(f"Respuesta recibida: {response}")
+            log.debug('Respuesta recibida: %s', response)
             
             data = response.data if isinstance(response.data, dict) else None
-            print(f"Datos extraídos: {data}")
+            log.debug('Datos extraídos: %s', data)
             
             if not data:
-                print("No se encontró la política de cartera")
+                log.warning('No se encontró la política de cartera')
                 return None
                 
             politica = PoliticasCartera(
@@ -2527,13 +2537,12 @@ class DBManager:
                 updated_at=self._parse_dt(data.get('updated_at')),
             )
             
-            print(f"Política creada: {politica}")
-            print("=== FIN DEBUG ===\n")
+            log.debug('Política creada: %s', politica)
+            log.debug('=== FIN DEBUG ===')
             return politica
             
         except Exception as e:
-            print(f"Error al obtener política de cartera: {str(e)}")
-            traceback.print_exc()
+            log.error('Error al obtener política de cartera: %s', str(e), exc_info=True)
             return None
 
     def create_politicas_cartera_table_if_not_exists(self) -> bool:
@@ -2551,7 +2560,7 @@ class DBManager:
             }).execute()
             return True
         except Exception as e:
-            print(f"Error creando tabla politicas_cartera: {e}")
+            log.error('Error creando tabla politicas_cartera: %s', e)
             return False
 
     def create_politica_cartera(self, politica: PoliticasCartera) -> bool:
@@ -2566,18 +2575,17 @@ class DBManager:
             
             if check_response.data and len(check_response.data) > 0:
                 # Si ya existe, actualizar en lugar de insertar
-                print("Ya existe un registro de política de cartera. Actualizando...")
+                log.debug('Ya existe un registro de política de cartera. Actualizando...')
                 resp = self.supabase.table('politicas_cartera').update(payload).eq('id', 1).execute()
             else:
                 # Si no existe, insertar con ID=1
-                print("No existe un registro de política de cartera. Creando nuevo...")
+                log.debug('No existe un registro de política de cartera. Creando nuevo...')
                 payload['id'] = 1
                 resp = self.supabase.table('politicas_cartera').insert(payload).execute()
             
             return bool(resp.data)
         except Exception as e:
-            print(f"Error al crear/actualizar política de cartera: {e}")
-            traceback.print_exc()
+            log.error('Error al crear/actualizar política de cartera: %s', e, exc_info=True)
             return False
 
     def update_politica_cartera(self, politica: PoliticasCartera) -> bool:
@@ -2590,9 +2598,9 @@ class DBManager:
             # Verificar si la política con ID=1 existe antes de actualizar
             check = self.supabase.table('politicas_cartera').select('id').eq('id', 1).execute()
             if not check.data:
-                print("Error: No se encontró la política de cartera (ID=1)")
+                log.error('Error: No se encontró la política de cartera (ID=1)')
                 # Si no existe, intentar crearla
-                print("Intentando crear la política de cartera...")
+                log.debug('Intentando crear la política de cartera...')
                 payload['id'] = 1
                 resp = self.supabase.table('politicas_cartera').insert(payload).execute()
             else:
@@ -2600,20 +2608,19 @@ class DBManager:
                 resp = self.supabase.table('politicas_cartera').update(payload).eq('id', 1).execute()
             
             if not resp.data:
-                print("Error: No se recibió respuesta de la actualización/creación")
+                log.error('Error: No se recibió respuesta de la actualización/creación')
                 return False
                 
-            print("Actualización exitosa de política de cartera")
+            log.info('Actualización exitosa de política de cartera')
             return True
             
         except Exception as e:
-            print(f"Error al actualizar política de cartera: {str(e)}")
-            traceback.print_exc()
+            log.error('Error al actualizar política de cartera: %s', str(e), exc_info=True)
             return False
 
     def delete_politica_cartera(self, politica_id: int) -> bool:
         # No permitimos eliminar el registro único
-        print("AVISO: No se permite eliminar la política de cartera. Solo se puede modificar.")
+        log.debug('AVISO: No se permite eliminar la política de cartera. Solo se puede modificar.')
         return False
 
     # ============================
@@ -2639,7 +2646,7 @@ class DBManager:
             resp = query.order('updated_at', desc=True).execute()
             return resp.data or []
         except Exception as e:
-            print(f"Error al obtener comerciales: {e}")
+            log.error('Error al obtener comerciales: %s', e)
             return []
 
     def get_comerciales_archivados(self, role_id: str) -> List[Dict[str, Any]]:
@@ -2653,7 +2660,7 @@ class DBManager:
             resp = self.supabase.table('perfiles').select('id,nombre,email,celular,rol_id,updated_at,archivado').eq('rol_id', role_id).eq('archivado', True).order('updated_at', desc=True).execute()
             return resp.data or []
         except Exception as e:
-            print(f"Error al obtener comerciales archivados: {e}")
+            log.error('Error al obtener comerciales archivados: %s', e)
             return []
     
     def create_comercial(self, nombre: str, email: Optional[str], celular: Optional[int], role_id: str) -> bool:
@@ -2668,7 +2675,7 @@ class DBManager:
             resp = self.supabase.table('perfiles').insert(payload).execute()
             return bool(resp.data)
         except Exception as e:
-            print(f"Error al crear comercial: {e}")
+            log.error('Error al crear comercial: %s', e)
             return False
 
     def update_comercial(self, perfil_id: str, nombre: str, email: Optional[str], celular: Optional[int]) -> bool:
@@ -2682,7 +2689,7 @@ class DBManager:
             resp = self.supabase.table('perfiles').update(payload).eq('id', perfil_id).execute()
             return bool(resp.data)
         except Exception as e:
-            print(f"Error al actualizar comercial: {e}")
+            log.error('Error al actualizar comercial: %s', e)
             return False
             
     def restaurar_comercial(self, perfil_id: str) -> bool:
@@ -2698,7 +2705,7 @@ class DBManager:
             resp = self.supabase.table('perfiles').update(payload).eq('id', perfil_id).execute()
             return bool(resp.data)
         except Exception as e:
-            print(f"Error al restaurar comercial: {e}")
+            log.error('Error al restaurar comercial: %s', e)
             return False
 
     def delete_comercial(self, perfil_id: str) -> bool:
@@ -2714,7 +2721,7 @@ class DBManager:
             resp = self.supabase.table('perfiles').update(payload).eq('id', perfil_id).execute()
             return bool(resp.data)
         except Exception as e:
-            print(f"Error al archivar comercial: {e}")
+            log.error('Error al archivar comercial: %s', e)
             return False
                 
             # Formatear los datos para que coincidan con la estructura esperada por generar_informe_tecnico_markdown
@@ -2738,8 +2745,7 @@ class DBManager:
             return datos_calculo
             
         except Exception as e:
-            print(f"Error al obtener cálculos persistidos: {e}")
-            traceback.print_exc()
+            log.error('Error al obtener cálculos persistidos: %s', e, exc_info=True)
             return None
 
     def obtener_cotizacion(self, cotizacion_id: int) -> Optional[Cotizacion]:
@@ -2754,21 +2760,19 @@ class DBManager:
         Returns:
             Optional[Cotizacion]: El objeto Cotizacion completo o None.
         """
-        print(f"-- Ejecutando obtener_cotizacion para ID: {cotizacion_id} --") # DEBUG
+        log.debug('-- Ejecutando obtener_cotizacion para ID: %s --', cotizacion_id) # DEBUG
         try:
             # 1. Obtener los detalles planos usando la RPC via get_full_cotizacion_details
             details = self.get_full_cotizacion_details(cotizacion_id)
 
             if not details:
-                print(f"obtener_cotizacion: No se encontraron detalles vía RPC para ID {cotizacion_id}. Retornando None.") # DEBUG
+                log.warning('obtener_cotizacion: No se encontraron detalles vía RPC para ID %s. Retornando None.', cotizacion_id) # DEBUG
                 return None
                     
-            print(f"obtener_cotizacion: Detalles RPC obtenidos para ID {cotizacion_id}. Procesando...") # DEBUG
+            log.debug('obtener_cotizacion: Detalles RPC obtenidos para ID %s. Procesando...', cotizacion_id) # DEBUG
             
             # --- INICIO DIAGNÓSTICO: Mostrar todos los campos ---
-            print(f"DIAGNÓSTICO COMPLETO - Todos los campos en details:")
-            for k, v in details.items():
-                print(f"  {k}: {v} (tipo: {type(v).__name__})")
+            log.debug('DIAGNÓSTICO COMPLETO - Todos los campos en details: %s', details)
             # --- FIN DIAGNÓSTICO ---
             
             # 2. Crear objetos relacionados a partir del diccionario `details`
@@ -2785,10 +2789,10 @@ class DBManager:
                         telefono=details.get('cliente_telefono')
                     )
                 except KeyError as ke:
-                    print(f"Error creando Cliente: Falta la clave {ke} en detalles RPC")
+                    log.error('Error creando Cliente: Falta la clave %s en detalles RPC', ke)
                     # Podrías retornar None aquí o continuar sin cliente
                 except Exception as e_cli:
-                    print(f"Error inesperado creando Cliente: {e_cli}")
+                    log.error('Error inesperado creando Cliente: %s', e_cli)
 
             # --- INICIO MODIFICACIÓN PERFIL COMERCIAL ---
             perfil_obj = None # Perfil es solo un dict simple aquí
@@ -2800,7 +2804,7 @@ class DBManager:
                 comercial_celular = None # Valor por defecto
 
                 # Intentar buscar email y celular en la tabla perfiles
-                print(f"obtener_cotizacion: Buscando email y celular para comercial ID {comercial_id_from_details}...")
+                log.debug('obtener_cotizacion: Buscando email y celular para comercial ID %s...', comercial_id_from_details)
                 try:
                     perfil_lookup = self.supabase.table('perfiles')\
                         .select('email, celular')\
@@ -2810,11 +2814,11 @@ class DBManager:
                     if perfil_lookup.data:
                         comercial_email = perfil_lookup.data.get('email')
                         comercial_celular = perfil_lookup.data.get('celular')
-                        print(f"obtener_cotizacion: Datos encontrados - Email: {comercial_email}, Celular: {comercial_celular}")
+                        log.debug('obtener_cotizacion: Datos encontrados - Email: %s, Celular: %s', comercial_email, comercial_celular)
                     else:
-                        print(f"obtener_cotizacion: No se encontraron datos de perfil adicionales para ID {comercial_id_from_details}")
+                        log.warning('obtener_cotizacion: No se encontraron datos de perfil adicionales para ID %s', comercial_id_from_details)
                 except Exception as lookup_err_perfil:
-                     print(f"Error buscando datos de perfil para ID {comercial_id_from_details}: {lookup_err_perfil}")
+                     log.error('Error buscando datos de perfil para ID %s: %s', comercial_id_from_details, lookup_err_perfil)
 
                 # Crear el diccionario perfil_obj con toda la información
                 perfil_obj = {
@@ -2839,9 +2843,9 @@ class DBManager:
                     referencia_obj.cliente = cliente_obj
                     referencia_obj.perfil = perfil_obj
                 except KeyError as ke:
-                    print(f"Error creando ReferenciaCliente: Falta la clave {ke} en detalles RPC")
+                    log.error('Error creando ReferenciaCliente: Falta la clave %s en detalles RPC', ke)
                 except Exception as e_ref:
-                    print(f"Error inesperado creando ReferenciaCliente: {e_ref}")
+                    log.error('Error inesperado creando ReferenciaCliente: %s', e_ref)
 
             material_obj = None
             # La RPC devuelve material_id y adhesivo_id, podríamos usarlos para obtener los objetos
@@ -2874,24 +2878,24 @@ class DBManager:
 
                 # Si el nombre no vino de la RPC (o es 'N/A'), intentar buscarlo por ID
                 if not acabado_nombre_from_details or acabado_nombre_from_details == 'N/A':
-                    print(f"obtener_cotizacion: Acabado nombre no encontrado en details (o es 'N/A'). Intentando buscar por ID {acabado_id_from_details}...")
+                    log.debug("obtener_cotizacion: Acabado nombre no encontrado en details (o es 'N/A'). Intentando buscar por ID %s...", acabado_id_from_details)
                     try:
                         acabado_lookup_response = self.supabase.table('acabados').select('nombre').eq('id', acabado_id_from_details).maybe_single().execute()
                         if acabado_lookup_response.data and acabado_lookup_response.data.get('nombre'):
                             acabado_nombre_from_details = acabado_lookup_response.data['nombre']
-                            print(f"obtener_cotizacion: Nombre de acabado encontrado por lookup: {acabado_nombre_from_details}")
+                            log.debug('obtener_cotizacion: Nombre de acabado encontrado por lookup: %s', acabado_nombre_from_details)
                         else:
-                             print(f"obtener_cotizacion: No se encontró nombre de acabado en lookup para ID {acabado_id_from_details}")
+                             log.warning('obtener_cotizacion: No se encontró nombre de acabado en lookup para ID %s', acabado_id_from_details)
                              acabado_nombre_from_details = 'N/A' # Mantener N/A si la búsqueda falla
                     except Exception as lookup_err:
-                         print(f"Error buscando nombre de acabado por ID {acabado_id_from_details}: {lookup_err}")
+                         log.error('Error buscando nombre de acabado por ID %s: %s', acabado_id_from_details, lookup_err)
                          acabado_nombre_from_details = 'N/A' # Mantener N/A en caso de error
 
                 # Intentar crear el objeto Acabado con el ID y el nombre (obtenido de RPC o lookup)
                 try:
                     acabado_obj = Acabado(id=acabado_id_from_details, nombre=acabado_nombre_from_details)
                 except Exception as e_acab:
-                     print(f"Error creando objeto Acabado con ID {acabado_id_from_details} y Nombre {acabado_nombre_from_details}: {e_acab}")
+                     log.error('Error creando objeto Acabado con ID %s y Nombre %s: %s', acabado_id_from_details, acabado_nombre_from_details, e_acab)
                      # acabado_obj permanecerá como None si falla la creación
             # --- FIN MODIFICACIÓN ACABADO ---
             
@@ -2948,23 +2952,21 @@ class DBManager:
                 # tipo_grafado=tipo_grafado_obj, # ID es suficiente
             )
             
-            print(f"obtener_cotizacion: Objeto Cotizacion creado para ID {cotizacion_id}") # DEBUG
+            log.debug('obtener_cotizacion: Objeto Cotizacion creado para ID %s', cotizacion_id) # DEBUG
 
             # 4. Obtener y asignar las escalas
-            print(f"obtener_cotizacion: Obteniendo escalas para ID {cotizacion_id}...") # DEBUG
+            log.debug('obtener_cotizacion: Obteniendo escalas para ID %s...', cotizacion_id) # DEBUG
             cotizacion.escalas = self.get_cotizacion_escalas(cotizacion.id)
-            print(f"obtener_cotizacion: {len(cotizacion.escalas)} escalas asignadas.") # DEBUG
+            log.debug('obtener_cotizacion: %s escalas asignadas.', len(cotizacion.escalas)) # DEBUG
                 
-            print(f"-- Fin obtener_cotizacion (Éxito) para ID: {cotizacion_id} --") # DEBUG
+            log.debug('-- Fin obtener_cotizacion (Éxito) para ID: %s --', cotizacion_id) # DEBUG
             return cotizacion
                 
         except KeyError as ke:
-            print(f"Error fatal en obtener_cotizacion (KeyError): Falta la clave {ke} en los detalles de la RPC.")
-            traceback.print_exc()
+            log.error('Error fatal en obtener_cotizacion (KeyError): Falta la clave %s en los detalles de la RPC.', ke, exc_info=True)
             return None
         except Exception as e:
-            print(f"Error inesperado en obtener_cotizacion para ID {cotizacion_id}: {e}")
-            traceback.print_exc()
+            log.error('Error inesperado en obtener_cotizacion para ID %s: %s', cotizacion_id, e, exc_info=True)
             return None
 
     def get_visible_cotizaciones_list(self) -> List[Dict]:
@@ -2979,29 +2981,36 @@ class DBManager:
                        Retorna lista vacía si no hay cotizaciones o en caso de error.
         """
         def _operation():
-            print("\n=== INICIO GET_VISIBLE_COTIZACIONES_LIST ===")
+            log.debug('=== INICIO GET_VISIBLE_COTIZACIONES_LIST ===')
             
             # 1. Verificar usuario y rol
             current_user_id = None
             rol = None
             try:
-                user_info = self.supabase.auth.get_user()
-                if not user_info or not user_info.user:
-                    print("⚠️ ERROR: No hay usuario autenticado.")
-                    # No lanzar error aquí, RLS se encargará, pero la consulta podría devolver vacío.
+                # Usuario y rol desde la sesión/caché: evita un GET /auth/v1/user en cada listado
+                current_user_id = st.session_state.get('user_id')
+                rol = cache_perfiles.obtener_rol(current_user_id)
+                if current_user_id and rol:
+                    log.debug('Usuario autenticado (caché): %s, rol: %s', current_user_id, rol)
                 else:
-                    current_user_id = user_info.user.id
-                    print(f"Usuario autenticado: {current_user_id}")
-                    perfil = self.get_perfil(current_user_id)
-                    if perfil:
-                        rol = perfil.get('rol_nombre')
-                        print(f"Rol del usuario: {rol}")
+                    current_user_id = None
+                    user_info = self.supabase.auth.get_user()
+                    if not user_info or not user_info.user:
+                        log.error('⚠️ ERROR: No hay usuario autenticado.')
+                        # No lanzar error aquí, RLS se encargará, pero la consulta podría devolver vacío.
                     else:
-                        print(f"Advertencia: No se encontró perfil para el usuario {current_user_id}")
-                        # Tratar como si no tuviera rol asignado (RLS bloqueará si es necesario)
-                        
+                        current_user_id = user_info.user.id
+                        log.debug('Usuario autenticado: %s', current_user_id)
+                        perfil = self.get_perfil(current_user_id)
+                        if perfil:
+                            rol = perfil.get('rol_nombre')
+                            log.debug('Rol del usuario: %s', rol)
+                        else:
+                            log.warning('Advertencia: No se encontró perfil para el usuario %s', current_user_id)
+                            # Tratar como si no tuviera rol asignado (RLS bloqueará si es necesario)
+
             except Exception as e:
-                print(f"Error verificando usuario/rol: {e}")
+                log.error('Error verificando usuario/rol: %s', e)
                 # Continuar; RLS se encargará de la seguridad.
 
             # 2. Construir la consulta SELECT basada en el rol (si se conoce)
@@ -3012,64 +3021,65 @@ class DBManager:
             if rol == 'administrador':
                 # Admin puede ver todo, usamos LEFT JOIN para referencia y cliente
                 select_query += ', referencias_cliente!left(descripcion, clientes!left(nombre))'
-                print("Construyendo query para Administrador (LEFT JOINs)")
+                log.debug('Construyendo query para Administrador (LEFT JOINs)')
             elif rol == 'comercial':
                 # Comercial: RLS filtra por sus referencias. Usamos INNER JOIN para referencia (optimización RLS)
                 # y LEFT JOIN para cliente.
                 select_query += ', referencias_cliente!inner(descripcion, clientes!left(nombre))'
-                print("Construyendo query para Comercial (INNER JOIN ref, LEFT JOIN cliente)")
+                log.debug('Construyendo query para Comercial (INNER JOIN ref, LEFT JOIN cliente)')
             else:
                 # Rol desconocido o sin autenticar: RLS se aplicará. Usamos LEFT JOINs por si acaso.
                 # Es probable que RLS bloquee la consulta si no es admin.
                 select_query += ', referencias_cliente!left(descripcion, clientes!left(nombre))'
-                print("Construyendo query para Rol desconocido/invitado (LEFT JOINs - RLS aplicará)")
+                log.debug('Construyendo query para Rol desconocido/invitado (LEFT JOINs - RLS aplicará)')
 
             # 3. Ejecutar la consulta
             try:
-                print(f"Ejecutando consulta: SELECT {select_query} FROM cotizaciones")
+                log.debug('Ejecutando consulta: SELECT %s FROM cotizaciones', select_query)
                 response = self.supabase.from_('cotizaciones') \
                     .select(select_query) \
                     .order('fecha_creacion', desc=True) \
                     .execute()
 
                 if not response.data:
-                    print("No se encontraron cotizaciones visibles o la consulta falló.")
+                    log.warning('No se encontraron cotizaciones visibles o la consulta falló.')
                     return []
                 
-                # 4. Procesar y formatear los resultados
+                # 4. Procesar y formatear los resultados (tipos convertidos en bloque)
+                log.debug('Procesando %s cotizaciones recibidas...', len(response.data))
+                filas = decodificar_filas(response.data, {
+                    'id': ENTERO, 'estado_id': ENTERO, 'ajustes_modificados_admin': BOOLEANO
+                })
                 formatted_data = []
-                print(f"Procesando {len(response.data)} cotizaciones recibidas...")
-                for cotizacion in response.data:
-                    try:
-                        # Validar ID básico
-                        cot_id = cotizacion.get('id')
-                        if not isinstance(cot_id, int) or cot_id <= 0:
-                             print(f"Saltando cotización con ID inválido: {cot_id}")
-                             continue
-
-                        ref_cliente_data = cotizacion.get('referencias_cliente', {}) or {} # Asegurar dict
-                        cliente_data = ref_cliente_data.get('clientes', {}) or {} # Asegurar dict
-
-                        formatted_data.append({
-                            'id': cot_id,
-                            'numero_cotizacion': str(cotizacion.get('numero_cotizacion', '')),
-                            'referencia': ref_cliente_data.get('descripcion', 'N/A'), # Default si falta
-                            'cliente': cliente_data.get('nombre', 'Sin Cliente'), # Default si falta
-                            'fecha_creacion': cotizacion.get('fecha_creacion', ''),
-                            'estado_id': cotizacion.get('estado_id'),
-                            'ajustes_modificados_admin': cotizacion.get('ajustes_modificados_admin', False)  # AÑADIDO: Asegura que el flag se incluya en los datos
-                        })
-                    except Exception as e_proc:
-                        print(f"Error procesando cotización ID {cotizacion.get('id')}: {e_proc}")
-                        continue # Saltar esta cotización si hay error al procesarla
-
-                print(f"Se procesaron {len(formatted_data)} cotizaciones válidas.")
-                print("=== FIN GET_VISIBLE_COTIZACIONES_LIST ===\n")
+                invalidas = 0
+                for cotizacion in filas:
+                    # Validar ID básico
+                    cot_id = cotizacion.get('id')
+                    if cot_id is None or cot_id <= 0:
+                        invalidas += 1
+                        continue
+
+                    ref_cliente_data = cotizacion.get('referencias_cliente') or {} # Asegurar dict
+                    cliente_data = ref_cliente_data.get('clientes') or {} # Asegurar dict
+
+                    formatted_data.append({
+                        'id': cot_id,
+                        'numero_cotizacion': str(cotizacion.get('numero_cotizacion', '')),
+                        'referencia': ref_cliente_data.get('descripcion', 'N/A'), # Default si falta
+                        'cliente': cliente_data.get('nombre', 'Sin Cliente'), # Default si falta
+                        'fecha_creacion': cotizacion.get('fecha_creacion', ''),
+                        'estado_id': cotizacion.get('estado_id'),
+                        'ajustes_modificados_admin': bool(cotizacion.get('ajustes_modificados_admin'))  # AÑADIDO: Asegura que el flag se incluya en los datos
+                    })
+                if invalidas:
+                    log.debug('Se saltaron %s cotizaciones con ID inválido.', invalidas)
+
+                log.debug('Se procesaron %s cotizaciones válidas.', len(formatted_data))
+                log.debug('=== FIN GET_VISIBLE_COTIZACIONES_LIST ===')
                 return formatted_data
 
             except Exception as e_query:
-                print(f"Error al ejecutar la consulta de cotizaciones: {e_query}")
-                traceback.print_exc()
+                log.error('Error al ejecutar la consulta de cotizaciones: %s', e_query, exc_info=True)
                 return [] # Devolver lista vacía en caso de error de consulta
 
         # Usar retry_operation para la lógica completa
@@ -3080,23 +3090,94 @@ class DBManager:
              return _operation()
              # TODO: Revisar si _retry_operation debe usarse aquí y cómo manejar el caso de [] vs None
         except Exception as e:
-            print(f"Error general en get_visible_cotizaciones_list: {str(e)}")
-            traceback.print_exc()
+            log.error('Error general en get_visible_cotizaciones_list: %s', str(e), exc_info=True)
             return []
 
+    # Tamaño de página al leer cotizaciones para el índice (PostgREST limita las filas por respuesta)
+    PAGINA_INDICE_COTIZACIONES = 1000
+    COLUMNAS_INDICE_COTIZACIONES = (
+        'id, numero_cotizacion, identificador, fecha_creacion, estado_id, '
+        'referencias_cliente(descripcion, clientes(nombre))'
+    )
+
+    def get_indice_cotizaciones(self) -> IndiceCotizaciones:
+        """
+        Índice de búsqueda con las cotizaciones visibles para el usuario (RLS).
+        Se construye en la primera llamada leyendo por páginas, se mantiene al
+        crear/actualizar cotizaciones y se reconstruye cuando otra sesión las cambia o
+        vence (TTL_INDICES).
+        """
+        if self._indice_cotizaciones is None or not self._indice_vigente(self._sello_cotizaciones, COTIZACIONES):
+            inicio = time.perf_counter()
+            sello = self._sellar_indice(COTIZACIONES)
+            def _leer_pagina(desde: int):
+                return (
+                    self.supabase.from_('cotizaciones')
+                    .select(self.COLUMNAS_INDICE_COTIZACIONES)
+                    .order('id', desc=True)
+                    .range(desde, desde + self.PAGINA_INDICE_COTIZACIONES - 1)
+                    .execute()
+                )
+
+            filas: List[CotizacionResumen] = []
+            desde = 0
+            while True:
+                respuesta = self._retry_operation(
+                    f"leer cotizaciones para el índice (desde {desde})", lambda: _leer_pagina(desde)
+                )
+                pagina = respuesta.data or []
+                filas.extend(CotizacionResumen.from_dict(fila) for fila in pagina)
+                if len(pagina) < self.PAGINA_INDICE_COTIZACIONES:
+                    break
+                desde += self.PAGINA_INDICE_COTIZACIONES
+            self._indice_cotizaciones = IndiceCotizaciones(filas)
+            self._sello_cotizaciones = sello
+            log.debug('Índice de cotizaciones construido: %s cotizaciones en %.0f ms', len(self._indice_cotizaciones), (time.perf_counter() - inicio) * 1000)
+        return self._indice_cotizaciones
+
+    def buscar_cotizaciones(self, texto: str = '', limite: Optional[int] = None) -> List[CotizacionResumen]:
+        """Busca cotizaciones por identificador, referencia, cliente o número (ver IndiceCotizaciones)"""
+        indice = self.get_indice_cotizaciones()
+        return indice.buscar(texto) if limite is None else indice.buscar(texto, limite)
+
+    def invalidar_indice_cotizaciones(self) -> None:
+        """Fuerza a reconstruir el índice de cotizaciones en la próxima búsqueda"""
+        self._indice_cotizaciones = None
+        self._sello_cotizaciones = None
+
+    def _reindexar_cotizacion(self, cotizacion_id: Optional[int]) -> None:
+        """
+        Registra la escritura de una cotización (los índices de las demás sesiones se
+        reconstruirán) y actualiza su entrada en el índice propio, si ya fue construido.
+        """
+        self._sello_cotizaciones = self._escritura_indice(self._sello_cotizaciones, COTIZACIONES)
+        if self._indice_cotizaciones is None or not cotizacion_id:
+            return
+        try:
+            response = (
+                self.supabase.from_('cotizaciones')
+                .select(self.COLUMNAS_INDICE_COTIZACIONES)
+                .eq('id', cotizacion_id)
+                .execute()
+            )
+            if response.data:
+                self._indice_cotizaciones.agregar(CotizacionResumen.from_dict(response.data[0]))
+            else:
+                self._indice_cotizaciones.quitar(cotizacion_id)
+        except Exception as e:
+            log.error('Error actualizando el índice para la cotización %s: %s', cotizacion_id, e)
+            # Mejor reconstruir que dejar el índice desactualizado
+            self.invalidar_indice_cotizaciones()
+
     def get_estados_cotizacion(self) -> List[EstadoCotizacion]:
         """Obtiene todos los estados de cotización disponibles"""
         try:
             response = self.supabase.from_('estados_cotizacion').select('*').execute()
             
-            if not response.data:
-                return []
-            
-            return [EstadoCotizacion(**estado) for estado in response.data]
+            return construir_modelos(EstadoCotizacion, response.data)
             
         except Exception as e:
-            print(f"Error al obtener estados de cotización: {e}")
-            traceback.print_exc()
+            log.error('Error al obtener estados de cotización: %s', e, exc_info=True)
             return []
 
     def get_motivos_rechazo(self) -> List[MotivoRechazo]:
@@ -3104,14 +3185,10 @@ class DBManager:
         try:
             response = self.supabase.from_('motivos_rechazo').select('*').execute()
             
-            if not response.data:
-                return []
-            
-            return [MotivoRechazo(**motivo) for motivo in response.data]
+            return construir_modelos(MotivoRechazo, response.data)
             
         except Exception as e:
-            print(f"Error al obtener motivos de rechazo: {e}")
-            traceback.print_exc()
+            log.error('Error al obtener motivos de rechazo: %s', e, exc_info=True)
             return []
 
     def actualizar_estado_cotizacion(self, cotizacion_id: int, estado_id: int, id_motivo_rechazo: Optional[int] = None) -> bool:
@@ -3128,13 +3205,13 @@ class DBManager:
             bool: True si la actualización fue exitosa, False en caso contrario
         """
         try:
-            print(f"\n=== ACTUALIZANDO ESTADO DE COTIZACIÓN {cotizacion_id} ===")
-            print(f"Nuevo estado_id: {estado_id}")
-            print(f"Motivo rechazo ID: {id_motivo_rechazo}")
+            log.debug('=== ACTUALIZANDO ESTADO DE COTIZACIÓN %s ===', cotizacion_id)
+            log.debug('Nuevo estado_id: %s', estado_id)
+            log.debug('Motivo rechazo ID: %s', id_motivo_rechazo)
             
             # Validar que si el estado es 3 (rechazado), se proporcione un motivo
             if estado_id == 3 and id_motivo_rechazo is None:
-                print("Error: Se requiere un motivo de rechazo cuando el estado es 3 (rechazado)")
+                log.error('Error: Se requiere un motivo de rechazo cuando el estado es 3 (rechazado)')
                 return False
             
             # Usar la función RPC dedicada para actualizar el estado (bypass RLS)
@@ -3148,18 +3225,18 @@ class DBManager:
             ).execute()
             
             if response.data is None or (isinstance(response.data, bool) and not response.data):
-                print("Error al actualizar el estado a través de RPC")
-                print(f"Respuesta: {response.data}")
+                log.error('Error al actualizar el estado a través de RPC')
+                log.debug('Respuesta: %s', response.data)
                 if hasattr(response, 'error') and response.error:
-                    print(f"Error: {response.error}")
+                    log.error('Error: %s', response.error)
                 return False
             
-            print(f"Estado actualizado exitosamente vía RPC")
+            log.info('Estado actualizado exitosamente vía RPC')
+            self._reindexar_cotizacion(cotizacion_id)
             return True
             
         except Exception as e:
-            print(f"Error al actualizar estado de cotización: {str(e)}")
-            traceback.print_exc()
+            log.error('Error al actualizar estado de cotización: %s', str(e), exc_info=True)
             return False
 
     # --- NUEVO: Función para obtener descripción de forma de pago --- 
@@ -3172,9 +3249,9 @@ class DBManager:
                 .select('*')\
                 .eq('cliente_id', cliente_id)\
                 .execute()
-            return [ReferenciaCliente(**ref) for ref in response.data]
+            return construir_modelos(ReferenciaCliente, response.data, self.TIPOS_REFERENCIA)
         except Exception as e:
-            print(f"Error obteniendo referencias: {str(e)}")
+            log.error('Error obteniendo referencias: %s', str(e))
             return []
 
     # --- New Methods ---
@@ -3183,26 +3260,15 @@ class DBManager:
         """Obtiene todos los adhesivos disponibles."""
         def _operation():
             try:
-                # ADD DEBUG LOGGING HERE
-                print("--- DEBUG: Inside get_adhesivos._operation ---")
                 response = self.supabase.table('adhesivos').select('*').execute()
-                # ADD MORE DEBUG LOGGING HERE
-                print(f"--- DEBUG: Raw response from adhesivos: {response.data}")
-                if response.data:
-                    # Assuming Adhesivo model exists and matches table structure
-                    adhesivos_list = [Adhesivo(**data) for data in response.data]
-                    print(f"--- DEBUG: Parsed Adhesivos list: {adhesivos_list}") # Log the parsed list
-                    return adhesivos_list
-                print("--- DEBUG: No data found in adhesivos response.")
-                return []
+                adhesivos_list = construir_modelos(Adhesivo, response.data, self.TIPOS_ADHESIVO)
+                log.debug('--- DEBUG: get_adhesivos: %s adhesivos', len(adhesivos_list))
+                return adhesivos_list
             except Exception as e:
-                print(f"--- DEBUG: Exception in get_adhesivos._operation: {e}") # Log exception
-                print(f"Error fetching adhesivos: {e}")
-                logging.error(f"Error fetching adhesivos: {e}", exc_info=True)
+                log.error('Error fetching adhesivos: %s', e, exc_info=True)
                 return None # Return None to trigger retry
 
         result = self._retry_operation("fetching adhesivos", _operation)
-        print(f"--- DEBUG: Final result from get_adhesivos (after retry): {result}") # Log final result
         return result if result is not None else []
 
     def get_material_adhesivo_valor(self, material_id: int, adhesivo_id: int) -> Optional[float]:
@@ -3218,7 +3284,7 @@ class DBManager:
         """
         def _operation():
             try:
-                print(f"Querying material_adhesivo for material_id={material_id}, adhesivo_id={adhesivo_id}")
+                log.debug('Querying material_adhesivo for material_id=%s, adhesivo_id=%s', material_id, adhesivo_id)
                 # Corrected query chaining without backslashes
                 response = (self.supabase.table('material_adhesivo')
                     .select('valor')
@@ -3229,15 +3295,14 @@ class DBManager:
 
                 if response.data:
                     valor = response.data[0].get('valor')
-                    print(f"Found valor: {valor}")
+                    log.debug('Found valor: %s', valor)
                     # Ensure conversion to float handles potential DB types
                     return float(valor) if valor is not None else None
                 else:
-                    print("No matching material_adhesivo found.")
+                    log.warning('No matching material_adhesivo found.')
                     return None # No combination found
             except Exception as e:
-                print(f"Error fetching material_adhesivo valor: {e}")
-                logging.error(f"Error fetching material_adhesivo valor for material={material_id}, adhesivo={adhesivo_id}: {e}", exc_info=True)
+                log.error('Error fetching material_adhesivo valor for material=%s, adhesivo=%s: %s', material_id, adhesivo_id, e, exc_info=True)
                 # Return None on error to allow retry or indicate failure
                 return None
 
@@ -3278,13 +3343,12 @@ class DBManager:
                                 # if adhesivo_data.get('tipo') != 'Sin adhesivo': 
                                 adhesivos_compatibles.append(Adhesivo(**adhesivo_data))
                             except TypeError as te:
-                                print(f"Error creating Adhesivo object from data: {adhesivo_data}, Error: {te}")
+                                log.error('Error creating Adhesivo object from data: %s, Error: %s', adhesivo_data, te)
                 
-                print(f"--- DEBUG: Found {len(adhesivos_compatibles)} compatible adhesivos for material {material_id}")
+                log.debug('--- DEBUG: Found %s compatible adhesivos for material %s', len(adhesivos_compatibles), material_id)
                 return adhesivos_compatibles
             except Exception as e:
-                print(f"Error fetching compatible adhesivos for material {material_id}: {e}")
-                logging.error(f"Error fetching compatible adhesivos for material {material_id}: {e}", exc_info=True)
+                log.error('Error fetching compatible adhesivos for material %s: %s', material_id, e, exc_info=True)
                 return None # Return None to trigger retry
 
         result = self._retry_operation(f"fetching compatible adhesivos for material {material_id}", _operation)
@@ -3303,7 +3367,7 @@ class DBManager:
         """
         def _operation():
             if material_adhesivo_id is None:
-                print("Error: material_adhesivo_id es requerido para get_material_id_from_material_adhesivo")
+                log.error('Error: material_adhesivo_id es requerido para get_material_id_from_material_adhesivo')
                 return None
             try:
                 # print(f"Querying material_adhesivo for material_id: entry_id={material_adhesivo_id}") # Optional debug
@@ -3320,18 +3384,17 @@ class DBManager:
                     # print(f"Found material_id: {mat_id}") # Optional debug
                     return mat_id
                 else:
-                    print(f"No material_adhesivo entry found with id {material_adhesivo_id}.")
+                    log.debug('No material_adhesivo entry found with id %s.', material_adhesivo_id)
                     return None
             except Exception as e:
-                print(f"Error fetching material_id from material_adhesivo: {e}")
-                logging.error(f"Error fetching material_id for material_adhesivo_id={material_adhesivo_id}: {e}", exc_info=True)
+                log.error('Error fetching material_id for material_adhesivo_id=%s: %s', material_adhesivo_id, e, exc_info=True)
                 return None
 
         # No usamos retry aquí porque None es un resultado esperado si el ID no existe.
         try:
              return _operation()
         except Exception as e:
-             print(f"Excepción final en get_material_id_from_material_adhesivo: {e}")
+             log.error('Excepción final en get_material_id_from_material_adhesivo: %s', e)
              return None
     # --- FIN NUEVO MÉTODO HELPER ---
 
@@ -3360,11 +3423,10 @@ class DBManager:
             if response.data and response.data.get('code'):
                 return response.data['code']
             else:
-                print(f"Advertencia: No se encontró código para material_adhesivo_id {material_adhesivo_id}.")
+                log.warning('Advertencia: No se encontró código para material_adhesivo_id %s.', material_adhesivo_id)
                 return ""
         except Exception as e:
-            print(f"Error fetching code from material_adhesivo: {e}")
-            logging.error(f"Error fetching code for material_adhesivo_id={material_adhesivo_id}: {e}", exc_info=True)
+            log.error('Error fetching code for material_adhesivo_id=%s: %s', material_adhesivo_id, e, exc_info=True)
             return ""
     # --- FIN NUEVO MÉTODO ---
 
@@ -3400,13 +3462,12 @@ class DBManager:
                                 # if adhesivo_data.get('tipo') != 'Sin adhesivo': 
                                 adhesivos_compatibles.append(Adhesivo(**adhesivo_data))
                             except TypeError as te:
-                                print(f"Error creating Adhesivo object from data: {adhesivo_data}, Error: {te}")
+                                log.error('Error creating Adhesivo object from data: %s, Error: %s', adhesivo_data, te)
                 
-                print(f"--- DEBUG: Found {len(adhesivos_compatibles)} compatible adhesivos for material {material_id}")
+                log.debug('--- DEBUG: Found %s compatible adhesivos for material %s', len(adhesivos_compatibles), material_id)
                 return adhesivos_compatibles
             except Exception as e:
-                print(f"Error fetching compatible adhesivos for material {material_id}: {e}")
-                logging.error(f"Error fetching compatible adhesivos for material {material_id}: {e}", exc_info=True)
+                log.error('Error fetching compatible adhesivos for material %s: %s', material_id, e, exc_info=True)
                 return None # Return None to trigger retry
 
         result = self._retry_operation(f"fetching compatible adhesivos for material {material_id}", _operation)
@@ -3426,11 +3487,10 @@ class DBManager:
                     return []
 
             except PostgrestAPIError as e:
-                print(f"Error al obtener overview de cotizaciones vía RPC: {e}")
+                log.error('Error al obtener overview de cotizaciones vía RPC: %s', e)
                 return []
             except Exception as e:
-                print(f"Error inesperado en RPC get_all_cotizaciones_overview: {e}")
-                traceback.print_exc()
+                log.error('Error inesperado en RPC get_all_cotizaciones_overview: %s', e, exc_info=True)
                 return []
         
         return self._retry_operation("get_all_cotizaciones_overview (RPC)", _operation)
@@ -3453,11 +3513,10 @@ class DBManager:
                     return []
                     
             except PostgrestAPIError as e:
-                print(f"Error al obtener overview de cotizaciones por comercial ({comercial_id}) vía RPC: {e}")
+                log.error('Error al obtener overview de cotizaciones por comercial (%s) vía RPC: %s', comercial_id, e)
                 return []
             except Exception as e:
-                print(f"Error inesperado en RPC get_cotizaciones_overview_by_comercial ({comercial_id}): {e}")
-                traceback.print_exc()
+                log.error('Error inesperado en RPC get_cotizaciones_overview_by_comercial (%s): %s', comercial_id, e, exc_info=True)
                 return []
                 
         return self._retry_operation(f"get_cotizaciones_overview_by_comercial (RPC {comercial_id})", _operation)
@@ -3468,12 +3527,12 @@ class DBManager:
         para poder recargar el formulario en modo edición.
         Utiliza una función RPC para mayor eficiencia y robustez.
         """
-        print(f"-- DEBUG: Entrando en get_full_cotizacion_details para ID: {cotizacion_id} --")
+        log.debug('-- DEBUG: Entrando en get_full_cotizacion_details para ID: %s --', cotizacion_id)
         rpc_result_data = None
         response_obj = None # Para inspeccionar el objeto response
         try:
             # --- Llamada directa a RPC SIN _retry_operation --- 
-            print(f"-- DEBUG: Llamando RPC 'get_cotizacion_details_for_edit' con p_cotizacion_id={cotizacion_id} --")
+            log.debug("-- DEBUG: Llamando RPC 'get_cotizacion_details_for_edit' con p_cotizacion_id=%s --", cotizacion_id)
             
             # --- Bloque try/except específico para la llamada RPC --- 
             try:
@@ -3481,45 +3540,43 @@ class DBManager:
                     'get_cotizacion_details_for_edit',
                     {'p_cotizacion_id': cotizacion_id}
                 ).execute()
-                print(f"-- DEBUG: Llamada RPC execute() completada. --")
+                log.debug('-- DEBUG: Llamada RPC execute() completada. --')
             except PostgrestAPIError as pg_err:
-                print(f"-- ERROR: PostgrestAPIError directo en llamada RPC ({cotizacion_id}): {pg_err.code} - {pg_err.message} --")
-                print(f"-- ERROR Details: {pg_err.details} --")
-                print(f"-- ERROR Hint: {pg_err.hint} --")
+                log.error('-- ERROR: PostgrestAPIError directo en llamada RPC (%s): %s - %s --', cotizacion_id, pg_err.code, pg_err.message)
+                log.error('-- ERROR Details: %s --', pg_err.details)
+                log.error('-- ERROR Hint: %s --', pg_err.hint)
                 return None # Error API, retornar None
             except Exception as call_err:
                 # Capturar cualquier otro error durante la ejecución de RPC
-                print(f"-- ERROR: Excepción directa en llamada RPC ({cotizacion_id}): {type(call_err).__name__} - {call_err} --")
-                traceback.print_exc()
+                log.error('-- ERROR: Excepción directa en llamada RPC (%s): %s - %s --', cotizacion_id, type(call_err).__name__, call_err, exc_info=True)
                 return None # Error inesperado, retornar None
             # ----------------------------------------------------------
             
             # -- Inspeccionar el objeto response --
-            print(f"-- DEBUG: Objeto Response RAW recibido: {response_obj} (Tipo: {type(response_obj)}) --")
+            log.debug('-- DEBUG: Objeto Response RAW recibido: %s (Tipo: %s) --', response_obj, type(response_obj))
             if response_obj and hasattr(response_obj, 'data'):
-                print(f"-- DEBUG: Atributo response.data: {response_obj.data} (Tipo: {type(response_obj.data)}) --")
+                log.debug('-- DEBUG: Atributo response.data: %s (Tipo: %s) --', response_obj.data, type(response_obj.data))
                 rpc_result_data = response_obj.data
             elif response_obj:
-                print("-- WARNING: Objeto response recibido pero no tiene atributo 'data' o es None/False --")
+                log.warning("-- WARNING: Objeto response recibido pero no tiene atributo 'data' o es None/False --")
             else:
-                print("-- WARNING: El objeto response en sí es None o False después de execute() --")
+                log.warning('-- WARNING: El objeto response en sí es None o False después de execute() --')
             # ------------------------------------
 
             # Verificar si obtuvimos datos válidos (diccionario)
             if rpc_result_data and isinstance(rpc_result_data, dict):
-                print(f"-- DEBUG: RPC devolvió datos válidos (diccionario). Retornando... --")
+                log.debug('-- DEBUG: RPC devolvió datos válidos (diccionario). Retornando... --')
                 return rpc_result_data
             elif rpc_result_data:
-                print(f"-- WARNING: RPC devolvió datos pero no en formato dict. Tipo: {type(rpc_result_data)} --")
+                log.warning('-- WARNING: RPC devolvió datos pero no en formato dict. Tipo: %s --', type(rpc_result_data))
                 return None 
             else:
-                print(f"-- DEBUG: RPC no devolvió datos válidos (o fue None/False) para ID {cotizacion_id} --")
+                log.debug('-- DEBUG: RPC no devolvió datos válidos (o fue None/False) para ID %s --', cotizacion_id)
                 return None 
                 
         except Exception as outer_err:
             # Error fuera de la llamada RPC específica pero dentro de la función
-            print(f"-- ERROR: Error inesperado en get_full_cotizacion_details ({cotizacion_id}): {type(outer_err).__name__} - {outer_err} --")
-            traceback.print_exc()
+            log.error('-- ERROR: Error inesperado en get_full_cotizacion_details (%s): %s - %s --', cotizacion_id, type(outer_err).__name__, outer_err, exc_info=True)
             return None
 
     # --- Funciones para Edición --- 
@@ -3535,16 +3592,16 @@ class DBManager:
         Returns:
             Optional[Cotizacion]: El objeto Cotizacion completo o None.
         """
-        print(f"-- Ejecutando obtener_cotizacion para ID: {cotizacion_id} --") # DEBUG
+        log.debug('-- Ejecutando obtener_cotizacion para ID: %s --', cotizacion_id) # DEBUG
         try:
             # 1. Obtener los detalles planos usando la RPC via get_full_cotizacion_details
             details = self.get_full_cotizacion_details(cotizacion_id)
 
             if not details:
-                print(f"obtener_cotizacion: No se encontraron detalles vía RPC para ID {cotizacion_id}. Retornando None.") # DEBUG
+                log.warning('obtener_cotizacion: No se encontraron detalles vía RPC para ID %s. Retornando None.', cotizacion_id) # DEBUG
                 return None
 
-            print(f"obtener_cotizacion: Detalles RPC obtenidos para ID {cotizacion_id}. Procesando...") # DEBUG
+            log.debug('obtener_cotizacion: Detalles RPC obtenidos para ID %s. Procesando...', cotizacion_id) # DEBUG
             # print(f"Detalles RPC: {details}") # DEBUG detallado opcional
             
             # 2. Crear objetos relacionados a partir del diccionario `details`
@@ -3561,10 +3618,10 @@ class DBManager:
                         telefono=details.get('cliente_telefono')
                     )
                 except KeyError as ke:
-                    print(f"Error creando Cliente: Falta la clave {ke} en detalles RPC")
+                    log.error('Error creando Cliente: Falta la clave %s en detalles RPC', ke)
                     # Podrías retornar None aquí o continuar sin cliente
                 except Exception as e_cli:
-                    print(f"Error inesperado creando Cliente: {e_cli}")
+                    log.error('Error inesperado creando Cliente: %s', e_cli)
 
             # --- INICIO MODIFICACIÓN PERFIL COMERCIAL ---
             perfil_obj = None # Perfil es solo un dict simple aquí
@@ -3576,7 +3633,7 @@ class DBManager:
                 comercial_celular = None # Valor por defecto
 
                 # Intentar buscar email y celular en la tabla perfiles
-                print(f"obtener_cotizacion: Buscando email y celular para comercial ID {comercial_id_from_details}...")
+                log.debug('obtener_cotizacion: Buscando email y celular para comercial ID %s...', comercial_id_from_details)
                 try:
                     perfil_lookup = self.supabase.table('perfiles')\
                         .select('email, celular')\
@@ -3587,7 +3644,7 @@ class DBManager:
                         comercial_email = perfil_lookup.data.get('email')
                         comercial_celular = perfil_lookup.data.get('celular')
                 except Exception as lookup_err_perfil:
-                     print(f"Error buscando datos de perfil para ID {comercial_id_from_details}: {lookup_err_perfil}")
+                     log.error('Error buscando datos de perfil para ID %s: %s', comercial_id_from_details, lookup_err_perfil)
 
                 # Crear el diccionario perfil_obj con toda la información
                 perfil_obj = {
@@ -3612,9 +3669,9 @@ class DBManager:
                     referencia_obj.cliente = cliente_obj
                     referencia_obj.perfil = perfil_obj
                 except KeyError as ke:
-                    print(f"Error creando ReferenciaCliente: Falta la clave {ke} en detalles RPC")
+                    log.error('Error creando ReferenciaCliente: Falta la clave %s en detalles RPC', ke)
                 except Exception as e_ref:
-                    print(f"Error inesperado creando ReferenciaCliente: {e_ref}")
+                    log.error('Error inesperado creando ReferenciaCliente: %s', e_ref)
 
             material_obj = None
             # La RPC devuelve material_id y adhesivo_id, podríamos usarlos para obtener los objetos
@@ -3647,24 +3704,24 @@ class DBManager:
 
                 # Si el nombre no vino de la RPC (o es 'N/A'), intentar buscarlo por ID
                 if not acabado_nombre_from_details or acabado_nombre_from_details == 'N/A':
-                    print(f"obtener_cotizacion: Acabado nombre no encontrado en details (o es 'N/A'). Intentando buscar por ID {acabado_id_from_details}...")
+                    log.debug("obtener_cotizacion: Acabado nombre no encontrado en details (o es 'N/A'). Intentando buscar por ID %s...", acabado_id_from_details)
                     try:
                         acabado_lookup_response = self.supabase.table('acabados').select('nombre').eq('id', acabado_id_from_details).maybe_single().execute()
                         if acabado_lookup_response.data and acabado_lookup_response.data.get('nombre'):
                             acabado_nombre_from_details = acabado_lookup_response.data['nombre']
-                            print(f"obtener_cotizacion: Nombre de acabado encontrado por lookup: {acabado_nombre_from_details}")
+                            log.debug('obtener_cotizacion: Nombre de acabado encontrado por lookup: %s', acabado_nombre_from_details)
                         else:
-                             print(f"obtener_cotizacion: No se encontró nombre de acabado en lookup para ID {acabado_id_from_details}")
+                             log.warning('obtener_cotizacion: No se encontró nombre de acabado en lookup para ID %s', acabado_id_from_details)
                              acabado_nombre_from_details = 'N/A' # Mantener N/A si la búsqueda falla
                     except Exception as lookup_err:
-                         print(f"Error buscando nombre de acabado por ID {acabado_id_from_details}: {lookup_err}")
+                         log.error('Error buscando nombre de acabado por ID %s: %s', acabado_id_from_details, lookup_err)
                          acabado_nombre_from_details = 'N/A' # Mantener N/A en caso de error
 
                 # Intentar crear el objeto Acabado con el ID y el nombre (obtenido de RPC o lookup)
                 try:
                     acabado_obj = Acabado(id=acabado_id_from_details, nombre=acabado_nombre_from_details)
                 except Exception as e_acab:
-                     print(f"Error creando objeto Acabado con ID {acabado_id_from_details} y Nombre {acabado_nombre_from_details}: {e_acab}")
+                     log.error('Error creando objeto Acabado con ID %s y Nombre %s: %s', acabado_id_from_details, acabado_nombre_from_details, e_acab)
                      # acabado_obj permanecerá como None si falla la creación
             # --- FIN MODIFICACIÓN ACABADO ---
             
@@ -3721,54 +3778,53 @@ class DBManager:
                 # tipo_grafado=tipo_grafado_obj, # ID es suficiente
             )
             
-            print(f"obtener_cotizacion: Objeto Cotizacion creado para ID {cotizacion_id}") # DEBUG
+            log.debug('obtener_cotizacion: Objeto Cotizacion creado para ID %s', cotizacion_id) # DEBUG
 
             # 4. Obtener y asignar las escalas
-            print(f"obtener_cotizacion: Obteniendo escalas para ID {cotizacion_id}...") # DEBUG
+            log.debug('obtener_cotizacion: Obteniendo escalas para ID %s...', cotizacion_id) # DEBUG
             cotizacion.escalas = self.get_cotizacion_escalas(cotizacion.id)
-            print(f"obtener_cotizacion: {len(cotizacion.escalas)} escalas asignadas.") # DEBUG
+            log.debug('obtener_cotizacion: %s escalas asignadas.', len(cotizacion.escalas)) # DEBUG
             
-            print(f"-- Fin obtener_cotizacion (Éxito) para ID: {cotizacion_id} --") # DEBUG
+            log.debug('-- Fin obtener_cotizacion (Éxito) para ID: %s --', cotizacion_id) # DEBUG
             return cotizacion
 
         except KeyError as ke:
-            print(f"Error fatal en obtener_cotizacion (KeyError): Falta la clave {ke} en los detalles de la RPC.")
-            traceback.print_exc()
+            log.error('Error fatal en obtener_cotizacion (KeyError): Falta la clave %s en los detalles de la RPC.', ke, exc_info=True)
             return None
         except Exception as e:
-            print(f"Error inesperado en obtener_cotizacion para ID {cotizacion_id}: {e}")
-            traceback.print_exc()
+            log.error('Error inesperado en obtener_cotizacion para ID %s: %s', cotizacion_id, e, exc_info=True)
             return None
 
     def update_referencia_cliente(self, referencia_id: int, data: Dict[str, Any]) -> bool:
         """Actualiza campos específicos de una referencia cliente."""
         # TODO: Implementar query de actualización para la tabla referencia_cliente
-        print(f"Placeholder: update_referencia_cliente called for ID {referencia_id} with data: {data}")
+        log.debug('Placeholder: update_referencia_cliente called for ID %s with data: %s', referencia_id, data)
+        cache_datos.invalidar(REFERENCIAS)
         try:
             # Ejemplo:
             # self.supabase.from_('referencia_cliente').update(data).eq('id', referencia_id).execute()
             # Verificar si la actualización fue exitosa (puede requerir chequear el resultado)
             return True # Asumir éxito por ahora
         except Exception as e:
-            print(f"Error actualizando referencia_cliente ID {referencia_id}: {e}")
+            log.error('Error actualizando referencia_cliente ID %s: %s', referencia_id, e)
             return False
 
     def eliminar_calculos_escala(self, cotizacion_id: int) -> bool:
         """Elimina los registros de calculos_escala_cotizacion asociados a una cotización."""
         # TODO: Implementar query de eliminación
-        print(f"Placeholder: eliminar_calculos_escala called for cotizacion_id {cotizacion_id}")
+        log.debug('Placeholder: eliminar_calculos_escala called for cotizacion_id %s', cotizacion_id)
         try:
             # Ejemplo:
             # self.supabase.from_('calculos_escala_cotizacion').delete().eq('cotizacion_id', cotizacion_id).execute()
             return True # Asumir éxito
         except Exception as e:
-            print(f"Error eliminando calculos_escala_cotizacion para cotizacion_id {cotizacion_id}: {e}")
+            log.error('Error eliminando calculos_escala_cotizacion para cotizacion_id %s: %s', cotizacion_id, e)
             return False
 
     def eliminar_cotizacion_escalas(self, cotizacion_id: int) -> bool:
         """Elimina los registros de cotizacion_escalas asociados a una cotización."""
         # TODO: Implementar query de eliminación
-        print(f"Placeholder: eliminar_cotizacion_escalas called for cotizacion_id {cotizacion_id}")
+        log.debug('Placeholder: eliminar_cotizacion_escalas called for cotizacion_id %s', cotizacion_id)
         try:
             # Ejemplo:
             # self.supabase.from_('cotizacion_escalas').delete().eq('cotizacion_id', cotizacion_id).execute()
@@ -3776,7 +3832,7 @@ class DBManager:
             # self.supabase.rpc('eliminar_escalas_y_precios', {'p_cotizacion_id': cotizacion_id})
             return True # Asumir éxito
         except Exception as e:
-            print(f"Error eliminando cotizacion_escalas para cotizacion_id {cotizacion_id}: {e}")
+            log.error('Error eliminando cotizacion_escalas para cotizacion_id %s: %s', cotizacion_id, e)
             return False
     # --- Fin Funciones para Edición ---
 
@@ -3793,7 +3849,7 @@ class DBManager:
         """
         def _operation():
             if material_adhesivo_id is None:
-                print("Error: material_adhesivo_id es requerido para get_adhesivo_id_from_material_adhesivo")
+                log.error('Error: material_adhesivo_id es requerido para get_adhesivo_id_from_material_adhesivo')
                 return None
             try:
                 # print(f"Querying material_adhesivo for adhesivo_id: entry_id={material_adhesivo_id}") # Optional debug
@@ -3810,18 +3866,17 @@ class DBManager:
                     # print(f"Found adhesivo_id: {adh_id}") # Optional debug
                     return adh_id
                 else:
-                    print(f"No material_adhesivo entry found with id {material_adhesivo_id}.")
+                    log.debug('No material_adhesivo entry found with id %s.', material_adhesivo_id)
                     return None
             except Exception as e:
-                print(f"Error fetching adhesivo_id from material_adhesivo: {e}")
-                logging.error(f"Error fetching adhesivo_id for material_adhesivo_id={material_adhesivo_id}: {e}", exc_info=True)
+                log.error('Error fetching adhesivo_id for material_adhesivo_id=%s: %s', material_adhesivo_id, e, exc_info=True)
                 return None
 
         # No usamos retry aquí porque None es un resultado esperado si el ID no existe.
         try:
              return _operation()
         except Exception as e:
-             print(f"Excepción final en get_adhesivo_id_from_material_adhesivo: {e}")
+             log.error('Excepción final en get_adhesivo_id_from_material_adhesivo: %s', e)
              return None
     # --- FIN NUEVA FUNCIÓN ---
 
@@ -3838,67 +3893,49 @@ class DBManager:
             # La RPC devuelve true si existe, false si no
             return response.data if isinstance(response.data, bool) else False
         except Exception as e:
-            print(f"Error verificando identificador '{identificador}' (excluyendo {exclude_cotizacion_id}): {e}")
+            log.error("Error verificando identificador '%s' (excluyendo %s): %s", identificador, exclude_cotizacion_id, e)
             # En caso de error, es más seguro asumir que SÍ existe para evitar duplicados
             return True 
 
-    #@st.cache_data
+    @cache_por_principal(CATALOGO, ttl=600, guardar_vacios=False)  # [] también sale de un error de consulta
     def get_adhesivos_for_material(_self, material_id: int) -> List[Adhesivo]:
         """
         Obtiene la lista de adhesivos disponibles para un material específico.
         ... (docstring) ...
         """
-        print(f"[CACHE CHECK] get_adhesivos_for_material llamado para material_id: {material_id}")
+        log.debug('[CACHE CHECK] get_adhesivos_for_material llamado para material_id: %s', material_id)
         if material_id is None:
-            print("[CACHE CHECK] material_id es None, retornando lista vacía.")
+            log.debug('[CACHE CHECK] material_id es None, retornando lista vacía.')
             return []
 
         # La función interna _operation no se cacheará individualmente,
         # pero su resultado sí a través del decorador externo.
         def _operation():
             try:
-                print(f"  [_operation] Intentando query para material_id: {material_id}")
+                log.debug('  [_operation] Intentando query para material_id: %s', material_id)
                 # Query material_adhesivo, join with adhesivos, filter by material_id
                 response = (_self.supabase.table('material_adhesivo')
                     .select('adhesivos(*)') 
                     .eq('material_id', material_id)
                     .execute())
                 
-                # Log detallado de la respuesta cruda
-                print(f"  [_operation] Respuesta DB cruda: {response}")
-                if hasattr(response, 'data'):
-                     print(f"  [_operation] Datos en respuesta DB: {response.data}")
-                if hasattr(response, 'error'):
-                     print(f"  [_operation] Error en respuesta DB: {response.error}")
-                
-                adhesivos_compatibles = []
-                if response.data:
-                    print(f"  [_operation] Procesando {len(response.data)} items de la respuesta...")
-                    # The result is a list of dicts like: [{'adhesivos': {'id': 1, 'tipo': '...', ...}}, ...]
-                    for item in response.data:
-                        adhesivo_data = item.get('adhesivos')
-                        print(f"    Item: {item}, Adhesivo Data Extraído: {adhesivo_data}") # Log cada item
-                        if adhesivo_data:
-                            try:
-                                adhesivos_compatibles.append(Adhesivo(**adhesivo_data))
-                            except TypeError as te:
-                                print(f"    Error creando Adhesivo: {te}, Datos: {adhesivo_data}")
-                        else:
-                             print("    Item no contenía clave 'adhesivos' o era None.")
-                else:
-                     print("  [_operation] response.data estaba vacío o era None.")
+                # The result is a list of dicts like: [{'adhesivos': {'id': 1, 'tipo': '...', ...}}, ...]
+                adhesivos_compatibles = construir_modelos(
+                    Adhesivo,
+                    [item['adhesivos'] for item in (response.data or []) if item.get('adhesivos')],
+                    _self.TIPOS_ADHESIVO
+                )
                 
-                print(f"  [_operation] Final: {len(adhesivos_compatibles)} adhesivos compatibles encontrados.")
+                log.debug('  [_operation] Final: %s adhesivos compatibles encontrados.', len(adhesivos_compatibles))
                 return adhesivos_compatibles
             except Exception as e:
-                print(f"  [_operation] EXCEPCIÓN en fetching: {e}")
-                logging.error(f"Error fetching compatible adhesivos for material {material_id}: {e}", exc_info=True)
+                log.error('Error fetching compatible adhesivos for material %s: %s', material_id, e, exc_info=True)
                 return None # Return None to trigger retry
 
         # Llamada a _retry_operation (que llama a _operation)
-        print(f"[CACHE CHECK] Llamando a _retry_operation para material_id: {material_id}")
+        log.debug('[CACHE CHECK] Llamando a _retry_operation para material_id: %s', material_id)
         result = _self._retry_operation(f"fetching compatible adhesivos for material {material_id}", _operation)
-        print(f"[CACHE CHECK] Resultado final para material_id {material_id} (después de retry): {'Lista vacía' if not result else f'{len(result)} items'}")
+        log.debug('[CACHE CHECK] Resultado final para material_id %s (después de retry): %s', material_id, 'Lista vacía' if not result else f'{len(result)} items')
         return result if result is not None else []
 
     # --- FIN NUEVA FUNCIÓN ---
@@ -3917,10 +3954,10 @@ class DBManager:
         """
         def _operation():
             if material_id is None or adhesivo_id is None:
-                print("Error: material_id y adhesivo_id son requeridos para get_material_adhesivo_entry")
+                log.error('Error: material_id y adhesivo_id son requeridos para get_material_adhesivo_entry')
                 return None
             try:
-                print(f"Querying material_adhesivo for entry: material_id={material_id}, adhesivo_id={adhesivo_id}")
+                log.debug('Querying material_adhesivo for entry: material_id=%s, adhesivo_id=%s', material_id, adhesivo_id)
                 response = (self.supabase.table('material_adhesivo')
                     .select('*') # Seleccionar todas las columnas, incluyendo el 'id' de esta tabla
                     .eq('material_id', material_id)
@@ -3930,14 +3967,13 @@ class DBManager:
 
                 if response.data:
                     entry = response.data[0]
-                    print(f"Found material_adhesivo entry: {entry}")
+                    log.debug('Found material_adhesivo entry: %s', entry)
                     return entry
                 else:
-                    print("No matching material_adhesivo entry found.")
+                    log.warning('No matching material_adhesivo entry found.')
                     return None # No combination found
             except Exception as e:
-                print(f"Error fetching material_adhesivo entry: {e}")
-                logging.error(f"Error fetching material_adhesivo entry for material={material_id}, adhesivo={adhesivo_id}: {e}", exc_info=True)
+                log.error('Error fetching material_adhesivo entry for material=%s, adhesivo=%s: %s', material_id, adhesivo_id, e, exc_info=True)
                 return None # Return None on error to allow retry or indicate failure
 
         # Retry the operation
@@ -3945,12 +3981,12 @@ class DBManager:
         return result
     # --- FIN NUEVO MÉTODO ---
 
-    #@st.cache_data
+    @cache_por_principal(REFERENCIAS, ttl=300)
     def get_referencia_cliente_by_details(self, cliente_id: int, descripcion: str, comercial_id: str) -> Optional[ReferenciaCliente]:
         """Busca una referencia específica por cliente, descripción y comercial."""
         def _operation():
             try:
-                print(f"Buscando referencia: cliente_id={cliente_id}, descripcion='{descripcion}', comercial_id={comercial_id}")
+                log.debug("Buscando referencia: cliente_id=%s, descripcion='%s', comercial_id=%s", cliente_id, descripcion, comercial_id)
                 response = self.supabase.from_('referencias_cliente') \
                     .select('*, cliente:clientes(*), perfil:perfiles(*)') \
                     .eq('cliente_id', cliente_id) \
@@ -3960,7 +3996,7 @@ class DBManager:
                     .execute()
 
                 if response.data:
-                    print(f"Referencia encontrada: {response.data['id']}")
+                    log.debug('Referencia encontrada: %s', response.data['id'])
                     # Reconstruir el objeto ReferenciaCliente
                     ref_data = response.data
                     cliente_data = ref_data.pop('cliente', None)
@@ -3974,11 +4010,10 @@ class DBManager:
                         
                     return ref_obj
                 else:
-                    print("Referencia no encontrada con esos detalles.")
+                    log.debug('Referencia no encontrada con esos detalles.')
                     return None
             except Exception as e:
-                print(f"Error buscando referencia por detalles: {e}")
-                traceback.print_exc()
+                log.error('Error buscando referencia por detalles: %s', e, exc_info=True)
                 return None # Indicar error
 
         try:
@@ -3987,7 +4022,7 @@ class DBManager:
             return _operation()
         except Exception as e:
             # Captura errores inesperados en _operation
-            print(f"Excepción final buscando referencia por detalles: {e}")
+            log.error('Excepción final buscando referencia por detalles: %s', e)
             return None
 
     #@st.cache_data
@@ -4027,8 +4062,7 @@ class DBManager:
             return result
                 
         except Exception as e:
-            print(f"Error obteniendo tabla material_adhesivo: {e}")
-            logging.error(f"Error obteniendo tabla material_adhesivo: {e}", exc_info=True)
+            log.error('Error obteniendo tabla material_adhesivo: %s', e, exc_info=True)
             return []
     
     def actualizar_material_adhesivo_valor(self, material_adhesivo_id: int, nuevo_valor: float) -> bool:
@@ -4045,41 +4079,40 @@ class DBManager:
         try:
             # Validar el ID y el nuevo valor
             if material_adhesivo_id is None or material_adhesivo_id <= 0:
-                print(f"ID de material_adhesivo inválido: {material_adhesivo_id}")
+                log.debug('ID de material_adhesivo inválido: %s', material_adhesivo_id)
                 return False
                 
             if nuevo_valor is None or nuevo_valor < 0:
-                print(f"Valor inválido para material_adhesivo: {nuevo_valor}")
+                log.debug('Valor inválido para material_adhesivo: %s', nuevo_valor)
                 return False
             
             # El campo 'valor' en la base de datos es de tipo INTEGER, convertir a entero
             nuevo_valor_int = int(round(float(nuevo_valor)))
             
             # Actualizar el valor con el valor entero
-            print(f"Actualizando material_adhesivo ID {material_adhesivo_id} con valor {nuevo_valor_int} (entero)")
+            log.debug('Actualizando material_adhesivo ID %s con valor %s (entero)', material_adhesivo_id, nuevo_valor_int)
             response = self.supabase.table('material_adhesivo').update(
                 {"valor": nuevo_valor_int}
             ).eq('id', material_adhesivo_id).execute()
             
             # Verificar la respuesta
             if hasattr(response, 'error') and response.error:
-                print(f"Error actualizando material_adhesivo: {response.error}")
+                log.error('Error actualizando material_adhesivo: %s', response.error)
                 return False
             
             # Verificar que haya datos en la respuesta
             if not response.data:
-                print("No se recibieron datos de respuesta en la actualización")
+                log.debug('No se recibieron datos de respuesta en la actualización')
                 # En este caso, aún podríamos considerar éxito dependiendo del API
                 # Si el API retorna array vacío cuando no hay cambios
                 
-            print(f"Actualización exitosa para material_adhesivo ID {material_adhesivo_id}")
-            print(f"Respuesta de API: {response.data}")
+            log.info('Actualización exitosa para material_adhesivo ID %s', material_adhesivo_id)
+            log.debug('Respuesta de API: %s', response.data)
+            cache_datos.invalidar(CATALOGO)
             return True
                 
         except Exception as e:
-            print(f"Error en actualizar_material_adhesivo_valor: {e}")
-            logging.error(f"Error en actualizar_material_adhesivo_valor para ID {material_adhesivo_id}: {e}", exc_info=True)
-            traceback.print_exc()  # Añadir stacktrace para mejor diagnóstico
+            log.error('Error en actualizar_material_adhesivo_valor para ID %s: %s', material_adhesivo_id, e, exc_info=True)
             return False
 
     def actualizar_acabado_valor(self, acabado_id: int, nuevo_valor: float) -> bool:
@@ -4096,44 +4129,86 @@ class DBManager:
         try:
             # Validar el ID y el nuevo valor
             if acabado_id is None or acabado_id <= 0:
-                print(f"ID de acabado inválido: {acabado_id}")
+                log.debug('ID de acabado inválido: %s', acabado_id)
                 return False
                 
             if nuevo_valor is None or nuevo_valor < 0:
-                print(f"Valor inválido para acabado: {nuevo_valor}")
+                log.debug('Valor inválido para acabado: %s', nuevo_valor)
                 return False
             
             # El campo 'valor' en la base de datos probablemente también es INTEGER
             nuevo_valor_int = int(round(float(nuevo_valor)))
             
             # Actualizar el valor con el valor entero
-            print(f"Actualizando acabado ID {acabado_id} con valor {nuevo_valor_int} (entero)")
+            log.debug('Actualizando acabado ID %s con valor %s (entero)', acabado_id, nuevo_valor_int)
             response = self.supabase.table('acabados').update(
                 {"valor": nuevo_valor_int}
             ).eq('id', acabado_id).execute()
             
             # Verificar la respuesta
             if hasattr(response, 'error') and response.error:
-                print(f"Error actualizando acabado: {response.error}")
+                log.error('Error actualizando acabado: %s', response.error)
                 return False
             
             # Verificar que haya datos en la respuesta
             if not response.data:
-                print("No se recibieron datos de respuesta en la actualización")
+                log.debug('No se recibieron datos de respuesta en la actualización')
                 # En este caso, aún podríamos considerar éxito dependiendo del API
             
-            print(f"Actualización exitosa para acabado ID {acabado_id}")
-            print(f"Respuesta de API: {response.data}")
+            log.info('Actualización exitosa para acabado ID %s', acabado_id)
+            log.debug('Respuesta de API: %s', response.data)
+            cache_datos.invalidar(CATALOGO)
             return True
                 
         except Exception as e:
-            print(f"Error en actualizar_acabado_valor: {e}")
-            logging.error(f"Error en actualizar_acabado_valor para ID {acabado_id}: {e}", exc_info=True)
-            traceback.print_exc()  # Añadir stacktrace para mejor diagnóstico
+            log.error('Error en actualizar_acabado_valor para ID %s: %s', acabado_id, e, exc_info=True)
             return False
+
+    # Columnas que se envían en el upsert masivo de valores (filas completas, ver filas_upsert)
+    COLUMNAS_UPSERT_VALORES = {
+        'material_adhesivo': ('id', 'material_id', 'adhesivo_id', 'code', 'valor'),
+        'acabados': ('id', 'nombre', 'code', 'valor'),
+    }
+
+    def actualizar_valores_lote(self, tabla: str, filas: List[Dict[str, Any]]) -> int:
+        """
+        Actualiza los valores de varias filas de material_adhesivo o acabados en un solo
+        upsert (una petición), en lugar de una lectura y una escritura por fila.
+
+        Args:
+            tabla: 'material_adhesivo' o 'acabados'
+            filas: Filas completas con 'id' y el nuevo 'valor' (ver importacion_precios.filas_upsert)
+
+        Returns:
+            int: Número de filas actualizadas
+
+        Raises:
+            ValueError: Si la tabla no admite actualización masiva o alguna fila no es válida
+        """
+        if tabla not in self.COLUMNAS_UPSERT_VALORES:
+            raise ValueError(f"La tabla '{tabla}' no admite actualización masiva de valores")
+        if not filas:
+            return 0
+        for fila in filas:
+            if not fila.get('id') or fila.get('valor') is None or fila['valor'] < 0:
+                raise ValueError(f"Fila inválida para actualizar {tabla}: {fila}")
+
+        datos = [dict(fila, valor=int(round(float(fila['valor'])))) for fila in filas]
+
+        def _operation():
+            response = self.supabase.table(tabla).upsert(datos, on_conflict='id').execute()
+            if hasattr(response, 'error') and response.error:
+                raise Exception(f"Error en upsert masivo de {tabla}: {response.error}")
+            return len(datos)
+
+        actualizadas = self._retry_operation(f"actualizar valores en lote ({tabla}, {len(datos)} filas)", _operation)
+        log.debug('Actualización masiva de %s: %s filas', tabla, actualizadas)
+        cache_datos.invalidar(CATALOGO)
+        return actualizadas
     # --- FIN MÉTODOS PARA GESTIÓN DE MATERIALES-ADHESIVOS Y ACABADOS ---
 
     # --- NUEVO MÉTODO ---
+    @cache_por_principal(CATALOGO, ttl=600)
     def get_material_adhesivo_entry(self, material_id: int, adhesivo_id: int) -> Optional[Dict]:
         """
         Obtiene la fila completa de la tabla material_adhesivo para una combinación específica.
@@ -4147,10 +4222,10 @@ class DBManager:
         """
         def _operation():
             if material_id is None or adhesivo_id is None:
-                print("Error: material_id y adhesivo_id son requeridos para get_material_adhesivo_entry")
+                log.error('Error: material_id y adhesivo_id son requeridos para get_material_adhesivo_entry')
                 return None
             try:
-                print(f"Querying material_adhesivo for entry: material_id={material_id}, adhesivo_id={adhesivo_id}")
+                log.debug('Querying material_adhesivo for entry: material_id=%s, adhesivo_id=%s', material_id, adhesivo_id)
                 response = (self.supabase.table('material_adhesivo')
                     .select('*') # Seleccionar todas las columnas, incluyendo el 'id' de esta tabla
                     .eq('material_id', material_id)
@@ -4160,14 +4235,13 @@ class DBManager:
 
                 if response.data:
                     entry = response.data[0]
-                    print(f"Found material_adhesivo entry: {entry}")
+                    log.debug('Found material_adhesivo entry: %s', entry)
                     return entry
                 else:
-                    print("No matching material_adhesivo entry found.")
+                    log.warning('No matching material_adhesivo entry found.')
                     return None # No combination found
             except Exception as e:
-                print(f"Error fetching material_adhesivo entry: {e}")
-                logging.error(f"Error fetching material_adhesivo entry for material={material_id}, adhesivo={adhesivo_id}: {e}", exc_info=True)
+                log.error('Error fetching material_adhesivo entry for material=%s, adhesivo=%s: %s', material_id, adhesivo_id, e, exc_info=True)
                 return None # Return None on error to allow retry or indicate failure
 
         # Retry the operation
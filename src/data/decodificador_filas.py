@@ -0,0 +1,223 @@
+"""
+Decodificación en bloque de respuestas de PostgREST.
+
+PostgREST entrega cada fila como un dict con valores JSON: los timestamptz llegan como
+texto ISO, los numeric pueden llegar como texto o como int, los booleanos a veces como
+'true'/'false'. En lugar de convertir campo por campo dentro de cada fila (con un
+try/except por valor), aquí se convierte columna por columna toda la respuesta:
+
+    filas = decodificar_filas(response.data, {'creado_en': FECHA, 'valor': NUMERO})
+    clientes = construir_modelos(Cliente, filas)
+
+Cada columna se convierte con una sola comprensión de lista; los valores que ya tienen
+el tipo correcto (lo normal con int, float y bool) pasan sin llamadas. Las fechas se
+parsean con datetime.fromisoformat en bloque y solo si algún valor falla se recurre al
+parseo tolerante valor por valor (fracciones de 1 a 6 dígitos, 'Z', formatos raros).
+"""
+import dataclasses
+import sys
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+from functools import lru_cache
+from typing import Any, Callable, Dict, FrozenSet, Iterable, List, Optional, Type, TypeVar
+
+from dateutil.parser import isoparse
+
+from src.utils.bitacora import obtener_bitacora
+
+log = obtener_bitacora('datos')
+
+FECHA = 'fecha'
+ENTERO = 'entero'
+NUMERO = 'numero'
+BOOLEANO = 'booleano'
+DECIMAL = 'decimal'
+
+# Desde Python 3.11 fromisoformat acepta 'Z' y fracciones de cualquier longitud, que es
+# todo lo que produce PostgREST; antes de 3.11 se usa siempre el parseo tolerante.
+_FROMISOFORMAT_COMPLETO = sys.version_info >= (3, 11)
+
+T = TypeVar('T')
+
+
+def parsear_fecha(valor: Any) -> Optional[datetime]:
+    """
+    Parsea un timestamp ISO de Postgres de forma tolerante (o devuelve el datetime si ya
+    lo es). Acepta fracciones con 1-6 dígitos y 'Z'. Retorna None si el valor es vacío
+    o no se puede parsear.
+    """
+    if not valor:
+        return None
+    if isinstance(valor, datetime):
+        return valor
+    texto = str(valor).replace('Z', '+00:00')
+    try:
+        return datetime.fromisoformat(texto)
+    except ValueError:
+        pass
+    if '.' in texto:
+        # Normalizar microsegundos a 6 dígitos antes de la zona horaria
+        cabeza, _, cola = texto.partition('.')
+        digitos = len(cola) - len(cola.lstrip('0123456789'))
+        try:
+            return datetime.fromisoformat(f"{cabeza}.{cola[:min(digitos, 6)].ljust(6, '0')}{cola[digitos:]}")
+        except ValueError:
+            pass
+    try:
+        return isoparse(texto)
+    except (ValueError, OverflowError):
+        return None
+
+
+def parsear_fechas(valores: List[Any]) -> List[Optional[datetime]]:
+    """Parsea una columna de timestamps; mismo resultado que parsear_fecha en cada valor"""
+    if _FROMISOFORMAT_COMPLETO:
+        desde_iso = datetime.fromisoformat
+        try:
+            return [None if not v else v if isinstance(v, datetime) else desde_iso(v) for v in valores]
+        except (TypeError, ValueError):
+            pass
+    return [parsear_fecha(v) for v in valores]
+
+
+# Conversión de un valor suelto, con las mismas reglas que DBManager._limpiar_datos:
+# texto 'true'/'false' para booleanos y None si el valor no se puede convertir.
+
+def a_entero(valor: Any) -> Optional[int]:
+    if valor is None or valor == '':
+        return None
+    try:
+        return int(valor)
+    except (ValueError, TypeError):
+        try:
+            return int(float(valor))
+        except (ValueError, TypeError, OverflowError):
+            return None
+
+
+def a_numero(valor: Any) -> Optional[float]:
+    if valor is None or valor == '':
+        return None
+    try:
+        return float(valor)
+    except (ValueError, TypeError):
+        return None
+
+
+def a_booleano(valor: Any) -> Optional[bool]:
+    if valor is None:
+        return None
+    if isinstance(valor, str):
+        return valor.strip().lower() == 'true'
+    return bool(valor)
+
+
+def a_decimal(valor: Any) -> Optional[Decimal]:
+    if valor is None or valor == '':
+        return None
+    if isinstance(valor, Decimal):
+        return valor
+    try:
+        return Decimal(str(valor))
+    except (InvalidOperation, ValueError, TypeError):
+        return None
+
+
+def _enteros(valores: List[Any]) -> List[Optional[int]]:
+    return [v if v is None or type(v) is int else a_entero(v) for v in valores]
+
+
+def _numeros(valores: List[Any]) -> List[Optional[float]]:
+    return [v if v is None or type(v) is float else a_numero(v) for v in valores]
+
+
+def _booleanos(valores: List[Any]) -> List[Optional[bool]]:
+    return [v if v is None or v is True or v is False else a_booleano(v) for v in valores]
+
+
+def _decimales(valores: List[Any]) -> List[Optional[Decimal]]:
+    return [a_decimal(v) for v in valores]
+
+
+CONVERSORES: Dict[str, Callable[[List[Any]], List[Any]]] = {
+    FECHA: parsear_fechas,
+    ENTERO: _enteros,
+    NUMERO: _numeros,
+    BOOLEANO: _booleanos,
+    DECIMAL: _decimales,
+}
+
+
+def decodificar_columnas(filas: List[Dict[str, Any]], tipos: Dict[str, str]) -> Dict[str, List[Any]]:
+    """
+    Columnas tipadas de las filas: {columna: [valor convertido por fila]}.
+    Las filas sin la columna aportan None.
+    """
+    columnas: Dict[str, List[Any]] = {}
+    for columna, tipo in tipos.items():
+        conversor = CONVERSORES.get(tipo)
+        if conversor is None:
+            raise ValueError(f"Tipo de columna desconocido: {tipo}")
+        columnas[columna] = conversor([fila.get(columna) for fila in filas])
+    return columnas
+
+
+def decodificar_filas(filas: Optional[List[Dict[str, Any]]], tipos: Dict[str, str]) -> List[Dict[str, Any]]:
+    """
+    Convierte en bloque las columnas indicadas de una respuesta de PostgREST.
+    Modifica las filas recibidas (son las de la respuesta, nadie más las usa) y las
+    devuelve. Las columnas que no vienen en una fila no se agregan a esa fila.
+
+    Args:
+        filas: response.data
+        tipos: {columna: FECHA | ENTERO | NUMERO | BOOLEANO | DECIMAL}
+
+    Returns:
+        Las mismas filas, con los valores convertidos
+    """
+    if not filas:
+        return []
+    for columna, valores in decodificar_columnas(filas, tipos).items():
+        for fila, valor in zip(filas, valores):
+            if columna in fila:
+                fila[columna] = valor
+    return filas
+
+
+@lru_cache(maxsize=None)
+def _campos_modelo(clase: type) -> FrozenSet[str]:
+    return frozenset(campo.name for campo in dataclasses.fields(clase) if campo.init)
+
+
+def construir_modelos(clase: Type[T], filas: Optional[Iterable[Dict[str, Any]]],
+                      tipos: Optional[Dict[str, str]] = None) -> List[T]:
+    """
+    Crea un modelo (dataclass) por fila. Las columnas que el modelo no tiene se ignoran,
+    así que un select('*') no rompe si la tabla gana columnas. Las filas que no se
+    pueden convertir (faltan campos obligatorios) se omiten con un aviso.
+
+    Args:
+        clase: Dataclass del modelo (Cliente, Acabado, Escala...)
+        filas: response.data
+        tipos: Columnas a convertir antes de crear los modelos (ver decodificar_filas)
+    """
+    filas = list(filas or [])
+    if not filas:
+        return []
+    if tipos:
+        decodificar_filas(filas, tipos)
+
+    campos = _campos_modelo(clase)
+    if all(campos.issuperset(fila) for fila in filas):
+        try:
+            return [clase(**fila) for fila in filas]
+        except TypeError:
+            pass  # Alguna fila incompleta: se repite fila por fila para omitir solo esa
+
+    modelos: List[T] = []
+    for fila in filas:
+        try:
+            modelos.append(clase(**{k: v for k, v in fila.items() if k in campos}))
+        except TypeError as te:
+            log.error('Error creando %s desde datos: %s. Datos: %s', clase.__name__, te, fila)
+    return modelos
@@ -0,0 +1,258 @@
+"""
+Índice de búsqueda de clientes en memoria.
+
+Se construye por sesión con los clientes visibles para el usuario (RLS) y se actualiza
+al crear o editar un cliente, de modo que el selector de clientes consulta el índice
+mientras el usuario escribe en lugar de cargar y enviar la lista completa. DBManager lo
+reconstruye cuando otra sesión escribe clientes o cuando vence (ver get_indice_clientes).
+
+Estructuras:
+    - Vocabulario ordenado (palabras del nombre y NIT/CC) con la lista de clientes
+      de cada palabra, para búsquedas por prefijo con bisect.
+    - Trigramas -> ids, para encontrar coincidencias en medio de una palabra
+      ("impres" encuentra "Flexoimpresos") cuando el prefijo no alcanza.
+
+El texto se normaliza (minúsculas, sin tildes ni signos), así que "etiquetas cía"
+encuentra "ETIQUETAS CIA. S.A.S".
+"""
+import bisect
+import heapq
+from functools import lru_cache
+import re
+import unicodedata
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from src.data.models import Cliente
+
+LIMITE_RESULTADOS = 20
+LONGITUD_TRIGRAMA = 3
+
+# Si los candidatos superan 1/_FRACCION_RECORRIDO del total, conviene recorrer el
+# orden alfabético y cortar al completar el límite en lugar de ordenarlos
+_FRACCION_RECORRIDO = 8
+
+_NO_ALFANUMERICO_ASCII = re.compile(r'[^0-9a-z]+')
+
+
+@lru_cache(maxsize=65536)
+def normalizar_texto(texto: Optional[str]) -> str:
+    """Minúsculas, sin tildes y con los signos de puntuación convertidos en espacios"""
+    if not texto:
+        return ''
+    texto = str(texto)
+    if texto.isascii():
+        return _NO_ALFANUMERICO_ASCII.sub(' ', texto.lower()).strip()
+    descompuesto = unicodedata.normalize('NFKD', texto)
+    sin_tildes = ''.join(c for c in descompuesto if not unicodedata.combining(c))
+    limpio = ''.join(c if c.isalnum() else ' ' for c in sin_tildes.lower())
+    return ' '.join(limpio.split())
+
+
+def _trigramas(token: str) -> Set[str]:
+    return {token[i:i + LONGITUD_TRIGRAMA] for i in range(len(token) - LONGITUD_TRIGRAMA + 1)}
+
+
+class IndiceClientes:
+    """Índice de prefijos y trigramas sobre nombre y código de los clientes"""
+
+    def __init__(self, clientes: Iterable[Cliente] = ()):
+        self._clientes: Dict[int, Cliente] = {}
+        self._nombres: Dict[int, str] = {}
+        self._codigos: Dict[int, str] = {}
+        self._tokens_cliente: Dict[int, Set[str]] = {}
+        self._ids_por_token: Dict[str, Set[int]] = {}
+        self._vocabulario: List[str] = []  # tokens distintos ordenados, para rangos por prefijo
+        self._trigramas: Dict[str, Set[int]] = {}
+        self._orden: List[Tuple[str, int]] = []  # (nombre normalizado, id) en orden alfabético
+
+        for cliente in clientes:
+            self._indexar(cliente)
+        self._vocabulario.sort()
+        self._orden.sort()
+
+    def __len__(self) -> int:
+        return len(self._clientes)
+
+    def __contains__(self, cliente_id: int) -> bool:
+        return cliente_id in self._clientes
+
+    def _indexar(self, cliente: Cliente, ordenado: bool = False) -> None:
+        """Agrega un cliente. Con ordenado=True inserta manteniendo el orden de las listas."""
+        if cliente.id is None:
+            return
+        nombre = normalizar_texto(cliente.nombre)
+        codigo = normalizar_texto(str(cliente.codigo)).replace(' ', '') if cliente.codigo is not None else ''
+        tokens = set(nombre.split())
+        if codigo:
+            tokens.add(codigo)
+
+        self._clientes[cliente.id] = cliente
+        self._nombres[cliente.id] = nombre
+        self._codigos[cliente.id] = codigo
+        self._tokens_cliente[cliente.id] = tokens
+
+        for token in tokens:
+            ids = self._ids_por_token.get(token)
+            if ids is None:
+                ids = self._ids_por_token[token] = set()
+                if ordenado:
+                    bisect.insort(self._vocabulario, token)
+                else:
+                    self._vocabulario.append(token)
+            ids.add(cliente.id)
+            for trigrama in _trigramas(token):
+                self._trigramas.setdefault(trigrama, set()).add(cliente.id)
+
+        if ordenado:
+            bisect.insort(self._orden, (nombre, cliente.id))
+        else:
+            self._orden.append((nombre, cliente.id))
+
+    def _desindexar(self, cliente_id: int) -> None:
+        tokens = self._tokens_cliente.pop(cliente_id, None)
+        if tokens is None:
+            return
+        for token in tokens:
+            ids = self._ids_por_token[token]
+            ids.discard(cliente_id)
+            if not ids:
+                del self._ids_por_token[token]
+                del self._vocabulario[bisect.bisect_left(self._vocabulario, token)]
+            for trigrama in _trigramas(token):
+                ids = self._trigramas.get(trigrama)
+                if ids is not None:
+                    ids.discard(cliente_id)
+                    if not ids:
+                        del self._trigramas[trigrama]
+
+        nombre = self._nombres.pop(cliente_id)
+        del self._orden[bisect.bisect_left(self._orden, (nombre, cliente_id))]
+        self._codigos.pop(cliente_id, None)
+        self._clientes.pop(cliente_id, None)
+
+    def agregar(self, cliente: Cliente) -> None:
+        """Agrega o reemplaza un cliente (por id)"""
+        if cliente.id is None:
+            return
+        self._desindexar(cliente.id)
+        self._indexar(cliente, ordenado=True)
+
+    def quitar(self, cliente_id: int) -> None:
+        self._desindexar(cliente_id)
+
+    def obtener(self, cliente_id: Optional[int]) -> Optional[Cliente]:
+        return self._clientes.get(cliente_id)
+
+    def obtener_por_codigo(self, codigo: Any) -> Optional[Cliente]:
+        """Cliente con ese NIT/CC exacto (None si no hay)"""
+        clave = normalizar_texto(str(codigo)).replace(' ', '') if codigo is not None else ''
+        for cliente_id in self._ids_por_token.get(clave, ()) if clave else ():
+            if self._codigos[cliente_id] == clave:
+                return self._clientes[cliente_id]
+        return None
+
+    def _por_prefijo(self, termino: str) -> Set[int]:
+        """Ids con algún token que empieza por el término"""
+        ids: Set[int] = set()
+        posicion = bisect.bisect_left(self._vocabulario, termino)
+        while posicion < len(self._vocabulario) and self._vocabulario[posicion].startswith(termino):
+            ids |= self._ids_por_token[self._vocabulario[posicion]]
+            posicion += 1
+        return ids
+
+    def _por_trigramas(self, terminos: List[str]) -> Set[int]:
+        """Candidatos que tienen todos los trigramas de los términos (pueden sobrar)"""
+        candidatos: Optional[Set[int]] = None
+        for termino in terminos:
+            for trigrama in _trigramas(termino):
+                ids = self._trigramas.get(trigrama)
+                if not ids:
+                    return set()
+                candidatos = set(ids) if candidatos is None else candidatos & ids
+        return candidatos or set()
+
+    def _contiene(self, cliente_id: int, terminos: List[str]) -> bool:
+        nombre, codigo = self._nombres[cliente_id], self._codigos[cliente_id]
+        return all(t in nombre or t in codigo for t in terminos)
+
+    def _primeros_por_nombre(self, candidatos: Set[int], limite: int,
+                             filtro: Optional[Callable[[int], bool]] = None) -> List[int]:
+        """
+        Los 'limite' primeros candidatos en orden alfabético. Si el conjunto es grande
+        recorre el orden global y se detiene al completar, en vez de ordenarlo entero.
+        """
+        if limite <= 0 or not candidatos:
+            return []
+        if len(candidatos) * _FRACCION_RECORRIDO > len(self._orden):
+            elegidos = []
+            for _, cliente_id in self._orden:
+                if cliente_id in candidatos and (filtro is None or filtro(cliente_id)):
+                    elegidos.append(cliente_id)
+                    if len(elegidos) == limite:
+                        break
+            return elegidos
+        if filtro is not None:
+            candidatos = {cliente_id for cliente_id in candidatos if filtro(cliente_id)}
+        return [cliente_id for _, cliente_id in
+                heapq.nsmallest(limite, ((self._nombres[i], i) for i in candidatos))]
+
+    def buscar(self, texto: Optional[str], limite: int = LIMITE_RESULTADOS) -> List[Cliente]:
+        """
+        Busca clientes por nombre o NIT/CC.
+
+        Orden de los resultados: NIT/CC exacto, nombre que empieza por el texto, cada
+        palabra del texto como prefijo de alguna palabra del nombre o del código y, si
+        aún faltan resultados y las palabras tienen al menos tres letras, coincidencias
+        en medio de una palabra. Dentro de cada grupo, por nombre.
+
+        Args:
+            texto: Lo que escribió el usuario (vacío devuelve los primeros por nombre)
+            limite: Número máximo de resultados
+
+        Returns:
+            List[Cliente]: Hasta 'limite' clientes, los más relevantes primero
+        """
+        consulta = normalizar_texto(texto)
+        if not consulta:
+            return [self._clientes[cliente_id] for _, cliente_id in self._orden[:limite]]
+
+        terminos = consulta.split()
+        elegidos: List[int] = []
+        vistos: Set[int] = set()
+
+        def agregar(ids: Iterable[int]) -> None:
+            for cliente_id in ids:
+                if cliente_id not in vistos and len(elegidos) < limite:
+                    vistos.add(cliente_id)
+                    elegidos.append(cliente_id)
+
+        # 1. NIT/CC exacto
+        codigo_consulta = consulta.replace(' ', '')
+        exactos = {i for i in self._ids_por_token.get(codigo_consulta, ()) if self._codigos[i] == codigo_consulta}
+        agregar(self._primeros_por_nombre(exactos, limite))
+
+        # 2. Nombre que empieza por la consulta (tramo contiguo del orden alfabético)
+        posicion = bisect.bisect_left(self._orden, (consulta,))
+        while len(elegidos) < limite and posicion < len(self._orden) \
+                and self._orden[posicion][0].startswith(consulta):
+            agregar((self._orden[posicion][1],))
+            posicion += 1
+
+        # 3. Todas las palabras como prefijo de alguna palabra del cliente
+        if len(elegidos) < limite:
+            por_prefijo: Optional[Set[int]] = None
+            for termino in terminos:
+                ids = self._por_prefijo(termino)
+                por_prefijo = ids if por_prefijo is None else por_prefijo & ids
+                if not por_prefijo:
+                    break
+            agregar(self._primeros_por_nombre((por_prefijo or set()) - vistos, limite - len(elegidos)))
+
+        # 4. Subcadenas (los trigramas filtran; se verifica contra el texto completo)
+        if len(elegidos) < limite and all(len(t) >= LONGITUD_TRIGRAMA for t in terminos):
+            candidatos = self._por_trigramas(terminos) - vistos
+            agregar(self._primeros_por_nombre(
+                candidatos, limite - len(elegidos), lambda i: self._contiene(i, terminos)
+            ))
+
+        return [self._clientes[cliente_id] for cliente_id in elegidos]
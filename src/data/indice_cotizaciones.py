@@ -0,0 +1,272 @@
+"""
+Índice de texto completo de cotizaciones en memoria.
+
+Indexa por cada cotización su identificador (el generado por
+DBManager._generar_identificador: TIPO MATERIAL ANCHOxAVANCE [TINTAS] [ACABADO]
+RX/MX_PAQUETES CLIENTE REFERENCIA NUMERO), la descripción de la referencia, el
+cliente y el número. Cada parte del identificador queda además asociada a su campo,
+de modo que se puede buscar:
+
+    ET PELB 50x50 LAM            todas las palabras, en cualquier campo
+    material:pelb cliente:vlam   palabras restringidas a un campo
+    150 / CT00000150             número de cotización
+
+Cada palabra de la consulta debe coincidir (exacta o como prefijo) con alguna
+palabra de la cotización. Los resultados se ordenan: número exacto, todas las
+palabras exactas, el resto; dentro de cada grupo, las más recientes primero.
+
+Las búsquedas intersecan conjuntos de ids por palabra (operaciones en C) y toman los
+más recientes recorriendo el orden de recencia con corte al completar el límite, o
+ordenando los candidatos si son pocos.
+"""
+import bisect
+import re
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple, Union
+
+from src.data.indice_clientes import normalizar_texto
+from src.data.models import CotizacionResumen
+
+LIMITE_RESULTADOS = 50
+
+CAMPOS = ('tipo', 'material', 'medidas', 'tintas', 'acabado', 'paquetes', 'cliente', 'referencia', 'numero')
+ALIAS_CAMPOS = {
+    'mat': 'material', 'med': 'medidas', 'tin': 'tintas', 'aca': 'acabado',
+    'paq': 'paquetes', 'cli': 'cliente', 'ref': 'referencia', 'num': 'numero',
+}
+
+_PATRON_TINTAS = re.compile(r'^\d+T(\+FOIL)?$')
+_PATRON_PAQUETES = re.compile(r'^[RM]X\d+$')
+_PATRON_CT = re.compile(r'^ct0*(\d+)$')
+_SEPARADOR_DECIMAL = re.compile(r'(?<=\d)[.,](?=\d)')
+
+
+def _normalizar(texto: Optional[str]) -> str:
+    """
+    normalizar_texto conservando los decimales de las medidas: "35.5X50MM" da
+    "35p5x50mm" (una palabra) en lugar de "35 5x50mm", y "35,5x50" busca igual.
+    """
+    if not texto:
+        return ''
+    return normalizar_texto(_SEPARADOR_DECIMAL.sub('p', str(texto)))
+
+
+def separar_identificador(identificador: Optional[str]) -> Dict[str, str]:
+    """
+    Separa un identificador en sus campos.
+
+    >>> separar_identificador("ET PELB 50X50MM 0T+FOIL LAM RX1000 ENSAYO VLAMOS 150")['acabado']
+    'LAM'
+
+    Las palabras entre los paquetes y el número (cliente y referencia) quedan en
+    'resto', porque en el identificador no hay separador entre ambos.
+    """
+    partes = (identificador or '').split()
+    campos: Dict[str, str] = {}
+    if len(partes) < 3:
+        return campos
+    campos['tipo'], campos['material'], campos['medidas'] = partes[0], partes[1], partes[2]
+    posicion = 3
+    if posicion < len(partes) and _PATRON_TINTAS.match(partes[posicion]):
+        campos['tintas'] = partes[posicion]
+        posicion += 1
+    paquetes = next((i for i in range(posicion, len(partes)) if _PATRON_PAQUETES.match(partes[i])), None)
+    if paquetes is not None:
+        if paquetes > posicion:
+            campos['acabado'] = ' '.join(partes[posicion:paquetes])
+        campos['paquetes'] = partes[paquetes]
+        posicion = paquetes + 1
+    if posicion < len(partes) and partes[-1].isdigit():
+        campos['numero'] = partes[-1]
+        campos['resto'] = ' '.join(partes[posicion:-1])
+    else:
+        campos['resto'] = ' '.join(partes[posicion:])
+    return campos
+
+
+class IndiceCotizaciones:
+    """Índice invertido (palabra -> ids) sobre identificador, referencia, cliente y número"""
+
+    def __init__(self, cotizaciones: Iterable[Union[CotizacionResumen, Dict[str, Any]]] = ()):
+        self._documentos: Dict[int, CotizacionResumen] = {}
+        self._claves_documento: Dict[int, Set[str]] = {}
+        self._ids_por_clave: Dict[str, Set[int]] = {}
+        self._vocabulario: List[str] = []  # palabras sin campo, ordenadas
+        self._vocabulario_campos: List[str] = []  # "campo:palabra", ordenadas
+        self._recencia: List[int] = []  # -id ordenado: las más recientes primero
+
+        for cotizacion in cotizaciones:
+            self._indexar(cotizacion)
+        self._vocabulario.sort()
+        self._vocabulario_campos.sort()
+        self._recencia.sort()
+
+    def __len__(self) -> int:
+        return len(self._documentos)
+
+    def __contains__(self, cotizacion_id: int) -> bool:
+        return cotizacion_id in self._documentos
+
+    @staticmethod
+    def _claves(cotizacion: CotizacionResumen) -> Set[str]:
+        """Palabras normalizadas de la cotización, sueltas y como 'campo:palabra'"""
+        campos = separar_identificador(cotizacion.identificador)
+        resto = campos.pop('resto', '')
+        if cotizacion.cliente_nombre:
+            campos['cliente'] = cotizacion.cliente_nombre
+        if cotizacion.referencia:
+            campos['referencia'] = cotizacion.referencia
+        numero = cotizacion.numero_cotizacion
+        if numero not in (None, ''):
+            campos['numero'] = str(numero)
+
+        palabras_campo = {(campo, palabra) for campo, valor in campos.items()
+                          for palabra in _normalizar(valor).split()}
+        claves = {f"{campo}:{palabra}" for campo, palabra in palabras_campo}
+        claves.update(palabra for _, palabra in palabras_campo)
+        claves.update(_normalizar(resto).split())
+        return claves
+
+    def _indexar(self, cotizacion: Union[CotizacionResumen, Dict[str, Any]], ordenado: bool = False) -> None:
+        if isinstance(cotizacion, dict):
+            cotizacion = CotizacionResumen.from_dict(cotizacion)
+        cotizacion_id = cotizacion.id
+        if cotizacion_id is None:
+            return
+        claves = self._claves(cotizacion)
+        self._documentos[cotizacion_id] = cotizacion
+        self._claves_documento[cotizacion_id] = claves
+        for clave in claves:
+            ids = self._ids_por_clave.get(clave)
+            if ids is None:
+                ids = self._ids_por_clave[clave] = set()
+                vocabulario = self._vocabulario_campos if ':' in clave else self._vocabulario
+                if ordenado:
+                    bisect.insort(vocabulario, clave)
+                else:
+                    vocabulario.append(clave)
+            ids.add(cotizacion_id)
+        if ordenado:
+            bisect.insort(self._recencia, -cotizacion_id)
+        else:
+            self._recencia.append(-cotizacion_id)
+
+    def _desindexar(self, cotizacion_id: int) -> None:
+        claves = self._claves_documento.pop(cotizacion_id, None)
+        if claves is None:
+            return
+        for clave in claves:
+            ids = self._ids_por_clave[clave]
+            ids.discard(cotizacion_id)
+            if not ids:
+                del self._ids_por_clave[clave]
+                vocabulario = self._vocabulario_campos if ':' in clave else self._vocabulario
+                del vocabulario[bisect.bisect_left(vocabulario, clave)]
+        del self._recencia[bisect.bisect_left(self._recencia, -cotizacion_id)]
+        self._documentos.pop(cotizacion_id, None)
+
+    def agregar(self, cotizacion: Union[CotizacionResumen, Dict[str, Any]]) -> None:
+        """Agrega o reemplaza una cotización (resumen o fila de listado con 'id')"""
+        cotizacion_id = cotizacion.get('id') if isinstance(cotizacion, dict) else cotizacion.id
+        if cotizacion_id is None:
+            return
+        self._desindexar(cotizacion_id)
+        self._indexar(cotizacion, ordenado=True)
+
+    def quitar(self, cotizacion_id: int) -> None:
+        self._desindexar(cotizacion_id)
+
+    def obtener(self, cotizacion_id: Optional[int]) -> Optional[CotizacionResumen]:
+        return self._documentos.get(cotizacion_id)
+
+    def _coincidencias(self, clave: str) -> Tuple[Set[int], List[Set[int]]]:
+        """(ids con la palabra exacta, conjuntos de ids de cada palabra que empieza por ella)"""
+        vocabulario = self._vocabulario_campos if ':' in clave else self._vocabulario
+        exactos = self._ids_por_clave.get(clave, set())
+        conjuntos: List[Set[int]] = []
+        posicion = bisect.bisect_left(vocabulario, clave)
+        while posicion < len(vocabulario) and vocabulario[posicion].startswith(clave):
+            conjuntos.append(self._ids_por_clave[vocabulario[posicion]])
+            posicion += 1
+        return exactos, conjuntos
+
+    @staticmethod
+    def _claves_consulta(texto: str) -> List[str]:
+        """Convierte la consulta en claves: 'palabra' o 'campo:palabra'"""
+        claves: List[str] = []
+        for parte in (texto or '').split():
+            campo, separador, valor = parte.partition(':')
+            campo = ALIAS_CAMPOS.get(campo.lower(), campo.lower())
+            if separador and campo in CAMPOS:
+                claves.extend(f"{campo}:{palabra}" for palabra in _normalizar(valor).split())
+                continue
+            for palabra in _normalizar(parte).split():
+                ct = _PATRON_CT.match(palabra)
+                claves.append(f"numero:{ct.group(1)}" if ct else palabra)
+        return claves
+
+    def _mas_recientes(self, candidatos: Set[int], limite: int, excluir: Tuple[Set[int], ...] = ()) -> List[int]:
+        """
+        Los 'limite' candidatos más recientes que no estén en 'excluir'. Con muchos
+        candidatos es más barato recorrer el orden de recencia y cortar al completar
+        (unos limite * total / candidatos pasos) que ordenarlos todos.
+        """
+        if limite <= 0 or not candidatos:
+            return []
+        if len(candidatos) ** 2 > limite * len(self._recencia):
+            elegidos = []
+            for negativo in self._recencia:
+                cotizacion_id = -negativo
+                if cotizacion_id in candidatos and not any(cotizacion_id in e for e in excluir):
+                    elegidos.append(cotizacion_id)
+                    if len(elegidos) == limite:
+                        break
+            return elegidos
+        return sorted(candidatos.difference(*excluir), reverse=True)[:limite]
+
+    def buscar(self, texto: Optional[str], limite: int = LIMITE_RESULTADOS) -> List[CotizacionResumen]:
+        """
+        Busca cotizaciones.
+
+        Args:
+            texto: Consulta (ver docstring del módulo). Vacía devuelve las más recientes.
+            limite: Número máximo de resultados
+
+        Returns:
+            List[CotizacionResumen]: Las cotizaciones encontradas, las más relevantes primero
+        """
+        claves = self._claves_consulta(texto or '')
+        if not claves:
+            return [self._documentos[-negativo] for negativo in self._recencia[:limite]]
+
+        # Primero las palabras más selectivas, para que las intersecciones se achiquen pronto.
+        # Los conjuntos del índice nunca se modifican: solo se leen o se intersecan.
+        coincidencias = sorted(
+            (self._coincidencias(clave) for clave in claves),
+            key=lambda c: sum(len(conjunto) for conjunto in c[1])
+        )
+        candidatos: Optional[Set[int]] = None
+        todos_exactos: Optional[Set[int]] = None
+        for exactos, conjuntos in coincidencias:
+            if not conjuntos:
+                return []
+            if candidatos is None:
+                candidatos = conjuntos[0] if len(conjuntos) == 1 else set().union(*conjuntos)
+            elif len(conjuntos) == 1:
+                candidatos = candidatos & conjuntos[0]
+            else:
+                # A ∩ (B1 ∪ B2 ...) = (A ∩ B1) ∪ (A ∩ B2) ...: cada intersección recorre el menor
+                candidatos = set().union(*(candidatos & conjunto for conjunto in conjuntos))
+            todos_exactos = exactos if todos_exactos is None else todos_exactos & exactos
+            if not candidatos:
+                return []
+
+        numero_exacto: Set[int] = set()
+        if len(claves) == 1:
+            numero = claves[0].split(':', 1)[-1]
+            if numero.isdigit():
+                numero_exacto = self._ids_por_clave.get(f"numero:{numero}", set()) & candidatos
+
+        elegidos = self._mas_recientes(numero_exacto, limite)
+        elegidos += self._mas_recientes(todos_exactos, limite - len(elegidos), (numero_exacto,))
+        elegidos += self._mas_recientes(candidatos, limite - len(elegidos), (numero_exacto, todos_exactos))
+        return [self._documentos[cotizacion_id] for cotizacion_id in elegidos]
@@ -1,6 +1,6 @@
 from __future__ import annotations
 from dataclasses import dataclass, field
-from typing import List, Dict, Optional, Any, Union, TYPE_CHECKING
+from typing import List, Dict, Optional, Any, Union, Iterable, Iterator, NamedTuple, Sequence, TYPE_CHECKING
 from decimal import Decimal
 from uuid import UUID
 from datetime import datetime
@@ -463,4 +463,233 @@ class Cotizacion:
         """Devuelve el nombre del perfil del comercial asociado"""
         perfil = self.perfil_comercial_info
         return perfil.get('nombre', "Desconocido") if perfil else "Desconocido"
-       
\ No newline at end of file
+       
+
+
+# --- Modelos compactos para listados ---
+#
+# Los listados (gestión de cotizaciones, dashboard, índice de búsqueda) pueden tener
+# decenas de miles de filas. Cotizacion lleva ~40 campos y relaciones anidadas y cada
+# instancia (como cada dict de PostgREST) arrastra su propio __dict__; para esos
+# caminos se usan tipos sin __dict__:
+#   - CotizacionResumen: NamedTuple de solo lectura (inmutable, compacta, se puede
+#     serializar con pickle para st.cache_data en cualquier versión de Python).
+#   - LoteCotizaciones: lote columnar (una lista por columna en vez de un dict por fila).
+#   - EscalaCompacta / PrecioEscalaCompacto: variantes con __slots__ de Escala y
+#     PrecioEscala para guardar muchas escalas en memoria.
+# Las cifras de memoria están en benchmarks/benchmark_memoria_listados.py.
+
+class CotizacionResumen(NamedTuple):
+    """Fila de solo lectura con los datos de una cotización que muestran los listados"""
+    id: int
+    numero_cotizacion: Optional[int] = None
+    identificador: Optional[str] = None
+    referencia: Optional[str] = None
+    cliente_nombre: Optional[str] = None
+    comercial_nombre: Optional[str] = None
+    fecha_creacion: Optional[str] = None
+    estado_id: Optional[int] = None
+    ajustes_modificados_admin: bool = False
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'CotizacionResumen':
+        """
+        Crea el resumen desde una fila de listado (RPC overview, get_visible_cotizaciones_list
+        o select con referencias_cliente anidado). Acepta 'cliente' como alias de
+        'cliente_nombre' y 'usuario_nombre' como alias de 'comercial_nombre'.
+        """
+        referencia = data.get('referencia')
+        cliente_nombre = data.get('cliente_nombre') or data.get('cliente')
+        anidada = data.get('referencias_cliente')
+        if isinstance(anidada, dict):
+            referencia = referencia or anidada.get('descripcion')
+            cliente_nombre = cliente_nombre or (anidada.get('clientes') or {}).get('nombre')
+        return cls(
+            id=data.get('id'),
+            numero_cotizacion=data.get('numero_cotizacion'),
+            identificador=data.get('identificador'),
+            referencia=referencia,
+            cliente_nombre=cliente_nombre,
+            comercial_nombre=data.get('comercial_nombre') or data.get('usuario_nombre'),
+            fecha_creacion=data.get('fecha_creacion'),
+            estado_id=data.get('estado_id'),
+            ajustes_modificados_admin=bool(data.get('ajustes_modificados_admin', False)),
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        return self._asdict()
+
+
+class LoteCotizaciones:
+    """
+    Lote columnar de filas de listado: una lista por columna.
+
+    Conserva todas las columnas que traigan las filas (no solo las de
+    CotizacionResumen), así que puede reemplazar a la lista de dicts en cualquier
+    listado y convertirse a DataFrame sin que pandas recorra dict por dict.
+    """
+    __slots__ = ('_columnas', '_filas')
+
+    def __init__(self, columnas: Optional[Dict[str, List[Any]]] = None):
+        self._columnas: Dict[str, List[Any]] = columnas or {}
+        longitudes = {len(valores) for valores in self._columnas.values()}
+        if len(longitudes) > 1:
+            raise ValueError(f"Las columnas del lote tienen longitudes distintas: {sorted(longitudes)}")
+        self._filas = longitudes.pop() if longitudes else 0
+
+    @classmethod
+    def from_filas(cls, filas: Iterable[Dict[str, Any]]) -> 'LoteCotizaciones':
+        """Convierte filas (dicts) a columnas en una sola pasada; las claves faltantes quedan en None"""
+        columnas: Dict[str, List[Any]] = {}
+        total = 0
+        for fila in filas:
+            for clave in fila:
+                if clave not in columnas:
+                    columnas[clave] = [None] * total
+            for clave, valores in columnas.items():
+                valores.append(fila.get(clave))
+            total += 1
+        lote = cls(columnas)
+        lote._filas = total
+        return lote
+
+    def __len__(self) -> int:
+        return self._filas
+
+    def __iter__(self) -> Iterator[CotizacionResumen]:
+        return (self.fila(i) for i in range(self._filas))
+
+    @property
+    def nombres_columnas(self) -> List[str]:
+        return list(self._columnas)
+
+    def columna(self, nombre: str) -> List[Any]:
+        """Valores de una columna (None en cada fila si no existe)"""
+        return self._columnas.get(nombre, [None] * self._filas)
+
+    def fila(self, posicion: int) -> CotizacionResumen:
+        """Resumen de la fila en la posición dada (se crea al pedirlo)"""
+        return CotizacionResumen.from_dict({nombre: valores[posicion] for nombre, valores in self._columnas.items()})
+
+    def seleccionar(self, ids: Sequence[int]) -> 'LoteCotizaciones':
+        """Nuevo lote con las filas de esos ids, en ese orden (ids inexistentes se omiten)"""
+        posicion_por_id = {cotizacion_id: i for i, cotizacion_id in enumerate(self.columna('id'))}
+        posiciones = [posicion_por_id[i] for i in ids if i in posicion_por_id]
+        return LoteCotizaciones({
+            nombre: [valores[p] for p in posiciones] for nombre, valores in self._columnas.items()
+        })
+
+    def to_dataframe(self):
+        """DataFrame con las mismas columnas (construido columna a columna)"""
+        import pandas as pd
+        return pd.DataFrame(self._columnas)
+
+
+@dataclass(init=False, eq=True)
+class PrecioEscalaCompacto:
+    """Variante con __slots__ de PrecioEscala (mismos campos, sin __dict__ por instancia)"""
+    __slots__ = ('id', 'escala_id', 'precio', 'tipo_precio', 'created_at', 'updated_at')
+    id: Optional[int]
+    escala_id: Optional[int]
+    precio: float
+    tipo_precio: str
+    created_at: Optional[datetime]
+    updated_at: Optional[datetime]
+
+    def __init__(self, id: Optional[int] = None, escala_id: Optional[int] = None, precio: float = 0.0,
+                 tipo_precio: str = 'normal', created_at: Optional[datetime] = None,
+                 updated_at: Optional[datetime] = None):
+        self.id = id
+        self.escala_id = escala_id
+        self.precio = precio
+        self.tipo_precio = tipo_precio
+        self.created_at = created_at
+        self.updated_at = updated_at
+
+    @classmethod
+    def from_precio(cls, precio: PrecioEscala) -> 'PrecioEscalaCompacto':
+        return cls(precio.id, precio.escala_id, precio.precio, precio.tipo_precio,
+                   precio.created_at, precio.updated_at)
+
+    def to_precio(self) -> PrecioEscala:
+        return PrecioEscala(self.id, self.escala_id, self.precio, self.tipo_precio,
+                            self.created_at, self.updated_at)
+
+
+@dataclass(init=False, eq=True)
+class EscalaCompacta:
+    """
+    Variante con __slots__ de Escala para listados y cachés con muchas escalas.
+    Mismos campos y métodos de consulta; from_escala/to_escala convierten entre ambas.
+    """
+    __slots__ = ('id', 'cotizacion_id', 'escala', 'valor_unidad', 'metros', 'tiempo_horas', 'montaje',
+                 'mo_y_maq', 'tintas', 'papel_lam', 'desperdicio_total', 'updated_at', 'precios')
+    id: Optional[int]
+    cotizacion_id: Optional[int]
+    escala: int
+    valor_unidad: float
+    metros: float
+    tiempo_horas: float
+    montaje: float
+    mo_y_maq: float
+    tintas: float
+    papel_lam: float
+    desperdicio_total: float
+    updated_at: Optional[datetime]
+    precios: List[PrecioEscalaCompacto]
+
+    def __init__(self, id: Optional[int] = None, cotizacion_id: Optional[int] = None, escala: int = 0,
+                 valor_unidad: float = 0.0, metros: float = 0.0, tiempo_horas: float = 0.0,
+                 montaje: float = 0.0, mo_y_maq: float = 0.0, tintas: float = 0.0, papel_lam: float = 0.0,
+                 desperdicio_total: float = 0.0, updated_at: Optional[datetime] = None,
+                 precios: Optional[List[PrecioEscalaCompacto]] = None):
+        self.id = id
+        self.cotizacion_id = cotizacion_id
+        self.escala = escala
+        self.valor_unidad = valor_unidad
+        self.metros = metros
+        self.tiempo_horas = tiempo_horas
+        self.montaje = montaje
+        self.mo_y_maq = mo_y_maq
+        self.tintas = tintas
+        self.papel_lam = papel_lam
+        self.desperdicio_total = desperdicio_total
+        self.updated_at = updated_at
+        self.precios = precios if precios is not None else []
+
+    @classmethod
+    def from_escala(cls, escala: Escala) -> 'EscalaCompacta':
+        return cls(
+            escala.id, escala.cotizacion_id, escala.escala, escala.valor_unidad, escala.metros,
+            escala.tiempo_horas, escala.montaje, escala.mo_y_maq, escala.tintas, escala.papel_lam,
+            escala.desperdicio_total, escala.updated_at,
+            [PrecioEscalaCompacto.from_precio(p) for p in escala.precios],
+        )
+
+    def to_escala(self) -> Escala:
+        return Escala(
+            id=self.id, cotizacion_id=self.cotizacion_id, escala=self.escala, valor_unidad=self.valor_unidad,
+            metros=self.metros, tiempo_horas=self.tiempo_horas, montaje=self.montaje, mo_y_maq=self.mo_y_maq,
+            tintas=self.tintas, papel_lam=self.papel_lam, desperdicio_total=self.desperdicio_total,
+            updated_at=self.updated_at, precios=[p.to_precio() for p in self.precios],
+        )
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'EscalaCompacta':
+        return cls.from_escala(Escala.from_dict(data))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return self.to_escala().to_dict()
+
+    def obtener_precio(self, tipo: str = 'normal') -> Optional[float]:
+        """Obtiene el precio más reciente de un tipo específico"""
+        precios_tipo = [p for p in self.precios if p.tipo_precio == tipo]
+        if not precios_tipo:
+            return None
+        return max(precios_tipo, key=lambda x: x.created_at or datetime.min).precio
+
+    @property
+    def precio_normal(self) -> float:
+        """Obtiene el precio normal más reciente"""
+        return self.obtener_precio('normal') or self.valor_unidad
+
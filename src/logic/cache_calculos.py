@@ -0,0 +1,185 @@
+"""
+Caché de resultados de cálculo compartida entre sesiones.
+
+Los comerciales vuelven a cotizar configuraciones idénticas (mismo material, ancho,
+avance, pistas, tintas y escalas para un cliente recurrente) y las recotizaciones
+repiten exactamente las entradas. El grafo de cálculo (grafo_cotizacion.py) solo evita
+recálculos dentro de una sesión; esta caché guarda los valores del grafo por un hash
+canónico de las entradas y los sirve a cualquier sesión del proceso.
+
+La clave incluye:
+    - todas las entradas del grafo (formulario + ajustes admin), normalizadas: números
+      como float (50 y 50.0 son la misma entrada), diccionarios con claves ordenadas,
+      las escalas en su orden (es el orden de los resultados);
+    - los precios que se usan en el cálculo (valor del material y del acabado), leídos
+      antes por el grafo de la sesión. Sus nodos de precio se vuelven a consultar cuando
+      cambia la versión del catálogo o vence TTL_PRECIOS (ver grafo_cotizacion.py), así
+      que un cambio de precio cambia la clave, a lo sumo con ese atraso si se hizo fuera
+      de la aplicación;
+    - la versión del dominio 'catalogo' de la caché de datos, leída antes que los precios
+      (los precios de la clave nunca son más viejos que su versión), de modo que las
+      entradas anteriores a un cambio de precio hecho desde la aplicación dejan de usarse.
+
+Si el catálogo cambia mientras se evalúa el grafo, el resultado se guarda bajo la clave
+de los precios con los que realmente se calculó.
+
+Los valores guardados son compartidos: quien los recibe no debe modificarlos
+(handle_calculation copia los resultados por escala antes de usarlos).
+"""
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import asdict, is_dataclass
+from decimal import Decimal
+from typing import Any, Dict, Optional, Tuple
+
+from src.data.cache_datos import cache_datos, CATALOGO
+from src.utils.bitacora import obtener_bitacora
+
+log = obtener_bitacora('calculos')
+
+MAX_ENTRADAS = 512
+TTL_RESULTADOS = 30 * 60  # segundos
+
+# Nodos del grafo que se guardan (los que usa handle_calculation)
+NODOS_RESULTADO = (
+    'geometria', 'mejor_opcion', 'acabado', 'valor_material', 'num_tintas_ajustado',
+    'rentabilidad', 'troquel', 'plancha', 'plan', 'resultados', 'curva_precio',
+)
+# Nodos que se evalúan antes de armar la clave (precios y ajuste de material)
+NODOS_PRECIO = ('valor_material', 'acabado')
+
+
+def _canonico(valor: Any) -> Any:
+    """Valor equivalente con representación estable para json.dumps"""
+    if valor is None or isinstance(valor, (bool, str)):
+        return valor
+    if isinstance(valor, (int, float, Decimal)):
+        return float(valor)
+    if isinstance(valor, dict):
+        return {str(k): _canonico(v) for k, v in valor.items()}
+    if isinstance(valor, (list, tuple)):
+        return [_canonico(v) for v in valor]
+    if is_dataclass(valor) and not isinstance(valor, type):
+        return _canonico(asdict(valor))
+    return str(valor)
+
+
+def clave_calculo(entradas: Dict[str, Any], precios: Dict[str, Any], version_precios: int = 0) -> str:
+    """
+    Hash SHA-256 de las entradas del grafo, los precios usados y la versión del catálogo.
+
+    Args:
+        entradas: Entradas del grafo (ver entradas_desde_formulario)
+        precios: Precios usados en el cálculo ({'valor_material': ..., 'valor_acabado': ...})
+        version_precios: Versión del dominio 'catalogo' (cache_datos.version)
+    """
+    canonico = {'entradas': _canonico(entradas), 'precios': _canonico(precios), 'version': version_precios}
+    texto = json.dumps(canonico, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+    return hashlib.sha256(texto.encode('utf-8')).hexdigest()
+
+
+class CacheCalculos:
+    """Resultados por clave de cálculo, con LRU acotado y vencimiento"""
+
+    def __init__(self, max_entradas: int = MAX_ENTRADAS, ttl: float = TTL_RESULTADOS):
+        self.max_entradas = max_entradas
+        self.ttl = ttl
+        self._entradas: 'OrderedDict[str, Tuple[float, Dict[str, Any]]]' = OrderedDict()  # clave -> (vence, valores)
+        self._lock = threading.Lock()
+        self.aciertos = 0
+        self.fallos = 0
+        self.descartadas = 0
+
+    def obtener(self, clave: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entrada = self._entradas.get(clave)
+            if entrada is not None and entrada[0] > time.monotonic():
+                self._entradas.move_to_end(clave)
+                self.aciertos += 1
+                return entrada[1]
+            if entrada is not None:
+                del self._entradas[clave]
+            self.fallos += 1
+            return None
+
+    def guardar(self, clave: str, valores: Dict[str, Any]) -> None:
+        with self._lock:
+            self._entradas[clave] = (time.monotonic() + self.ttl, valores)
+            self._entradas.move_to_end(clave)
+            while len(self._entradas) > self.max_entradas:
+                self._entradas.popitem(last=False)
+                self.descartadas += 1
+
+    def limpiar(self) -> None:
+        with self._lock:
+            self._entradas.clear()
+
+    def estadisticas(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.aciertos + self.fallos
+            return {
+                'entradas': len(self._entradas),
+                'max_entradas': self.max_entradas,
+                'aciertos': self.aciertos,
+                'fallos': self.fallos,
+                'descartadas': self.descartadas,
+                'tasa_aciertos': self.aciertos / total if total else 0.0,
+            }
+
+
+# Instancia única del proceso
+cache_calculos = CacheCalculos()
+
+
+def precios_valores(valores: Dict[str, Any]) -> Dict[str, Any]:
+    """Precios de la clave a partir de los valores de los nodos de precio"""
+    acabado = valores['acabado']
+    return {
+        'valor_material': valores['valor_material'],
+        'valor_acabado': acabado.valor if acabado else None,
+    }
+
+
+def precios_calculo(grafo, entradas: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Precios que entran en la clave (nodos de precio del grafo de la sesión, que los
+    vuelve a leer de la BD cuando cambia version_precios)
+    """
+    return precios_valores(grafo.evaluar(entradas, objetivos=NODOS_PRECIO))
+
+
+def evaluar_con_cache(grafo, entradas: Dict[str, Any], cache: Optional[CacheCalculos] = None) -> Dict[str, Any]:
+    """
+    Evalúa el grafo de cotización usando la caché compartida.
+
+    Primero lee la versión del catálogo y evalúa los nodos de precio (consultas a la
+    BD, memorizadas por el grafo de la sesión mientras la versión no cambie) para armar
+    la clave; si hay un resultado guardado se devuelve sin ejecutar las calculadoras,
+    si no se evalúa el grafo completo y se guarda.
+
+    Raises:
+        ValueError: Igual que GrafoCalculo.evaluar (los errores no se guardan)
+    """
+    cache = cache or cache_calculos
+    version = cache_datos.version(CATALOGO)
+    precios = precios_calculo(grafo, entradas)
+    clave = clave_calculo(entradas, precios, version)
+
+    valores = cache.obtener(clave)
+    if valores is not None:
+        log.debug('Caché de cálculos: resultado reutilizado (%s)', clave[:12])
+        return valores
+
+    version = cache_datos.version(CATALOGO)
+    evaluados = grafo.evaluar(entradas)
+    usados = precios_valores(evaluados)
+    if usados != precios:
+        # El grafo volvió a leer los precios (cambió el catálogo o venció su TTL)
+        log.info('Caché de cálculos: los precios cambiaron durante el cálculo, se guarda con los usados')
+        clave = clave_calculo(entradas, usados, version)
+    valores = {nombre: evaluados[nombre] for nombre in NODOS_RESULTADO}
+    cache.guardar(clave, valores)
+    return valores
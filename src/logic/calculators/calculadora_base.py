@@ -2,6 +2,7 @@
 Clase base para cálculos comunes entre CalculadoraLitografia y CalculadoraCostosEscala.
 """
 from typing import Dict
+from src.logic.calculators import kernel_precio
 from src.config.constants import (
     GAP_PISTAS_ETIQUETAS, GAP_PISTAS_MANGAS, GAP_FIJO, 
     AVANCE_FIJO, MM_COLOR
@@ -38,13 +39,13 @@ class CalculadoraBase:
                 - q3: Valor de Q3 (ancho total ajustado)
         """
         # Determinar C3 según tipo y pistas
-        c3 = GAP_PISTAS_MANGAS if es_manga or pistas <= 1 else self.GAP
+        c3 = kernel_precio.calcular_c3(pistas, es_manga)
         
         # Calcular D3 = ancho + C3
         d3 = ancho + c3
         
         # Calcular Q3 = D3 * pistas + C3
-        q3 = (d3 * pistas) + c3
+        q3 = kernel_precio.calcular_q3(ancho, pistas, es_manga)
         
         return {
             'c3': c3,
@@ -69,7 +70,7 @@ class CalculadoraBase:
         resultado_q3 = self.calcular_q3(ancho, pistas, es_manga)
         
         # Calcular S3 = GAP_FIJO + Q3
-        s3 = self.GAP_FIJO + resultado_q3['q3']
+        s3 = kernel_precio.calcular_s3(resultado_q3['q3'])
         
         # Agregar S3 al resultado
         resultado_q3['s3'] = s3
@@ -3,7 +3,11 @@ from typing import List, Dict, Tuple, Optional # Added Optional here
 import math
 import pandas as pd
 from src.logic.calculators.calculadora_base import CalculadoraBase
-from src.logic.calculators.calculadora_desperdicios import CalculadoraDesperdicio
+from src.logic.calculators import kernel_precio
+from src.logic.calculators.calculadora_desperdicios import CalculadoraDesperdicio, OpcionDesperdicio
+from src.logic.calculators.curva_precio import CurvaPrecio
+from src.logic.calculators.plan_precio import PlanPrecio
+from src.utils.perfilador import medir, CALCULO
 from src.config.constants import (
     VELOCIDAD_MAQUINA_NORMAL, MO_MONTAJE, MO_IMPRESION, MO_TROQUELADO,
     VALOR_GR_TINTA, RENTABILIDAD_ETIQUETAS, DESPERDICIO_ETIQUETAS,
@@ -98,6 +102,26 @@ class CalculadoraCostosEscala(CalculadoraBase):
             es_manga=es_manga
         )
 
+    @medir(CALCULO)
+    def obtener_opcion_montaje(self, datos: DatosEscala, es_manga: bool = False) -> OpcionDesperdicio:
+        """
+        Obtiene la unidad de montaje respetando la unidad elegida por el usuario (si existe).
+        Si no hay unidad elegida o no tiene una opción válida, usa la mejor opción global.
+        """
+        calculadora = self._get_calculadora_desperdicios(es_manga)
+        mejor_opcion = None
+        
+        # Si el usuario ha seleccionado una unidad específica, calcular las repeticiones óptimas para esa unidad
+        if getattr(datos, 'unidad_montaje_dientes', None) is not None:
+            mejor_opcion = calculadora.obtener_mejor_opcion_para_unidad(datos.avance, datos.unidad_montaje_dientes)
+                
+        # Si no se ha seleccionado unidad o no se encontró una opción válida, usar la mejor opción global
+        if mejor_opcion is None:
+            mejor_opcion = calculadora.obtener_mejor_opcion(datos.avance)
+        if not mejor_opcion:
+            raise ValueError("No se pudo determinar la unidad de montaje")
+        return mejor_opcion
+
     def _debug_datos_entrada(
         self,
         datos: DatosEscala,
@@ -209,7 +233,8 @@ class CalculadoraCostosEscala(CalculadoraBase):
             
         return ancho_redondeado, mensaje
         
-    def calcular_metros(self, escala: int, datos: DatosEscala, es_manga: bool = False) -> float:
+    def calcular_metros(self, escala: int, datos: DatosEscala, es_manga: bool = False,
+                        opcion: Optional[OpcionDesperdicio] = None) -> float:
         """
         Calcula los metros según la fórmula: (Escala / Pistas) * ((Avance_total + Desperdicio_unidad) / 1000)
         donde:
@@ -218,21 +243,7 @@ class CalculadoraCostosEscala(CalculadoraBase):
         """
         try:
             # 1. Obtener la opción de desperdicio según la unidad de montaje elegida (si existe)
-            calculadora = self._get_calculadora_desperdicios(es_manga)
-            mejor_opcion = None
-            
-            # Si el usuario ha seleccionado una unidad específica, calcular las repeticiones óptimas para esa unidad
-            if getattr(datos, 'unidad_montaje_dientes', None) is not None:
-                # Usar el nuevo método para obtener la mejor opción para esta unidad específica
-                opcion_unidad = calculadora.obtener_mejor_opcion_para_unidad(datos.avance, datos.unidad_montaje_dientes)
-                if opcion_unidad:
-                    mejor_opcion = opcion_unidad
-                    
-            # Si no se ha seleccionado unidad o no se encontró una opción válida, usar la mejor opción global
-            if mejor_opcion is None:
-                mejor_opcion = calculadora.obtener_mejor_opcion(datos.avance)
-            if not mejor_opcion:
-                raise ValueError("No se pudo determinar la unidad de montaje")
+            mejor_opcion = opcion if opcion is not None else self.obtener_opcion_montaje(datos, es_manga)
             
             # 2. Obtener el desperdicio por dientes
             desperdicio_unidad = mejor_opcion.desperdicio
@@ -241,7 +252,7 @@ class CalculadoraCostosEscala(CalculadoraBase):
             avance_total = datos.avance_total
             
             # 4. Cálculo de metros
-            metros = (escala / datos.pistas) * ((avance_total + desperdicio_unidad) / 1000)
+            metros = kernel_precio.metros(escala, datos.pistas, avance_total, desperdicio_unidad)
             
             print(f"\n=== CÁLCULO DE METROS ===")
             print(f"Escala: {escala}")
@@ -260,7 +271,7 @@ class CalculadoraCostosEscala(CalculadoraBase):
         
     def calcular_tiempo_horas(self, metros: float, datos: DatosEscala) -> float:
         """Calcula el tiempo en horas según la fórmula: metros / velocidad_maquina / 60"""
-        tiempo = metros / datos.velocidad_maquina / 60
+        tiempo = kernel_precio.tiempo_horas(metros, datos.velocidad_maquina)
         
         # Debug detallado
         debug_info = f"""
@@ -307,12 +318,12 @@ Cálculo:
             if num_tintas > 0:
                 # Si hay tintas, usar MO_Impresion
                 base_mo = datos.mo_impresion
-                resultado = base_mo if tiempo_horas < 1 else base_mo * tiempo_horas
+                resultado = kernel_precio.mo_y_maq(base_mo, tiempo_horas)
                 print(f"Etiqueta con tintas > 0: base_mo={base_mo:.2f}, resultado={resultado:.2f}")
             else:
                 # Si no hay tintas (tintas = 0), usar MO_Troquelado
                 base_mo = datos.mo_troquelado
-                resultado = base_mo if tiempo_horas < 1 else base_mo * tiempo_horas
+                resultado = kernel_precio.mo_y_maq(base_mo, tiempo_horas)
                 print(f"Etiqueta con tintas = 0: base_mo={base_mo:.2f}, resultado={resultado:.2f}")
             return resultado
         else:
@@ -320,7 +331,7 @@ Cálculo:
             # Se requiere agregar MO_SELLADO y MO_CORTE
             base_mo = datos.mo_impresion if num_tintas > 0 else datos.mo_troquelado
             total_mo = base_mo + MO_SELLADO + MO_CORTE
-            resultado = total_mo if tiempo_horas < 1 else total_mo * tiempo_horas
+            resultado = kernel_precio.mo_y_maq(total_mo, tiempo_horas)
             print(f"Manga: base_mo={base_mo:.2f}, + sellado/corte -> total_mo={total_mo:.2f}, resultado={resultado:.2f}")
             return resultado
 
@@ -334,7 +345,7 @@ Cálculo:
         # Costo fijo por número de tintas
         costo_fijo = CANTIDAD_TINTA_ESTANDAR * num_tintas * datos.valor_gr_tinta
         
-        total_tintas = costo_variable + costo_fijo
+        total_tintas = kernel_precio.tintas(escala, num_tintas, area_etiqueta, datos.valor_gr_tinta)
         
         print(f"\n=== CÁLCULO TINTAS ===")
         print(f"Área etiqueta: {area_etiqueta:.2f} mm²")
@@ -352,7 +363,7 @@ Cálculo:
             return 0
         
         costo_por_unidad = area_etiqueta * ((valor_material + valor_acabado) / 1000000)
-        papel_lam = costo_por_unidad * escala
+        papel_lam = kernel_precio.papel_lam(escala, area_etiqueta, valor_material, valor_acabado)
         
         print(f"\n=== CÁLCULO PAPEL/LAM ===")
         print(f"Área etiqueta: {area_etiqueta:.2f} mm²")
@@ -412,15 +423,9 @@ Cálculo:
         """
         self._validar_inputs(datos, num_tintas, es_manga)
         # 1. Desperdicio por tintas
-        if num_tintas > 0:
-            mm_totales = self.MM_COLOR * num_tintas
-            if s3_val is None:
-                s3 = self.GAP_FIJO + self.calcular_q3(ancho, datos.pistas, es_manga)['q3']
-            else:
-                s3 = s3_val
-            desperdicio_tintas = mm_totales * s3 * (valor_material / 1000000)
-        else:
-            desperdicio_tintas = 0
+        if s3_val is None:
+            s3_val = kernel_precio.calcular_s3(kernel_precio.calcular_q3(ancho, datos.pistas, es_manga))
+        desperdicio_tintas = kernel_precio.desperdicio_tintas(num_tintas, s3_val, valor_material)
         
         # 2. Desperdicio por material
         desperdicio_material = papel_lam * porcentaje_desperdicio
@@ -434,135 +439,48 @@ Cálculo:
         
         return desperdicio_total
         
-    def calcular_valor_plancha(self, datos: DatosEscala, num_tintas: int, es_manga: bool = False, q3_val: float = None, s3_val: float = None) -> float:
+    def calcular_valor_plancha(self, datos: DatosEscala, num_tintas: int, es_manga: bool = False, q3_val: float = None, s3_val: float = None,
+                               opcion: Optional[OpcionDesperdicio] = None) -> float:
         """
-        Calcula el valor de la plancha según la fórmula:
-            valor = (VALOR_MM_PLANCHA * S3 * S4 * num_tintas) / constante
-        Donde:
-            - S3 = GAP_FIJO + Q3 (ancho total ajustado)
-            - S4 = mm_unidad_montaje + AVANCE_FIJO
-            - constante = 10000000 si planchas_por_separado, 1 si no
+        Calcula el valor de la plancha (ver kernel_precio.precio_plancha).
         Args:
             datos (DatosEscala): Parámetros de la escala
             num_tintas (int): Número de tintas
             es_manga (bool): True si es manga
             q3_val (float, opcional): Q3 precalculado
             s3_val (float, opcional): S3 precalculado
+            opcion (OpcionDesperdicio, opcional): Unidad de montaje ya resuelta
         Returns:
             float: Valor de la plancha
         """
         self._validar_inputs(datos, num_tintas, es_manga)
         try:
-            # 1. Calcular Q3 (ancho total ajustado) solo si no se pasa
-            if q3_val is None or s3_val is None:
-                q3_result = self.calcular_q3(datos.ancho, datos.pistas, es_manga)
-                q3 = q3_result['q3']
-                s3 = self.GAP_FIJO + q3
-            else:
-                q3 = q3_val
-                s3 = s3_val
-            
-            # 3. Obtener medida de montaje respetando la unidad elegida
-            calculadora = self._get_calculadora_desperdicios(es_manga)
-            mejor_opcion = None
-            
-            # Si el usuario ha seleccionado una unidad específica, calcular las repeticiones óptimas para esa unidad
-            if getattr(datos, 'unidad_montaje_dientes', None) is not None:
-                # Usar el nuevo método para obtener la mejor opción para esta unidad específica
-                opcion_unidad = calculadora.obtener_mejor_opcion_para_unidad(datos.avance, datos.unidad_montaje_dientes)
-                if opcion_unidad:
-                    mejor_opcion = opcion_unidad
-                    
-            # Si no se ha seleccionado unidad o no se encontró una opción válida, usar la mejor opción global
-            if mejor_opcion is None:
-                mejor_opcion = calculadora.obtener_mejor_opcion(datos.avance)
-            if not mejor_opcion:
-                raise ValueError("No se pudo determinar la unidad de montaje")
-            mm_unidad_montaje = mejor_opcion.medida_mm
-            
-            # 4. Calcular S4 = mm_unidad_montaje + AVANCE_FIJO
-            s4 = mm_unidad_montaje + 30  # AVANCE_FIJO = 30
-            
-            # 5. Calcular precio sin aplicar constante
-            precio_sin_constante = self.VALOR_MM_PLANCHA * s3 * s4 * num_tintas
-            
-            # 6. Determinar constante según si las planchas se cobran por separado
-            constante = 10000000 if datos.planchas_por_separado else 1
-            
-            # 7. Calcular precio final
-            precio = precio_sin_constante / constante
-            
-            print("\n=== CÁLCULO DE PLANCHA ===")
-            print(f"VALOR_MM: ${self.VALOR_MM_PLANCHA}/mm")
-            print(f"S3: {s3} mm")
-            print(f"S4: {s4} mm")
-            print(f"Número de tintas: {num_tintas}")
-            print(f"Planchas por separado: {datos.planchas_por_separado}")
-            print(f"Constante: {constante}")
-            print(f"Precio sin constante: ${precio_sin_constante:.2f}")
-            print(f"Precio final: ${precio:.2f}")
-            
+            if s3_val is None:
+                s3_val = kernel_precio.calcular_s3(kernel_precio.calcular_q3(datos.ancho, datos.pistas, es_manga))
+            mejor_opcion = opcion if opcion is not None else self.obtener_opcion_montaje(datos, es_manga)
+            precio, _ = kernel_precio.precio_plancha(
+                s3_val, mejor_opcion.medida_mm, num_tintas, datos.planchas_por_separado, self.VALOR_MM_PLANCHA
+            )
+            print(f"Plancha: S3 {s3_val} mm, montaje {mejor_opcion.medida_mm} mm, {num_tintas} tintas, "
+                  f"por separado {datos.planchas_por_separado} -> ${precio:.2f}")
             return precio
-            
+
         except Exception as e:
             print(f"Error en cálculo de plancha: {str(e)}")
             return 0
 
-    def calcular_valor_troquel(self, datos: DatosEscala, es_manga: bool = False, tipo_grafado_id: Optional[int] = None) -> float: # Added tipo_grafado_id
+    def calcular_valor_troquel(self, datos: DatosEscala, es_manga: bool = False, tipo_grafado_id: Optional[int] = None,
+                               opcion: Optional[OpcionDesperdicio] = None) -> float:
         """
-        Calcula el valor del troquel según la fórmula del código original
+        Calcula el valor del troquel (ver kernel_precio.valor_troquel y factor_division_troquel)
         """
         try:
-            # Constantes
-            FACTOR_BASE = 25 * 5000  # 125,000
-            VALOR_MINIMO = 700000
-            
-            # Calcular valor base
-            perimetro = (datos.ancho + datos.avance) * 2
-            calculadora = self._get_calculadora_desperdicios(es_manga)
-            repeticiones = None
-            
-            # Si el usuario ha seleccionado una unidad específica, calcular las repeticiones óptimas para esa unidad
-            if getattr(datos, 'unidad_montaje_dientes', None) is not None:
-                # Usar el nuevo método para obtener la mejor opción para esta unidad específica
-                mejor_opcion = calculadora.obtener_mejor_opcion_para_unidad(datos.avance, datos.unidad_montaje_dientes)
-                if mejor_opcion:
-                    repeticiones = mejor_opcion.repeticiones
-            
-            # Si no se ha seleccionado unidad o no se encontró una opción válida, usar la mejor opción global
-            if repeticiones is None:
-                repeticiones = calculadora.obtener_mejor_opcion(datos.avance).repeticiones
-            valor_base = perimetro * datos.pistas * repeticiones * 100  # valor_mm = 100
-            valor_calculado = max(VALOR_MINIMO, valor_base)
-
-            # Determinar factor de división CORRECTAMENTE
-            if es_manga:
-                # --- DEBUGGING ---
-                print(f"DEBUG (costos_escala): Received tipo_grafado_id = {repr(tipo_grafado_id)} (Type: {type(tipo_grafado_id)})")
-                # --- END DEBUGGING ---
-                # Lógica para mangas usando ID
-                factor_division = 1 if tipo_grafado_id == 4 else 2
-                print(f"ES MANGA (costos_escala) - Tipo grafado ID: {tipo_grafado_id}")
-            else:
-                # Lógica para etiquetas
-                factor_division = 2 if datos.troquel_existe else 1
-                print("ES ETIQUETA (costos_escala)")
-                print(f"Troquel existe: {datos.troquel_existe}")
-
-            print(f"Factor división seleccionado (costos_escala): {factor_division}")
-
-            # Calcular valor final
-            valor_final = (FACTOR_BASE + valor_calculado) / factor_division
-
-            print("\n=== CÁLCULO TROQUEL (costos_escala) ===")
-            print(f"Perimetro: {perimetro:,.2f} mm")
-            print(f"Valor base: ${valor_base:,.2f}")
-            print(f"Valor calculado (max con mínimo): ${valor_calculado:,.2f}")
-            print(f"FACTOR_BASE: ${FACTOR_BASE:,.2f}")
-            print(f"Troquel existe: {datos.troquel_existe}")
-            print(f"Factor división: {factor_division}")
-            print(f"Valor final: ${valor_final:,.2f}")
-
+            mejor_opcion = opcion if opcion is not None else self.obtener_opcion_montaje(datos, es_manga)
+            factor_division = kernel_precio.factor_division_troquel(es_manga, tipo_grafado_id, datos.troquel_existe)
+            valor_final = kernel_precio.valor_troquel(
+                datos.ancho, datos.avance, datos.pistas, mejor_opcion.repeticiones, factor_division
+            )
+            print(f"Troquel (costos_escala): factor división {factor_division}, valor final ${valor_final:,.2f}")
             return valor_final
 
         except Exception as e:
@@ -664,165 +582,62 @@ Cálculo:
             return 0
         
     def calcular_desperdicio_tintas(self, dados: DatosEscala, num_tintas: int, valor_material: float, es_manga: bool = False) -> Dict:
-        print(f"DEBUG (desp_tintas): Received valor_material = {valor_material}")
-        # Validaciones iniciales
+        """
+        Calcula el desperdicio de tintas (ver kernel_precio.desperdicio_tintas).
+        Returns:
+            Dict: {'desperdicio_tintas': valor, 'detalles': {'s3': ...}}
+        """
         if num_tintas <= 0 or valor_material <= 0:
             return {
                 'desperdicio_tintas': 0,
                 'detalles': {}
             }
 
-        # Constantes
-        MM_COLOR = 30000  # mm por color
-        GAP_FIJO = 50  # R3 es 50 tanto para mangas como etiquetas
-
-        print("\n========== CÁLCULO DETALLADO DE DESPERDICIO DE TINTAS ==========")
-        print(f"1. Constante MM_COLOR = {MM_COLOR}")
-
-        # Calcular mm totales
-        mm_totales = MM_COLOR * num_tintas
-        print(f"2. MM Totales (S7) = MM_COLOR * num_tintas = {MM_COLOR} * {num_tintas} = {mm_totales}")
-
-        # Usar el ancho que ya viene ajustado
-        B3 = dados.ancho  # El ancho ya viene ajustado desde el cálculo anterior
-        
-        # Para mangas: no hay gap entre pistas
-        # Para etiquetas: gap = 0 si pistas = 1, gap = GAP_PISTAS_ETIQUETAS si pistas > 1
-        C3 = 0 if (es_manga or dados.pistas == 1) else GAP_PISTAS_ETIQUETAS
-
-        print(f"3. Uso de ancho ya ajustado:")
-        print(f"   - B3 (ancho ajustado): {B3} mm")
-        print(f"   - Es manga: {es_manga}")
-        print(f"   - Pistas: {dados.pistas}")
-        print(f"   - C3 (GAP): {C3} mm")
-
-        # Calcular D3 (ancho + GAP)
-        D3 = B3 + C3
-        
-        # Calcular E3 (pistas)
-        E3 = dados.pistas
-
-        # Calcular Q3
-        Q3 = (D3 * E3) + C3
-
-        print(f"4. Cálculo de Q3:")
-        print(f"   - B3 (ancho): {B3} mm")
-        print(f"   - D3 (ancho + GAP): {D3} mm")
-        print(f"   - E3 (pistas): {E3}")
-        print(f"   - Q3 = (D3 * pistas + C3) = ({D3} * {E3} + {C3}) = {Q3} mm")
-
-        # Calcular S3
-        S3 = GAP_FIJO + Q3
-        print(f"5. GAP_FIJO (R3) = {GAP_FIJO} mm")
-        print(f"6. S3 = GAP_FIJO + Q3 = {GAP_FIJO} + {Q3} = {S3} mm")
-
-        # Calcular factor de conversión
-        print(f"7. Valor material (received): ${valor_material}/m²")
-        factor = valor_material / 1000000
-        print(f"8. Factor de conversión (O7) = valor_material / 1000000 = {valor_material} / 1000000 = {factor:.8f}")
-
-        # Calcular desperdicio de tintas
-        desperdicio_tintas = mm_totales * S3 * factor
-        print(f"9. Cálculo final:")
-        print(f"   Desperdicio tintas = S7 * S3 * O7")
-        print(f"   Desperdicio tintas = MM_Totales * S3 * Factor")
-        print(f"   Desperdicio tintas = {mm_totales} * {S3} * {factor:.8f} = ${desperdicio_tintas:.2f}")
+        s3 = kernel_precio.calcular_s3(kernel_precio.calcular_q3(dados.ancho, dados.pistas, es_manga))
+        desperdicio_tintas = kernel_precio.desperdicio_tintas(num_tintas, s3, valor_material)
+        print(f"Desperdicio tintas: {num_tintas} tintas, S3 {s3} mm, material ${valor_material}/m² "
+              f"-> ${desperdicio_tintas:.2f}")
 
-        # Retornar diccionario con más detalles
         return {
             'desperdicio_tintas': desperdicio_tintas,
-            'detalles': {
-                'mm_totales': mm_totales,
-                'q3': Q3,
-                'c3': C3,
-                'd3': D3,
-                's3': S3,
-                'factor': factor,
-                'formula': 'desperdicio_tintas = mm_totales * s3 * factor',
-                'ancho': B3,
-                'pistas': E3,
-                'es_manga': es_manga
-            }
+            'detalles': {'s3': s3}
         }
-        
-    def calcular_area_etiqueta(self, datos: DatosEscala, num_tintas: int, es_manga: bool = False, q3_val: float = None, s3_val: float = None) -> Dict:
+
+    def calcular_area_etiqueta(self, datos: DatosEscala, num_tintas: int, es_manga: bool = False, q3_val: float = None, s3_val: float = None,
+                               opcion: Optional[OpcionDesperdicio] = None) -> Dict:
         """
-        Calcula el área de la etiqueta.
-        Fórmula:
-            - Si num_tintas == 0: área = (Q3/E3) * (Q4/E4)
-            - Si num_tintas > 0: área = (S3/E3) * (Q4/E4)
+        Calcula el área de la etiqueta (ver kernel_precio.area_etiqueta).
         Args:
             datos (DatosEscala): Parámetros de la escala
             num_tintas (int): Número de tintas
             es_manga (bool): True si es manga
             q3_val (float, opcional): Q3 precalculado
             s3_val (float, opcional): S3 precalculado
+            opcion (OpcionDesperdicio, opcional): Unidad de montaje ya resuelta
         Returns:
             Dict: {'area': valor, 'detalles': ...}
         """
         self._validar_inputs(datos, num_tintas, es_manga)
         try:
-            # 1. Obtener Q3/S3 usando el método base solo si no se pasa
-            if q3_val is None or s3_val is None:
-                q3_result = self.calcular_q3(datos.ancho, datos.pistas, es_manga)
-                q3 = q3_result['q3']
-                s3 = self.GAP_FIJO + q3
-            else:
-                q3 = q3_val
-                s3 = s3_val
-            
-            # 3. Obtener mejor opción de desperdicio respetando unidad elegida (si existe)
-            calculadora = self._get_calculadora_desperdicios(es_manga)
-            mejor_opcion = None
-            
-            # Si el usuario ha seleccionado una unidad específica, calcular las repeticiones óptimas para esa unidad
-            if getattr(datos, 'unidad_montaje_dientes', None) is not None:
-                # Usar el nuevo método para obtener la mejor opción para esta unidad específica
-                opcion_unidad = calculadora.obtener_mejor_opcion_para_unidad(datos.avance, datos.unidad_montaje_dientes)
-                if opcion_unidad:
-                    mejor_opcion = opcion_unidad
-                    
-            # Si no se ha seleccionado unidad o no se encontró una opción válida, usar la mejor opción global
-            if mejor_opcion is None:
-                mejor_opcion = calculadora.obtener_mejor_opcion(datos.avance)
-            if not mejor_opcion:
-                raise ValueError("No se pudo determinar la unidad de montaje")
-            
-            # 4. Calcular área según fórmula basada en número de tintas
-            if num_tintas == 0:
-                area_ancho = q3/datos.pistas
-                formula_usada = 'Q3/E3 * Q4/E4'
-            else:
-                area_ancho = s3/datos.pistas
-                formula_usada = 'S3/E3 * Q4/E4'
-            
-            area_largo = mejor_opcion.medida_mm/mejor_opcion.repeticiones
-            area = area_ancho * area_largo
-            
-            print(f"\n=== CÁLCULO DE ÁREA DE ETIQUETA ===")
-            print(f"Q3: {q3:.2f} mm")
-            print(f"S3: {s3:.2f} mm")
-            print(f"Pistas (E3): {datos.pistas}")
-            print(f"Medida montaje (Q4): {mejor_opcion.medida_mm:.2f} mm")
-            print(f"Repeticiones (E4): {mejor_opcion.repeticiones}")
-            print(f"Área ancho: {area_ancho:.2f} mm")
-            print(f"Área largo: {area_largo:.2f} mm")
-            print(f"Área total: {area:.2f} mm²")
-            print(f"Fórmula usada: {formula_usada}")
-            
+            q3 = q3_val if q3_val is not None else kernel_precio.calcular_q3(datos.ancho, datos.pistas, es_manga)
+            s3 = s3_val if s3_val is not None else kernel_precio.calcular_s3(q3)
+            mejor_opcion = opcion if opcion is not None else self.obtener_opcion_montaje(datos, es_manga)
+            area = kernel_precio.area_etiqueta(
+                q3, s3, datos.pistas, mejor_opcion.medida_mm, mejor_opcion.repeticiones, num_tintas
+            )
+            print(f"Área etiqueta: Q3 {q3:.2f}, S3 {s3:.2f}, montaje {mejor_opcion.medida_mm:.2f} mm "
+                  f"/ {mejor_opcion.repeticiones} -> {area:.2f} mm²")
+
             return {
                 'area': area,
                 'detalles': {
                     'q3': q3,
                     's3': s3,
-                    'area_ancho': area_ancho,
-                    'area_largo': area_largo,
-                    'formula_usada': formula_usada,
                     'medida_montaje': mejor_opcion.medida_mm,
                     'repeticiones': mejor_opcion.repeticiones
                 }
             }
-            
+
         except Exception as e:
             print(f"Error en cálculo de área de etiqueta: {str(e)}")
             return {
@@ -831,6 +646,7 @@ Cálculo:
                 'detalles': None
             }
 
+    @medir(CALCULO)
     def calcular_costos_por_escala(
         self, 
         datos: DatosEscala, 
@@ -841,7 +657,8 @@ Cálculo:
         valor_acabado: float,
         es_manga: bool = False,
         tipo_grafado_id: Optional[int] = None, # Added tipo_grafado_id here
-        acabado_id: Optional[int] = None # Añadido acabado_id
+        acabado_id: Optional[int] = None, # Añadido acabado_id
+        plan: Optional[PlanPrecio] = None
     ) -> List[Dict]:
         """
         Calcula los costos por escala para un producto.
@@ -856,6 +673,7 @@ Cálculo:
             es_manga (bool): True si es manga, False si es etiqueta
             tipo_grafado_id (Optional[int]): ID del tipo de grafado
             acabado_id (Optional[int]): ID del acabado seleccionado
+            plan (Optional[PlanPrecio]): Plan ya preparado con preparar_plan (evita recalcularlo)
 
         Returns:
             List[Dict]: Lista de resultados por cada escala, con los siguientes campos:
@@ -878,122 +696,209 @@ Cálculo:
             >>> print(resultados[0]['valor_unidad'])
         """
         try:
-            # Simplemente mantenemos el valor de tintas que viene desde afuera
-            # IMPORTANTE: Asumimos que el ajuste por acabados especiales YA FUE REALIZADO
+            # IMPORTANTE: Asumimos que el ajuste de tintas por acabados especiales YA FUE REALIZADO
             # en app_calculadora_costos.py
-            num_tintas_original = num_tintas  # Para registro y debugging
-            num_tintas_interno = num_tintas   # Usar el valor que ya viene ajustado si era necesario
-            
             print(f"\n=== INFORMACIÓN DE TINTAS ===")
             print(f"- Tintas recibidas: {num_tintas}")
             print(f"- Acabado ID: {acabado_id}")
             print(f"- Es manga: {es_manga}")
             print(f"- NO se realiza ajuste interno de tintas (debe venir ya ajustado desde app_calculadora_costos.py)")
             
-            # Validar entradas con el número de tintas recibido
-            self._validar_inputs(datos, num_tintas_interno, es_manga)
-            
-            # Calcular Q3/S3 una sola vez
-            q3_result = self.calcular_q3(datos.ancho, datos.pistas, es_manga)
-            q3 = q3_result['q3']
-            s3 = self.GAP_FIJO + q3
-
-            # Calcular valor de plancha y troquel si no se proporcionan
-            if valor_plancha is None:
-                valor_plancha = self.calcular_valor_plancha(datos, num_tintas_interno, es_manga, q3, s3)
-            if valor_troquel is None:
-                # Pass tipo_grafado_id to the internal method call
-                valor_troquel = self.calcular_valor_troquel(datos, es_manga, tipo_grafado_id) # Pass the ID
-            # Ensure they are floats after potential calculation or if passed as 0 initially
-           
-            valor_troquel = float(valor_troquel) if valor_troquel is not None else 0.0
-
-            # Calcular área de etiqueta si no está establecida
-            if datos.area_etiqueta <= 0:
-                calculo_area = self.calcular_area_etiqueta(datos, num_tintas_interno, es_manga, q3, s3)
-                if 'error' in calculo_area:
-                    raise ValueError(f"Error calculando área: {calculo_area['error']}")
-                datos.set_area_etiqueta(calculo_area['area'])
+            # Todo lo que no depende de la escala se calcula una sola vez
+            if plan is None:
+                plan = self.preparar_plan(
+                    datos, num_tintas, valor_plancha, valor_troquel, valor_material, valor_acabado,
+                    es_manga, tipo_grafado_id
+                )
 
             # Debug detallado de datos de entrada
             self._debug_datos_entrada(
-                datos, num_tintas_interno, valor_plancha, valor_troquel, valor_material, valor_acabado, es_manga
+                datos, num_tintas, plan.valor_plancha, plan.valor_troquel, valor_material, valor_acabado, es_manga
             )
-            
-            resultados = []
-            porcentaje_desperdicio = datos.porcentaje_desperdicio / 100
-            print("\n=== INICIO CÁLCULO DE COSTOS POR ESCALA ===")
-            print(f"Datos de entrada:")
-            print(f"- Número de tintas: {num_tintas_interno} (ya incluye ajustes si los había)")
-            print(f"- Acabado ID: {acabado_id}")
-            print(f"- Valor plancha: ${valor_plancha:.2f}")
-            print(f"- Valor troquel: ${valor_troquel:.2f}")
-            print(f"- Valor material: ${valor_material:.6f}/mm²")
-            print(f"- Valor acabado: ${valor_acabado:.6f}/mm²")
-            print(f"- Es manga: {es_manga}")
-            print(f"- Porcentaje desperdicio: {porcentaje_desperdicio * 100}%")
-            print(f"- Área etiqueta: {datos.area_etiqueta:.2f} mm²")
-            if datos.area_etiqueta <= 0:
+            if plan.area_etiqueta <= 0:
                 print("ADVERTENCIA: El área de etiqueta es cero o negativa. Esto afectará los cálculos.")
-            for escala in datos.escalas:
-                print(f"\n=== CÁLCULO PARA ESCALA: {escala:,} ===")
-                metros = self.calcular_metros(escala, datos, es_manga)
-                print(f"Metros lineales: {metros:.2f}")
-                tiempo_horas = self.calcular_tiempo_horas(metros, datos)
-                print(f"Tiempo en horas: {tiempo_horas:.2f}")
-                montaje = self.calcular_montaje(num_tintas_interno, datos)
-                print(f"Montaje: ${montaje:.2f}")
-                mo_y_maq = self.calcular_mo_y_maq(tiempo_horas, num_tintas_interno, datos, es_manga)
-                print(f"MO y Maq: ${mo_y_maq:.2f}")
-                print(f"Área etiqueta para cálculo de tintas: {datos.area_etiqueta:.2f} mm²")
-                tintas = self.calcular_tintas(escala, num_tintas_interno, datos.area_etiqueta, datos)
-                print(f"Tintas: ${tintas:.2f}")
-                print(f"Área etiqueta para cálculo de papel_lam: {datos.area_etiqueta:.2f} mm²")
-                papel_lam = self.calcular_papel_lam(escala, datos.area_etiqueta, valor_material, valor_acabado)
-                print(f"Papel/lam: ${papel_lam:.2f}")
-                desperdicio_porcentaje = papel_lam * porcentaje_desperdicio
-                print(f"Desperdicio porcentaje ({porcentaje_desperdicio * 100}%): ${desperdicio_porcentaje:.2f}")
-                if num_tintas_interno > 0:
-                    resultado_desperdicio = self.calcular_desperdicio_tintas(
-                        dados=datos,
-                        num_tintas=num_tintas_interno,
-                        valor_material=valor_material,
-                        es_manga=es_manga
-                    )
-                    desperdicio_tintas = resultado_desperdicio['desperdicio_tintas']
-                    desperdicio_tintas_detalles = resultado_desperdicio['detalles']
-                else:
-                    desperdicio_tintas = 0
-                    desperdicio_tintas_detalles = {}
-                desperdicio_total = desperdicio_porcentaje + desperdicio_tintas
-                print(f"Desperdicio total: ${desperdicio_total:.2f} = ${desperdicio_porcentaje:.2f} + ${desperdicio_tintas:.2f}")
-                suma_costos = montaje + mo_y_maq + tintas + papel_lam + desperdicio_total
-                print(f"Suma de costos variables: ${suma_costos:.2f}")
-                valor_unidad = self.calcular_valor_unidad_full(
-                    suma_costos, datos, escala, valor_plancha, valor_troquel
-                )
-                print(f"Valor por unidad: ${valor_unidad:.6f}")
-                resultados.append({
-                    'escala': escala,
-                    'valor_unidad': valor_unidad,
-                    'metros': metros,
-                    'tiempo_horas': tiempo_horas,
-                    'montaje': montaje,
-                    'mo_y_maq': mo_y_maq,
-                    'tintas': tintas,
-                    'papel_lam': papel_lam,
-                    'desperdicio': desperdicio_total,
-                    'desperdicio_tintas': desperdicio_tintas,
-                    'desperdicio_porcentaje': desperdicio_porcentaje,
-                    'desperdicio_total': desperdicio_total,
-                    'num_tintas': num_tintas_original,  # Guardar número original de tintas
-                    'num_tintas_interno': num_tintas_interno,  # Guardar número ajustado de tintas
-                    'ancho': datos.ancho,
-                    'avance': datos.avance,
-                    'porcentaje_desperdicio': porcentaje_desperdicio
-                })
-            return resultados
+
+            return [self.calcular_escala(plan, escala) for escala in datos.escalas]
         except Exception as e:
             import traceback
             traceback.print_exc()
             raise ValueError(f"Error en cálculo de costos: {str(e)}")
+
+    @medir(CALCULO)
+    def preparar_plan(
+        self,
+        datos: DatosEscala,
+        num_tintas: int,
+        valor_plancha: Optional[float],
+        valor_troquel: Optional[float],
+        valor_material: float,
+        valor_acabado: float,
+        es_manga: bool = False,
+        tipo_grafado_id: Optional[int] = None
+    ) -> PlanPrecio:
+        """
+        Precalcula todos los valores de la cotización que no dependen de la escala.
+
+        Resuelve Q3/S3, la unidad de montaje (una sola búsqueda), plancha y troquel (si
+        vienen en None), área de etiqueta (si no está establecida en datos) y desperdicio
+        de tintas.
+
+        Args:
+            Los mismos de calcular_costos_por_escala
+
+        Returns:
+            PlanPrecio: Plan inmutable para aplicar en calcular_escala
+        """
+        self._validar_inputs(datos, num_tintas, es_manga)
+
+        # Calcular Q3/S3 una sola vez
+        q3 = kernel_precio.calcular_q3(datos.ancho, datos.pistas, es_manga)
+        s3 = kernel_precio.calcular_s3(q3)
+
+        # Unidad de montaje una sola vez (respeta la unidad elegida)
+        mejor_opcion = self.obtener_opcion_montaje(datos, es_manga)
+
+        # Calcular valor de plancha y troquel si no se proporcionan
+        if valor_plancha is None:
+            valor_plancha = self.calcular_valor_plancha(datos, num_tintas, es_manga, q3, s3, opcion=mejor_opcion)
+        if valor_troquel is None:
+            valor_troquel = self.calcular_valor_troquel(datos, es_manga, tipo_grafado_id, opcion=mejor_opcion)
+
+        # Calcular área de etiqueta si no está establecida
+        if datos.area_etiqueta <= 0:
+            calculo_area = self.calcular_area_etiqueta(datos, num_tintas, es_manga, q3, s3, opcion=mejor_opcion)
+            if 'error' in calculo_area:
+                raise ValueError(f"Error calculando área: {calculo_area['error']}")
+            datos.set_area_etiqueta(calculo_area['area'])
+
+        # El desperdicio de tintas no depende de la escala
+        desperdicio_tintas = 0
+        if num_tintas > 0:
+            desperdicio_tintas = self.calcular_desperdicio_tintas(
+                dados=datos, num_tintas=num_tintas, valor_material=valor_material, es_manga=es_manga
+            )['desperdicio_tintas']
+
+        # MO base (ver calcular_mo_y_maq): mangas agregan sellado y corte
+        mo_base = datos.mo_impresion if num_tintas > 0 else datos.mo_troquelado
+        if es_manga:
+            mo_base = mo_base + MO_SELLADO + MO_CORTE
+
+        # Rentabilidad en decimal (ver calcular_valor_unidad_full)
+        rentabilidad = datos.rentabilidad / 100.0 if datos.rentabilidad >= 1 else datos.rentabilidad
+
+        return PlanPrecio(
+            es_manga=es_manga,
+            num_tintas=num_tintas,
+            pistas=datos.pistas,
+            ancho=datos.ancho,
+            avance=datos.avance,
+            avance_total=datos.avance_total,
+            q3=q3,
+            s3=s3,
+            dientes=mejor_opcion.dientes,
+            medida_mm=mejor_opcion.medida_mm,
+            repeticiones=mejor_opcion.repeticiones,
+            desperdicio_unidad=mejor_opcion.desperdicio,
+            area_etiqueta=datos.area_etiqueta,
+            valor_plancha=valor_plancha if valor_plancha is not None else 0.0,
+            valor_troquel=valor_troquel if valor_troquel is not None else 0.0,
+            valor_material=valor_material,
+            valor_acabado=valor_acabado,
+            desperdicio_tintas=desperdicio_tintas,
+            velocidad_maquina=datos.velocidad_maquina,
+            mo_montaje=datos.mo_montaje,
+            mo_base=mo_base,
+            valor_gr_tinta=datos.valor_gr_tinta,
+            porcentaje_desperdicio=datos.porcentaje_desperdicio / 100,
+            rentabilidad=rentabilidad
+        )
+
+    @medir(CALCULO)
+    def calcular_escala(self, plan: PlanPrecio, escala: int) -> Dict:
+        """
+        Aplica a una escala los términos que dependen de la cantidad.
+
+        Usa las funciones de kernel_precio (las mismas de calcular_metros,
+        calcular_tiempo_horas, calcular_mo_y_maq, calcular_tintas, calcular_papel_lam y
+        calcular_valor_unidad_full) con los valores invariantes del plan.
+
+        Returns:
+            Dict: Resultado de la escala (mismas claves que calcular_costos_por_escala)
+        """
+        metros = kernel_precio.metros(escala, plan.pistas, plan.avance_total, plan.desperdicio_unidad)
+        tiempo_horas = kernel_precio.tiempo_horas(metros, plan.velocidad_maquina)
+        montaje = plan.montaje
+        mo_y_maq = kernel_precio.mo_y_maq(plan.mo_base, tiempo_horas)
+        tintas = kernel_precio.tintas(escala, plan.num_tintas, plan.area_etiqueta, plan.valor_gr_tinta)
+        papel_lam = kernel_precio.papel_lam(escala, plan.area_etiqueta, plan.valor_material, plan.valor_acabado)
+
+        desperdicio_porcentaje = papel_lam * plan.porcentaje_desperdicio
+        desperdicio_total = desperdicio_porcentaje + plan.desperdicio_tintas
+        suma_costos = montaje + mo_y_maq + tintas + papel_lam + desperdicio_total
+
+        valor_unidad = kernel_precio.valor_unidad(
+            suma_costos, plan.rentabilidad, escala, plan.valor_plancha + plan.valor_troquel
+        )
+
+        print(f"Escala {escala:,}: metros={metros:.2f}, t(h)={tiempo_horas:.2f}, MO y Maq=${mo_y_maq:.2f}, "
+              f"tintas=${tintas:.2f}, papel/lam=${papel_lam:.2f}, desperdicio=${desperdicio_total:.2f}, "
+              f"valor unidad=${valor_unidad:.6f}")
+
+        return {
+            'escala': escala,
+            'valor_unidad': valor_unidad,
+            'metros': metros,
+            'tiempo_horas': tiempo_horas,
+            'montaje': montaje,
+            'mo_y_maq': mo_y_maq,
+            'tintas': tintas,
+            'papel_lam': papel_lam,
+            'desperdicio': desperdicio_total,
+            'desperdicio_tintas': plan.desperdicio_tintas,
+            'desperdicio_porcentaje': desperdicio_porcentaje,
+            'desperdicio_total': desperdicio_total,
+            'num_tintas': plan.num_tintas,  # Número de tintas recibido
+            'num_tintas_interno': plan.num_tintas,  # Número usado en los cálculos (ya ajustado)
+            'ancho': plan.ancho,
+            'avance': plan.avance,
+            'porcentaje_desperdicio': plan.porcentaje_desperdicio
+        }
+
+    @medir(CALCULO)
+    def compilar_curva_precio(
+        self,
+        datos: DatosEscala,
+        num_tintas: int,
+        valor_plancha: Optional[float],
+        valor_troquel: Optional[float],
+        valor_material: float,
+        valor_acabado: float,
+        es_manga: bool = False,
+        tipo_grafado_id: Optional[int] = None
+    ) -> CurvaPrecio:
+        """
+        Compila la curva de precio en forma cerrada para la configuración dada.
+
+        Recibe los mismos argumentos que calcular_costos_por_escala y parte del mismo plan,
+        de modo que curva.valor_unidad(escala) coincide con el 'valor_unidad' de cada escala.
+
+        Returns:
+            CurvaPrecio: Coeficientes de la curva (ver curva_precio.py)
+        """
+        try:
+            plan = self.preparar_plan(
+                datos, num_tintas, valor_plancha, valor_troquel, valor_material, valor_acabado,
+                es_manga, tipo_grafado_id
+            )
+            curva = CurvaPrecio.desde_plan(plan)
+
+            print("\n=== CURVA DE PRECIO ===")
+            print(f"Escala de quiebre MO (t(h) = 1): {curva.escala_quiebre:,.0f}")
+            print(f"Tramo bajo: {curva.coeficientes(tramo_alto=False)}")
+            print(f"Tramo alto: {curva.coeficientes(tramo_alto=True)}")
+
+            return curva
+        except Exception as e:
+            import traceback
+            traceback.print_exc()
+            raise ValueError(f"Error compilando curva de precio: {str(e)}")
@@ -3,6 +3,8 @@ from typing import Optional, Dict, List, Tuple
 import math
 from src.logic.calculators.calculadora_desperdicios import CalculadoraDesperdicio, OpcionDesperdicio
 from src.logic.calculators.calculadora_base import CalculadoraBase
+from src.logic.calculators import kernel_precio
+from src.utils.perfilador import medir, CALCULO
 from src.config.constants import (
     GAP_PISTAS_ETIQUETAS, GAP_AVANCE_ETIQUETAS, ANCHO_MAXIMO_LITOGRAFIA,
     VALOR_MM_PLANCHA, INCREMENTO_ANCHO_SIN_TINTAS, INCREMENTO_ANCHO_TINTAS
@@ -148,6 +150,7 @@ class CalculadoraLitografia(CalculadoraBase):
         calculadora = self._get_calculadora_desperdicios(es_manga)
         return calculadora.generar_reporte(datos.avance)
 
+    @medir(CALCULO)
     def obtener_mejor_opcion_desperdicio(self, datos: DatosLitografia, es_manga: bool = False) -> Optional[OpcionDesperdicio]:
         """
         Obtiene la mejor opción de desperdicio según el tipo de producto
@@ -197,23 +200,20 @@ class CalculadoraLitografia(CalculadoraBase):
     #     mejor_opcion = self.obtener_mejor_opcion_desperdicio(datos, es_manga)
     #     return mejor_opcion.dientes
 
-    def calcular_precio_plancha(self, datos: DatosLitografia, num_tintas: int = 0, es_manga: bool = False) -> Dict:
+    @medir(CALCULO)
+    def calcular_precio_plancha(self, datos: DatosLitografia, num_tintas: int = 0, es_manga: bool = False,
+                                opcion: Optional[OpcionDesperdicio] = None) -> Dict:
         """
-        Calcula el precio de la plancha basado en dimensiones y número de tintas.
+        Calcula el precio de la plancha (ver kernel_precio.precio_plancha).
         
-        El cálculo se basa en la fórmula:
-        precio = (VALOR_MM_PLANCHA * S3 * S4 * num_tintas) / constante
-        
-        Donde:
-        - S3 = GAP_FIJO + Q3 (ancho total ajustado con gap fijo)
-        - S4 = mm_unidad_montaje + AVANCE_FIJO (largo total ajustado)
-        - Q3 = resultado de _calcular_q3 (ancho total con gaps entre pistas)
-        - constante = 10000000 si planchas por separado (planchas_por_separado=True), 1 si no (planchas_por_separado=False)
+        En la interfaz, "Planchas por separado" = "Sí" se traduce a planchas_por_separado=True,
+        que divide el precio por kernel_precio.CONSTANTE_PLANCHAS_SEPARADAS.
         
         Args:
             datos: Objeto DatosLitografia con los datos necesarios
             num_tintas: Número de tintas (colores)
             es_manga: True si es manga, False si es etiqueta
+            opcion: Unidad de montaje ya resuelta (si no se pasa, se busca la mejor opción)
             
         Returns:
             Dict con el precio calculado y detalles del cálculo
@@ -222,92 +222,30 @@ class CalculadoraLitografia(CalculadoraBase):
             ValueError: Si no se puede determinar la unidad de montaje
         """
         try:
-            print("\n=== INICIO CÁLCULO DE PLANCHA ===")
-            print(f"Datos de entrada:")
-            print(f"- Ancho: {datos.ancho} mm")
-            print(f"- Pistas: {datos.pistas}")
-            print(f"- Número de tintas: {num_tintas}")
-            print(f"- Es manga: {es_manga}")
-            print(f"- Incluye planchas: {datos.planchas_por_separado}")
-            
-            # 1. Calcular Q3 (ancho total ajustado) usando el método auxiliar
-            q3_result = self._calcular_q3(num_tintas, datos.ancho, datos.pistas, es_manga)
-            q3 = q3_result['q3']
-            c3 = q3_result['c3']
-            d3 = q3_result['d3']
-            
-            # 2. Calcular S3 = GAP_FIJO + Q3 (ancho total con gap fijo)
-            s3 = self.GAP_FIJO + q3
-            
-            # 3. Obtener mm de la unidad de montaje (para S4)
-            mejor_opcion = self.obtener_mejor_opcion_desperdicio(datos, es_manga)
+            q3 = kernel_precio.calcular_q3(datos.ancho, datos.pistas, es_manga)
+            s3 = kernel_precio.calcular_s3(q3)
+            mejor_opcion = opcion if opcion is not None else self.obtener_mejor_opcion_desperdicio(datos, es_manga)
             if not mejor_opcion:
                 raise ValueError("No se pudo determinar la unidad de montaje")
-            mm_unidad_montaje = mejor_opcion.medida_mm
-            
-            # 4. Calcular S4 = mm_unidad_montaje + AVANCE_FIJO (largo total)
-            s4 = mm_unidad_montaje + self.AVANCE_FIJO
-            
-            # 5. Calcular precio sin aplicar constante
-            precio_sin_constante = self.VALOR_MM_PLANCHA * s3 * s4 * num_tintas
-            
-            # 6. Determinar constante según si las planchas se cobran por separado
-            # NOTA: En la interfaz, "Planchas por separado" = "Sí" se traduce a planchas_por_separado=True
-            # Si planchas_por_separado es True, significa que las planchas se cobran por separado y la constante debe ser 10000000
-            # Si planchas_por_separado es False, significa que las planchas se incluyen en el cálculo y la constante debe ser 1
-            constante = 10000000 if datos.planchas_por_separado else 1
-            
-            # 7. Calcular precio final
-            precio = precio_sin_constante / constante
-            
-            # Imprimir información detallada para depuración
-            print("\n=== CÁLCULO DE PLANCHA ===")
-            print(f"VALOR_MM: ${self.VALOR_MM_PLANCHA}/mm")
-            print(f"B3 (Ancho): {datos.ancho} mm")
-            print(f"C3 (GAP): {c3} mm")
-            print(f"D3 (ancho + C3): {d3} mm")
-            print(f"E3 (pistas): {datos.pistas}")
-            print(f"Q3 (D3*E3+C3): {q3} mm")
-            print(f"Gap fijo (R3): {self.GAP_FIJO} mm")
-            print(f"S3 (Total): {s3} mm")
-            print(f"Unidad montaje: {mm_unidad_montaje} mm")
-            print(f"Avance fijo: {self.AVANCE_FIJO} mm")
-            print(f"S4 (Unidad + Avance): {s4} mm")
-            print(f"Número de tintas: {num_tintas}")
-            print(f"Planchas por separado: {datos.planchas_por_separado}")
-            print(f"Constante: {constante}")
-            print(f"Precio sin constante: ${precio_sin_constante:.2f}")
-            print(f"Precio final: ${precio:.2f}")
-            
-            # Verificar si el precio es razonable (validación)
-            if precio_sin_constante > 0 and num_tintas > 0:
-                precio_por_tinta = precio_sin_constante / num_tintas
-                print(f"Precio por tinta: ${precio_por_tinta:.2f}")
-                
-                if precio_por_tinta < 10000 or precio_por_tinta > 1000000:
-                    print(f"ADVERTENCIA: El precio por tinta parece inusual: ${precio_por_tinta:.2f}")
-            
-            # Preparar detalles para el retorno
-            detalles = {
-                'valor_mm': self.VALOR_MM_PLANCHA,
-                'gap_fijo': self.GAP_FIJO,
-                'avance_fijo': self.AVANCE_FIJO,
-                'mm_unidad_montaje': mm_unidad_montaje,
-                's3': s3,
-                's4': s4,
-                'q3': q3,
-                'c3': c3,
-                'd3': d3,
-                'num_tintas': num_tintas,
-                'es_manga': es_manga,
-                'planchas_por_separado': datos.planchas_por_separado,
-                'constante': constante,
-                'precio_sin_constante': precio_sin_constante
-            }
+            precio, precio_sin_constante = kernel_precio.precio_plancha(
+                s3, mejor_opcion.medida_mm, num_tintas, datos.planchas_por_separado, self.VALOR_MM_PLANCHA
+            )
+            print(f"Plancha: Q3 {q3} mm, S3 {s3} mm, montaje {mejor_opcion.medida_mm} mm, {num_tintas} tintas, "
+                  f"por separado {datos.planchas_por_separado} -> ${precio:.2f}")
             
             return {
                 'precio': precio,
-                'detalles': detalles
+                'detalles': {
+                    'valor_mm': self.VALOR_MM_PLANCHA,
+                    'gap_fijo': self.GAP_FIJO,
+                    'avance_fijo': self.AVANCE_FIJO,
+                    'mm_unidad_montaje': mejor_opcion.medida_mm,
+                    'q3': q3,
+                    's3': s3,
+                    'num_tintas': num_tintas,
+                    'planchas_por_separado': datos.planchas_por_separado,
+                    'precio_sin_constante': precio_sin_constante
+                }
             }
             
         except Exception as e:
@@ -318,12 +256,13 @@ class CalculadoraLitografia(CalculadoraBase):
                 'detalles': None
             }
 
+    @medir(CALCULO)
     def calcular_valor_troquel(self, datos: DatosLitografia, repeticiones: int, 
                             valor_mm: float = 100, troquel_existe: bool = False, 
                             tipo_grafado_id: Optional[int] = None, 
                             es_manga: bool = False) -> Dict:
         """
-        Calcula el valor del troquel según el tipo de producto y grafado ID.
+        Calcula el valor del troquel (ver kernel_precio.valor_troquel).
         Para mangas:
         - Si tipo_grafado_id es 4 (Horizontal Total + Vertical), factor_division = 1
         - Para otros tipos de grafado, factor_division = 2
@@ -332,65 +271,18 @@ class CalculadoraLitografia(CalculadoraBase):
         - Si troquel_existe = False, factor_division = 1
         """
         try:
-            # Constantes
-            FACTOR_BASE = 25 * 5000  # 125,000
-            VALOR_MINIMO = 700000
-            
-            # Debug inicial
-            print("\n=== INICIO CÁLCULO TROQUEL ===")
-            print(f"Tipo grafado ID recibido: {tipo_grafado_id}")
-            print(f"Es manga: {es_manga}")
-            print(f"Ancho: {datos.ancho}, Avance: {datos.avance}, Pistas: {datos.pistas}")
-            print(f"Repeticiones: {repeticiones}, Valor_mm: {valor_mm}")
-            
-            # Calcular valor base
-            perimetro = (datos.ancho + datos.avance) * 2
-            valor_base = perimetro * datos.pistas * repeticiones * valor_mm
-            valor_calculado = max(VALOR_MINIMO, valor_base)
-            
-            # Determinar si es manga y el factor de división
-            if es_manga:
-                # Lógica específica para mangas usando ID
-                # Si tipo_grafado_id es 4 (Horizontal Total + Vertical), factor_division = 1
-                # Para otros tipos de grafado, factor_division = 2
-                factor_division = 1 if tipo_grafado_id == 4 else 2
-                print(f"ES MANGA - Tipo grafado ID: {tipo_grafado_id}")
-                print(f"Factor división seleccionado: {factor_division}")
-            else:
-                # Lógica para etiquetas
-                factor_division = 2 if troquel_existe else 1
-                print("ES ETIQUETA")
-                print(f"Troquel existe: {troquel_existe}")
-                print(f"Factor división seleccionado: {factor_division}")
-            
-            # Calcular valor final
-            valor_final = (FACTOR_BASE + valor_calculado) / factor_division
-            
-            # Asegurar que el valor final nunca sea cero
-            if valor_final <= 0:
-                print("ADVERTENCIA: Valor final <= 0, usando valor mínimo")
-                valor_final = VALOR_MINIMO
-            
-            print(f"Perimetro: {perimetro:,.2f} mm")
-            print(f"Valor base: ${valor_base:,.2f}")
-            print(f"Valor calculado (max con mínimo): ${valor_calculado:,.2f}")
-            print(f"FACTOR_BASE: ${FACTOR_BASE:,.2f}")
-            print(f"Suma antes de división: ${(FACTOR_BASE + valor_calculado):,.2f}")
-            print(f"Factor de división aplicado: {factor_division}")
-            print(f"Valor final después de división: ${valor_final:,.2f}")
+            factor_division = kernel_precio.factor_division_troquel(es_manga, tipo_grafado_id, troquel_existe)
+            valor_final = kernel_precio.valor_troquel(
+                datos.ancho, datos.avance, datos.pistas, repeticiones, factor_division, valor_mm
+            )
+            print(f"Troquel: factor división {factor_division}, valor final ${valor_final:,.2f}")
             
             return {
                 'valor': valor_final,
                 'detalles': {
-                    'perimetro': perimetro,
-                    'valor_base': valor_base,
-                    'valor_minimo': VALOR_MINIMO,
-                    'valor_calculado': valor_calculado,
-                    'factor_base': FACTOR_BASE,
                     'factor_division': factor_division,
                     'es_manga': es_manga,
                     'tipo_grafado_id': tipo_grafado_id if es_manga else None,
-                    'suma_antes_division': FACTOR_BASE + valor_calculado,
                     'valor_final': valor_final
                 }
             }
@@ -399,28 +291,18 @@ class CalculadoraLitografia(CalculadoraBase):
             # En caso de error, retornar el valor mínimo en lugar de None
             return {
                 'error': str(e),
-                'valor': VALOR_MINIMO,
+                'valor': kernel_precio.VALOR_MINIMO_TROQUEL,
                 'detalles': {
                     'error': str(e),
-                    'valor_minimo_usado': VALOR_MINIMO
+                    'valor_minimo_usado': kernel_precio.VALOR_MINIMO_TROQUEL
                 }
             }
 
+    @medir(CALCULO)
     def calcular_area_etiqueta(self, datos: DatosLitografia, num_tintas: int, 
                               medida_montaje: float, repeticiones: int, es_manga: bool = False) -> Dict:
         """
-        Calcula el área de la etiqueta basada en dimensiones y configuración.
-        
-        El cálculo del área depende del número de tintas:
-        - Si num_tintas = 0: area = (Q3/E3) * (Q4/E4)
-        - Si num_tintas > 0: area = (S3/E3) * (Q4/E4)
-        
-        Donde:
-        - Q3 = Ancho total ajustado (calculado por _calcular_q3)
-        - S3 = GAP_FIJO + Q3 (ancho total con gap fijo)
-        - E3 = Número de pistas
-        - Q4 = Medida de montaje en mm
-        - E4 = Número de repeticiones
+        Calcula el área de la etiqueta (ver kernel_precio.area_etiqueta).
         
         Args:
             datos: Objeto DatosLitografia con los datos necesarios
@@ -433,83 +315,20 @@ class CalculadoraLitografia(CalculadoraBase):
             Dict con el área calculada y los valores intermedios utilizados
         """
         try:
-            # 1. Definir parámetros comunes
-            q4 = medida_montaje  # Medida de montaje
-            e4 = repeticiones    # Número de repeticiones
-            e3 = datos.pistas    # Número de pistas
-            
-            # 2. Calcular Q3 usando el método auxiliar
-            q3_result = self._calcular_q3(num_tintas, datos.ancho, e3, es_manga)
-            q3 = q3_result['q3']
-            c3 = q3_result['c3']
-            d3 = q3_result['d3']
-            
-            # 3. Calcular S3 = GAP_FIJO + Q3
-            s3 = self.GAP_FIJO + q3
-            
-            # 4. Calcular ancho total para etiquetas (solo para información adicional)
-            f3 = None
-            f3_detalles = None
-            if not es_manga:
-                f3 = self.calcular_ancho_total(num_tintas, e3, datos.ancho)
-                
-                # Calcular detalles de f3 para depuración
-                C3_f3 = 0 if e3 <= 1 else self.GAP
-                D3_f3 = datos.ancho + C3_f3
-                base_f3 = (e3 * D3_f3) - C3_f3
-                incremento_f3 = 10 if num_tintas == 0 else 20
-                f3_sin_redondeo = base_f3 + incremento_f3
-                f3_redondeado = math.ceil(f3_sin_redondeo / 10) * 10
-                
-                f3_detalles = {
-                    'c3_f3': C3_f3,
-                    'd3_f3': D3_f3,
-                    'base_f3': base_f3,
-                    'incremento_f3': incremento_f3,
-                    'f3_sin_redondeo': f3_sin_redondeo,
-                    'f3_redondeado': f3_redondeado
-                }
-            
-            # 5. Calcular área según fórmula basada en número de tintas
-            if num_tintas == 0:
-                area_ancho = q3/e3
-                formula_usada = 'Q3/E3 * Q4/E4'
-                calculo_detallado = f"({q3}/{e3}) * ({q4}/{e4})"
-            else:
-                area_ancho = s3/e3
-                formula_usada = 'S3/E3 * Q4/E4'
-                calculo_detallado = f"({s3}/{e3}) * ({q4}/{e4})"
-                
-                area_largo = q4/e4
-                area = area_ancho * area_largo
-            
-            # 6. Preparar detalles del cálculo
-            detalles = {
-                'q3': q3,
-                'c3': c3,
-                'd3': d3,
-                's3': s3,
-                'q4': q4,
-                'e3': e3,
-                'e4': e4,
-                'gap_fijo': self.GAP_FIJO,
-                'formula_usada': formula_usada,
-                'area_ancho': area_ancho,
-                'area_largo': area_largo,
-                'calculo_detallado': calculo_detallado,
-                'es_manga': es_manga
-            }
-            
-            # Agregar detalles específicos para etiquetas
-            if not es_manga and f3 is not None:
-                detalles.update({
-                    'f3': f3,
-                    'f3_detalles': f3_detalles
-                })
+            q3 = kernel_precio.calcular_q3(datos.ancho, datos.pistas, es_manga)
+            s3 = kernel_precio.calcular_s3(q3)
+            area = kernel_precio.area_etiqueta(q3, s3, datos.pistas, medida_montaje, repeticiones, num_tintas)
             
             return {
                 'area': area,
-                'detalles': detalles
+                'detalles': {
+                    'q3': q3,
+                    's3': s3,
+                    'q4': medida_montaje,
+                    'e3': datos.pistas,
+                    'e4': repeticiones,
+                    'es_manga': es_manga
+                }
             }
         except Exception as e:
             print(f"Error en cálculo de área de etiqueta: {str(e)}")
@@ -555,6 +374,7 @@ class CalculadoraLitografia(CalculadoraBase):
                 'detalles': None
             }
             
+    @medir(CALCULO)
     def generar_reporte_completo(self, datos: DatosLitografia, num_tintas: int, es_manga: bool = False) -> Dict:
         """Genera un reporte completo con todos los cálculos"""
         try:
@@ -685,8 +505,7 @@ class CalculadoraLitografia(CalculadoraBase):
                     "ancho_total": detalles.get("ancho_total"),
                     "mm_unidad_montaje": detalles.get("mm_unidad_montaje"),
                     "s3": detalles.get("s3"),
-                    "s4": detalles.get("s4"),
-                    "formula": f"{detalles.get('valor_mm')} * {detalles.get('s3')} * {detalles.get('s4')} * {detalles.get('num_tintas')}",
+                    "formula": f"{detalles.get('valor_mm')} * {detalles.get('s3')} * ({detalles.get('mm_unidad_montaje')} + {detalles.get('avance_fijo')}) * {detalles.get('num_tintas')}",
                     "resultado": calculo_plancha.get("precio")
                 }
             
@@ -751,7 +570,8 @@ class CalculadoraLitografia(CalculadoraBase):
             debug_info["error"] = str(e)
             return debug_info
 
-    def calcular_desperdicio_por_escala(self, datos: DatosLitografia, num_tintas: int, valor_material_mm2: float, escala: int, es_manga: bool = False) -> Dict:
+    def calcular_desperdicio_por_escala(self, datos: DatosLitografia, num_tintas: int, valor_material_mm2: float, escala: int, es_manga: bool = False,
+                                        s3: Optional[float] = None, area_etiqueta: Optional[float] = None) -> Dict:
         """
         Calcula el desperdicio por escala según la fórmula:
         
@@ -769,13 +589,15 @@ class CalculadoraLitografia(CalculadoraBase):
             - s7 = mm por color (30000 * num_tintas)
             - o7 = precio por mm² del material
             - Papel/lam = área_etiqueta * valor_material_mm2 * escala
+
+        s3 y area_etiqueta no dependen de la escala: si se proporcionan (ver
+        calcular_desperdicio_escala_completo) no se recalculan plancha ni área.
         """
         try:
-            # 1. Obtener S3 del cálculo de planchas
-            calculo_plancha = self.calcular_precio_plancha(datos, num_tintas, es_manga)
-            
-            # Verificar si calculo_plancha tiene la estructura esperada
-            if isinstance(calculo_plancha, dict) and ('error' in calculo_plancha or 'detalles' not in calculo_plancha):
+            # 1. Obtener S3 del cálculo de planchas (si no viene precalculado)
+            if s3 is None:
+                s3 = self._obtener_s3_plancha(datos, num_tintas, es_manga)
+            if s3 is None:
                 return {
                     'error': 'No se pudo calcular el precio de plancha correctamente',
                     'valor': 0,
@@ -788,31 +610,22 @@ class CalculadoraLitografia(CalculadoraBase):
                     }
                 }
             
-            s3 = calculo_plancha['detalles']['s3']
-            
             # 2. Calcular S7 (mm por color)
-            s7 = 30000 * num_tintas if num_tintas > 0 else 0
+            s7 = self.MM_COLOR * num_tintas if num_tintas > 0 else 0
             
             # 3. O7 es el precio por mm² del material
             o7 = valor_material_mm2 / 1000000  # Convertir a millones
             
             if es_manga:
                 # Para mangas, el desperdicio es simplemente S7 * S3 * O7
-                desperdicio_total = s7 * s3 * o7
+                desperdicio_total = kernel_precio.desperdicio_tintas(num_tintas, s3, valor_material_mm2)
             else:
                 # 4. Primera parte: (s3 * s7 * o7)
-                primera_parte = s3 * s7 * o7
+                primera_parte = kernel_precio.desperdicio_tintas(num_tintas, s3, valor_material_mm2)
                 
                 # 5. Calcular papel/lam directamente sin usar CalculadoraCostosEscala
-                mejor_opcion = self.obtener_mejor_opcion_desperdicio(datos, es_manga)
-                calculo_area = self.calcular_area_etiqueta(
-                    datos, 
-                    num_tintas, 
-                    mejor_opcion.medida_mm, 
-                    mejor_opcion.repeticiones,
-                    es_manga
-                )
-                area_etiqueta = calculo_area['area']
+                if area_etiqueta is None:
+                    area_etiqueta = self._obtener_area_desperdicio(datos, num_tintas, es_manga)
                 papel_lam = area_etiqueta * valor_material_mm2 * escala
                 
                 # 6. Segunda parte: 10% del papel/lam
@@ -886,14 +699,16 @@ class CalculadoraLitografia(CalculadoraBase):
         escalas = [1000, 2000, 3000, 5000]
         resultados_desperdicio = {}
         
-        # Obtener S3 una sola vez para todas las escalas
-        calculo_plancha = self.calcular_precio_plancha(datos, num_tintas, es_manga)
-        
-        # Verificar si calculo_plancha tiene la estructura esperada
-        if isinstance(calculo_plancha, dict) and ('error' in calculo_plancha or 'detalles' not in calculo_plancha):
+        # Obtener S3 y área una sola vez para todas las escalas
+        s3 = self._obtener_s3_plancha(datos, num_tintas, es_manga)
+        if s3 is None:
             return {'error': 'No se pudo calcular el precio de plancha correctamente'}
-        
-        s3 = calculo_plancha['detalles']['s3']
+        area_etiqueta = None
+        if not es_manga:
+            try:
+                area_etiqueta = self._obtener_area_desperdicio(datos, num_tintas, es_manga)
+            except Exception as e:
+                print(f"Error al calcular área para desperdicio: {str(e)}")
         
         print("\n=== RESUMEN DE DESPERDICIOS POR ESCALA ===")
         print(f"Tipo: {'MANGA' if es_manga else 'ETIQUETA'}")
@@ -902,11 +717,33 @@ class CalculadoraLitografia(CalculadoraBase):
         print(f"Valor material: ${valor_material_mm2}/mm²\n")
         
         for escala in escalas:
-            resultado = self.calcular_desperdicio_por_escala(datos, num_tintas, valor_material_mm2, escala, es_manga)
+            resultado = self.calcular_desperdicio_por_escala(
+                datos, num_tintas, valor_material_mm2, escala, es_manga,
+                s3=s3, area_etiqueta=area_etiqueta
+            )
             resultados_desperdicio[escala] = resultado
         
         return resultados_desperdicio
 
+    def _obtener_s3_plancha(self, datos: DatosLitografia, num_tintas: int, es_manga: bool) -> Optional[float]:
+        """Obtiene S3 del cálculo de planchas. Devuelve None si el cálculo falla."""
+        calculo_plancha = self.calcular_precio_plancha(datos, num_tintas, es_manga)
+        if isinstance(calculo_plancha, dict) and ('error' in calculo_plancha or 'detalles' not in calculo_plancha):
+            return None
+        return calculo_plancha['detalles']['s3']
+
+    def _obtener_area_desperdicio(self, datos: DatosLitografia, num_tintas: int, es_manga: bool) -> float:
+        """Área de etiqueta con la mejor opción de desperdicio (usada para papel/lam)"""
+        mejor_opcion = self.obtener_mejor_opcion_desperdicio(datos, es_manga)
+        calculo_area = self.calcular_area_etiqueta(
+            datos, 
+            num_tintas, 
+            mejor_opcion.medida_mm, 
+            mejor_opcion.repeticiones,
+            es_manga
+        )
+        return calculo_area['area']
+
     def obtener_input_numerico(self, mensaje: str, minimo: float = 0.1) -> float:
         """Obtiene un input numérico con validación"""
         while True:
@@ -943,10 +780,3 @@ class CalculadoraLitografia(CalculadoraBase):
             }
         except Exception as e:
             return {'error': str(e)}
-
-    def _calcular_q3(self, num_tintas: int, ancho: float, pistas: int, es_manga: bool = False) -> Dict:
-        """
-        Método auxiliar para calcular Q3, C3 y D3 para cálculos de área y precio.
-        Este método es un wrapper del método de la clase base para mantener compatibilidad.
-        """
-        return self.calcular_q3(ancho, pistas, es_manga)
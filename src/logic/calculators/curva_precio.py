@@ -0,0 +1,181 @@
+"""
+Curva de precio en forma cerrada para una cotización.
+
+Para una configuración fija (material, tintas, montaje, rentabilidad, plancha y troquel)
+el valor por unidad que produce CalculadoraCostosEscala depende de la escala de forma
+analítica:
+
+    valor_unidad(q) = costo_fijo / q + costo_variable
+
+con dos tramos separados por el quiebre de MO y Maq (t(h) < 1 cobra la hora mínima):
+
+    - Tramo bajo  (q < escala_quiebre): MO y Maq es un costo fijo (base_mo)
+    - Tramo alto  (q >= escala_quiebre): MO y Maq crece con q (base_mo * horas_por_unidad * q)
+
+Con estos coeficientes se puede evaluar el valor por unidad en cualquier cantidad sin
+repetir el cálculo completo por escala.
+"""
+from dataclasses import dataclass, asdict, fields
+from typing import Dict, List, Any, Optional
+
+from src.config.constants import FACTOR_TINTA_AREA, CANTIDAD_TINTA_ESTANDAR
+from src.logic.calculators.plan_precio import PlanPrecio
+
+# Versión del formato persistido (en parametros_especiales['curva_precio'])
+VERSION_CURVA_PRECIO = 1
+
+
+@dataclass
+class CurvaPrecio:
+    """
+    Coeficientes de la curva de precio de una cotización.
+
+    Los componentes crudos (montaje, tintas, papel/lam, etc.) se guardan junto a los
+    coeficientes para poder auditar la curva y reconstruir cada término.
+    """
+    # Componentes de costo (antes de rentabilidad)
+    montaje: float
+    mo_base: float  # MO Impresión/Troquelado (+ sellado y corte en mangas)
+    metros_por_unidad: float  # (Avance_total + Desperdicio_unidad) / 1000 / Pistas
+    velocidad_maquina: float
+    tintas_fijo: float
+    tintas_por_unidad: float
+    papel_lam_por_unidad: float
+    porcentaje_desperdicio: float  # En decimal (ej: 0.10)
+    desperdicio_tintas: float
+    # Parámetros de precio
+    rentabilidad: float  # En decimal (ej: 0.40)
+    valor_plancha: float = 0.0
+    valor_troquel: float = 0.0
+    version: int = VERSION_CURVA_PRECIO
+
+    def __post_init__(self):
+        """Asegurar floats nativos (los valores de la tabla de desperdicio llegan como numpy)"""
+        for f in fields(self):
+            if f.name != 'version':
+                setattr(self, f.name, float(getattr(self, f.name)))
+
+    @property
+    def horas_por_unidad(self) -> float:
+        """Horas de máquina por unidad producida"""
+        if self.velocidad_maquina <= 0:
+            return 0.0
+        return self.metros_por_unidad / self.velocidad_maquina / 60
+
+    @property
+    def factor_rentabilidad(self) -> float:
+        """Factor (1 - rentabilidad) por el que se divide la suma de costos"""
+        return 1 - self.rentabilidad
+
+    @property
+    def escala_quiebre(self) -> float:
+        """Escala a partir de la cual t(h) >= 1 y MO y Maq deja de ser la hora mínima"""
+        horas = self.horas_por_unidad
+        return 1 / horas if horas > 0 else float('inf')
+
+    @property
+    def costo_variable_material(self) -> float:
+        """Costo variable por unidad sin MO: tintas + papel/lam + desperdicio porcentual"""
+        return self.tintas_por_unidad + self.papel_lam_por_unidad * (1 + self.porcentaje_desperdicio)
+
+    def coeficientes(self, tramo_alto: bool) -> Dict[str, float]:
+        """
+        Devuelve los coeficientes (costo_fijo, costo_variable) de un tramo, ya ajustados
+        por rentabilidad e incluyendo plancha y troquel en el costo fijo.
+        """
+        factor = self.factor_rentabilidad
+        fijo = self.montaje + self.tintas_fijo + self.desperdicio_tintas
+        variable = self.costo_variable_material
+        if tramo_alto:
+            variable += self.mo_base * self.horas_por_unidad
+        else:
+            fijo += self.mo_base
+        return {
+            'costo_fijo': fijo / factor + self.valor_plancha + self.valor_troquel,
+            'costo_variable': variable / factor
+        }
+
+    def es_tramo_alto(self, escala: float) -> bool:
+        """True si para esta escala MO y Maq se cobra por horas (t(h) >= 1)"""
+        tiempo_horas = escala * self.metros_por_unidad / self.velocidad_maquina / 60 if self.velocidad_maquina > 0 else 0
+        return not tiempo_horas < 1
+
+    def suma_costos(self, escala: float) -> float:
+        """Suma de costos variables de una escala antes de rentabilidad, plancha y troquel"""
+        if escala <= 0:
+            return 0
+        if self.es_tramo_alto(escala):
+            mo_y_maq = self.mo_base * escala * self.horas_por_unidad
+        else:
+            mo_y_maq = self.mo_base
+        return (self.montaje + mo_y_maq + self.tintas_fijo + self.desperdicio_tintas
+                + self.costo_variable_material * escala)
+
+    def valor_unidad(self, escala: float) -> float:
+        """
+        Evalúa el valor por unidad para una cantidad.
+
+        Replica los casos límite de calcular_valor_unidad_full: escala <= 0 o
+        rentabilidad >= 100% devuelven 0.
+        """
+        if escala <= 0 or self.factor_rentabilidad <= 0:
+            return 0
+        coef = self.coeficientes(self.es_tramo_alto(escala))
+        valor = coef['costo_fijo'] / escala + coef['costo_variable']
+        return valor if valor >= 0 else 0
+
+    def valores_unidad(self, escalas: List[float]) -> List[float]:
+        """Evalúa la curva para una lista de escalas"""
+        return [self.valor_unidad(escala) for escala in escalas]
+
+    def costo_total(self, escala: float) -> float:
+        """Valor total de la cotización para una cantidad (valor_unidad * escala)"""
+        return self.valor_unidad(escala) * escala if escala > 0 else 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serializa la curva (componentes + coeficientes derivados) para persistirla"""
+        datos = asdict(self)
+        quiebre = self.escala_quiebre
+        datos['escala_quiebre'] = quiebre if quiebre != float('inf') else None
+        datos['tramo_bajo'] = self.coeficientes(tramo_alto=False)
+        datos['tramo_alto'] = self.coeficientes(tramo_alto=True)
+        return datos
+
+    @staticmethod
+    def desde_plan(plan: PlanPrecio) -> 'CurvaPrecio':
+        """Construye la curva a partir del plan invariante de la cotización"""
+        area = plan.area_etiqueta
+        if area > 0 and plan.num_tintas > 0:
+            tintas_fijo = CANTIDAD_TINTA_ESTANDAR * plan.num_tintas * plan.valor_gr_tinta
+            tintas_por_unidad = FACTOR_TINTA_AREA * plan.num_tintas * area
+        else:
+            tintas_fijo = 0.0
+            tintas_por_unidad = 0.0
+
+        return CurvaPrecio(
+            montaje=plan.montaje,
+            mo_base=plan.mo_base,
+            metros_por_unidad=plan.metros_por_unidad,
+            velocidad_maquina=plan.velocidad_maquina,
+            tintas_fijo=tintas_fijo,
+            tintas_por_unidad=tintas_por_unidad,
+            papel_lam_por_unidad=area * ((plan.valor_material + plan.valor_acabado) / 1000000) if area > 0 else 0.0,
+            porcentaje_desperdicio=plan.porcentaje_desperdicio,
+            desperdicio_tintas=plan.desperdicio_tintas,
+            rentabilidad=plan.rentabilidad,
+            valor_plancha=plan.valor_plancha,
+            valor_troquel=plan.valor_troquel
+        )
+
+    @staticmethod
+    def from_dict(data: Optional[Dict[str, Any]]) -> Optional['CurvaPrecio']:
+        """Reconstruye una curva persistida. Devuelve None si el formato no es compatible."""
+        if not isinstance(data, dict) or data.get('version') != VERSION_CURVA_PRECIO:
+            return None
+        try:
+            campos = {f.name for f in fields(CurvaPrecio)}
+            return CurvaPrecio(**{k: float(v) if k != 'version' else int(v)
+                                  for k, v in data.items() if k in campos})
+        except (TypeError, ValueError) as e:
+            print(f"ADVERTENCIA: Curva de precio persistida inválida: {e}")
+            return None
@@ -0,0 +1,181 @@
+"""
+Grafo de cálculo con recálculo incremental.
+
+Cada nodo declara de qué entradas (del formulario) u otros nodos depende. Al evaluar
+con un nuevo conjunto de entradas solo se recalculan los nodos cuyas dependencias
+cambiaron desde la evaluación anterior; el resto conserva el valor en caché.
+
+Ejemplo:
+    >>> grafo = GrafoCalculo([
+    ...     Nodo('area', ('ancho', 'avance'), lambda ancho, avance: ancho * avance),
+    ...     Nodo('precio', ('area', 'margen'), lambda area, margen: area * (1 + margen)),
+    ... ])
+    >>> grafo.evaluar({'ancho': 10, 'avance': 20, 'margen': 0.4})['precio']
+    280.0
+    >>> valores = grafo.evaluar({'ancho': 10, 'avance': 20, 'margen': 0.5})
+    >>> grafo.ultimos_recalculados  # 'area' sale de caché
+    ['precio']
+"""
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+from src.utils.bitacora import obtener_bitacora
+from src.utils.perfilador import medir, CALCULO
+
+log = obtener_bitacora('calculos')
+
+
+@dataclass(frozen=True)
+class Nodo:
+    """
+    Nodo del grafo.
+
+    Attributes:
+        nombre: Nombre del valor que produce
+        entradas: Nombres de las entradas u otros nodos de los que depende.
+            Se pasan a la función como argumentos por nombre.
+        funcion: Función que calcula el valor
+    """
+    nombre: str
+    entradas: Tuple[str, ...]
+    funcion: Callable[..., Any]
+
+
+def _iguales(a: Any, b: Any) -> bool:
+    """Igualdad estricta de entradas (True y 1 se consideran distintos)"""
+    if type(a) is not type(b):
+        return False
+    try:
+        return bool(a == b)
+    except Exception:
+        return a is b
+
+
+class GrafoCalculo:
+    """
+    Evalúa nodos en orden topológico y guarda el valor de cada uno junto con la
+    versión de sus dependencias. Un nodo se recalcula solo si alguna dependencia
+    cambió de versión.
+    """
+
+    def __init__(self, nodos: Iterable[Nodo]):
+        self.nodos: Dict[str, Nodo] = {}
+        for nodo in nodos:
+            if nodo.nombre in self.nodos:
+                raise ValueError(f"Nodo duplicado en el grafo: {nodo.nombre}")
+            self.nodos[nodo.nombre] = nodo
+
+        self.entradas = sorted({
+            dependencia for nodo in self.nodos.values() for dependencia in nodo.entradas
+            if dependencia not in self.nodos
+        })
+        self._orden = self._ordenar()
+
+        self._valores: Dict[str, Any] = {}
+        self._versiones: Dict[str, int] = {}
+        self._firmas: Dict[str, Tuple[int, ...]] = {}
+        self.ultimos_recalculados: List[str] = []
+        self.recalculos: Dict[str, int] = {nombre: 0 for nombre in self.nodos}
+
+    def _ordenar(self) -> List[str]:
+        """Orden topológico; falla si hay ciclos"""
+        orden: List[str] = []
+        estado: Dict[str, int] = {}  # 1 = visitando, 2 = listo
+
+        def visitar(nombre: str, camino: List[str]):
+            if estado.get(nombre) == 2:
+                return
+            if estado.get(nombre) == 1:
+                ciclo = " -> ".join(camino + [nombre])
+                raise ValueError(f"Ciclo en el grafo de cálculo: {ciclo}")
+            estado[nombre] = 1
+            for dependencia in self.nodos[nombre].entradas:
+                if dependencia in self.nodos:
+                    visitar(dependencia, camino + [nombre])
+            estado[nombre] = 2
+            orden.append(nombre)
+
+        for nombre in self.nodos:
+            visitar(nombre, [])
+        return orden
+
+    def _dependientes(self, objetivos: Optional[Iterable[str]]) -> List[str]:
+        """Nodos necesarios para los objetivos, en orden topológico"""
+        if objetivos is None:
+            return self._orden
+        necesarios = set()
+        pendientes = list(objetivos)
+        while pendientes:
+            nombre = pendientes.pop()
+            if nombre not in self.nodos:
+                raise ValueError(f"Nodo desconocido: {nombre}")
+            if nombre in necesarios:
+                continue
+            necesarios.add(nombre)
+            pendientes.extend(d for d in self.nodos[nombre].entradas if d in self.nodos)
+        return [nombre for nombre in self._orden if nombre in necesarios]
+
+    def _actualizar_entrada(self, nombre: str, valor: Any) -> None:
+        if nombre in self._valores and _iguales(self._valores[nombre], valor):
+            return
+        self._valores[nombre] = valor
+        self._versiones[nombre] = self._versiones.get(nombre, 0) + 1
+
+    @medir(CALCULO)
+    def evaluar(self, entradas: Dict[str, Any], objetivos: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+        """
+        Evalúa el grafo con las entradas dadas.
+
+        Args:
+            entradas: Valores de las entradas (las claves extra se ignoran)
+            objetivos: Nodos a calcular (por defecto todos)
+
+        Returns:
+            Dict[str, Any]: Valores de los nodos evaluados
+
+        Raises:
+            ValueError: Si faltan entradas o un nodo falla (el nodo queda sucio)
+        """
+        faltantes = [nombre for nombre in self.entradas if nombre not in entradas]
+        if faltantes:
+            raise ValueError(f"Faltan entradas para el grafo de cálculo: {', '.join(faltantes)}")
+
+        for nombre in self.entradas:
+            self._actualizar_entrada(nombre, entradas[nombre])
+
+        self.ultimos_recalculados = []
+        resultado = {}
+        for nombre in self._dependientes(objetivos):
+            nodo = self.nodos[nombre]
+            firma = tuple(self._versiones.get(d, 0) for d in nodo.entradas)
+            if self._firmas.get(nombre) != firma:
+                argumentos = {d: self._valores[d] for d in nodo.entradas}
+                try:
+                    valor = nodo.funcion(**argumentos)
+                except Exception:
+                    self._firmas.pop(nombre, None)
+                    raise
+                self._firmas[nombre] = firma
+                self.recalculos[nombre] += 1
+                self.ultimos_recalculados.append(nombre)
+                if nombre not in self._valores or not _iguales(self._valores[nombre], valor):
+                    self._valores[nombre] = valor
+                    self._versiones[nombre] = self._versiones.get(nombre, 0) + 1
+            resultado[nombre] = self._valores[nombre]
+
+        if self.ultimos_recalculados:
+            log.debug('Grafo de cálculo: recalculados %s', self.ultimos_recalculados)
+        else:
+            log.debug('Grafo de cálculo: sin cambios, todos los nodos desde caché')
+        return resultado
+
+    def valor(self, nombre: str) -> Any:
+        """Último valor calculado de un nodo o entrada"""
+        return self._valores.get(nombre)
+
+    def invalidar(self, *nombres: str) -> None:
+        """Marca nodos como sucios (sin argumentos, todo el grafo)"""
+        if not nombres:
+            self._firmas.clear()
+            return
+        for nombre in nombres:
+            self._firmas.pop(nombre, None)
@@ -0,0 +1,140 @@
+"""
+Núcleo de cálculo de precios compartido por CalculadoraLitografia y CalculadoraCostosEscala.
+
+Funciones puras con entradas y salidas numéricas planas (sin diccionarios por paso ni
+objetos de datos). Las calculadoras son envoltorios delgados que resuelven sus datos de
+entrada, llaman a estas funciones y arman sus diccionarios de detalle y debug.
+
+Nomenclatura (hoja de cálculo original):
+    - C3: gap entre pistas, D3: ancho + C3, E3: pistas
+    - Q3: D3 * E3 + C3 (ancho total ajustado)
+    - S3: GAP_FIJO + Q3
+    - Q4 / E4: medida de la unidad de montaje / repeticiones
+"""
+from typing import Optional, Tuple
+
+from src.config.constants import (
+    GAP_PISTAS_ETIQUETAS, GAP_PISTAS_MANGAS, GAP_FIJO, AVANCE_FIJO, MM_COLOR,
+    VALOR_MM_PLANCHA, FACTOR_TINTA_AREA, CANTIDAD_TINTA_ESTANDAR
+)
+
+# Constantes de troquel (antes repetidas dentro de cada calculadora)
+FACTOR_BASE_TROQUEL = 25 * 5000  # 125,000
+VALOR_MINIMO_TROQUEL = 700000
+VALOR_MM_TROQUEL = 100
+
+# Constante de plancha cuando se cobran por separado
+CONSTANTE_PLANCHAS_SEPARADAS = 10000000
+
+
+# --- Geometría ---
+
+def calcular_c3(pistas: int, es_manga: bool = False) -> float:
+    """C3: gap entre pistas (0 para mangas o una sola pista)"""
+    return GAP_PISTAS_MANGAS if es_manga or pistas <= 1 else GAP_PISTAS_ETIQUETAS
+
+
+def calcular_q3(ancho: float, pistas: int, es_manga: bool = False) -> float:
+    """Q3 = (ancho + C3) * pistas + C3"""
+    c3 = calcular_c3(pistas, es_manga)
+    return ((ancho + c3) * pistas) + c3
+
+
+def calcular_s3(q3: float) -> float:
+    """S3 = GAP_FIJO + Q3"""
+    return GAP_FIJO + q3
+
+
+# --- Costos fijos por cotización ---
+
+def precio_plancha(s3: float, medida_montaje: float, num_tintas: int,
+                   planchas_por_separado: bool, valor_mm: float = VALOR_MM_PLANCHA) -> Tuple[float, float]:
+    """
+    Precio de plancha: (valor_mm * S3 * S4 * tintas) / constante, con S4 = Q4 + AVANCE_FIJO.
+
+    Returns:
+        Tuple[float, float]: (precio, precio_sin_constante)
+    """
+    s4 = medida_montaje + AVANCE_FIJO
+    precio_sin_constante = valor_mm * s3 * s4 * num_tintas
+    constante = CONSTANTE_PLANCHAS_SEPARADAS if planchas_por_separado else 1
+    return precio_sin_constante / constante, precio_sin_constante
+
+
+def factor_division_troquel(es_manga: bool, tipo_grafado_id: Optional[int], troquel_existe: bool) -> int:
+    """
+    Mangas: 1 si el grafado es 'Horizontal Total + Vertical' (ID 4), 2 en otro caso.
+    Etiquetas: 2 si el troquel ya existe, 1 si hay que hacerlo.
+    """
+    if es_manga:
+        return 1 if tipo_grafado_id == 4 else 2
+    return 2 if troquel_existe else 1
+
+
+def valor_troquel(ancho: float, avance: float, pistas: int, repeticiones: int,
+                  factor_division: int, valor_mm: float = VALOR_MM_TROQUEL) -> float:
+    """Valor troquel: (FACTOR_BASE + max(VALOR_MINIMO, perímetro * pistas * repeticiones * valor_mm)) / factor"""
+    perimetro = (ancho + avance) * 2
+    valor_calculado = max(VALOR_MINIMO_TROQUEL, perimetro * pistas * repeticiones * valor_mm)
+    return (FACTOR_BASE_TROQUEL + valor_calculado) / factor_division
+
+
+def area_etiqueta(q3: float, s3: float, pistas: int, medida_montaje: float,
+                  repeticiones: int, num_tintas: int) -> float:
+    """Área: (Q3/E3) * (Q4/E4) sin tintas, (S3/E3) * (Q4/E4) con tintas"""
+    area_ancho = q3 / pistas if num_tintas == 0 else s3 / pistas
+    return area_ancho * (medida_montaje / repeticiones)
+
+
+def desperdicio_tintas(num_tintas: int, s3: float, valor_material: float) -> float:
+    """Desperdicio de tintas: S7 * S3 * O7, con S7 = MM_COLOR * tintas y O7 = valor_material / 1e6"""
+    if num_tintas <= 0 or valor_material <= 0:
+        return 0
+    return MM_COLOR * num_tintas * s3 * (valor_material / 1000000)
+
+
+# --- Términos por escala ---
+
+def metros(escala: int, pistas: int, avance_total: float, desperdicio_unidad: float) -> float:
+    """Metros: (escala / pistas) * ((avance_total + desperdicio_unidad) / 1000)"""
+    return (escala / pistas) * ((avance_total + desperdicio_unidad) / 1000)
+
+
+def tiempo_horas(metros_lineales: float, velocidad_maquina: float) -> float:
+    """t(h): metros / velocidad_maquina / 60"""
+    return metros_lineales / velocidad_maquina / 60
+
+
+def mo_y_maq(mo_base: float, horas: float) -> float:
+    """MO y Maq: hora mínima si t(h) < 1, proporcional a t(h) en otro caso"""
+    return mo_base if horas < 1 else mo_base * horas
+
+
+def tintas(escala: int, num_tintas: int, area: float, valor_gr_tinta: float) -> float:
+    """Tintas: FACTOR_TINTA_AREA * tintas * área * escala + CANTIDAD_TINTA_ESTANDAR * tintas * $/gr"""
+    if area <= 0 or num_tintas <= 0:
+        return 0
+    costo_variable = FACTOR_TINTA_AREA * num_tintas * area * escala
+    costo_fijo = CANTIDAD_TINTA_ESTANDAR * num_tintas * valor_gr_tinta
+    return costo_variable + costo_fijo
+
+
+def papel_lam(escala: int, area: float, valor_material: float, valor_acabado: float) -> float:
+    """Papel/lam: área * ((valor_material + valor_acabado) / 1e6) * escala"""
+    if area <= 0:
+        return 0
+    return area * ((valor_material + valor_acabado) / 1000000) * escala
+
+
+def valor_unidad(suma_costos: float, rentabilidad: float, escala: int, costos_fijos: float) -> float:
+    """
+    Valor por unidad: (suma_costos / (1 - rentabilidad) + costos_fijos) / escala
+
+    La rentabilidad va en decimal. Escala <= 0, rentabilidad >= 100% o un resultado
+    negativo devuelven 0.
+    """
+    factor_rentabilidad = 1 - rentabilidad
+    if escala <= 0 or factor_rentabilidad <= 0:
+        return 0
+    valor = (suma_costos / factor_rentabilidad + costos_fijos) / escala
+    return valor if valor >= 0 else 0
@@ -0,0 +1,74 @@
+"""
+Plan de precio invariante por configuración.
+
+Todo lo que no depende de la escala (geometría Q3/S3, unidad de montaje, área de la
+etiqueta, plancha, troquel, desperdicio de tintas, MO base y rentabilidad) se calcula
+una sola vez y queda congelado en un PlanPrecio. El cálculo por escala solo aplica los
+términos que dependen de la cantidad (metros, tiempo, MO y Maq, tintas y papel/lam).
+
+El plan es inmutable y hashable, por lo que puede compartirse entre calculadoras y
+usarse como clave de caché.
+"""
+from dataclasses import dataclass, asdict, fields
+from typing import Dict, Any
+
+
+@dataclass(frozen=True)
+class PlanPrecio:
+    """
+    Valores de una cotización que no dependen de la escala.
+    """
+    # Configuración
+    es_manga: bool
+    num_tintas: int
+    pistas: int
+    ancho: float
+    avance: float
+    avance_total: float
+    # Geometría
+    q3: float
+    s3: float
+    # Unidad de montaje elegida
+    dientes: float
+    medida_mm: float
+    repeticiones: int
+    desperdicio_unidad: float
+    # Costos invariantes
+    area_etiqueta: float
+    valor_plancha: float
+    valor_troquel: float
+    valor_material: float
+    valor_acabado: float
+    desperdicio_tintas: float
+    # Parámetros de producción y precio
+    velocidad_maquina: float
+    mo_montaje: float
+    mo_base: float  # MO Impresión/Troquelado (+ sellado y corte en mangas)
+    valor_gr_tinta: float
+    porcentaje_desperdicio: float  # En decimal (ej: 0.10)
+    rentabilidad: float  # En decimal (ej: 0.40)
+
+    def __post_init__(self):
+        """Normalizar a tipos nativos (la tabla de desperdicio entrega valores numpy)"""
+        for f in fields(self):
+            valor = getattr(self, f.name)
+            if f.type == 'bool' or f.type is bool:
+                object.__setattr__(self, f.name, bool(valor))
+            elif f.type == 'int' or f.type is int:
+                object.__setattr__(self, f.name, int(valor))
+            else:
+                object.__setattr__(self, f.name, float(valor))
+
+    @property
+    def metros_por_unidad(self) -> float:
+        """Metros lineales por unidad: (Avance_total + Desperdicio_unidad) / 1000 / Pistas"""
+        return ((self.avance_total + self.desperdicio_unidad) / 1000) / self.pistas
+
+    @property
+    def montaje(self) -> float:
+        """Montaje: Tintas * MO Montaje"""
+        return self.num_tintas * self.mo_montaje
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convierte el plan a un diccionario"""
+        return asdict(self)
@@ -0,0 +1,127 @@
+"""
+Solver inverso de precios sobre la curva de precio (CurvaPrecio).
+
+Responde las dos preguntas habituales de ventas sin repetir cálculos por escala:
+    - ¿Qué cantidad mínima alcanza un valor por unidad objetivo?
+    - ¿Qué rentabilidad mantiene el valor por unidad bajo un precio tope?
+
+La curva es monótona decreciente en la escala (costo_fijo / q + costo_variable en cada
+tramo y continua en el quiebre de MO), por lo que ambos problemas tienen solución
+analítica; solo se corrige el redondeo a unidades enteras.
+"""
+import math
+from typing import Dict, Any
+
+from src.logic.calculators.curva_precio import CurvaPrecio
+
+
+class SolverPrecio:
+    """
+    Resuelve la cantidad o la rentabilidad que alcanza un precio objetivo.
+    """
+
+    def __init__(self, curva: CurvaPrecio):
+        """
+        Args:
+            curva: Curva de precio compilada por CalculadoraCostosEscala.compilar_curva_precio
+        """
+        self.curva = curva
+
+    def valor_minimo_alcanzable(self) -> float:
+        """Asíntota de la curva: valor por unidad cuando la escala tiende a infinito"""
+        if self.curva.factor_rentabilidad <= 0:
+            return float('inf')
+        return self.curva.coeficientes(tramo_alto=True)['costo_variable']
+
+    def escala_para_valor_unidad(self, valor_objetivo: float) -> Dict[str, Any]:
+        """
+        Calcula la cantidad mínima cuyo valor por unidad es menor o igual al objetivo.
+
+        Args:
+            valor_objetivo: Valor por unidad deseado
+
+        Returns:
+            Dict con:
+                - escala: cantidad mínima (int) o None si el objetivo no es alcanzable
+                - valor_unidad: valor por unidad en esa escala
+                - tramo: 'bajo' (hora mínima de MO) o 'alto' (MO por horas)
+                - valor_minimo: asíntota de la curva (precio mínimo alcanzable)
+                - error: mensaje si no hay solución
+        """
+        curva = self.curva
+        valor_minimo = self.valor_minimo_alcanzable()
+
+        if valor_objetivo is None or valor_objetivo <= valor_minimo:
+            return {
+                'escala': None,
+                'valor_unidad': None,
+                'tramo': None,
+                'valor_minimo': valor_minimo,
+                'error': f"El valor objetivo debe ser mayor que el mínimo alcanzable (${valor_minimo:,.4f})"
+            }
+
+        # 1. Intentar en el tramo bajo (MO fija por hora mínima)
+        escala = None
+        quiebre = curva.escala_quiebre
+        coef_bajo = curva.coeficientes(tramo_alto=False)
+        if valor_objetivo > coef_bajo['costo_variable']:
+            q_bajo = coef_bajo['costo_fijo'] / (valor_objetivo - coef_bajo['costo_variable'])
+            if q_bajo < quiebre:
+                escala = q_bajo
+
+        # 2. Si no se alcanza antes del quiebre, resolver en el tramo alto
+        if escala is None:
+            coef_alto = curva.coeficientes(tramo_alto=True)
+            escala = max(coef_alto['costo_fijo'] / (valor_objetivo - coef_alto['costo_variable']), quiebre)
+
+        # 3. Ajustar a unidades enteras contra la curva (corrige errores de redondeo)
+        escala = max(1, math.ceil(escala))
+        while curva.valor_unidad(escala) > valor_objetivo:
+            escala += 1
+        while escala > 1 and curva.valor_unidad(escala - 1) <= valor_objetivo:
+            escala -= 1
+
+        return {
+            'escala': escala,
+            'valor_unidad': curva.valor_unidad(escala),
+            'tramo': 'alto' if curva.es_tramo_alto(escala) else 'bajo',
+            'valor_minimo': valor_minimo
+        }
+
+    def rentabilidad_para_valor_unidad(self, escala: int, valor_objetivo: float) -> Dict[str, Any]:
+        """
+        Calcula la rentabilidad máxima que mantiene el valor por unidad bajo el objetivo.
+
+        valor_unidad = (suma_costos / (1 - r) + plancha + troquel) / escala
+            =>  r = 1 - suma_costos / (valor_objetivo * escala - plancha - troquel)
+
+        El quiebre de MO depende solo de la escala, no de la rentabilidad.
+
+        Args:
+            escala: Cantidad a cotizar
+            valor_objetivo: Valor por unidad tope
+
+        Returns:
+            Dict con:
+                - rentabilidad: en decimal (ej: 0.35) o None si no es alcanzable
+                - rentabilidad_porcentaje: rentabilidad * 100
+                - valor_unidad: valor por unidad resultante
+                - error: mensaje si no hay solución
+        """
+        if escala is None or escala <= 0:
+            return {'rentabilidad': None, 'rentabilidad_porcentaje': None, 'valor_unidad': None,
+                    'error': "La escala debe ser mayor que 0"}
+
+        suma_costos = self.curva.suma_costos(escala)
+        disponible = valor_objetivo * escala - self.curva.valor_plancha - self.curva.valor_troquel
+        if disponible <= 0 or suma_costos > disponible:
+            return {'rentabilidad': None, 'rentabilidad_porcentaje': None, 'valor_unidad': None,
+                    'error': "El valor objetivo no cubre los costos de producción aun sin rentabilidad"}
+
+        rentabilidad = 1 - suma_costos / disponible
+        curva_ajustada = CurvaPrecio(**{**self.curva.__dict__, 'rentabilidad': rentabilidad})
+        return {
+            'rentabilidad': rentabilidad,
+            'rentabilidad_porcentaje': rentabilidad * 100,
+            'valor_unidad': curva_ajustada.valor_unidad(escala)
+        }
@@ -0,0 +1,169 @@
+"""
+Corpus de cálculos reales para pruebas de regresión y rendimiento.
+
+Con el corpus activo, cada cálculo de handle_calculation agrega una línea JSON a
+ARCHIVO_CORPUS con lo necesario para repetirlo sin base de datos ni sesión:
+
+    entradas    entradas del grafo (formulario + ajustes admin: ancho, avance, pistas,
+                tintas, escalas, troquel, planchas, rentabilidad ajustada...)
+    precios     precios leídos de la BD (valor base del material, valor del acabado)
+    salidas     DatosEscala (geometría), mejor opción de montaje, tintas ajustadas,
+                rentabilidad, troquel, plancha y los resultados por escala
+
+El cliente se guarda solo como un hash con sal (SAL_CLIENTE): permite agrupar cálculos
+del mismo cliente sin identificarlo. El archivo solo crece: un cálculo cuya clave
+canónica (cache_calculos.clave_calculo) ya está en el corpus no se vuelve a escribir,
+así que recotizar la misma configuración no lo infla.
+
+benchmarks/reproducir_corpus.py vuelve a correr el corpus con las calculadoras actuales,
+marca las diferencias numéricas fuera de tolerancia y reporta el tiempo por cálculo.
+
+Configuración por variables de entorno:
+    CORPUS_CALCULOS_ACTIVO=1        registrar los cálculos (por defecto no se registra)
+    CORPUS_CALCULOS_ARCHIVO=...     ruta del corpus (por defecto corpus_calculos.jsonl)
+    CORPUS_CALCULOS_SAL=...         sal del hash de cliente; sin ella se usa una sal
+                                    aleatoria por proceso (los hashes no se repiten
+                                    entre reinicios)
+"""
+import hashlib
+import json
+import os
+import secrets
+import threading
+from dataclasses import asdict, is_dataclass
+from datetime import datetime
+from typing import Any, Dict, Optional, Set
+
+from src.logic.cache_calculos import _canonico, clave_calculo
+
+ACTIVO = os.environ.get('CORPUS_CALCULOS_ACTIVO', '').lower() in ('1', 'true', 'si', 'sí')
+ARCHIVO_CORPUS = os.environ.get('CORPUS_CALCULOS_ARCHIVO', 'corpus_calculos.jsonl')
+SAL_CLIENTE = os.environ.get('CORPUS_CALCULOS_SAL') or secrets.token_hex(16)
+VERSION_FORMATO = 1
+
+# Campos de cada resultado por escala que se guardan (los demás se derivan del plan)
+CAMPOS_RESULTADO = (
+    'escala', 'valor_unidad', 'metros', 'tiempo_horas', 'montaje', 'mo_y_maq', 'tintas',
+    'papel_lam', 'desperdicio_total',
+)
+
+
+def _a_json(valor: Any) -> Any:
+    """Valores de las entradas que json no serializa solo (Decimal, numpy, dataclasses)"""
+    if is_dataclass(valor) and not isinstance(valor, type):
+        return asdict(valor)
+    if hasattr(valor, 'item'):
+        return valor.item()
+    return _canonico(valor)
+
+
+def anonimizar_cliente(cliente_id: Any) -> Optional[str]:
+    """Hash corto con sal del ID de cliente (None si no hay cliente)"""
+    if cliente_id is None:
+        return None
+    return hashlib.sha256(f"{SAL_CLIENTE}:{cliente_id}".encode('utf-8')).hexdigest()[:16]
+
+
+def salidas_calculo(valores: Dict[str, Any]) -> Dict[str, Any]:
+    """Salidas comparables de un cálculo a partir de los valores del grafo"""
+    opcion = valores['mejor_opcion']
+    return _canonico({
+        'datos_escala': asdict(valores['geometria']) if is_dataclass(valores['geometria']) else valores['geometria'],
+        'mejor_opcion': {'dientes': opcion.dientes, 'repeticiones': opcion.repeticiones,
+                         'desperdicio': opcion.desperdicio} if opcion else None,
+        'num_tintas_ajustado': valores['num_tintas_ajustado'],
+        'rentabilidad': valores['rentabilidad'],
+        'valor_material': valores['valor_material'],
+        'valor_troquel': valores['troquel']['valor'],
+        'valor_plancha': valores['plancha']['valor'],
+        'resultados': [{campo: r.get(campo) for campo in CAMPOS_RESULTADO} for r in valores['resultados']],
+    })
+
+
+class CorpusCalculos:
+    """Registro de cálculos en un archivo JSON lines de solo agregado, sin duplicados"""
+
+    def __init__(self, archivo: str = ARCHIVO_CORPUS, activo: bool = ACTIVO):
+        self.archivo = archivo
+        self.activo = activo
+        self._lock = threading.Lock()
+        self._claves: Optional[Set[str]] = None
+        self.escritos = 0
+        self.repetidos = 0
+
+    def _claves_existentes(self) -> Set[str]:
+        """Claves ya guardadas (se leen del archivo la primera vez)"""
+        if self._claves is None:
+            self._claves = set()
+            if os.path.exists(self.archivo):
+                with open(self.archivo, encoding='utf-8') as f:
+                    for linea in f:
+                        try:
+                            self._claves.add(json.loads(linea)['clave'])
+                        except (ValueError, KeyError):
+                            continue
+        return self._claves
+
+    def registrar(self, grafo, entradas: Dict[str, Any], valores: Dict[str, Any],
+                  cliente_id: Any = None) -> bool:
+        """
+        Agrega el cálculo al corpus si está activo y no estaba.
+
+        Args:
+            grafo: Grafo de la sesión ya evaluado con estas entradas (los precios salen
+                de sus nodos memorizados, sin volver a consultar la BD)
+            entradas: Entradas del grafo (ver entradas_desde_formulario)
+            valores: Valores del cálculo (los de evaluar_con_cache)
+            cliente_id: ID del cliente; se guarda anonimizado
+
+        Returns:
+            bool: True si se escribió una línea nueva
+        """
+        if not self.activo or not self.archivo:
+            return False
+        try:
+            precios_grafo = grafo.evaluar(entradas, objetivos=('valor_material_base', 'acabado'))
+            acabado = precios_grafo['acabado']
+            precios = {
+                'valor_material_base': precios_grafo['valor_material_base'],
+                'valor_acabado': acabado.valor if acabado else None,
+            }
+            clave = clave_calculo(entradas, precios)
+            registro = {
+                'version': VERSION_FORMATO,
+                'clave': clave,
+                'fecha': datetime.now().isoformat(timespec='seconds'),
+                'cliente': anonimizar_cliente(cliente_id),
+                # Entradas con sus tipos originales (pistas y tintas enteras): se reproducen tal cual
+                'entradas': entradas,
+                'precios': _canonico(precios),
+                'salidas': salidas_calculo(valores),
+            }
+            linea = json.dumps(registro, ensure_ascii=False, separators=(',', ':'), default=_a_json)
+        except (ValueError, KeyError, TypeError, AttributeError) as e:
+            print(f"Corpus de cálculos: no se pudo armar el registro: {e}")
+            return False
+
+        with self._lock:
+            claves = self._claves_existentes()
+            if clave in claves:
+                self.repetidos += 1
+                return False
+            try:
+                with open(self.archivo, 'a', encoding='utf-8') as f:
+                    f.write(linea + '\n')
+            except OSError as e:
+                print(f"Corpus de cálculos: no se pudo escribir en {self.archivo}: {e}")
+                return False
+            claves.add(clave)
+            self.escritos += 1
+            return True
+
+    def estadisticas(self) -> Dict[str, Any]:
+        with self._lock:
+            return {'activo': self.activo, 'archivo': self.archivo,
+                    'escritos': self.escritos, 'repetidos': self.repetidos}
+
+
+# Instancia única del proceso
+corpus_calculos = CorpusCalculos()
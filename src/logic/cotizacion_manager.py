@@ -1,12 +1,14 @@
 from typing import List, Dict, Optional, Tuple, Any
 from decimal import Decimal
 from datetime import datetime
-import traceback
 import streamlit as st # Necesario para acceder a session_state en algunos casos
 
 # Importaciones relativas desde la misma capa o capas inferiores (data, config)
 from ..data.database import DBManager
 from ..data.models import Cotizacion, Escala, ReferenciaCliente, TipoGrafado
+from ..utils.bitacora import obtener_bitacora
+
+log = obtener_bitacora('cotizaciones')
 
 class CotizacionManagerError(Exception):
     """Custom exception for CotizacionManager errors."""
@@ -48,7 +50,7 @@ class CotizacionManager:
             - altura_grafado: Optional[float]
             - escalas_resultados: List[Dict] # Resultado del cálculo
         """
-        print("\n=== Preparando NUEVO modelo Cotizacion ===")
+        log.debug('=== Preparando NUEVO modelo Cotizacion ===')
         try:
             cotizacion = Cotizacion()
             cotizacion.id = None  # Es nueva
@@ -93,31 +95,30 @@ class CotizacionManager:
             if cotizacion.es_manga and tipo_grafado_nombre:
                 try:
                     cotizacion.tipo_grafado_id = self.db.get_tipos_grafado_id_by_name(tipo_grafado_nombre)
-                    print(f"ID de Grafado '{tipo_grafado_nombre}' obtenido: {cotizacion.tipo_grafado_id}")
+                    log.debug("ID de Grafado '%s' obtenido: %s", tipo_grafado_nombre, cotizacion.tipo_grafado_id)
                 except Exception as e_graf:
-                    print(f"Error obteniendo ID para grafado '{tipo_grafado_nombre}': {e_graf}")
+                    log.error("Error obteniendo ID para grafado '%s': %s", tipo_grafado_nombre, e_graf)
                     # Considerar lanzar error o dejarlo None
                     cotizacion.tipo_grafado_id = None
             else:
                 cotizacion.tipo_grafado_id = None
 
-            print("Modelo Cotizacion NUEVO preparado:")
+            log.debug('Modelo Cotizacion NUEVO preparado:')
             # Imprimir algunos campos para verificar
             # print(f"  Material ID: {cotizacion.material_id}")
-            print(f"  Material Adhesivo ID: {cotizacion.material_adhesivo_id}") # Imprimir el nuevo ID
-            print(f"  Acabado ID: {cotizacion.acabado_id}")
-            print(f"  Num Tintas: {cotizacion.num_tintas}")
-            print(f"  Es Manga: {cotizacion.es_manga}")
+            log.debug('  Material Adhesivo ID: %s', cotizacion.material_adhesivo_id) # Imprimir el nuevo ID
+            log.debug('  Acabado ID: %s', cotizacion.acabado_id)
+            log.debug('  Num Tintas: %s', cotizacion.num_tintas)
+            log.debug('  Es Manga: %s', cotizacion.es_manga)
 
-            print(f"  Altura Grafado: {cotizacion.altura_grafado}")
-            print(f"  Tipo Grafado ID: {cotizacion.tipo_grafado_id}")
-            print(f"  Número de escalas procesadas: {len(cotizacion.escalas)}")
+            log.debug('  Altura Grafado: %s', cotizacion.altura_grafado)
+            log.debug('  Tipo Grafado ID: %s', cotizacion.tipo_grafado_id)
+            log.debug('  Número de escalas procesadas: %s', len(cotizacion.escalas))
 
             return cotizacion
 
         except Exception as e:
-            print(f"Error en preparar_nueva_cotizacion_model: {str(e)}")
-            traceback.print_exc()
+            log.error('Error en preparar_nueva_cotizacion_model: %s', str(e), exc_info=True)
             # Re-lanzar como error específico del manager
             raise CotizacionManagerError(f"Error preparando nuevo modelo de cotización: {e}") from e
 
@@ -130,7 +131,7 @@ class CotizacionManager:
         kwargs esperados: Mismos que preparar_nueva_cotizacion_model, ya que se 
                         pueden actualizar todos los campos editables.
         """
-        print(f"\n=== Actualizando modelo Cotizacion ID: {cotizacion_existente.id} ===")
+        log.debug('=== Actualizando modelo Cotizacion ID: %s ===', cotizacion_existente.id)
         if not isinstance(cotizacion_existente, Cotizacion) or cotizacion_existente.id is None:
              raise ValueError("Se requiere una instancia de Cotizacion válida con ID para actualizar.")
              
@@ -173,26 +174,25 @@ class CotizacionManager:
             if cotizacion.es_manga and tipo_grafado_nombre:
                 try:
                     cotizacion.tipo_grafado_id = self.db.get_tipos_grafado_id_by_name(tipo_grafado_nombre)
-                    print(f"ID de Grafado '{tipo_grafado_nombre}' actualizado: {cotizacion.tipo_grafado_id}")
+                    log.debug("ID de Grafado '%s' actualizado: %s", tipo_grafado_nombre, cotizacion.tipo_grafado_id)
                 except Exception as e_graf:
-                    print(f"Error obteniendo ID para grafado '{tipo_grafado_nombre}' en actualización: {e_graf}")
+                    log.error("Error obteniendo ID para grafado '%s' en actualización: %s", tipo_grafado_nombre, e_graf)
                     cotizacion.tipo_grafado_id = None
             elif not cotizacion.es_manga:
                 cotizacion.tipo_grafado_id = None # Asegurar None si ya no es manga
             # Si es manga pero no se provee tipo_grafado, mantener el existente
             
-            print("Modelo Cotizacion ACTUALIZADO:")
+            log.debug('Modelo Cotizacion ACTUALIZADO:')
             # Imprimir algunos campos para verificar
-            print(f"  ID: {cotizacion.id}")
-            print(f"  Material Adhesivo ID: {cotizacion.material_adhesivo_id}")
+            log.debug('  ID: %s', cotizacion.id)
+            log.debug('  Material Adhesivo ID: %s', cotizacion.material_adhesivo_id)
 
-            print(f"  Número de escalas actualizadas: {len(cotizacion.escalas)}")
+            log.debug('  Número de escalas actualizadas: %s', len(cotizacion.escalas))
 
             return cotizacion
 
         except Exception as e:
-            print(f"Error en actualizar_cotizacion_model: {str(e)}")
-            traceback.print_exc()
+            log.error('Error en actualizar_cotizacion_model: %s', str(e), exc_info=True)
             # Re-lanzar como error específico del manager
             raise CotizacionManagerError(f"Error actualizando modelo de cotización existente: {e}") from e
 
@@ -214,9 +214,9 @@ class CotizacionManager:
         Devuelve (éxito, mensaje, cotizacion_id).
         Ahora incluye un flag para saber si admin aplicó ajustes durante el cálculo.
         """
-        print("\n=== Iniciando guardado de NUEVA cotización ===")
+        log.debug('=== Iniciando guardado de NUEVA cotización ===')
         # *** DEBUG: Imprimir valores clave del modelo recibido ***
-        print(f"---> DEBUG MANAGER: Modelo Recibido - Acabado ID: {cotizacion_model.acabado_id}, Foil ID: {cotizacion_model.tipo_foil_id}")
+        log.debug('---> DEBUG MANAGER: Modelo Recibido - Acabado ID: %s, Foil ID: %s', cotizacion_model.acabado_id, cotizacion_model.tipo_foil_id)
         # *** FIN DEBUG ***
         cotizacion_id = None # Inicializar ID
         try:
@@ -224,21 +224,21 @@ class CotizacionManager:
             acabado_id_check = cotizacion_model.acabado_id
             tipo_foil_id_check = cotizacion_model.tipo_foil_id # Ya debería ser int o None por preparar_nueva/actualizar
 
-            print(f"Validando combinación Acabado ID: {acabado_id_check}, Foil ID: {tipo_foil_id_check}")
+            log.debug('Validando combinación Acabado ID: %s, Foil ID: %s', acabado_id_check, tipo_foil_id_check)
 
             if acabado_id_check in (5, 6): # Acabados que requieren foil
                 if tipo_foil_id_check is None or tipo_foil_id_check <= 0: # Asumiendo que los IDs de foil son > 0
                     error_msg = f"❌ Se requiere un Tipo de Foil válido cuando el acabado es {acabado_id_check}."
-                    print(error_msg)
+                    log.error(error_msg)
                     return False, error_msg, None # Devolver False, mensaje de error, y None para cotizacion_id
             elif tipo_foil_id_check is not None: # Acabados que NO deben tener foil
                  error_msg = f"❌ No se debe seleccionar un Tipo de Foil cuando el acabado es {acabado_id_check}."
-                 print(error_msg)
+                 log.error(error_msg)
                  # También limpiar el ID en el modelo por si acaso antes de continuar (opcional, mejor fallar)
                  # cotizacion_model.tipo_foil_id = None
                  return False, error_msg, None # Devolver False, mensaje de error, y None para cotizacion_id
             
-            print("Combinación Acabado/Foil válida.")
+            log.debug('Combinación Acabado/Foil válida.')
             # *** FIN VALIDACIÓN ACABADO/FOIL ***
 
             # 1. Obtener o crear la referencia
@@ -249,7 +249,7 @@ class CotizacionManager:
                 
             # 2. Asignar ID de referencia al modelo
             cotizacion_model.referencia_cliente_id = referencia_id
-            print(f"Asignado referencia_cliente_id: {referencia_id}")
+            log.debug('Asignado referencia_cliente_id: %s', referencia_id)
             
             # 3. Preparar datos y crear cotización principal
             # Convertir el modelo dataclass a un diccionario para la BD
@@ -273,7 +273,7 @@ class CotizacionManager:
                     try:
                         datos_bd['tipo_foil_id'] = int(datos_bd['tipo_foil_id'])
                     except ValueError:
-                        print(f"Advertencia: No se pudo convertir tipo_foil_id '{datos_bd['tipo_foil_id']}' a entero. Se establecerá a None.")
+                        log.warning("Advertencia: No se pudo convertir tipo_foil_id '%s' a entero. Se establecerá a None.", datos_bd['tipo_foil_id'])
                         datos_bd['tipo_foil_id'] = None
             
             # CORRECCIÓN: Asegurar que se usa 'material_adhesivo_id' si existe en el modelo
@@ -283,11 +283,11 @@ class CotizacionManager:
                  datos_bd['material_adhesivo_id'] = cotizacion_model.material_adhesivo_id
                  # Eliminar la clave 'material_id' original si existe para evitar confusión
                  datos_bd.pop('material_id', None)
-                 print(f"Se usará material_adhesivo_id: {datos_bd['material_adhesivo_id']}")
+                 log.debug('Se usará material_adhesivo_id: %s', datos_bd['material_adhesivo_id'])
             else:
                  # Si el modelo por alguna razón no tiene material_adhesivo_id, 
                  # asegurar que la clave exista como None para la BD y eliminar material_id si existe.
-                 print("Advertencia: El atributo 'material_adhesivo_id' no está en el cotizacion_model. Se enviará 'material_adhesivo_id' como None.")
+                 log.warning("Advertencia: El atributo 'material_adhesivo_id' no está en el cotizacion_model. Se enviará 'material_adhesivo_id' como None.")
                  datos_bd['material_adhesivo_id'] = None
                  datos_bd.pop('material_id', None) # Eliminar la clave antigua por si acaso
 
@@ -302,15 +302,13 @@ class CotizacionManager:
             
             # --- NUEVO: Establecer el flag basado en el parámetro --- 
             datos_bd['ajustes_modificados_admin'] = admin_ajustes_calculo 
-            print(f"---> Valor para 'ajustes_modificados_admin' (creación): {admin_ajustes_calculo}")
+            log.debug("---> Valor para 'ajustes_modificados_admin' (creación): %s", admin_ajustes_calculo)
             # -------------------------------------------------------
             
-            print("\nDatos preparados para db.crear_cotizacion:")
-            for k, v in datos_bd.items():
-                print(f"  {k}: {v} ({type(v)})")
+            log.debug('Datos preparados para db.crear_cotizacion: %s', datos_bd)
             
             # --- Añadir campos de cálculo para la función RPC --- 
-            print("\nAñadiendo datos de cálculo para la función RPC...")
+            log.debug('Añadiendo datos de cálculo para la función RPC...')
             campos_calculo_requeridos = [
                 'valor_material', 'valor_plancha', 'valor_acabado', 'valor_troquel',
                 'rentabilidad', 'avance', 'ancho', 'unidad_z_dientes',
@@ -324,7 +322,7 @@ class CotizacionManager:
                     # Ajuste especial para valor_plancha
                     if campo == 'valor_plancha_para_calculo':
                         datos_bd['valor_plancha'] = float(valor_calculo) if valor_calculo is not None else 0.0
-                        print(f"  Añadido 'valor_plancha': {datos_bd['valor_plancha']}")
+                        log.debug("  Añadido 'valor_plancha': %s", datos_bd['valor_plancha'])
                     else:
                         # Convertir a float si es numérico para asegurar compatibilidad JSON/RPC
                         if isinstance(valor_calculo, bool):
@@ -337,21 +335,21 @@ class CotizacionManager:
                         else:
                             # Mantener otros tipos (None, str, etc.)
                             datos_bd[campo] = valor_calculo
-                        print(f"  Añadido '{campo}': {datos_bd.get(campo)} (Tipo: {type(datos_bd.get(campo))})") # Añadir tipo al log
+                        log.debug("  Añadido '%s': %s (Tipo: %s)", campo, datos_bd.get(campo), type(datos_bd.get(campo))) # Añadir tipo al log
                 else:
-                    print(f"  Advertencia: Campo de cálculo '{campo}' no encontrado en datos_calculo.")
+                    log.warning("  Advertencia: Campo de cálculo '%s' no encontrado en datos_calculo.", campo)
             # --------------------------------------------------
 
             resultado_creacion = self.db.crear_cotizacion(datos_bd)
             
             if not resultado_creacion or 'id' not in resultado_creacion:
                 error_msg = "Error al crear el registro principal de la cotización en la BD."
-                print(error_msg)
+                log.error(error_msg)
                 return False, error_msg, None
             
             cotizacion_id = resultado_creacion['id']
             cotizacion_model.id = cotizacion_id # Actualizar ID en el modelo
-            print(f"Cotización principal creada con ID: {cotizacion_id}")
+            log.debug('Cotización principal creada con ID: %s', cotizacion_id)
             
             # Intentar guardar parametros_especiales si vienen en datos_calculo
             try:
@@ -364,28 +362,27 @@ class CotizacionManager:
             
             # 4. Guardar las escalas
             if cotizacion_model.escalas:
-                print(f"\nGuardando {len(cotizacion_model.escalas)} escalas...")
+                log.debug('Guardando %s escalas...', len(cotizacion_model.escalas))
                 success_escalas = self.db.guardar_cotizacion_escalas(cotizacion_id, cotizacion_model.escalas)
                 if not success_escalas:
                     # La cotización se creó, pero las escalas fallaron. Advertencia.
                     warning_msg = f"Cotización creada (ID: {cotizacion_id}), pero falló el guardado de las escalas."
-                    print(warning_msg)
+                    log.warning('%s', warning_msg)
                     # Devolver éxito parcial con advertencia
                     return True, warning_msg, cotizacion_id 
             else:
-                print("No hay escalas para guardar.")
+                log.debug('No hay escalas para guardar.')
             
             # Todo OK
             success_msg = f"Cotización creada exitosamente con ID: {cotizacion_id}"
-            print(f"\n=== Fin guardado NUEVA cotización ===")
+            log.debug('=== Fin guardado NUEVA cotización ===')
             return True, success_msg, cotizacion_id
 
         except CotizacionManagerError as cme: # Capturar errores específicos del manager
-            print(f"Error de lógica de negocio: {cme}")
+            log.error('Error de lógica de negocio: %s', cme)
             return False, str(cme), None
         except Exception as e:
-            print(f"Error inesperado en guardar_nueva_cotizacion: {e}")
-            traceback.print_exc()
+            log.error('Error inesperado en guardar_nueva_cotizacion: %s', e, exc_info=True)
             return False, f"Error inesperado al guardar la cotización: {e}", None
 
     def actualizar_cotizacion_existente(
@@ -408,16 +405,16 @@ class CotizacionManager:
         4. Llama a db.actualizar_cotizacion (RPC) pasando los datos.
         Devuelve (éxito, mensaje).
         """
-        print(f"\n=== Iniciando actualización de cotización ID: {cotizacion_id} ===")
+        log.debug('=== Iniciando actualización de cotización ID: %s ===', cotizacion_id)
         
         try:
             # --- PASO 1: VERIFICAR/ACTUALIZAR REFERENCIA CLIENTE ---
-            print("\nVerificando referencia cliente...")
+            log.debug('Verificando referencia cliente...')
             # Obtener cotización actual para verificar si cambió la referencia
             cotizacion_actual = self.db.obtener_cotizacion(cotizacion_id)
             if not cotizacion_actual:
                 error_msg = f"❌ No se pudo obtener la cotización actual con ID {cotizacion_id}."
-                print(error_msg)
+                log.error(error_msg)
                 return False, error_msg
                 
             # Datos para el identificador (leerlos temprano para estar seguros)
@@ -433,7 +430,7 @@ class CotizacionManager:
             referencia_actual = cotizacion_actual.referencia_cliente
             if not referencia_actual:
                 error_msg = f"❌ No se pudo obtener la referencia actual para cotización {cotizacion_id}."
-                print(error_msg)
+                log.error(error_msg)
                 return False, error_msg
                 
             referencia_id_actual = referencia_actual.id
@@ -443,7 +440,7 @@ class CotizacionManager:
             # Verificar si cambió la descripción de la referencia
             referencia_id_final = referencia_id_actual
             if referencia_descripcion != referencia_desc_actual:
-                print(f"Descripción de referencia cambiada: '{referencia_desc_actual}' -> '{referencia_descripcion}'")
+                log.debug("Descripción de referencia cambiada: '%s' -> '%s'", referencia_desc_actual, referencia_descripcion)
                 
                 # Verificar si ya existe una referencia con el nuevo nombre
                 ref_existente = self.db.get_referencia_cliente_by_details(
@@ -454,7 +451,7 @@ class CotizacionManager:
                 
                 if ref_existente:
                     # Usar la referencia existente
-                    print(f"Se encontró referencia existente con ID {ref_existente.id}")
+                    log.debug('Se encontró referencia existente con ID %s', ref_existente.id)
                     referencia_id_final = ref_existente.id
                 else:
                     # Crear nueva referencia para este cliente con la nueva descripción
@@ -466,17 +463,17 @@ class CotizacionManager:
                     ref_creada = self.db.crear_referencia(nueva_ref)
                     if not ref_creada:
                         error_msg = f"❌ No se pudo crear la nueva referencia."
-                        print(error_msg)
+                        log.error(error_msg)
                         return False, error_msg
                         
                     referencia_id_final = ref_creada.id
-                    print(f"Nueva referencia creada con ID {referencia_id_final}")
+                    log.debug('Nueva referencia creada con ID %s', referencia_id_final)
             else:
-                print("Descripción de referencia sin cambios.")
+                log.debug('Descripción de referencia sin cambios.')
                 
             # Actualizar la referencia en el modelo
             cotizacion_model.referencia_cliente_id = referencia_id_final
-            print(f"Referencia a usar para la actualización: {referencia_id_final}")
+            log.debug('Referencia a usar para la actualización: %s', referencia_id_final)
             # ------------------------------------------------------------------------
 
             # --- PASO 2: Lógica UNIFICADA para marcar 'ajustes_modificados_admin' --- 
@@ -522,35 +519,35 @@ class CotizacionManager:
                             # Si hay diferencia significativa entre los valores
                             if abs(valor_actual - valor_nuevo) > 0.001:
                                 hay_cambios_ajustes_avanzados = True
-                                print(f"⚠️ Detectado cambio en {campo}: {valor_actual} -> {valor_nuevo}")
+                                log.warning('⚠️ Detectado cambio en %s: %s -> %s', campo, valor_actual, valor_nuevo)
             
             # Determinar si se deben activar los ajustes de admin
             if admin_ajustes_activos:
                 # Si el parámetro explícito está activo, usar ese valor directamente
                 ajustes_modificados_por_admin_ahora = True
-                print(f"⚠️ Detectados ajustes de admin activos a través del parámetro admin_ajustes_activos=True")
+                log.warning('⚠️ Detectados ajustes de admin activos a través del parámetro admin_ajustes_activos=True')
             elif es_admin and hay_cambios_ajustes_avanzados:
                 # Si un admin está modificando ajustes avanzados, activar el flag
                 ajustes_modificados_por_admin_ahora = True
-                print(f"⚠️ Detectados ajustes de admin implícitos: Admin modificando valores avanzados.")
+                log.warning('⚠️ Detectados ajustes de admin implícitos: Admin modificando valores avanzados.')
             elif es_admin:
-                print(f"Admin está modificando pero sin cambios en ajustes avanzados.")
+                log.debug('Admin está modificando pero sin cambios en ajustes avanzados.')
             
             # Obtener el valor actual del flag en la BD para preservarlo si ya está en TRUE
             valor_actual_flag_bd = False 
             try:
                 response_flag = self.db.supabase.table('cotizaciones').select('ajustes_modificados_admin').eq('id', cotizacion_id).maybe_single().execute()
                 if response_flag.data: valor_actual_flag_bd = response_flag.data.get('ajustes_modificados_admin', False)
-                print(f"Valor actual del flag en BD: {valor_actual_flag_bd}")
-            except Exception as e_flag: print(f"ERROR al leer flag: {e_flag}")
+                log.debug('Valor actual del flag en BD: %s', valor_actual_flag_bd)
+            except Exception as e_flag: log.error('ERROR al leer flag: %s', e_flag)
             
             # El flag final es TRUE si ya estaba en TRUE o si un admin lo está modificando ahora con ajustes activos
             flag_final_ajustes_admin = valor_actual_flag_bd or ajustes_modificados_por_admin_ahora
-            print(f"Valor final del flag ajustes_modificados_admin a enviar: {flag_final_ajustes_admin}")
+            log.debug('Valor final del flag ajustes_modificados_admin a enviar: %s', flag_final_ajustes_admin)
             # ------------------------------------------------------------------------
 
             # --- PASO 3: GENERAR Y VALIDAR IDENTIFICADOR --- 
-            print("\nGenerando y validando identificador actualizado...")
+            log.debug('Generando y validando identificador actualizado...')
             identificador_nuevo = ""
             try:
                 mat_ad_id_actual = cotizacion_model.material_adhesivo_id
@@ -577,16 +574,15 @@ class CotizacionManager:
                     referencia=referencia_desc_identificador,
                     numero_cotizacion=numero_cotizacion_original
                 )
-                print(f"Nuevo identificador generado: {identificador_nuevo}")
+                log.debug('Nuevo identificador generado: %s', identificador_nuevo)
                 if self.db.check_identificador_exists(identificador_nuevo, cotizacion_id):
                     error_msg = f"❌ El identificador generado '{identificador_nuevo}' ya existe para otra cotización. No se puede actualizar."
-                    print(error_msg)
+                    log.error(error_msg)
                     return False, error_msg
                 else:
-                    print("Identificador nuevo es único.")
+                    log.debug('Identificador nuevo es único.')
             except Exception as e_ident:
-                print(f"Error generando o validando identificador: {e_ident}")
-                traceback.print_exc()
+                log.error('Error generando o validando identificador: %s', e_ident, exc_info=True)
                 return False, f"❌ Error al procesar el identificador: {e_ident}"
             # ------------------------------------------------------------------------
 
@@ -615,7 +611,7 @@ class CotizacionManager:
             # --- INICIO: MANEJO EXPLÍCITO DE AJUSTES DE ADMIN ---
             # Usar el valor calculado en el PASO 2
             datos_actualizar['ajustes_modificados_admin'] = flag_final_ajustes_admin
-            print(f"Estableciendo ajustes_modificados_admin={flag_final_ajustes_admin} en los datos de actualización")
+            log.debug('Estableciendo ajustes_modificados_admin=%s en los datos de actualización', flag_final_ajustes_admin)
             # --- FIN: MANEJO EXPLÍCITO DE AJUSTES DE ADMIN ---
             
             if hasattr(cotizacion_model, 'material_adhesivo_id'):
@@ -634,7 +630,7 @@ class CotizacionManager:
             # --- INICIO: Incluir es_recotizacion en los datos ---
             if es_recotizacion is not None: # Añadir si se proporciona
                 datos_actualizar['es_recotizacion'] = es_recotizacion
-                print(f"  Añadiendo es_recotizacion={es_recotizacion} a los datos de actualización")
+                log.debug('  Añadiendo es_recotizacion=%s a los datos de actualización', es_recotizacion)
             # --- FIN: Incluir es_recotizacion en los datos ---
 
             # Convertir datetime a string ISO 8601 para serialización JSON
@@ -647,40 +643,38 @@ class CotizacionManager:
             
             # --- ELIMINADO: No añadir datos_calculo directamente aquí --- 
 
-            print("\nDEBUG CotizacionManager: datos_actualizar ANTES de enviar a DBManager:")
-            for k, v in datos_actualizar.items():
-                print(f"  {k}: {v}")
-            print(f"DEBUG CotizacionManager: Identificador específico en datos_actualizar: {datos_actualizar.get('identificador')}")
+            log.debug('DEBUG CotizacionManager: datos_actualizar ANTES de enviar a DBManager: %s', datos_actualizar)
+            log.debug('DEBUG CotizacionManager: Identificador específico en datos_actualizar: %s', datos_actualizar.get('identificador'))
             
             # --- PASO 5: Actualizar la cotización en la BD --- 
             success_main, msg_main = self.db.actualizar_cotizacion(cotizacion_id, datos_actualizar)
             if not success_main:
-                print(f"Error actualizando cotización: {msg_main}")
+                log.error('Error actualizando cotización: %s', msg_main)
                 return False, msg_main
                 
-            print("✅ Actualización principal de cotización exitosa.")
+            log.info('✅ Actualización principal de cotización exitosa.')
             
             # --- PASO 6: Guardar escalas actualizadas --- 
-            print("\nGuardando escalas actualizadas...")
+            log.debug('Guardando escalas actualizadas...')
             # --- INICIO: Log detallado del contenido de escalas --- 
             if cotizacion_model.escalas:
-                print(f"  Número de escalas a guardar: {len(cotizacion_model.escalas)}")
+                log.debug('  Número de escalas a guardar: %s', len(cotizacion_model.escalas))
                 for i, esc in enumerate(cotizacion_model.escalas):
-                    print(f"    Escala {i+1}: {esc.__dict__}") # Imprimir el diccionario de la escala
+                    log.debug('    Escala %s: %s', i + 1, esc.__dict__) # Imprimir el diccionario de la escala
             else:
-                print("  cotizacion_model.escalas está vacío o es None.")
+                log.debug('  cotizacion_model.escalas está vacío o es None.')
             # --- FIN: Log detallado --- 
             if cotizacion_model.escalas:
                 success_scales = self.db.guardar_cotizacion_escalas(cotizacion_id, cotizacion_model.escalas)
                 if not success_scales:
                     return False, "⚠️ La cotización principal se actualizó, pero hubo un error al guardar las escalas"
             else:
-                print("No hay escalas para actualizar.")
+                log.debug('No hay escalas para actualizar.')
                 # Considerar si eliminar escalas existentes si cotizacion_model.escalas está vacío
                 # self.db.eliminar_cotizacion_escalas(cotizacion_id) 
             
             # --- PASO 7: Guardar cálculos de escala actualizados --- 
-            print("\nGuardando cálculos de escala actualizados...")
+            log.debug('Guardando cálculos de escala actualizados...')
             # Extraer los parámetros necesarios del diccionario datos_calculo
             # Asegurarse de que las claves coincidan con las esperadas por guardar_calculos_escala
             # y proporcionar valores por defecto o manejar errores si faltan claves.
@@ -710,20 +704,18 @@ class CotizacionManager:
                     return False, "⚠️ La cotización principal y escalas se actualizaron, pero hubo un error al guardar los cálculos de escala"
             except Exception as e_calc:
                 error_msg = f"❌ Error inesperado guardando cálculos de escala: {e_calc}"
-                print(error_msg)
-                traceback.print_exc()
+                log.error(error_msg, exc_info=True)
                 return False, error_msg
 
-            print(f"=== Fin actualización exitosa para cotización ID: {cotizacion_id} ===")
+            log.info('=== Fin actualización exitosa para cotización ID: %s ===', cotizacion_id)
             return True, "✅ Cotización actualizada exitosamente (incluyendo escalas y cálculos)."
                 
         except ValueError as ve: # Capturar errores específicos de validación (ej: Identificador)
-            print(f"Error de validación durante actualización: {ve}")
+            log.error('Error de validación durante actualización: %s', ve)
             return False, str(ve)
         except Exception as e:
             # Captura errores de los pasos 0, 1, 3 o generales
-            print(f"Error general en actualizar_cotizacion_existente: {str(e)}")
-            traceback.print_exc()
+            log.error('Error general en actualizar_cotizacion_existente: %s', str(e), exc_info=True)
             return False, f"❌ Error actualizando cotización: {str(e)}"
 
     # --- Métodos Helper (si son necesarios) ---
@@ -736,7 +728,7 @@ class CotizacionManager:
         if not escalas_resultados:
             return escalas_transformadas
 
-        print(f"\nTransformando {len(escalas_resultados)} escalas...")
+        log.debug('Transformando %s escalas...', len(escalas_resultados))
         for i, resultado in enumerate(escalas_resultados):
             try:
                 # Asegurar que los campos necesarios existen y tienen valores válidos
@@ -762,15 +754,15 @@ class CotizacionManager:
                     papel_lam=papel_lam_val,
                     desperdicio_total=desperdicio_total_val
                 )
-                print(f"  Escala {i+1} transformada: {escala_obj.escala}, Valor: {escala_obj.valor_unidad:.2f}")
+                log.debug('  Escala %s transformada: %s, Valor: %.2f', i + 1, escala_obj.escala, escala_obj.valor_unidad)
                 escalas_transformadas.append(escala_obj)
             except (ValueError, TypeError, KeyError) as e:
-                print(f"Error transformando escala {i+1} (Datos: {resultado}): {e}")
+                log.error('Error transformando escala %s (Datos: %s): %s', i + 1, resultado, e)
                 # Opcional: lanzar una excepción o continuar con las siguientes escalas
                 # raise CotizacionManagerError(f"Error en datos de escala: {e}") from e
                 continue # Continuar con la siguiente escala
         
-        print(f"Total de escalas transformadas: {len(escalas_transformadas)}")
+        log.debug('Total de escalas transformadas: %s', len(escalas_transformadas))
         return escalas_transformadas
         
     def _obtener_o_crear_referencia(self, cliente_id: int, descripcion: str, comercial_id: str) -> Optional[int]:
@@ -780,18 +772,18 @@ class CotizacionManager:
         Devuelve el ID de la referencia encontrada o creada, o None si hay error.
         """
         if not cliente_id or not descripcion or not comercial_id:
-            print("Error: cliente_id, descripción y comercial_id son requeridos para obtener/crear referencia")
+            log.error('Error: cliente_id, descripción y comercial_id son requeridos para obtener/crear referencia')
             return None
             
         try:
-            print(f"Buscando/Creando referencia para Cliente {cliente_id}, Desc: '{descripcion}', Comercial: {comercial_id}")
+            log.debug("Buscando/Creando referencia para Cliente %s, Desc: '%s', Comercial: %s", cliente_id, descripcion, comercial_id)
             referencia_existente = self.db.get_referencia_cliente_by_details(cliente_id, descripcion, comercial_id)
             
             if referencia_existente:
-                print(f"Referencia existente encontrada con ID: {referencia_existente.id}")
+                log.debug('Referencia existente encontrada con ID: %s', referencia_existente.id)
                 return referencia_existente.id
             else:
-                print("Referencia no encontrada, creando nueva...")
+                log.debug('Referencia no encontrada, creando nueva...')
                 nueva_referencia = ReferenciaCliente(
                     cliente_id=cliente_id,
                     descripcion=descripcion,
@@ -799,16 +791,15 @@ class CotizacionManager:
                 )
                 referencia_guardada = self.db.crear_referencia(nueva_referencia)
                 if referencia_guardada and referencia_guardada.id:
-                    print(f"Nueva referencia creada con ID: {referencia_guardada.id}")
+                    log.debug('Nueva referencia creada con ID: %s', referencia_guardada.id)
                     return referencia_guardada.id
                 else:
-                    print("Error: No se pudo crear la nueva referencia en la BD.")
+                    log.error('Error: No se pudo crear la nueva referencia en la BD.')
                     # Aquí podríamos querer lanzar una excepción para detener el flujo
                     raise CotizacionManagerError("Fallo al crear la nueva referencia de cliente requerida.")
 
         except Exception as e:
-            print(f"Error en _obtener_o_crear_referencia: {e}")
-            traceback.print_exc()
+            log.error('Error en _obtener_o_crear_referencia: %s', e, exc_info=True)
             # Lanzar excepción para indicar fallo crítico
             raise CotizacionManagerError(f"Error obteniendo o creando referencia: {e}") from e
 
@@ -0,0 +1,295 @@
+"""
+Grafo de cálculo de una cotización (ver src/logic/calculators/grafo_calculo.py).
+
+Los nodos reproducen los pasos de handle_calculation en app_calculadora_costos.py,
+cada uno con sus entradas declaradas:
+
+    ancho_ajustado, num_tintas_ajustado, troquel_existe   <- formulario
+    geometria (DatosEscala sin escalas ni rentabilidad)   <- ancho, avance, pistas...
+    mejor_opcion                                          <- geometria
+    troquel, plancha                                      <- geometria + mejor_opcion + ajustes admin
+    acabado, valor_material_base                          <- consultas a la BD (+ version_precios)
+    valor_material                                        <- valor base + ajuste admin
+    plan_base (PlanPrecio)                                <- todo lo anterior
+    rentabilidad -> plan                                  <- plan_base + rentabilidad
+    resultados, curva_precio                              <- plan (+ escalas)
+
+Cambiar solo las escalas recalcula 'resultados'; cambiar la rentabilidad ajustada
+recalcula 'rentabilidad', 'plan', 'resultados' y 'curva_precio' sin volver a consultar
+precios ni recalcular troquel, plancha o la unidad de montaje.
+
+El grafo vive en la sesión, pero los precios los cambia cualquier usuario. Por eso los
+nodos de BD dependen también de 'version_precios', que GrafoCotizacion agrega en cada
+evaluación: la versión del dominio 'catalogo' de cache_datos (sube con cada cambio de
+precio hecho desde la aplicación, en cualquier sesión del proceso) y la franja de
+TTL_PRECIOS segundos (cambios hechos fuera de la aplicación se leen con ese atraso).
+"""
+import time
+from dataclasses import replace
+from typing import Any, Callable, Dict, Hashable, Iterable, Optional
+
+from src.data.cache_datos import cache_datos, CATALOGO
+from src.logic.calculators.grafo_calculo import GrafoCalculo, Nodo
+from src.logic.calculators.calculadora_costos_escala import CalculadoraCostosEscala, DatosEscala
+from src.logic.calculators.calculadora_litografia import CalculadoraLitografia
+from src.logic.calculators.curva_precio import CurvaPrecio
+from src.config.constants import (
+    ANCHO_MAXIMO_MAQUINA, RENTABILIDAD_MANGAS, RENTABILIDAD_ETIQUETAS,
+    FACTOR_ANCHO_MANGAS, INCREMENTO_ANCHO_MANGAS, GAP_AVANCE_ETIQUETAS, GAP_AVANCE_MANGAS,
+    VELOCIDAD_MAQUINA_NORMAL, VELOCIDAD_MAQUINA_MANGAS_7_TINTAS, DESPERDICIO_MANGAS,
+    DESPERDICIO_ETIQUETAS
+)
+
+ID_SIN_ADHESIVO = 4  # Material de manga: precio con adhesivo "Sin adhesivo"
+ACABADOS_TINTA_ADICIONAL = (3, 4, 5, 6)
+ANCHO_MAXIMO_FUNDA = 415
+
+# Nodos que consultan la base de datos (se invalidan cuando cambian precios)
+NODOS_BD = ('acabado', 'valor_material_base')
+TTL_PRECIOS = 60  # segundos que un precio leído de la BD se reutiliza sin cambio de catálogo
+
+
+def version_precios() -> Hashable:
+    """Versión del catálogo de precios del proceso y franja de TTL_PRECIOS actual"""
+    return cache_datos.version(CATALOGO), int(time.monotonic() // TTL_PRECIOS)
+
+
+class GrafoCotizacion(GrafoCalculo):
+    """GrafoCalculo que agrega la entrada 'version_precios' en cada evaluación"""
+
+    def __init__(self, nodos: Iterable[Nodo], version: Callable[[], Hashable] = version_precios):
+        super().__init__(nodos)
+        self.version = version
+
+    def evaluar(self, entradas: Dict[str, Any], objetivos: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+        return super().evaluar({**entradas, 'version_precios': self.version()}, objetivos)
+
+
+def convertir_troquel_existe(tiene_troquel: Any) -> bool:
+    """Convierte el valor del formulario ("Sí"/"No", bool, número o texto) a booleano"""
+    if isinstance(tiene_troquel, str):
+        if tiene_troquel == "Sí":
+            return True
+        if tiene_troquel == "No":
+            return False
+        return tiene_troquel.lower() in ('true', 'yes', '1')
+    if isinstance(tiene_troquel, (int, float)) and not isinstance(tiene_troquel, bool):
+        return tiene_troquel > 0
+    return bool(tiene_troquel)
+
+
+def calcular_ancho_ajustado(ancho: float, es_manga: bool, num_tintas: int) -> float:
+    """Ancho efectivo: mangas se abren (o se doblan + 6 en fundas transparentes sin tintas)"""
+    if not es_manga:
+        return ancho
+    if num_tintas == 0:
+        ancho_ajustado = (ancho * 2) + 6
+        if ancho_ajustado > ANCHO_MAXIMO_FUNDA:
+            raise ValueError(
+                f"El ancho efectivo ({ancho_ajustado:.2f} mm) excede el máximo permitido "
+                f"({ANCHO_MAXIMO_FUNDA} mm) para fundas transparentes."
+            )
+        return ancho_ajustado
+    return (ancho * FACTOR_ANCHO_MANGAS) + INCREMENTO_ANCHO_MANGAS
+
+
+def calcular_num_tintas_ajustado(num_tintas: int, es_manga: bool, acabado_id: Optional[int]) -> int:
+    """Los acabados especiales en etiquetas requieren una tinta adicional"""
+    if es_manga or acabado_id not in ACABADOS_TINTA_ADICIONAL:
+        return num_tintas
+    num_tintas_ajustado = num_tintas + 1
+    if num_tintas_ajustado > 7:
+        raise ValueError(
+            f"El acabado seleccionado requiere 1 tinta adicional en el cálculo. "
+            f"Con las {num_tintas} tintas seleccionadas, se excede el máximo de 7 tintas "
+            f"permitidas. Para este acabado, seleccione máximo 6 tintas."
+        )
+    return num_tintas_ajustado
+
+
+def construir_grafo_cotizacion(db, ancho_maximo: float = ANCHO_MAXIMO_MAQUINA,
+                               version: Callable[[], Hashable] = version_precios) -> GrafoCotizacion:
+    """
+    Construye el grafo de cálculo de la cotización.
+
+    Args:
+        db: DBManager de la sesión (consultas de precio de material y acabado)
+        ancho_maximo: Ancho máximo de máquina para la calculadora de costos
+        version: Versión de los precios; al cambiar se vuelven a leer de la BD
+
+    Returns:
+        GrafoCotizacion: Grafo listo para evaluar con los valores del formulario
+    """
+    calculadora = CalculadoraCostosEscala(ancho_maximo=ancho_maximo)
+    calc_lito = CalculadoraLitografia()
+
+    def geometria(ancho_ajustado, avance, pistas, es_manga, num_tintas, troquel_existe,
+                  planchas_separadas, unidad_montaje_dientes):
+        # Escalas y rentabilidad quedan fuera: no afectan montaje, troquel ni plancha
+        return DatosEscala(
+            escalas=[],
+            pistas=pistas,
+            ancho=ancho_ajustado,
+            avance=avance,
+            avance_total=avance + (GAP_AVANCE_MANGAS if es_manga else GAP_AVANCE_ETIQUETAS),
+            desperdicio=0,
+            velocidad_maquina=VELOCIDAD_MAQUINA_MANGAS_7_TINTAS if (es_manga and num_tintas >= 7)
+                            else VELOCIDAD_MAQUINA_NORMAL,
+            porcentaje_desperdicio=DESPERDICIO_MANGAS if es_manga else DESPERDICIO_ETIQUETAS,
+            troquel_existe=troquel_existe,
+            planchas_por_separado=bool(planchas_separadas),
+            unidad_montaje_dientes=unidad_montaje_dientes
+        )
+
+    def mejor_opcion(geometria, es_manga):
+        opcion = calc_lito.obtener_mejor_opcion_desperdicio(geometria, es_manga)
+        if opcion is None:
+            raise ValueError("No se encontró una configuración de cilindro/repetición válida para este avance.")
+        return opcion
+
+    # version_precios no se usa en el cálculo: solo fuerza la relectura de la BD
+    def acabado(acabado_id, es_manga, version_precios):
+        return db.get_acabado(acabado_id) if not es_manga else None
+
+    def valor_material_base(material_id, adhesivo_id, es_manga, version_precios):
+        if es_manga:
+            valor = db.get_material_adhesivo_valor(material_id, ID_SIN_ADHESIVO)
+            if valor is None:
+                raise ValueError(
+                    f"No se encontró precio base para el Material de Manga ID {material_id} "
+                    f"(con adhesivo 'Sin adhesivo'). Verifique la tabla material_adhesivo."
+                )
+            return valor
+        if not adhesivo_id:
+            raise ValueError("Para Etiquetas, debe seleccionar un Adhesivo.")
+        valor = db.get_material_adhesivo_valor(material_id, adhesivo_id)
+        if valor is None:
+            raise ValueError(
+                f"No se encontró precio para la combinación de Material ID {material_id} y "
+                f"Adhesivo ID {adhesivo_id}. Por favor, verifique la configuración."
+            )
+        return valor
+
+    def valor_material(valor_material_base, ajustar_material, valor_material_ajustado):
+        if ajustar_material and valor_material_ajustado is not None:
+            return valor_material_ajustado
+        return valor_material_base
+
+    def troquel(geometria, mejor_opcion, tipo_grafado_id, es_manga, ajustar_troquel, precio_troquel):
+        """Valor final del troquel (ajuste admin o cálculo por defecto)"""
+        if ajustar_troquel:
+            return {'valor': precio_troquel if precio_troquel is not None else 0.0, 'advertencia': None}
+        resultado = calc_lito.calcular_valor_troquel(
+            geometria,
+            mejor_opcion.repeticiones,
+            troquel_existe=geometria.troquel_existe,
+            tipo_grafado_id=tipo_grafado_id,
+            es_manga=es_manga
+        )
+        if 'error' in resultado:
+            return {'valor': 0.0, 'advertencia': f"No se pudo calcular el valor del troquel por defecto: {resultado['error']}"}
+        return {'valor': resultado.get('valor', 0.0), 'advertencia': None}
+
+    def plancha(geometria, mejor_opcion, num_tintas_ajustado, es_manga, unidad_montaje_dientes,
+                ajustar_planchas, precio_planchas):
+        """Valor final de plancha y precio sin constante (para planchas por separado)"""
+        if ajustar_planchas:
+            return {'valor': precio_planchas if precio_planchas is not None else 0.0,
+                    'precio_sin_constante': None, 'advertencia': None}
+        if unidad_montaje_dientes is not None:
+            # Con unidad elegida la calculadora de costos computa la plancha internamente
+            return {'valor': None, 'precio_sin_constante': None, 'advertencia': None}
+        resultado = calc_lito.calcular_precio_plancha(geometria, num_tintas_ajustado, es_manga, opcion=mejor_opcion)
+        if 'error' in resultado:
+            return {'valor': 0.0, 'precio_sin_constante': None,
+                    'advertencia': f"No se pudo calcular el valor de plancha por defecto: {resultado['error']}"}
+        detalles = resultado.get('detalles') or {}
+        return {'valor': resultado.get('precio', 0.0),
+                'precio_sin_constante': detalles.get('precio_sin_constante'), 'advertencia': None}
+
+    def plan_base(geometria, num_tintas_ajustado, plancha, troquel, valor_material, acabado,
+                  es_manga, tipo_grafado_id):
+        # preparar_plan fija el área en los datos: trabajar sobre una copia
+        return calculadora.preparar_plan(
+            datos=replace(geometria),
+            num_tintas=num_tintas_ajustado,
+            valor_plancha=plancha['valor'],
+            valor_troquel=troquel['valor'],
+            valor_material=valor_material,
+            valor_acabado=acabado.valor if acabado else 0,
+            es_manga=es_manga,
+            tipo_grafado_id=tipo_grafado_id
+        )
+
+    def rentabilidad(es_manga, rentabilidad_ajustada):
+        """Rentabilidad como la recibe DatosEscala: ajuste admin en decimal o el % por defecto"""
+        if rentabilidad_ajustada is not None and rentabilidad_ajustada > 0:
+            return rentabilidad_ajustada / 100.0
+        return RENTABILIDAD_MANGAS if es_manga else RENTABILIDAD_ETIQUETAS
+
+    def plan(plan_base, rentabilidad):
+        # Misma normalización a decimal que preparar_plan
+        decimal = rentabilidad / 100.0 if rentabilidad >= 1 else rentabilidad
+        return replace(plan_base, rentabilidad=decimal)
+
+    def resultados(plan, escalas):
+        return [calculadora.calcular_escala(plan, escala) for escala in escalas]
+
+    def curva_precio(plan):
+        return CurvaPrecio.desde_plan(plan)
+
+    return GrafoCotizacion([
+        Nodo('troquel_existe', ('tiene_troquel',), convertir_troquel_existe),
+        Nodo('ancho_ajustado', ('ancho', 'es_manga', 'num_tintas'), calcular_ancho_ajustado),
+        Nodo('num_tintas_ajustado', ('num_tintas', 'es_manga', 'acabado_id'), calcular_num_tintas_ajustado),
+        Nodo('geometria', ('ancho_ajustado', 'avance', 'pistas', 'es_manga', 'num_tintas', 'troquel_existe',
+                           'planchas_separadas', 'unidad_montaje_dientes'), geometria),
+        Nodo('mejor_opcion', ('geometria', 'es_manga'), mejor_opcion),
+        Nodo('acabado', ('acabado_id', 'es_manga', 'version_precios'), acabado),
+        Nodo('valor_material_base', ('material_id', 'adhesivo_id', 'es_manga', 'version_precios'),
+             valor_material_base),
+        Nodo('valor_material', ('valor_material_base', 'ajustar_material', 'valor_material_ajustado'), valor_material),
+        Nodo('troquel', ('geometria', 'mejor_opcion', 'tipo_grafado_id', 'es_manga',
+                         'ajustar_troquel', 'precio_troquel'), troquel),
+        Nodo('plancha', ('geometria', 'mejor_opcion', 'num_tintas_ajustado', 'es_manga',
+                         'unidad_montaje_dientes', 'ajustar_planchas', 'precio_planchas'), plancha),
+        Nodo('plan_base', ('geometria', 'num_tintas_ajustado', 'plancha', 'troquel', 'valor_material',
+                           'acabado', 'es_manga', 'tipo_grafado_id'), plan_base),
+        Nodo('rentabilidad', ('es_manga', 'rentabilidad_ajustada'), rentabilidad),
+        Nodo('plan', ('plan_base', 'rentabilidad'), plan),
+        Nodo('resultados', ('plan', 'escalas'), resultados),
+        Nodo('curva_precio', ('plan',), curva_precio),
+    ], version=version)
+
+
+def entradas_desde_formulario(form_data: Dict[str, Any], ajustes: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Arma las entradas del grafo a partir del formulario y los ajustes admin.
+
+    Args:
+        form_data: Datos del formulario de la calculadora
+        ajustes: Ajustes admin (ajustar_material, valor_material_ajustado, ajustar_troquel,
+            precio_troquel, ajustar_planchas, precio_planchas, rentabilidad_ajustada)
+    """
+    return {
+        'ancho': form_data['ancho'],
+        'avance': form_data['avance'],
+        'pistas': form_data['pistas'],
+        'es_manga': form_data['es_manga'],
+        'num_tintas': form_data['num_tintas'],
+        'acabado_id': form_data.get('acabado_id'),
+        'material_id': form_data['material_id'],
+        'adhesivo_id': form_data.get('adhesivo_id'),
+        'tiene_troquel': form_data.get('tiene_troquel'),
+        'planchas_separadas': form_data.get('planchas_separadas', False),
+        'unidad_montaje_dientes': form_data.get('unidad_montaje_dientes'),
+        'tipo_grafado_id': form_data.get('tipo_grafado_id'),
+        'escalas': list(form_data['escalas']),
+        'ajustar_material': bool(ajustes.get('ajustar_material')),
+        'valor_material_ajustado': ajustes.get('valor_material_ajustado'),
+        'ajustar_troquel': bool(ajustes.get('ajustar_troquel')),
+        'precio_troquel': ajustes.get('precio_troquel'),
+        'ajustar_planchas': bool(ajustes.get('ajustar_planchas')),
+        'precio_planchas': ajustes.get('precio_planchas'),
+        'rentabilidad_ajustada': ajustes.get('rentabilidad_ajustada'),
+    }
@@ -0,0 +1,312 @@
+"""
+Importación masiva de clientes y referencias (alta de un distribuidor con cientos de
+clientes) desde un CSV o XLSX.
+
+Columnas (encabezados sin importar mayúsculas ni tildes):
+
+    nombre, nit (o codigo/cc)                    obligatorias
+    contacto, correo, telefono                   opcionales, datos del cliente
+    referencia (o descripcion), comercial        opcionales
+
+Cada fila crea el cliente si su NIT/CC no existe y la referencia (cliente, descripción,
+comercial) si no existe. Un cliente nuevo sin referencia en la fila recibe la referencia
+'Principal' de su comercial, como hace crear_cliente. El comercial se indica por id,
+nombre o correo; si falta se usa el comercial por defecto de la importación.
+
+En lugar de una consulta de existencia y un insert por fila, el importador:
+    - lee las filas de a una (el CSV no se carga entero en memoria),
+    - des-duplica contra índices en memoria: el índice de clientes de la sesión (NIT/CC)
+      y el conjunto de claves (cliente, descripción, comercial) de las referencias
+      existentes, leído una sola vez con paginación,
+    - inserta clientes y referencias en lotes de 'tamano_lote' filas (un insert por lote);
+      si un lote falla se reintenta fila por fila para rechazar solo las filas con error,
+    - reporta filas por segundo y los rechazos con su número de fila y motivo.
+"""
+import csv
+import io
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+import pandas as pd
+
+from src.data.indice_clientes import normalizar_texto
+
+TAMANO_LOTE = 200
+REFERENCIA_PRINCIPAL = 'Principal'
+
+# Encabezado normalizado -> campo
+ALIAS_COLUMNAS = {
+    'nombre': 'nombre', 'cliente': 'nombre', 'razon social': 'nombre',
+    'nit': 'codigo', 'codigo': 'codigo', 'cc': 'codigo', 'nit cc': 'codigo', 'documento': 'codigo',
+    'contacto': 'persona_contacto', 'persona contacto': 'persona_contacto', 'persona de contacto': 'persona_contacto',
+    'correo': 'correo_electronico', 'correo electronico': 'correo_electronico', 'email': 'correo_electronico',
+    'telefono': 'telefono', 'celular': 'telefono',
+    'referencia': 'referencia', 'descripcion': 'referencia',
+    'comercial': 'comercial',
+}
+
+Clave = Tuple[Any, str, str]  # (cliente_id o ('nit', codigo), descripción normalizada, id del comercial)
+
+
+def clave_descripcion(descripcion: Optional[str]) -> str:
+    """Descripciones comparables: sin espacios repetidos ni diferencias de mayúsculas"""
+    return ' '.join((descripcion or '').split()).casefold()
+
+
+def limpiar_codigo(codigo: Any) -> Optional[int]:
+    """NIT/CC como entero (sin puntos ni guiones), igual que crear_cliente; None si no es válido"""
+    if isinstance(codigo, float):  # celdas numéricas de Excel
+        return int(codigo) if codigo.is_integer() and codigo > 0 else None
+    texto = str(codigo or '').strip()
+    if texto.endswith('.0'):  # la misma celda ya convertida a texto ('900123.0')
+        texto = texto[:-2]
+    texto = texto.replace('-', '').replace('.', '').replace(' ', '')
+    return int(texto) if texto.isdigit() else None
+
+
+def _normalizar_fila(fila: Dict[Any, Any]) -> Dict[str, str]:
+    datos: Dict[str, str] = {}
+    for columna, valor in fila.items():
+        campo = ALIAS_COLUMNAS.get(normalizar_texto(str(columna or '')))
+        if campo and campo not in datos:
+            datos[campo] = '' if valor is None or (isinstance(valor, float) and pd.isna(valor)) else str(valor).strip()
+    return datos
+
+
+def leer_filas(contenido: bytes, nombre_archivo: str) -> Iterator[Tuple[int, Dict[str, str]]]:
+    """
+    Itera (número de fila, datos) del archivo. El CSV se lee fila por fila; el XLSX se
+    carga con pandas (requiere openpyxl).
+
+    Raises:
+        ValueError: Si el formato no es soportado o faltan las columnas obligatorias
+    """
+    extension = os.path.splitext(nombre_archivo or '')[1].lower()
+    if extension == '.csv':
+        texto = io.TextIOWrapper(io.BytesIO(contenido), encoding='utf-8-sig', newline='')
+        muestra = texto.read(4096)
+        texto.seek(0)
+        try:
+            dialecto = csv.Sniffer().sniff(muestra, delimiters=',;\t')
+        except csv.Error:
+            dialecto = csv.excel
+        lector = csv.DictReader(texto, dialect=dialecto)
+        columnas = lector.fieldnames or []
+        filas: Iterable[Dict[Any, Any]] = lector
+    elif extension in ('.xlsx', '.xls'):
+        try:
+            df = pd.read_excel(io.BytesIO(contenido), dtype=str, keep_default_na=False)
+        except ImportError as e:
+            raise ValueError(f"Para leer archivos Excel se necesita openpyxl instalado ({e}). "
+                             "Exporte la lista como CSV.") from e
+        columnas = [str(c) for c in df.columns]
+        filas = df.to_dict('records')
+    else:
+        raise ValueError(f"Formato no soportado: '{extension or nombre_archivo}'. Use CSV o XLSX.")
+
+    campos = {ALIAS_COLUMNAS.get(normalizar_texto(str(c))) for c in columnas}
+    if not {'nombre', 'codigo'} <= campos:
+        raise ValueError(f"El archivo debe tener columnas de nombre y NIT/CC. "
+                         f"Columnas encontradas: {', '.join(map(str, columnas))}")
+
+    for posicion, fila in enumerate(filas):
+        datos = _normalizar_fila(fila)
+        if any(datos.values()):  # filas totalmente vacías se ignoran
+            yield posicion + 2, datos  # +2: encabezado y numeración desde 1
+
+
+@dataclass
+class ReporteImportacion:
+    """Resultado de una importación"""
+    filas_leidas: int = 0
+    clientes_creados: int = 0
+    clientes_existentes: int = 0
+    referencias_creadas: int = 0
+    referencias_existentes: int = 0
+    lotes: int = 0
+    segundos: float = 0.0
+    rechazos: List[Tuple[int, str]] = field(default_factory=list)  # (fila, motivo)
+
+    @property
+    def filas_por_segundo(self) -> float:
+        return self.filas_leidas / self.segundos if self.segundos > 0 else 0.0
+
+    def resumen(self) -> str:
+        return (f"{self.filas_leidas} filas en {self.segundos:.1f}s ({self.filas_por_segundo:.0f} filas/s): "
+                f"{self.clientes_creados} clientes creados, {self.clientes_existentes} existentes, "
+                f"{self.referencias_creadas} referencias creadas, {self.referencias_existentes} ya existían, "
+                f"{len(self.rechazos)} rechazos, {self.lotes} lotes")
+
+
+def mapa_comerciales(perfiles: List[Dict[str, Any]]) -> Dict[str, str]:
+    """{id, nombre normalizado o correo: id del comercial} desde get_perfiles_by_role('comercial')"""
+    mapa: Dict[str, str] = {}
+    for perfil in perfiles:
+        comercial_id = perfil.get('id')
+        if not comercial_id:
+            continue
+        mapa[str(comercial_id).lower()] = str(comercial_id)
+        for clave in (perfil.get('nombre'), perfil.get('email')):
+            if clave:
+                mapa.setdefault(normalizar_texto(clave), str(comercial_id))
+    return mapa
+
+
+class ImportadorClientes:
+    """Importa filas de clientes/referencias en lotes, des-duplicando en memoria"""
+
+    def __init__(self, db, comerciales: Dict[str, str], comercial_por_defecto: Optional[str] = None,
+                 tamano_lote: int = TAMANO_LOTE):
+        if tamano_lote < 1:
+            raise ValueError("El tamaño de lote debe ser al menos 1")
+        self.db = db
+        self.comerciales = comerciales
+        self.comercial_por_defecto = comercial_por_defecto
+        self.tamano_lote = tamano_lote
+        self.reporte = ReporteImportacion()
+
+        self._indice = db.get_indice_clientes()
+        self._claves: Set[Clave] = {
+            (cliente_id, clave_descripcion(descripcion), str(id_usuario))
+            for cliente_id, descripcion, id_usuario in db.listar_claves_referencias()
+        }
+        self._ids_por_codigo: Dict[int, int] = {}  # clientes creados en esta importación
+        self._codigos_vistos: Set[int] = set()
+        self._codigos_fallidos: Set[int] = set()
+        self._clientes_pendientes: Dict[int, Tuple[int, Dict[str, Any]]] = {}  # codigo -> (fila, datos)
+        self._referencias_pendientes: List[Tuple[int, int, str, str]] = []  # (fila, codigo, descripcion, comercial)
+
+    def _rechazar(self, fila: int, motivo: str) -> None:
+        self.reporte.rechazos.append((fila, motivo))
+
+    def _resolver_comercial(self, valor: str) -> Optional[str]:
+        if not valor:
+            return self.comercial_por_defecto
+        return self.comerciales.get(valor.strip().lower()) or self.comerciales.get(normalizar_texto(valor))
+
+    def _cliente_id(self, codigo: int) -> Optional[int]:
+        if codigo in self._ids_por_codigo:
+            return self._ids_por_codigo[codigo]
+        existente = self._indice.obtener_por_codigo(codigo)
+        return existente.id if existente is not None else None
+
+    def agregar(self, fila: int, datos: Dict[str, str]) -> None:
+        """Procesa una fila; los inserts se hacen al completar cada lote"""
+        self.reporte.filas_leidas += 1
+        nombre = datos.get('nombre', '')
+        codigo = limpiar_codigo(datos.get('codigo'))
+        if not nombre:
+            return self._rechazar(fila, "Falta el nombre del cliente")
+        if codigo is None:
+            return self._rechazar(fila, f"NIT/CC inválido: '{datos.get('codigo', '')}' (solo números, puntos o guiones)")
+        comercial = self._resolver_comercial(datos.get('comercial', ''))
+        if datos.get('comercial') and comercial is None:
+            return self._rechazar(fila, f"Comercial no encontrado: '{datos['comercial']}'")
+
+        # Cliente: existente (índice), ya visto en el archivo o nuevo (pendiente de lote)
+        cliente_id = self._cliente_id(codigo)
+        es_nuevo = cliente_id is None and codigo not in self._codigos_vistos
+        if codigo not in self._codigos_vistos:
+            self._codigos_vistos.add(codigo)
+            if cliente_id is not None:
+                self.reporte.clientes_existentes += 1
+            else:
+                self._clientes_pendientes[codigo] = (fila, {
+                    'nombre': nombre,
+                    'codigo': codigo,
+                    'persona_contacto': datos.get('persona_contacto') or None,
+                    'correo_electronico': datos.get('correo_electronico') or None,
+                    'telefono': datos.get('telefono') or None,
+                })
+
+        # Referencia: la de la fila o 'Principal' para un cliente nuevo
+        descripcion = datos.get('referencia') or (REFERENCIA_PRINCIPAL if es_nuevo else '')
+        if descripcion:
+            if comercial is None:
+                self._rechazar(fila, f"La referencia '{descripcion}' necesita un comercial "
+                                     "(columna comercial o comercial por defecto)")
+            else:
+                # Los clientes creados en esta importación no tienen referencias previas en la
+                # base: sus claves van por NIT, porque el id solo se conoce al insertar el lote
+                nuevo = cliente_id is None or codigo in self._ids_por_codigo
+                clave = (('nit', codigo) if nuevo else cliente_id, clave_descripcion(descripcion), comercial)
+                if clave in self._claves:
+                    self.reporte.referencias_existentes += 1
+                else:
+                    self._claves.add(clave)
+                    self._referencias_pendientes.append((fila, codigo, descripcion, comercial))
+
+        if len(self._clientes_pendientes) >= self.tamano_lote:
+            self._insertar_clientes()
+        if len(self._referencias_pendientes) >= self.tamano_lote:
+            self._insertar_referencias()
+
+    def _insertar_lote(self, metodo, filas: List[Tuple[int, Dict[str, Any]]]) -> List[Tuple[int, Any]]:
+        """
+        Inserta un lote con metodo(lista de dicts). Si falla, reintenta fila por fila y
+        rechaza solo las que fallan. Devuelve (fila, creado) de las insertadas.
+        """
+        self.reporte.lotes += 1
+        try:
+            creados = metodo([datos for _, datos in filas])
+            if len(creados) == len(filas):
+                return [(fila, creado) for (fila, _), creado in zip(filas, creados)]
+            print(f"Lote con {len(creados)} de {len(filas)} filas insertadas; se reintenta fila por fila")
+        except Exception as e:
+            print(f"Error insertando lote de {len(filas)} filas: {e}. Se reintenta fila por fila")
+        insertados = []
+        for fila, datos in filas:
+            try:
+                creados = metodo([datos])
+                if creados:
+                    insertados.append((fila, creados[0]))
+                else:
+                    self._rechazar(fila, "La base de datos no devolvió la fila creada")
+            except Exception as e:
+                self._rechazar(fila, f"Error al insertar: {e}")
+        return insertados
+
+    def _insertar_clientes(self) -> None:
+        if not self._clientes_pendientes:
+            return
+        pendientes = list(self._clientes_pendientes.items())
+        self._clientes_pendientes = {}
+        insertados = self._insertar_lote(self.db.crear_clientes_lote, [item for _, item in pendientes])
+        creados = {limpiar_codigo(cliente.codigo): cliente.id for _, cliente in insertados}
+        for codigo, _ in pendientes:
+            if codigo in creados:
+                self._ids_por_codigo[codigo] = creados[codigo]
+            else:
+                self._codigos_fallidos.add(codigo)
+        self.reporte.clientes_creados += len(insertados)
+
+    def _insertar_referencias(self) -> None:
+        # Los clientes nuevos deben existir antes que sus referencias
+        self._insertar_clientes()
+        if not self._referencias_pendientes:
+            return
+        pendientes = self._referencias_pendientes
+        self._referencias_pendientes = []
+        filas: List[Tuple[int, Dict[str, Any]]] = []
+        for fila, codigo, descripcion, comercial in pendientes:
+            cliente_id = self._cliente_id(codigo)
+            if cliente_id is None:
+                motivo = "no se pudo crear su cliente" if codigo in self._codigos_fallidos else "cliente no encontrado"
+                self._rechazar(fila, f"Referencia '{descripcion}' no creada: {motivo}")
+                continue
+            filas.append((fila, {'cliente_id': cliente_id, 'descripcion': descripcion, 'id_usuario': comercial}))
+        if filas:
+            self.reporte.referencias_creadas += len(self._insertar_lote(self.db.crear_referencias_lote, filas))
+
+    def importar(self, filas: Iterable[Tuple[int, Dict[str, str]]]) -> ReporteImportacion:
+        """Procesa todas las filas (ver leer_filas) y devuelve el reporte"""
+        inicio = time.perf_counter()
+        for fila, datos in filas:
+            self.agregar(fila, datos)
+        self._insertar_referencias()
+        self.reporte.segundos = time.perf_counter() - inicio
+        self.reporte.rechazos.sort()
+        print(f"Importación de clientes: {self.reporte.resumen()}")
+        return self.reporte
@@ -0,0 +1,254 @@
+"""
+Importación masiva de precios (material_adhesivo y acabados) desde una lista de
+proveedor en CSV o XLSX.
+
+El archivo trae una fila por código con su nuevo valor:
+
+    codigo,valor
+    PELB-ACR,1850
+    LAM,920
+
+Flujo (ver la pestaña "Importación masiva" en src/ui/manage_values_view.py):
+    1. leer_archivo_precios: archivo -> filas (codigo, valor) con su número de fila
+    2. validar_precios: contra el catálogo ya cargado (códigos que existen, valores
+       numéricos no negativos, códigos repetidos) -> cambios, sin cambio y errores
+    3. vista previa de los cambios (valor actual -> nuevo, diferencia en %)
+    4. DBManager.actualizar_valores_lote: un solo upsert con todas las filas cambiadas
+    5. una sola invalidación del catálogo en caché (SessionManager.invalidar_catalogo_precios)
+
+Los valores se guardan como enteros, igual que actualizar_material_adhesivo_valor y
+actualizar_acabado_valor.
+"""
+import io
+import os
+import re
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+import pandas as pd
+
+TABLA_MATERIAL_ADHESIVO = 'material_adhesivo'
+TABLA_ACABADOS = 'acabados'
+
+# Encabezados aceptados (en minúsculas, sin espacios a los lados)
+COLUMNAS_CODIGO = ('codigo', 'código', 'code', 'cod')
+COLUMNAS_VALOR = ('valor', 'nuevo_valor', 'precio', 'value')
+
+_MILES = re.compile(r'^\d{1,3}([.,]\d{3})+$')
+
+
+@dataclass
+class FilaImportada:
+    """Fila leída del archivo (fila = número de fila en el archivo, contando el encabezado)"""
+    fila: int
+    codigo: str
+    valor: Any
+
+
+@dataclass
+class CambioPrecio:
+    """Cambio de precio validado, listo para aplicar"""
+    id: int
+    codigo: str
+    descripcion: str
+    valor_actual: int
+    valor_nuevo: int
+
+    @property
+    def diferencia_porcentual(self) -> Optional[float]:
+        if not self.valor_actual:
+            return None
+        return (self.valor_nuevo - self.valor_actual) / self.valor_actual * 100
+
+
+@dataclass
+class ResultadoValidacion:
+    """Resultado de validar un archivo contra el catálogo"""
+    cambios: List[CambioPrecio] = field(default_factory=list)
+    sin_cambio: List[str] = field(default_factory=list)  # códigos con el mismo valor
+    errores: List[str] = field(default_factory=list)
+
+    @property
+    def valido(self) -> bool:
+        return not self.errores
+
+    def vista_previa(self) -> pd.DataFrame:
+        """Tabla de cambios para mostrar antes de aplicar"""
+        return pd.DataFrame(
+            [{
+                'Código': c.codigo,
+                'Descripción': c.descripcion,
+                'Valor actual': c.valor_actual,
+                'Valor nuevo': c.valor_nuevo,
+                'Diferencia (%)': round(c.diferencia_porcentual, 2) if c.diferencia_porcentual is not None else None,
+            } for c in self.cambios],
+            columns=['Código', 'Descripción', 'Valor actual', 'Valor nuevo', 'Diferencia (%)']
+        )
+
+
+def normalizar_codigo(codigo: Any) -> str:
+    """Códigos comparables: sin espacios a los lados y en mayúsculas"""
+    if codigo is None or (isinstance(codigo, float) and pd.isna(codigo)):
+        return ''
+    return str(codigo).strip().upper()
+
+
+def _columna(columnas: List[str], aceptadas: Tuple[str, ...]) -> Optional[str]:
+    for columna in columnas:
+        if columna.strip().lower() in aceptadas:
+            return columna
+    return None
+
+
+def leer_archivo_precios(contenido: bytes, nombre_archivo: str) -> List[FilaImportada]:
+    """
+    Lee un CSV (separado por coma o punto y coma) o un XLSX con columnas de código y valor.
+
+    Raises:
+        ValueError: Si el formato no es soportado o faltan las columnas
+    """
+    extension = os.path.splitext(nombre_archivo or '')[1].lower()
+    if extension == '.csv':
+        # sep=None detecta ',' o ';' (listas exportadas desde Excel en español)
+        df = pd.read_csv(io.BytesIO(contenido), sep=None, engine='python', dtype=str,
+                         encoding='utf-8-sig', keep_default_na=False)
+    elif extension in ('.xlsx', '.xls'):
+        try:
+            df = pd.read_excel(io.BytesIO(contenido), dtype=str, keep_default_na=False)
+        except ImportError as e:
+            raise ValueError(f"Para leer archivos Excel se necesita openpyxl instalado ({e}). "
+                             "Exporte la lista como CSV.") from e
+    else:
+        raise ValueError(f"Formato no soportado: '{extension or nombre_archivo}'. Use CSV o XLSX.")
+
+    columnas = [str(c) for c in df.columns]
+    df.columns = columnas
+    columna_codigo = _columna(columnas, COLUMNAS_CODIGO)
+    columna_valor = _columna(columnas, COLUMNAS_VALOR)
+    if columna_codigo is None or columna_valor is None:
+        raise ValueError(
+            f"El archivo debe tener columnas de código ({', '.join(COLUMNAS_CODIGO)}) "
+            f"y valor ({', '.join(COLUMNAS_VALOR)}). Columnas encontradas: {', '.join(columnas)}"
+        )
+
+    return [
+        FilaImportada(fila=posicion + 2, codigo=normalizar_codigo(codigo), valor=valor)
+        for posicion, (codigo, valor) in enumerate(zip(df[columna_codigo], df[columna_valor]))
+        if normalizar_codigo(codigo) or str(valor).strip()  # filas totalmente vacías se ignoran
+    ]
+
+
+def _a_valor(valor: Any) -> Optional[float]:
+    """Convierte '1.850', '1.850,50', '1850,5', '$ 1850' o 1850 a número; None si no es numérico"""
+    if valor is None:
+        return None
+    if isinstance(valor, (int, float)):
+        return None if pd.isna(valor) else float(valor)
+    texto = str(valor).strip().replace('$', '').replace(' ', '')
+    if not texto:
+        return None
+    if ',' in texto and '.' in texto:
+        # El último separador es el decimal: 1.850,50 o 1,850.50
+        if texto.rfind(',') > texto.rfind('.'):
+            texto = texto.replace('.', '').replace(',', '.')
+        else:
+            texto = texto.replace(',', '')
+    elif _MILES.match(texto):
+        # Solo separadores de miles: 1.850 o 1,850
+        texto = texto.replace('.', '').replace(',', '')
+    elif ',' in texto:
+        texto = texto.replace(',', '.')
+    try:
+        return float(texto)
+    except ValueError:
+        return None
+
+
+def validar_precios(filas: List[FilaImportada], catalogo: List[Dict[str, Any]]) -> ResultadoValidacion:
+    """
+    Valida las filas importadas contra el catálogo de la tabla.
+
+    Args:
+        filas: Filas de leer_archivo_precios
+        catalogo: Filas del catálogo con 'id', 'code', 'valor' y 'descripcion'
+            (ver catalogo_material_adhesivo y catalogo_acabados)
+
+    Returns:
+        ResultadoValidacion con los cambios (solo filas cuyo valor cambia) y los errores
+        por fila. Si hay errores no se debe aplicar nada.
+    """
+    resultado = ResultadoValidacion()
+    por_codigo: Dict[str, Dict[str, Any]] = {}
+    repetidos_catalogo = set()
+    for item in catalogo:
+        codigo = normalizar_codigo(item.get('code'))
+        if codigo in por_codigo:
+            repetidos_catalogo.add(codigo)
+        elif codigo:
+            por_codigo[codigo] = item
+
+    vistos: Dict[str, int] = {}
+    for fila in filas:
+        if not fila.codigo:
+            resultado.errores.append(f"Fila {fila.fila}: falta el código")
+            continue
+        if fila.codigo in vistos:
+            resultado.errores.append(
+                f"Fila {fila.fila}: el código {fila.codigo} ya aparece en la fila {vistos[fila.codigo]}"
+            )
+            continue
+        vistos[fila.codigo] = fila.fila
+
+        item = por_codigo.get(fila.codigo)
+        if item is None:
+            resultado.errores.append(f"Fila {fila.fila}: el código {fila.codigo} no existe en el catálogo")
+            continue
+        if fila.codigo in repetidos_catalogo:
+            resultado.errores.append(
+                f"Fila {fila.fila}: el código {fila.codigo} está en varias filas del catálogo; actualícelo a mano"
+            )
+            continue
+        valor = _a_valor(fila.valor)
+        if valor is None:
+            resultado.errores.append(f"Fila {fila.fila}: el valor '{fila.valor}' no es numérico")
+            continue
+        if valor < 0:
+            resultado.errores.append(f"Fila {fila.fila}: el valor {valor} es negativo")
+            continue
+
+        valor_nuevo = int(round(valor))
+        valor_actual = int(round(float(item.get('valor') or 0)))
+        if valor_nuevo == valor_actual:
+            resultado.sin_cambio.append(fila.codigo)
+            continue
+        resultado.cambios.append(CambioPrecio(
+            id=item['id'], codigo=fila.codigo, descripcion=item.get('descripcion', ''),
+            valor_actual=valor_actual, valor_nuevo=valor_nuevo,
+        ))
+    return resultado
+
+
+def catalogo_material_adhesivo(materiales_adhesivos: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Catálogo desde DBManager.get_materiales_adhesivos_table()"""
+    return [dict(item, descripcion=f"{item.get('material_nombre')} + {item.get('adhesivo_tipo')}")
+            for item in materiales_adhesivos]
+
+
+def catalogo_acabados(acabados: List[Any]) -> List[Dict[str, Any]]:
+    """Catálogo desde DBManager.get_acabados() (objetos Acabado)"""
+    return [{'id': a.id, 'nombre': a.nombre, 'code': a.code, 'valor': a.valor, 'descripcion': a.nombre}
+            for a in acabados]
+
+
+def filas_upsert(cambios: List[CambioPrecio], catalogo: List[Dict[str, Any]],
+                 columnas: Tuple[str, ...]) -> List[Dict[str, Any]]:
+    """
+    Filas completas para el upsert: todas las columnas de la tabla tomadas del catálogo
+    con el valor nuevo. Un upsert inserta si no encuentra el id, así que enviar solo
+    {'id', 'valor'} violaría las columnas NOT NULL del resto.
+    """
+    por_id = {item['id']: item for item in catalogo}
+    return [
+        {**{columna: por_id[cambio.id].get(columna) for columna in columnas}, 'valor': cambio.valor_nuevo}
+        for cambio in cambios
+    ]
@@ -22,6 +22,9 @@ from src.config.constants import GAP_AVANCE_MANGAS, GAP_AVANCE_ETIQUETAS
 # Importar DBManager si es necesario para type hinting, aunque lo usemos de session_state
 from src.data.database import DBManager 
 from src.logic.calculators.calculadora_desperdicios import CalculadoraDesperdicio
+from src.logic.snapshot_calculo import snapshot_desde_parametros
+from src.utils.perfilador import medir, PDF
+from src.utils.metricas import PDF_DURACION
 
 def generar_informe_tecnico_markdown(
     cotizacion_data: Dict[str, Any],
@@ -202,6 +205,17 @@ def generar_informe_tecnico_markdown(
         gap_avance = GAP_AVANCE_MANGAS if es_manga else GAP_AVANCE_ETIQUETAS
         area_etiqueta = ancho * avance
 
+        # Unidad de montaje del snapshot del cálculo guardado (si coincide con la unidad
+        # de la cotización): evita volver a correr CalculadoraDesperdicio
+        plan_snapshot = {}
+        snapshot = snapshot_desde_parametros(calculos_guardados.get('parametros_especiales')) if isinstance(calculos_guardados, dict) else None
+        if snapshot is not None:
+            try:
+                if dientes in (None, 'N/A', '') or float(dientes) == float(snapshot.plan.get('dientes')):
+                    plan_snapshot = snapshot.plan
+            except (TypeError, ValueError):
+                plan_snapshot = {}
+
         # Obtener desperdicio de la unidad (mm) priorizando la unidad seleccionada por el usuario
         desperdicio_unidad = 0.0
         try:
@@ -213,6 +227,8 @@ def generar_informe_tecnico_markdown(
 
             # Preferir valor persistido explícito si existe
             desperdicio_persistido = calculos_guardados.get('desperdicio_mm') if isinstance(calculos_guardados, dict) else None
+            if desperdicio_persistido is None:
+                desperdicio_persistido = plan_snapshot.get('desperdicio_unidad')
             if desperdicio_persistido is not None:
                 desperdicio_unidad = float(desperdicio_persistido)
             elif avance and avance > 0:
@@ -252,6 +268,8 @@ def generar_informe_tecnico_markdown(
         repeticiones_unidad = None
         try:
             rep_persistido = calculos_guardados.get('repeticiones') if isinstance(calculos_guardados, dict) else None
+            if rep_persistido is None:
+                rep_persistido = plan_snapshot.get('repeticiones')
             if rep_persistido is not None:
                 repeticiones_unidad = int(rep_persistido)
             elif avance and avance > 0:
@@ -393,6 +411,7 @@ def generar_informe_tecnico_markdown(
         traceback.print_exc()
         return f"Error al generar el informe técnico: {str(e)}"
 
+@medir(PDF)
 def markdown_a_pdf(markdown_text: str, filename: str) -> Optional[str]:
     """
     Convierte texto Markdown a un archivo PDF usando ReportLab
@@ -407,7 +426,8 @@ def markdown_a_pdf(markdown_text: str, filename: str) -> Optional[str]:
     """
     try:
         # Usar directamente la implementación de ReportLab
-        return _generar_pdf_reportlab(markdown_text, filename)
+        with PDF_DURACION.cronometrar(documento='informe_tecnico'):
+            return _generar_pdf_reportlab(markdown_text, filename)
     except Exception as e:
         print(f"Error generando PDF: {e}")
         traceback.print_exc()
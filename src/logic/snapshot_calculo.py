@@ -0,0 +1,184 @@
+"""
+Snapshot del cálculo de una cotización guardada.
+
+Al guardar, handle_calculation persiste en parametros_especiales de
+calculos_escala_cotizacion (clave 'snapshot_calculo') los valores del grafo de cálculo:
+
+    geometria       DatosEscala sin escalas (ancho ajustado, avance, pistas, troquel...)
+    mejor_opcion    unidad de montaje (dientes, medida, repeticiones, desperdicio)
+    plan            PlanPrecio: unidad elegida, área de etiqueta, plancha, troquel,
+                    material, acabado y desperdicio de tintas ya resueltos
+    troquel/plancha valores finales y precio sin constante de la plancha
+    resultados      desglose completo por escala
+
+junto con la clave canónica del cálculo (cache_calculos.clave_calculo, sin versión de
+catálogo: esa versión es del proceso) y los precios leídos al calcular.
+
+Al reabrir la cotización en modo edición, evaluar_con_snapshot solo consulta los precios
+(nodos de precio del grafo, releídos de la BD: los memorizados en la sesión pueden tener
+hasta TTL_PRECIOS de atraso): si las entradas y los precios dan la misma clave, los
+valores salen del snapshot sin ejecutar las calculadoras; si el usuario cambió algo o los
+precios se movieron, se recalcula como siempre. El informe técnico toma del snapshot la unidad de
+montaje en lugar de volver a correr CalculadoraDesperdicio.
+
+Un snapshot de otra VERSION_SNAPSHOT se ignora (from_dict devuelve None) y la cotización
+se recalcula.
+"""
+from dataclasses import asdict, dataclass, field, is_dataclass
+from datetime import datetime
+from decimal import Decimal
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.data.models import Acabado
+from src.logic.cache_calculos import clave_calculo, evaluar_con_cache, precios_calculo, precios_valores
+from src.logic.calculators.calculadora_costos_escala import DatosEscala
+from src.logic.calculators.calculadora_desperdicios import OpcionDesperdicio
+from src.logic.calculators.curva_precio import CurvaPrecio
+from src.logic.calculators.plan_precio import PlanPrecio
+from src.logic.grafo_cotizacion import NODOS_BD
+from src.utils.bitacora import obtener_bitacora
+from src.utils.metricas import SNAPSHOT_CALCULO
+
+log = obtener_bitacora('calculos')
+
+VERSION_SNAPSHOT = 1
+CLAVE_SNAPSHOT = 'snapshot_calculo'  # en parametros_especiales
+
+
+def _nativo(valor: Any) -> Any:
+    """Valor serializable como JSON conservando enteros (escalas, pistas, repeticiones)"""
+    if valor is None or isinstance(valor, (bool, int, float, str)):
+        return valor
+    if isinstance(valor, Decimal):
+        return float(valor)
+    if isinstance(valor, dict):
+        return {str(k): _nativo(v) for k, v in valor.items()}
+    if isinstance(valor, (list, tuple)):
+        return [_nativo(v) for v in valor]
+    if is_dataclass(valor) and not isinstance(valor, type):
+        return _nativo(asdict(valor))
+    if hasattr(valor, 'item'):  # escalares numpy de la tabla de desperdicio
+        return valor.item()
+    return str(valor)
+
+
+@dataclass
+class SnapshotCalculo:
+    """Valores del grafo de cotización persistidos junto con su clave de cálculo"""
+    clave: str
+    precios: Dict[str, Any]
+    geometria: Dict[str, Any]
+    mejor_opcion: Dict[str, Any]
+    acabado: Optional[Dict[str, Any]]
+    valor_material: float
+    num_tintas_ajustado: int
+    rentabilidad: float
+    troquel: Dict[str, Any]
+    plancha: Dict[str, Any]
+    plan: Dict[str, Any]
+    resultados: List[Dict[str, Any]] = field(default_factory=list)
+    fecha: str = ''
+    version: int = VERSION_SNAPSHOT
+
+    @staticmethod
+    def desde_valores(clave: str, precios: Dict[str, Any], valores: Dict[str, Any]) -> 'SnapshotCalculo':
+        """Snapshot de los valores de evaluar_con_cache"""
+        acabado = valores['acabado']
+        return SnapshotCalculo(
+            clave=clave,
+            precios=_nativo(precios),
+            geometria=_nativo(valores['geometria']),
+            mejor_opcion=_nativo(valores['mejor_opcion']),
+            acabado={'id': acabado.id, 'valor': _nativo(acabado.valor)} if acabado else None,
+            valor_material=_nativo(valores['valor_material']),
+            num_tintas_ajustado=_nativo(valores['num_tintas_ajustado']),
+            rentabilidad=_nativo(valores['rentabilidad']),
+            troquel=_nativo(valores['troquel']),
+            plancha=_nativo(valores['plancha']),
+            plan=_nativo(valores['plan']),
+            resultados=_nativo(valores['resultados']),
+            fecha=datetime.now().isoformat(timespec='seconds'),
+        )
+
+    def valores_grafo(self) -> Dict[str, Any]:
+        """
+        Valores con los tipos que entrega el grafo (los de NODOS_RESULTADO).
+
+        Raises:
+            TypeError, ValueError, KeyError: Si el snapshot no corresponde a los modelos actuales
+        """
+        plan = PlanPrecio(**self.plan)
+        return {
+            'geometria': DatosEscala(**self.geometria),
+            'mejor_opcion': OpcionDesperdicio(**self.mejor_opcion),
+            'acabado': Acabado(id=self.acabado['id'], valor=self.acabado['valor']) if self.acabado else None,
+            'valor_material': self.valor_material,
+            'num_tintas_ajustado': self.num_tintas_ajustado,
+            'rentabilidad': self.rentabilidad,
+            'troquel': dict(self.troquel),
+            'plancha': dict(self.plancha),
+            'plan': plan,
+            'resultados': [dict(resultado) for resultado in self.resultados],
+            'curva_precio': CurvaPrecio.desde_plan(plan),
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+    @staticmethod
+    def from_dict(data: Optional[Dict[str, Any]]) -> Optional['SnapshotCalculo']:
+        """Reconstruye un snapshot persistido. Devuelve None si el formato no es compatible."""
+        if not isinstance(data, dict) or data.get('version') != VERSION_SNAPSHOT:
+            return None
+        try:
+            return SnapshotCalculo(**data)
+        except TypeError as e:
+            log.warning('Snapshot de cálculo persistido inválido: %s', e)
+            return None
+
+
+def snapshot_desde_parametros(parametros_especiales: Any) -> Optional[SnapshotCalculo]:
+    """Snapshot guardado en parametros_especiales de calculos_escala_cotizacion (o None)"""
+    if not isinstance(parametros_especiales, dict):
+        return None
+    return SnapshotCalculo.from_dict(parametros_especiales.get(CLAVE_SNAPSHOT))
+
+
+def evaluar_con_snapshot(grafo, entradas: Dict[str, Any],
+                         snapshot: Optional[SnapshotCalculo] = None) -> Tuple[Dict[str, Any], SnapshotCalculo]:
+    """
+    Evalúa el grafo de cotización reutilizando el snapshot de la cotización reabierta.
+
+    Con snapshot, los nodos de precio se vuelven a leer de la BD y se arma la clave: si
+    coincide con la del snapshot, los valores salen de él; si no (o no hay snapshot), se
+    usa evaluar_con_cache. El snapshot devuelto lleva los precios con los que se calculó.
+
+    Returns:
+        Tuple: (valores como los de evaluar_con_cache, snapshot para persistir al guardar)
+
+    Raises:
+        ValueError: Igual que GrafoCalculo.evaluar
+    """
+    if snapshot is not None:
+        grafo.invalidar(*NODOS_BD)
+        precios = precios_calculo(grafo, entradas)
+        clave = clave_calculo(entradas, precios)
+        if snapshot.clave == clave:
+            try:
+                valores = snapshot.valores_grafo()
+                SNAPSHOT_CALCULO.inc(resultado='reutilizado')
+                log.debug('Snapshot de cálculo: valores reutilizados (%s, calculado %s)', clave[:12], snapshot.fecha)
+                return valores, snapshot
+            except (TypeError, ValueError, KeyError) as e:
+                SNAPSHOT_CALCULO.inc(resultado='invalido')
+                log.warning('Snapshot de cálculo no utilizable, se recalcula: %s', e)
+        elif snapshot.precios != _nativo(precios):
+            SNAPSHOT_CALCULO.inc(resultado='precios_cambiaron')
+            log.info('Snapshot de cálculo: los precios cambiaron desde que se guardó, se recalcula')
+        else:
+            SNAPSHOT_CALCULO.inc(resultado='entradas_cambiaron')
+            log.debug('Snapshot de cálculo: las entradas cambiaron, se recalcula')
+
+    valores = evaluar_con_cache(grafo, entradas)
+    precios = precios_valores(valores)
+    return valores, SnapshotCalculo.desde_valores(clave_calculo(entradas, precios), precios, valores)
@@ -0,0 +1,142 @@
+"""
+PDF de cotización anticipado: se genera en segundo plano apenas se guarda la cotización.
+
+Después de guardar, el comercial casi siempre pulsa "Generar PDF", que hidrata la
+cotización (get_datos_completos_cotizacion) y la renderiza (CotizacionPDF.generar_pdf).
+Al guardar se encola ese trabajo de inmediato (ver src/ui/pdf_anticipado_ui.py) y los
+bytes quedan en CachePDF por (cotizacion_id, version): el botón sirve el PDF sin esperar.
+
+La versión sube cada vez que se guarda la misma cotización (nueva_version): un PDF de una
+versión anterior nunca se sirve y se libera al registrar la nueva. Cada entrada queda
+ligada al usuario que la generó (la hidratación se hizo con sus permisos).
+"""
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from .pdf_generator import generar_bytes_pdf_cotizacion
+
+MAX_ENTRADAS = 64
+TTL_PDF = 30 * 60  # segundos (igual que los resultados de la cola de trabajos)
+
+ClavePDF = Tuple[int, int]  # (cotizacion_id, version)
+
+
+@dataclass
+class EntradaPDF:
+    """PDF renderizado de una versión de cotización"""
+    pdf: bytes
+    nombre: str
+    propietario: Optional[str]
+    vence: float
+
+
+def nombre_archivo_pdf(datos_completos: Dict[str, Any]) -> str:
+    """Nombre de descarga: identificador de la cotización o 'Cotizacion_<consecutivo>'"""
+    return f"{datos_completos.get('identificador') or 'Cotizacion_' + str(datos_completos.get('consecutivo', 'N'))}.pdf"
+
+
+class CachePDF:
+    """PDF por (cotizacion_id, version), con LRU acotado y vencimiento"""
+
+    def __init__(self, max_entradas: int = MAX_ENTRADAS, ttl: float = TTL_PDF):
+        self.max_entradas = max_entradas
+        self.ttl = ttl
+        self._entradas: 'OrderedDict[ClavePDF, EntradaPDF]' = OrderedDict()
+        self._versiones: Dict[int, int] = {}
+        self._lock = threading.Lock()
+        self.aciertos = 0
+        self.fallos = 0
+        self.descartadas = 0
+
+    def nueva_version(self, cotizacion_id: int) -> int:
+        """Registra un guardado de la cotización y libera los PDF de versiones anteriores"""
+        with self._lock:
+            version = self._versiones.get(cotizacion_id, 0) + 1
+            self._versiones[cotizacion_id] = version
+            for clave in [c for c in self._entradas if c[0] == cotizacion_id]:
+                del self._entradas[clave]
+            return version
+
+    def guardar(self, cotizacion_id: int, version: int, propietario: Optional[str],
+                pdf: bytes, nombre: str) -> bool:
+        """Guarda el PDF si la versión sigue siendo la vigente (False si quedó obsoleta)"""
+        with self._lock:
+            if self._versiones.get(cotizacion_id) != version:
+                return False
+            clave = (cotizacion_id, version)
+            self._entradas[clave] = EntradaPDF(pdf, nombre, propietario, time.monotonic() + self.ttl)
+            self._entradas.move_to_end(clave)
+            while len(self._entradas) > self.max_entradas:
+                self._entradas.popitem(last=False)
+                self.descartadas += 1
+            return True
+
+    def obtener(self, cotizacion_id: int, version: int, propietario: Optional[str]) -> Optional[EntradaPDF]:
+        with self._lock:
+            clave = (cotizacion_id, version)
+            entrada = self._entradas.get(clave)
+            if entrada is not None and entrada.vence <= time.monotonic():
+                del self._entradas[clave]
+                entrada = None
+            if entrada is None or entrada.propietario != propietario:
+                self.fallos += 1
+                return None
+            self._entradas.move_to_end(clave)
+            self.aciertos += 1
+            return entrada
+
+    def descartar(self, cotizacion_id: int, version: int) -> None:
+        with self._lock:
+            self._entradas.pop((cotizacion_id, version), None)
+
+    def estadisticas(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.aciertos + self.fallos
+            return {
+                'entradas': len(self._entradas),
+                'max_entradas': self.max_entradas,
+                'bytes': sum(len(e.pdf) for e in self._entradas.values()),
+                'aciertos': self.aciertos,
+                'fallos': self.fallos,
+                'descartadas': self.descartadas,
+                'tasa_aciertos': self.aciertos / total if total else 0.0,
+            }
+
+
+# Instancia única del proceso
+cache_pdf = CachePDF()
+
+
+def renderizar_pdf_anticipado(db, cotizacion_id: int, version: int, propietario: Optional[str],
+                              cancelado: Optional[Callable[[], bool]] = None) -> Optional[bytes]:
+    """
+    Trabajo de la cola: hidrata la cotización, genera el PDF y lo guarda en cache_pdf.
+
+    Args:
+        db: DBManager de la sesión que guardó la cotización
+        cotizacion_id: ID de la cotización guardada
+        version: Versión devuelta por cache_pdf.nueva_version al guardar
+        propietario: user_id de la sesión
+        cancelado: Lo pasa la cola de trabajos; se consulta entre hidratar y renderizar
+
+    Returns:
+        bytes del PDF, o None si el trabajo se canceló
+
+    Raises:
+        ValueError: Si no se pudieron obtener los datos o generar el PDF
+    """
+    datos = db.get_datos_completos_cotizacion(cotizacion_id)
+    if not datos:
+        raise ValueError(f"No se pudieron obtener los datos completos de la cotización {cotizacion_id}")
+    if cancelado is not None and cancelado():
+        return None
+    pdf = generar_bytes_pdf_cotizacion(datos)
+    if not pdf:
+        raise ValueError(f"No se pudo generar el PDF de la cotización {cotizacion_id}")
+    if cancelado is not None and cancelado():
+        return None
+    cache_pdf.guardar(cotizacion_id, version, propietario, pdf, nombre_archivo_pdf(datos))
+    return pdf
@@ -7,6 +7,8 @@ from reportlab.lib.units import inch
 from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, Image, Flowable, HRFlowable
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from ..data.models import Cotizacion, Escala, Cliente, ReferenciaCliente
+from ..utils.perfilador import medir, PDF
+from ..utils.metricas import PDF_DURACION, PDF_BYTES
 import io
 import tempfile
 import os
@@ -87,6 +89,7 @@ class CotizacionPDF(BasePDFGenerator):
         print("ADVERTENCIA: Llamando a _crear_resultados_predeterminados. Implementar lógica real si es necesario.")
         return [{'escala': 0, 'valor_unidad': 0.0}]
     
+    @medir(PDF)
     def generar_pdf(self, datos_cotizacion: Dict[str, Any]) -> Optional[bytes]:
         """
         Genera el PDF de la cotización siguiendo la estructura provista.
@@ -867,8 +870,10 @@ def generar_bytes_pdf_cotizacion(datos_completos: Dict[str, Any]) -> Optional[by
         return None
     try:
         pdf_gen = CotizacionPDF() 
-        pdf_bytes = pdf_gen.generar_pdf(datos_completos) 
+        with PDF_DURACION.cronometrar(documento='cotizacion'):
+            pdf_bytes = pdf_gen.generar_pdf(datos_completos) 
         if pdf_bytes:
+            PDF_BYTES.observar(len(pdf_bytes), documento='cotizacion')
             print("Bytes de PDF generados exitosamente por la función helper.")
         else:
             print("La generación de PDF en CotizacionPDF devolvió None.")
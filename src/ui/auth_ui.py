@@ -151,7 +151,7 @@ def handle_authentication() -> Tuple[bool, Optional[str]]:
     show_user_info()
     
     # Verificar rol del usuario
-    rol = st.session_state.get('usuario_rol')
+    rol = SessionManager.get_role()
     if rol not in ['comercial', 'administrador']:
         return False, f"Acceso denegado. Rol actual: {rol}"
     
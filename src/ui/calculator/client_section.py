@@ -1,38 +1,79 @@
 import streamlit as st
 from typing import Optional
 from src.data.models import Cliente
+from src.data.indice_clientes import LIMITE_RESULTADOS
 
 # Ahora solo retorna el cliente seleccionado, no referencia
 
+def selector_cliente(db, key: str, cliente_inicial: Optional[Cliente] = None,
+                     disabled: bool = False, etiqueta: str = "Cliente") -> Optional[Cliente]:
+    """
+    Buscador + selector de cliente sobre el índice de clientes de la sesión.
+    Solo se envían al navegador los LIMITE_RESULTADOS mejores resultados de la búsqueda
+    (más el cliente ya seleccionado), no la lista completa.
+
+    Args:
+        db: DBManager de la sesión
+        key: Prefijo de las claves de los widgets
+        cliente_inicial: Cliente preseleccionado (p. ej. al editar una cotización)
+        disabled: Deshabilita la búsqueda y el selector
+        etiqueta: Texto del selector
+
+    Returns:
+        Cliente seleccionado o None si no hay coincidencias
+    """
+    indice = db.get_indice_clientes()
+
+    texto = st.text_input(
+        "Buscar cliente (nombre o NIT/CC)",
+        key=f"{key}_busqueda",
+        disabled=disabled,
+        placeholder="Escriba para filtrar...",
+    )
+    resultados = indice.buscar(texto, LIMITE_RESULTADOS)
+
+    # Mantener visible el cliente ya seleccionado aunque no esté entre los resultados
+    seleccionado_id = st.session_state.get(key)
+    if seleccionado_id is None and cliente_inicial is not None:
+        seleccionado_id = cliente_inicial.id
+    seleccionado = indice.obtener(seleccionado_id) or (
+        cliente_inicial if cliente_inicial is not None and cliente_inicial.id == seleccionado_id else None
+    )
+    if seleccionado is not None and all(c.id != seleccionado.id for c in resultados):
+        resultados = [seleccionado] + resultados
+
+    if not resultados:
+        st.info("No hay clientes que coincidan con la búsqueda" if texto else "No se encontraron clientes disponibles")
+        return None
+
+    clientes_por_id = {c.id: c for c in resultados}
+    opciones = list(clientes_por_id)
+    indice_inicial = opciones.index(seleccionado.id) if seleccionado is not None else 0
+    if len(indice) > len(opciones):
+        st.caption(f"Mostrando {len(opciones)} de {len(indice)} clientes")
+
+    cliente_id = st.selectbox(
+        etiqueta,
+        options=opciones,
+        index=indice_inicial,
+        format_func=lambda i: f"{clientes_por_id[i].nombre} - {clientes_por_id[i].codigo}",
+        key=key,
+        disabled=disabled,
+    )
+    return clientes_por_id.get(cliente_id)
+
+
 def mostrar_seccion_cliente(db) -> Optional[Cliente]:
     """
     Muestra la sección de selección de cliente
     Retorna: cliente_seleccionado
     """
-    # Obtener clientes según rol (RLS aplicado en DB)
-    if st.session_state.usuario_rol == 'administrador':
-        clientes = db.get_clientes()
-    else:
-        clientes = db.get_clientes_by_comercial(st.session_state.comercial_id)
-
-    if not clientes:
+    if len(db.get_indice_clientes()) == 0:
         st.warning("No se encontraron clientes disponibles")
         return None
 
-    # Ordenar clientes por nombre
-    clientes.sort(key=lambda x: x.nombre)
-
-    # Ordenar clientes por nombre
-    clientes.sort(key=lambda x: x.nombre)
-
     # Mostrar comercial (no editable)
     st.write(f"**Comercial:** {st.session_state.perfil_usuario['nombre']}")
 
-    # Selector de cliente
-    cliente_seleccionado = st.selectbox(
-        "Cliente",
-        options=clientes,
-        format_func=lambda x: f"{x.codigo} - {x.nombre}"
-    )
-
-    return cliente_seleccionado
+    # Selector de cliente (búsqueda en el índice; RLS aplicado al construirlo)
+    return selector_cliente(db, key="seccion_cliente_selector")
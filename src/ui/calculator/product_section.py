@@ -4,7 +4,8 @@ from typing import Dict, Any, List, Optional
 from src.logic.calculators.calculadora_desperdicios import CalculadoraDesperdicio
 from src.data.models import Cliente  # Corrected import: Directly from src.data.models module
 from src.data.database import DBManager  # Asumiendo que DBManager está definido aquí
-import time
+from src.utils.session_manager import SessionManager
+from src.ui.fragmentos import fragmento, rerun_pagina, rerun_seccion
 
 # --- Helper Functions for Input Sections ---
 
@@ -109,7 +110,7 @@ def _mostrar_dimensiones_y_tintas(es_manga: bool, datos_cargados: Optional[Dict]
             st.session_state['avance'] = float(default_avance)
     with col2:
         # --- Pistas ---
-        usuario_rol = st.session_state.get('usuario_rol', '')
+        usuario_rol = SessionManager.get_role() or ''
         if es_manga:
             if usuario_rol == 'comercial':
                 # Mostrar como texto no editable para comercial en manga
@@ -196,19 +197,12 @@ def _mostrar_material(es_manga: bool, materiales: List[Any], datos_cargados: Opt
     if previous_material_id != current_material_id:
         st.session_state["material_id"] = current_material_id
         st.session_state["adhesivo_id"] = None
-        print(f"    DETECCION: Material cambiado a {current_material_id}, limpiando adhesivo y caché, forzando rerun.") # DEBUG con indentación
-        # Limpiar explícitamente el caché de la función específica
-        try:
-            st.session_state.db.get_adhesivos_for_material.clear()
-            print("    DETECCION: Caché de get_adhesivos_for_material limpiado.") # DEBUG con indentación
-        except Exception as e:
-            print(f"    DETECCION: Error al intentar limpiar caché: {e}") # DEBUG con indentación
-        
-        # Mostrar advertencia ANTES del rerun
-        st.warning("Refrescando opciones de adhesivo...") 
-        time.sleep(1) # Pausa breve para que se vea el warning
+        print(f"    DETECCION: Material cambiado a {current_material_id}, limpiando adhesivo, forzando rerun.") # DEBUG con indentación
+        # get_adhesivos_for_material se guarda en caché por material_id (src/data/cache_datos.py):
+        # no hace falta limpiarla al cambiar de material
         
-        st.rerun() # Forzar rerun al detectar cambio
+        # El adhesivo está en el mismo fragmento: basta con volver a ejecutar la sección
+        rerun_seccion()
     # else: # Opcional: Log si no hay cambio
     #     print("--> _mostrar_material: No se detectó cambio de material.")
             
@@ -385,7 +379,7 @@ def _mostrar_grafado_altura(es_manga: bool, tipos_grafado: List[Any], datos_carg
             (previous_id in [3, 4] and current_selected_id not in [3, 4]) or
             (previous_id not in [3, 4] and current_selected_id in [3, 4])
         ):
-            st.rerun()
+            rerun_seccion()
     else:
         st.session_state["grafado_seleccionado_id"] = None
     
@@ -429,7 +423,7 @@ def _mostrar_grafado_altura(es_manga: bool, tipos_grafado: List[Any], datos_carg
                     st.session_state["grafado_seleccionado_id"] = 1
                     st.session_state["tipo_grafado_select"] = next((i for i, tg in enumerate(tipos_grafado) if tg.id == 1), 0)
                     st.warning("Para fundas transparentes de ancho efectivo > 325mm, se fuerza 'Sin grafado'.")
-                    st.rerun()
+                    rerun_seccion()
     except Exception:
         pass
 
@@ -623,7 +617,7 @@ def _mostrar_opciones_adicionales(es_manga: bool, datos_cargados: Optional[Dict]
              st.session_state.tiene_troquel = False
 
     # --- Planchas Separadas (Solo Admin) ---
-    if st.session_state.get('usuario_rol') == 'administrador':
+    if SessionManager.get_role() == 'administrador':
         # El valor bool se guarda en st.session_state.planchas_separadas
         st.checkbox(
             "¿Planchas por separado?", 
@@ -640,6 +634,57 @@ def _mostrar_opciones_adicionales(es_manga: bool, datos_cargados: Optional[Dict]
 
 
 
+# --- Secciones como fragmentos (ver src/ui/fragmentos.py) ---
+# Un cambio dentro de una sección solo vuelve a ejecutar su fragmento. Las secciones que
+# dependen entre sí comparten fragmento:
+#   material -> adhesivo (lista de adhesivos compatibles)
+#   dimensiones y tintas -> grafado (regla de fundas transparentes)
+#   acabado -> tipo de foil
+# Opciones adicionales (unidad de montaje) lee el avance, que escribe la sección de
+# dimensiones: al cambiar el avance esa sección vuelve a ejecutar la página completa.
+
+@fragmento
+def seccion_material_adhesivo(es_manga: bool, materiales: List[Any], datos_cargados: Optional[Dict] = None):
+    """Material y, para etiquetas, los adhesivos compatibles con el material elegido."""
+    _mostrar_material(es_manga, materiales, datos_cargados)
+    material_obj_actual = st.session_state.get('material_select')
+    if es_manga or not material_obj_actual:
+        return
+    st.divider()
+    adhesivos_filtrados = []
+    try:
+        adhesivos_filtrados = st.session_state.db.get_adhesivos_for_material(material_obj_actual.id)
+    except Exception as e:
+        st.error(f"Error al obtener adhesivos: {e}")
+    _mostrar_adhesivo(adhesivos_filtrados, material_obj_actual, datos_cargados)
+
+
+@fragmento
+def seccion_escalas(default_escalas: str):
+    _mostrar_escalas(default_escalas=default_escalas)
+
+
+@fragmento
+def seccion_dimensiones_grafado(es_manga: bool, tipos_grafado: List[Any], datos_cargados: Optional[Dict] = None):
+    avance_anterior = st.session_state.get('avance')
+    _mostrar_dimensiones_y_tintas(es_manga, datos_cargados)
+    # Grafado (solo para mangas, inmediatamente después de dimensiones)
+    if es_manga:
+        _mostrar_grafado_altura(es_manga, tipos_grafado, datos_cargados)
+    if avance_anterior is not None and st.session_state.get('avance') != avance_anterior:
+        rerun_pagina()
+
+
+@fragmento
+def seccion_acabados_empaque(es_manga: bool, acabados: List[Any], datos_cargados: Optional[Dict] = None):
+    _mostrar_acabados_y_empaque(es_manga, acabados, datos_cargados)
+
+
+@fragmento
+def seccion_opciones_adicionales(es_manga: bool, datos_cargados: Optional[Dict] = None):
+    _mostrar_opciones_adicionales(es_manga, datos_cargados)
+
+
 # --- Función Principal Refactorizada --- 
 def mostrar_secciones_internas_formulario(
     es_manga: bool, 
@@ -655,24 +700,18 @@ def mostrar_secciones_internas_formulario(
         default_escalas (str): String formateado para el valor inicial del input de escalas.
     """
     # 1. Escalas (Pasar el valor inicial)
-    _mostrar_escalas(default_escalas=default_escalas)
+    seccion_escalas(default_escalas)
     st.divider()
 
-    # 2. Dimensiones y Tintas
-    _mostrar_dimensiones_y_tintas(es_manga, datos_cargados)
-    
-    # 3. Grafado (solo para mangas, inmediatamente después de dimensiones)
-    if es_manga:
-        tipos_grafado = initial_data.get('tipos_grafado', [])
-        _mostrar_grafado_altura(es_manga, tipos_grafado, datos_cargados)
+    # 2. Dimensiones y Tintas (+ 3. Grafado para mangas)
+    seccion_dimensiones_grafado(es_manga, initial_data.get('tipos_grafado', []), datos_cargados)
     st.divider()
     
     # 4. Acabados y Empaque
-    acabados = initial_data.get('acabados', [])
-    _mostrar_acabados_y_empaque(es_manga, acabados, datos_cargados)
+    seccion_acabados_empaque(es_manga, initial_data.get('acabados', []), datos_cargados)
     st.divider()
     
     # 5. Opciones Adicionales
-    _mostrar_opciones_adicionales(es_manga, datos_cargados)
+    seccion_opciones_adicionales(es_manga, datos_cargados)
 
 # --- FIN FUNCIÓN RENOMBRADA --- 
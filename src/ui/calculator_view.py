@@ -298,7 +298,7 @@ def show_quote_history() -> None:
 
     except Exception as e:
         st.error(f"Error al cargar el historial: {str(e)}")
-        if st.session_state.get('usuario_rol') == 'administrador':
+        if SessionManager.get_role() == 'administrador':
             st.exception(e)
 
 def show_quote_summary(form_data: Dict[str, Any], results: Dict[str, Any], is_manga: bool) -> None:
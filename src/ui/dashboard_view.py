@@ -7,6 +7,7 @@ import traceback
 # Importaciones del proyecto (ajustar según sea necesario)
 from src.data.database import DBManager
 from src.auth.auth_manager import AuthManager # O donde esté la lógica de roles
+from src.utils.session_manager import SessionManager
 
 # Paleta de colores básica (restaurada)
 COLOR_MAP_ESTADO = {
@@ -23,7 +24,7 @@ def _load_dashboard_data(_db: DBManager, comercial_id=None, start_date=None, end
     Carga y preprocesa los datos necesarios para el dashboard.
     """
     try:
-        user_role = st.session_state.get('usuario_rol', None)
+        user_role = SessionManager.get_role()
         user_id = st.session_state.get('user_id', None)
         
         # Enfoque mejorado con múltiples estrategias de carga de datos
@@ -138,7 +139,7 @@ def show_dashboard():
         return
 
     db = st.session_state.db
-    user_role = st.session_state.get('usuario_rol', None)
+    user_role = SessionManager.get_role()
 
     # --- Filtros en el Sidebar ---
     st.sidebar.header("Filtros")
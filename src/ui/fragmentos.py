@@ -0,0 +1,53 @@
+"""
+Secciones de la UI que se vuelven a ejecutar solas (st.fragment).
+
+Cada interacción con un widget vuelve a ejecutar el script completo: navegación,
+selector de cliente, carga de datos y todas las secciones de la calculadora. Dentro
+de un fragmento, la interacción solo vuelve a ejecutar esa función; el resto de la
+página queda como estaba.
+
+Reglas para las secciones de la calculadora (src/ui/calculator/product_section.py):
+    - Cada fragmento lee y escribe su estado en st.session_state; el botón Calcular
+      (script completo) lee de ahí todos los valores.
+    - Las secciones que dependen entre sí van en el mismo fragmento (el adhesivo
+      depende del material; el grafado de ancho y tintas), así un cambio vuelve a
+      mostrar todo lo que depende de él sin ejecutar la página completa.
+    - Para volver a dibujar la sección tras cambiar el estado se usa rerun_seccion()
+      en lugar de st.rerun().
+    - Si otra sección (otro fragmento) lee un valor que escribe la sección, al cambiar
+      ese valor se llama rerun_pagina(): un fragmento no vuelve a ejecutar a los demás.
+
+Con versiones de Streamlit sin st.fragment (< 1.37) las funciones se ejecutan como
+antes, dentro del script completo.
+"""
+from typing import Any, Callable
+
+import streamlit as st
+
+_FRAGMENT = getattr(st, 'fragment', None)
+
+
+def fragmento(funcion: Callable[..., Any]) -> Callable[..., Any]:
+    """Decorador: st.fragment si está disponible; si no, la función sin cambios"""
+    if _FRAGMENT is None:
+        return funcion
+    return _FRAGMENT(funcion)
+
+
+def rerun_seccion() -> None:
+    """
+    Vuelve a ejecutar solo el fragmento actual. Si el fragmento se está ejecutando
+    dentro del script completo (Streamlit no permite el rerun de fragmento ahí) o no
+    hay fragmentos, vuelve a ejecutar la página completa.
+    """
+    if _FRAGMENT is not None:
+        try:
+            st.rerun(scope="fragment")
+        except st.errors.StreamlitAPIException:
+            pass
+    st.rerun()
+
+
+def rerun_pagina() -> None:
+    """Vuelve a ejecutar la página completa, también desde dentro de un fragmento"""
+    st.rerun()  # el alcance por defecto es la app
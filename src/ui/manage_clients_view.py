@@ -6,6 +6,10 @@ import traceback
 # Importaciones del proyecto
 from src.data.database import DBManager
 from src.data.models import Cliente # Importar el modelo Cliente
+from src.utils.session_manager import SessionManager
+from src.logic.importacion_clientes import (
+    ImportadorClientes, TAMANO_LOTE, leer_filas, mapa_comerciales,
+)
 
 def show_manage_clients():
     """Muestra la vista para gestionar clientes."""
@@ -26,9 +30,13 @@ def show_manage_clients():
         return
 
     db_manager: DBManager = st.session_state.db
-    user_role = st.session_state.get('usuario_rol')
+    user_role = SessionManager.get_role()
     comercial_id = st.session_state.get('comercial_id')
 
+    if user_role == 'administrador':
+        with st.expander("📥 Importación masiva de clientes y referencias"):
+            _mostrar_importacion_clientes(db_manager)
+
     try:
         # Administrador ve todos; comercial solo los suyos
         if user_role == 'administrador':
@@ -190,4 +198,56 @@ def show_create_client():
 
                     print(f"Error detallado creando cliente: {e}")
                     traceback.print_exc()
-                    # No hacer rerun aquí, permitir al usuario corregir 
\ No newline at end of file
+                    # No hacer rerun aquí, permitir al usuario corregir 
+
+
+def _mostrar_importacion_clientes(db: DBManager):
+    """Carga un CSV/XLSX de clientes y referencias y lo importa en lotes (solo administradores)."""
+    st.markdown("""
+    Columnas: **nombre** y **NIT** (obligatorias); contacto, correo, telefono, **referencia** y
+    **comercial** (id, nombre o correo) opcionales. Los clientes que ya existen (mismo NIT) y las
+    referencias repetidas (mismo cliente, descripción y comercial) se omiten. Un cliente nuevo sin
+    referencia recibe la referencia 'Principal' de su comercial.
+    """)
+    archivo = st.file_uploader("Archivo de clientes", type=['csv', 'xlsx'], key="importacion_clientes_archivo")
+
+    perfiles = db.get_perfiles_by_role('comercial') or []
+    opciones = {None: "(Sin comercial por defecto)"}
+    opciones.update({str(p['id']): p.get('nombre') or str(p['id']) for p in perfiles if p.get('id')})
+    col1, col2 = st.columns(2)
+    with col1:
+        comercial_defecto = st.selectbox(
+            "Comercial por defecto", options=list(opciones.keys()),
+            format_func=lambda k: opciones[k], key="importacion_clientes_comercial"
+        )
+    with col2:
+        tamano_lote = st.number_input(
+            "Filas por lote", min_value=1, max_value=1000, value=TAMANO_LOTE, step=50,
+            key="importacion_clientes_lote"
+        )
+
+    if archivo is None or not st.button("Importar", key="importacion_clientes_btn", type="primary"):
+        return
+
+    with st.spinner("Importando clientes y referencias..."):
+        try:
+            importador = ImportadorClientes(db, mapa_comerciales(perfiles), comercial_defecto, int(tamano_lote))
+            reporte = importador.importar(leer_filas(archivo.getvalue(), archivo.name))
+        except ValueError as e:
+            st.error(str(e))
+            return
+        except Exception as e:
+            st.error(f"Error en la importación: {str(e)}")
+            traceback.print_exc()
+            return
+
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Filas", reporte.filas_leidas, f"{reporte.filas_por_segundo:.0f} filas/s", delta_color="off")
+    col2.metric("Clientes creados", reporte.clientes_creados, f"{reporte.clientes_existentes} existentes", delta_color="off")
+    col3.metric("Referencias creadas", reporte.referencias_creadas,
+                f"{reporte.referencias_existentes} existentes", delta_color="off")
+    col4.metric("Rechazos", len(reporte.rechazos))
+    st.caption(reporte.resumen())
+    if reporte.rechazos:
+        st.dataframe(pd.DataFrame(reporte.rechazos, columns=['Fila', 'Motivo']),
+                     hide_index=True, use_container_width=True)
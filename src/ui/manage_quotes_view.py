@@ -6,9 +6,11 @@ from datetime import datetime # Asegurar importación
 
 # Importaciones del proyecto
 from src.data.database import DBManager
+from src.data.models import LoteCotizaciones
 from src.utils.session_manager import SessionManager # Para resetear widgets al editar
 from src.pdf.pdf_generator import generar_bytes_pdf_cotizacion # Para el botón PDF
 from src.logic.report_generator import generar_informe_tecnico_markdown, markdown_a_pdf # Para el informe técnico
+from src.ui.trabajos_ui import enviar_trabajo, mostrar_trabajo, descartar_trabajo # Renders en segundo plano
 
 def show_manage_quotes_ui():
     """Muestra la vista para gestionar (ver y modificar) cotizaciones."""
@@ -25,7 +27,7 @@ def show_manage_quotes_ui():
          st.warning("Datos iniciales (estados, motivos) no encontrados. Funcionalidad limitada.")
 
     db_manager: DBManager = st.session_state.db
-    user_role = st.session_state.usuario_rol
+    user_role = SessionManager.get_role()
     user_id = st.session_state.user_id
 
     # --- Obtener Cotizaciones ---
@@ -74,8 +76,9 @@ def show_manage_quotes_ui():
     # --- Mostrar Tabla de Cotizaciones ---
     st.subheader("Cotizaciones Guardadas")
 
-    # Crear DataFrame desde la lista de diccionarios/objetos
-    df_cotizaciones = pd.DataFrame(cotizaciones)
+    # Lote columnar: las filas de la búsqueda se toman de él sin filtrar el DataFrame completo
+    lote_cotizaciones = LoteCotizaciones.from_filas(cotizaciones)
+    df_cotizaciones = lote_cotizaciones.to_dataframe()
 
     # Verificar columnas esenciales para la tabla
     required_table_cols = ['id', 'numero_cotizacion', 'referencia', 'cliente_nombre', 'fecha_creacion', 'estado_id']
@@ -119,9 +122,31 @@ def show_manage_quotes_ui():
         # 'comercial_nombre': 'Comercial' # Si se renombró en _load_dashboard_data
     }
 
+    # --- Búsqueda (índice de texto completo en memoria, ver src/data/indice_cotizaciones.py) ---
+    busqueda = st.text_input(
+        "🔍 Buscar cotización",
+        key="busqueda_cotizaciones_manage",
+        placeholder="Ej: ET PELB 50x50 LAM · cliente:vlamos ref:ensayo · CT00000150",
+        help="Busca por identificador, referencia, cliente o número. Use campo:valor "
+             "(tipo, material, medidas, tintas, acabado, paquetes, cliente, referencia, numero) "
+             "para restringir una palabra a un campo."
+    )
+    try:
+        ids_encontrados = [c.id for c in db_manager.buscar_cotizaciones(busqueda)]
+    except Exception as e_busqueda:
+        print(f"Error en la búsqueda de cotizaciones: {e_busqueda}")
+        traceback.print_exc()
+        st.warning("No se pudo usar el índice de búsqueda; se muestran las cotizaciones más recientes.")
+        ids_encontrados = sorted(lote_cotizaciones.columna('id'), reverse=True)[:50]
+    df_busqueda = lote_cotizaciones.seleccionar(ids_encontrados).to_dataframe()
+    df_busqueda['Estado Nombre'] = df_busqueda['estado_id'].map(current_estados_map).fillna('Desconocido')
+    if busqueda.strip():
+        st.caption(f"{len(df_busqueda)} resultado(s) para «{busqueda.strip()}»")
+    df_tabla = df_busqueda if busqueda.strip() else df_cotizaciones
+
     # Filtrar y renombrar columnas existentes
-    columnas_existentes_db = {k: v for k, v in columnas_db.items() if k in df_cotizaciones.columns or k == 'Estado Nombre'}
-    df_display = df_cotizaciones[list(columnas_existentes_db.keys())].rename(columns=columnas_existentes_db)
+    columnas_existentes_db = {k: v for k, v in columnas_db.items() if k in df_tabla.columns or k == 'Estado Nombre'}
+    df_display = df_tabla[list(columnas_existentes_db.keys())].rename(columns=columnas_existentes_db)
 
     # Formatear fecha
     if 'Fecha Creación' in df_display.columns:
@@ -140,10 +165,13 @@ def show_manage_quotes_ui():
     client_col_pdf = 'cliente_nombre'
     id_col_pdf = 'id'
 
-    if all(col in df_cotizaciones.columns for col in [id_col_pdf, num_col_pdf, client_col_pdf]):
+    # Opciones = resultados de la búsqueda (las más recientes si no hay búsqueda)
+    if all(col in df_busqueda.columns for col in [id_col_pdf, num_col_pdf, client_col_pdf]):
         opciones_cotizacion_pdf = {
-            row[id_col_pdf]: f"CT{row[num_col_pdf]:0>8} - {row[client_col_pdf]}"
-            for index, row in df_cotizaciones.iterrows()
+            cotizacion_id: f"CT{numero:0>8} - {cliente}"
+            for cotizacion_id, numero, cliente in zip(
+                df_busqueda[id_col_pdf], df_busqueda[num_col_pdf], df_busqueda[client_col_pdf]
+            )
         }
     else:
          st.error("Faltan columnas (ID, Número, Cliente) para generar opciones de descarga PDF.")
@@ -165,26 +193,28 @@ def show_manage_quotes_ui():
             session_bytes_key = f'pdf_bytes_{selected_quote_id_pdf}'
             session_filename_key = f'pdf_filename_{selected_quote_id_pdf}'
 
+            session_job_key = f'trabajo_pdf_{selected_quote_id_pdf}'
+
             if st.button("📄 Generar PDF para Descargar", key=button_key_pdf):
-                with st.spinner("⏳ Generando PDF, por favor espere..."):
-                    try:
-                        # Usar el método específico para obtener datos completos para el PDF
-                        datos_pdf = db_manager.get_datos_completos_cotizacion(selected_quote_id_pdf)
-                        if datos_pdf:
-                            pdf_bytes = generar_bytes_pdf_cotizacion(datos_pdf) # Usar helper importado
-                            if pdf_bytes:
-                                st.session_state[session_bytes_key] = pdf_bytes
-                                st.session_state[session_filename_key] = f"{datos_pdf.get('identificador') or 'Cotizacion ' + str(datos_pdf.get('consecutivo', 'N'))}.pdf"
-                                st.success("✅ PDF generado exitosamente. Use el botón de abajo para descargar.")
-                                # No usar st.rerun() aquí para que el botón de descarga aparezca
-                            else:
-                                st.error("❌ No se pudo generar el PDF (función devolvió None).")
-                        else:
-                            st.error("❌ No se encontraron los datos completos de la cotización para el PDF.")
-                    except Exception as e:
-                        st.error(f"❌ Ocurrió un error inesperado generando el PDF: {e}")
-                        print(f"Error generando PDF para ID {selected_quote_id_pdf}: {e}")
-                        traceback.print_exc()
+                try:
+                    # Usar el método específico para obtener datos completos para el PDF
+                    datos_pdf = db_manager.get_datos_completos_cotizacion(selected_quote_id_pdf)
+                    if datos_pdf:
+                        st.session_state[session_filename_key] = f"{datos_pdf.get('identificador') or 'Cotizacion ' + str(datos_pdf.get('consecutivo', 'N'))}.pdf"
+                        # El render corre en la cola de trabajos, sin bloquear este rerun
+                        enviar_trabajo(session_job_key, 'pdf_cotizacion', generar_bytes_pdf_cotizacion, datos_pdf)
+                    else:
+                        st.error("❌ No se encontraron los datos completos de la cotización para el PDF.")
+                except Exception as e:
+                    st.error(f"❌ Ocurrió un error inesperado generando el PDF: {e}")
+                    print(f"Error generando PDF para ID {selected_quote_id_pdf}: {e}")
+                    traceback.print_exc()
+
+            pdf_bytes = mostrar_trabajo(session_job_key, "Generando PDF")
+            if pdf_bytes:
+                st.session_state[session_bytes_key] = pdf_bytes
+                descartar_trabajo(session_job_key)
+                st.success("✅ PDF generado exitosamente. Use el botón de abajo para descargar.")
 
             # Mostrar botón de descarga si los bytes están en sesión
             if session_bytes_key in st.session_state and session_filename_key in st.session_state:
@@ -218,8 +248,10 @@ def show_manage_quotes_ui():
             # Usar una key única para el botón basada en el ID para evitar conflictos
             button_key_informe = f"generate_informe_button_{selected_quote_id_informe}"
 
+            session_job_key_informe = f'trabajo_informe_{selected_quote_id_informe}'
+
             if st.button("📋 Generar Informe Técnico", key=button_key_informe):
-                with st.spinner("⏳ Generando informe técnico, por favor espere..."):
+                with st.spinner("⏳ Preparando informe técnico..."):
                     try:
                         # Obtener datos completos de la cotización
                         datos_completos_cot = db_manager.get_full_cotizacion_details(selected_quote_id_informe)
@@ -247,7 +279,9 @@ def show_manage_quotes_ui():
                                     'num_paquetes_rollos': calculos_raw.get('num_paquetes_rollos', 0),
                                     # Pasar desperdicio en mm y repeticiones si están persistidos
                                     'desperdicio_mm': calculos_raw.get('desperdicio_mm'),
-                                    'repeticiones': calculos_raw.get('repeticiones')
+                                    'repeticiones': calculos_raw.get('repeticiones'),
+                                    # Snapshot del cálculo (unidad de montaje sin recalcular)
+                                    'parametros_especiales': calculos_raw.get('parametros_especiales')
                                 }
                             else:
                                 datos_calculo = None
@@ -270,19 +304,19 @@ def show_manage_quotes_ui():
                             cliente_nombre = datos_completos_cot.get('cliente_nombre', '').replace(' ', '_')
                             nombre_archivo = f"Informe_Tecnico_{numero_cotizacion}_{cliente_nombre}"
                             
-                            # Generar enlace de descarga
-                            pdf_download_link = markdown_a_pdf(informe_md, nombre_archivo)
-                            if pdf_download_link:
-                                st.markdown(pdf_download_link, unsafe_allow_html=True)
-                                st.success("✅ Informe técnico generado exitosamente. Use el enlace para descargar.")
-                            else:
-                                st.error("❌ No se pudo generar el PDF del informe técnico.")
+                            # Generar enlace de descarga en la cola de trabajos
+                            enviar_trabajo(session_job_key_informe, 'informe_tecnico_pdf', markdown_a_pdf, informe_md, nombre_archivo)
                         else:
                             st.error("❌ No se encontraron los datos completos o cálculos de la cotización para generar el informe.")
                     except Exception as e:
                         st.error(f"❌ Ocurrió un error inesperado generando el informe técnico: {e}")
                         print(f"Error generando informe técnico para ID {selected_quote_id_informe}: {e}")
                         traceback.print_exc()
+
+            pdf_download_link = mostrar_trabajo(session_job_key_informe, "Generando informe técnico")
+            if pdf_download_link:
+                st.markdown(pdf_download_link, unsafe_allow_html=True)
+                st.success("✅ Informe técnico generado exitosamente. Use el enlace para descargar.")
     else:
          st.info("No hay cotizaciones disponibles para seleccionar.")
 
@@ -298,10 +332,13 @@ def show_manage_quotes_ui():
     ref_col_acc = 'referencia' # Nombre de la columna de referencia/descripción
     id_col_acc = 'id'
 
-    if all(col in df_cotizaciones.columns for col in [id_col_acc, num_col_acc, client_col_acc, ref_col_acc]):
+    if all(col in df_busqueda.columns for col in [id_col_acc, num_col_acc, client_col_acc, ref_col_acc]):
         opciones_accion = {
-            row[id_col_acc]: f"#{row[num_col_acc]} - {row[client_col_acc]} - {row[ref_col_acc]}"
-             for index, row in df_cotizaciones.iterrows()
+            cotizacion_id: f"#{numero} - {cliente} - {referencia}"
+            for cotizacion_id, numero, cliente, referencia in zip(
+                df_busqueda[id_col_acc], df_busqueda[num_col_acc],
+                df_busqueda[client_col_acc], df_busqueda[ref_col_acc]
+            )
         }
     else:
          st.error("Faltan columnas (ID, Número, Cliente, Referencia) para generar opciones de acción.")
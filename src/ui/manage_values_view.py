@@ -4,11 +4,15 @@ import pandas as pd
 import traceback
 import time
 from src.utils.session_manager import SessionManager
+from src.logic.importacion_precios import (
+    TABLA_MATERIAL_ADHESIVO, TABLA_ACABADOS, leer_archivo_precios, validar_precios,
+    catalogo_material_adhesivo, catalogo_acabados, filas_upsert
+)
 
 def show_manage_values():
     """Vista para administradores que permite modificar valores de materiales-adhesivos y acabados."""
     # Verificar que el usuario sea administrador
-    if st.session_state.get('usuario_rol') != 'administrador':
+    if SessionManager.get_role() != 'administrador':
         st.error("Solo los administradores pueden acceder a esta sección.")
         return
     
@@ -19,7 +23,12 @@ def show_manage_values():
     db = st.session_state.db
     
     # Crear pestañas para separar materiales-adhesivos y acabados
-    tab1, tab2 = st.tabs(["Materiales-Adhesivos", "Acabados"])
+    tab1, tab2, tab3 = st.tabs(["Materiales-Adhesivos", "Acabados", "Importación masiva"])
+    
+    # --- Pestaña de Importación masiva ---
+    # (se dibuja primero porque las otras pestañas hacen return si no hay datos)
+    with tab3:
+        _mostrar_importacion_masiva(db)
     
     # --- Pestaña de Materiales-Adhesivos ---
     with tab1:
@@ -100,6 +109,7 @@ def show_manage_values():
                             try:
                                 success = db.actualizar_material_adhesivo_valor(selected_mat_adh_id, nuevo_valor)
                                 if success:
+                                    SessionManager.invalidar_catalogo_precios()
                                     st.success(f"Valor actualizado correctamente a ${nuevo_valor:.2f}")
                                     time.sleep(1)  # Pequeña pausa para que el usuario vea el mensaje
                                     st.rerun()  # Recargar para mostrar los datos actualizados
@@ -189,6 +199,7 @@ def show_manage_values():
                                 try:
                                     success = db.actualizar_acabado_valor(selected_acabado_id, nuevo_valor)
                                     if success:
+                                        SessionManager.invalidar_catalogo_precios()
                                         st.success(f"Valor de acabado actualizado correctamente a ${nuevo_valor:.2f}")
                                         time.sleep(1)  # Pequeña pausa para que el usuario vea el mensaje
                                         st.rerun()  # Recargar para mostrar los datos actualizados
@@ -202,4 +213,71 @@ def show_manage_values():
             
             except Exception as e:
                 st.error(f"Error cargando datos de acabados: {str(e)}")
-                traceback.print_exc() 
\ No newline at end of file
+                traceback.print_exc() 
+
+
+def _mostrar_importacion_masiva(db):
+    """Carga una lista de precios (código -> valor), muestra la vista previa y la aplica en lote."""
+    st.subheader("Importación masiva de valores")
+    st.markdown("""
+    Cargue la lista de precios del proveedor con una columna de **código** y otra de **valor**
+    (CSV o XLSX). Se valida contra el catálogo actual, se muestran los cambios y, al confirmar,
+    se aplican todos en una sola operación.
+    
+    **💡 Nota:** Si alguna fila tiene errores (código inexistente o repetido, valor no numérico o
+    negativo) no se aplica ningún cambio. Los valores se guardan como enteros.
+    """)
+    
+    tabla = st.radio(
+        "Tabla a actualizar:",
+        options=[TABLA_MATERIAL_ADHESIVO, TABLA_ACABADOS],
+        format_func=lambda t: "Materiales-Adhesivos" if t == TABLA_MATERIAL_ADHESIVO else "Acabados",
+        horizontal=True,
+        key="importacion_tabla"
+    )
+    archivo = st.file_uploader("Lista de precios", type=['csv', 'xlsx'], key="importacion_archivo")
+    if archivo is None:
+        return
+    
+    try:
+        filas = leer_archivo_precios(archivo.getvalue(), archivo.name)
+        if tabla == TABLA_MATERIAL_ADHESIVO:
+            catalogo = catalogo_material_adhesivo(db.get_materiales_adhesivos_table())
+        else:
+            catalogo = catalogo_acabados(db.get_acabados())
+        resultado = validar_precios(filas, catalogo)
+    except ValueError as e:
+        st.error(str(e))
+        return
+    except Exception as e:
+        st.error(f"Error leyendo la lista de precios: {str(e)}")
+        traceback.print_exc()
+        return
+    
+    st.caption(f"{len(filas)} filas leídas: {len(resultado.cambios)} con cambio de valor, "
+               f"{len(resultado.sin_cambio)} sin cambio, {len(resultado.errores)} con errores")
+    
+    if not resultado.valido:
+        st.error("El archivo tiene errores. Corríjalos y vuelva a cargarlo; no se aplicó ningún cambio.")
+        st.dataframe(pd.DataFrame({'Error': resultado.errores}), hide_index=True, use_container_width=True)
+        return
+    if not resultado.cambios:
+        st.info("Todos los valores del archivo coinciden con los actuales. No hay cambios que aplicar.")
+        return
+    
+    st.markdown("### Vista previa de cambios")
+    st.dataframe(resultado.vista_previa(), hide_index=True, use_container_width=True)
+    
+    if st.button(f"Aplicar {len(resultado.cambios)} cambios", key="aplicar_importacion_btn", type="primary"):
+        with st.spinner("Aplicando cambios..."):
+            try:
+                actualizadas = db.actualizar_valores_lote(
+                    tabla, filas_upsert(resultado.cambios, catalogo, db.COLUMNAS_UPSERT_VALORES[tabla])
+                )
+                SessionManager.invalidar_catalogo_precios()
+                st.success(f"Se actualizaron {actualizadas} valores correctamente")
+                time.sleep(1)  # Pequeña pausa para que el usuario vea el mensaje
+                st.rerun()
+            except Exception as e:
+                st.error(f"Error al aplicar la importación: {str(e)}")
+                traceback.print_exc()
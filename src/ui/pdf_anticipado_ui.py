@@ -0,0 +1,87 @@
+"""
+UI del PDF anticipado de cotización (src/pdf/pdf_anticipado.py).
+
+    anticipar_pdf_cotizacion(cotizacion_id)       # al guardar con éxito
+    if st.button("Generar PDF"):
+        if not usar_pdf_anticipado('trabajo_pdf_cotizacion', cotizacion_id):
+            ...                                   # camino normal: hidratar y encolar
+    pdf_bytes = pdf_anticipado_listo(cotizacion_id) or mostrar_trabajo('trabajo_pdf_cotizacion', ...)
+    cancelar_pdf_anticipado()                     # al empezar una cotización nueva
+
+El render anticipado se encola directamente en la cola de trabajos (no con
+enviar_trabajo): mientras el usuario no pida el PDF no hay barra de progreso ni sondeo.
+Si lo pide antes de que termine, la vista adopta el trabajo y muestra su avance.
+"""
+from typing import Optional
+
+import streamlit as st
+
+from src.pdf.pdf_anticipado import cache_pdf, renderizar_pdf_anticipado
+from src.utils.cola_trabajos import obtener_cola
+
+CLAVE_PDF_ANTICIPADO = 'pdf_anticipado'  # {'cotizacion_id', 'version', 'trabajo_id', 'solicitado'}
+
+
+def anticipar_pdf_cotizacion(cotizacion_id: int) -> None:
+    """Encola la hidratación y el render del PDF de la cotización recién guardada"""
+    cancelar_pdf_anticipado()
+    version = cache_pdf.nueva_version(cotizacion_id)
+    propietario = st.session_state.get('user_id')
+    trabajo_id = obtener_cola().enviar(
+        'pdf_cotizacion_anticipado', renderizar_pdf_anticipado, st.session_state.db,
+        cotizacion_id, version, propietario, propietario=propietario
+    )
+    st.session_state[CLAVE_PDF_ANTICIPADO] = {
+        'cotizacion_id': cotizacion_id, 'version': version, 'trabajo_id': trabajo_id, 'solicitado': False,
+    }
+
+
+def _anticipado(cotizacion_id: int) -> Optional[dict]:
+    info = st.session_state.get(CLAVE_PDF_ANTICIPADO)
+    return info if info and info['cotizacion_id'] == cotizacion_id else None
+
+
+def usar_pdf_anticipado(clave_sesion: str, cotizacion_id: int) -> bool:
+    """
+    Al pulsar "Generar PDF": usa el PDF anticipado si ya está en caché o si su trabajo
+    sigue en curso (lo adopta en session_state[clave_sesion] para mostrar el avance).
+
+    Returns:
+        bool: False si no hay PDF anticipado utilizable (hay que generarlo como siempre)
+    """
+    info = _anticipado(cotizacion_id)
+    if info is None:
+        return False
+    propietario = st.session_state.get('user_id')
+    if cache_pdf.obtener(cotizacion_id, info['version'], propietario) is not None:
+        info['solicitado'] = True
+        return True
+    trabajo = obtener_cola().obtener(info['trabajo_id'], propietario)
+    if trabajo is not None and trabajo.activo:
+        info['solicitado'] = True
+        st.session_state[clave_sesion] = trabajo.id
+        return True
+    return False
+
+
+def pdf_anticipado_listo(cotizacion_id: int) -> Optional[bytes]:
+    """Bytes del PDF anticipado ya pedido por el usuario (y su nombre en 'pdf_cotizacion_nombre')"""
+    info = _anticipado(cotizacion_id)
+    if info is None or not info['solicitado']:
+        return None
+    entrada = cache_pdf.obtener(cotizacion_id, info['version'], st.session_state.get('user_id'))
+    if entrada is None:
+        return None
+    st.session_state.pdf_cotizacion_nombre = entrada.nombre
+    return entrada.pdf
+
+
+def cancelar_pdf_anticipado() -> None:
+    """Cancela el render anticipado de la sesión (si sigue en curso) y libera su PDF"""
+    info = st.session_state.pop(CLAVE_PDF_ANTICIPADO, None)
+    if not info:
+        return
+    cola = obtener_cola()
+    cola.cancelar(info['trabajo_id'])
+    cola.descartar(info['trabajo_id'])
+    cache_pdf.descartar(info['cotizacion_id'], info['version'])
@@ -0,0 +1,80 @@
+"""
+UI del perfilador de reruns (src/utils/perfilador.py).
+
+    with perfilar_rerun():   # en el punto de entrada, alrededor de main()
+        main()
+
+    mostrar_perfilador()     # barra lateral, solo administradores
+
+Un administrador activa el perfilador para su sesión desde la barra lateral; con
+PERFILADOR_ACTIVO=1 se perfilan todas las sesiones. Cada rerun completo queda en
+session_state['perfil_ultimo_rerun'] y el panel muestra el del rerun anterior (el
+actual todavía no terminó cuando se dibuja la barra lateral). Los reruns de un
+fragmento (st.fragment) no pasan por main() y no se miden.
+"""
+from contextlib import contextmanager
+from typing import Iterator
+
+import streamlit as st
+
+from src.utils.perfilador import (
+    ACTIVO_POR_DEFECTO, RERUN, TRABAJO, traza, registro_perfiles, formatear_arbol
+)
+
+CLAVE_ACTIVO = 'perfilador_activo'
+CLAVE_ULTIMO = 'perfil_ultimo_rerun'
+
+
+def perfilador_activo() -> bool:
+    if ACTIVO_POR_DEFECTO:
+        return True
+    return st.session_state.get('usuario_rol') == 'administrador' and bool(st.session_state.get(CLAVE_ACTIVO))
+
+
+@contextmanager
+def perfilar_rerun() -> Iterator[None]:
+    """Traza del rerun completo; al terminar (también con st.rerun/st.stop) la guarda en la sesión"""
+    raiz = None
+    contexto = {
+        'vista': st.session_state.get('current_view', 'calculator'),
+        'rol': st.session_state.get('usuario_rol'),
+    }
+    try:
+        with traza('rerun', RERUN, activo=perfilador_activo(), contexto=contexto) as raiz:
+            yield
+    finally:
+        if raiz is not None:
+            st.session_state[CLAVE_ULTIMO] = raiz.to_dict()
+
+
+def mostrar_perfilador() -> None:
+    """Panel de la barra lateral con el árbol de tramos del último rerun (solo administradores)"""
+    if st.session_state.get('usuario_rol') != 'administrador':
+        return
+    with st.sidebar.expander("⏱️ Perfilador de reruns", expanded=False):
+        st.checkbox(
+            "Perfilar mis reruns", key=CLAVE_ACTIVO, disabled=ACTIVO_POR_DEFECTO,
+            help="Mide DB, calculadoras, PDF y vistas en cada rerun de esta sesión"
+        )
+        ultimo = st.session_state.get(CLAVE_ULTIMO)
+        if ultimo:
+            st.caption(
+                f"Último rerun ({ultimo.get('vista')}): {ultimo['ms']:.0f} ms · "
+                f"{ultimo['peticiones']} peticiones · "
+                f"{(ultimo['bytes_enviados'] + ultimo['bytes_recibidos']) / 1024:.1f} KB"
+            )
+            st.code(formatear_arbol(ultimo), language=None)
+        elif perfilador_activo():
+            st.caption("El árbol aparece a partir del próximo rerun.")
+
+        trabajos = registro_perfiles.recientes(TRABAJO)[:3]
+        if trabajos:
+            st.markdown("###### Trabajos en segundo plano")
+            for registro in trabajos:
+                st.code(formatear_arbol(registro, max_profundidad=2), language=None)
+
+        stats = registro_perfiles.estadisticas()
+        st.caption(
+            f"Trazas: {stats['trazas']} · en archivo: {stats['escritas']} "
+            f"(muestreo {stats['muestreo']:.0%}, {stats['archivo']})"
+        )
@@ -13,6 +13,7 @@ from src.logic.report_generator import generar_informe_tecnico
 #     formatear_moneda
 # )
 from src.pdf.pdf_generator import CotizacionPDF, MaterialesPDF
+from src.utils.session_manager import SessionManager
 
 def show_quote_header(cotizacion_data: Dict) -> None:
     """Muestra el encabezado de la cotización con información básica."""
@@ -181,7 +182,7 @@ def show_quote_view() -> None:
 
     except Exception as e:
         st.error(f"Error mostrando la cotización: {str(e)}")
-        if st.session_state.get('usuario_rol') == 'administrador':
+        if SessionManager.get_role() == 'administrador':
             st.exception(e)
 
 def guardar_cotizacion() -> bool:
@@ -225,7 +226,7 @@ def guardar_cotizacion() -> bool:
 
     except Exception as e:
         st.error(f"Error al guardar la cotización: {str(e)}")
-        if st.session_state.get('usuario_rol') == 'administrador':
+        if SessionManager.get_role() == 'administrador':
             st.exception(e)
         return False
 
@@ -262,7 +263,7 @@ def generar_pdf_cliente() -> Optional[bytes]:
 
     except Exception as e:
         st.error(f"Error generando PDF: {str(e)}")
-        if st.session_state.get('usuario_rol') == 'administrador':
+        if SessionManager.get_role() == 'administrador':
             st.exception(e)
         return None
 
@@ -297,7 +298,7 @@ def generar_pdf_materiales() -> Optional[bytes]:
 
     except Exception as e:
         st.error(f"Error generando PDF de materiales: {str(e)}")
-        if st.session_state.get('usuario_rol') == 'administrador':
+        if SessionManager.get_role() == 'administrador':
             st.exception(e)
         return None
 
@@ -0,0 +1,86 @@
+"""
+Helpers de UI para la cola de trabajos en segundo plano (src/utils/cola_trabajos.py).
+
+Uso típico en una vista:
+
+    if st.button("Generar PDF"):
+        enviar_trabajo('trabajo_pdf_123', 'pdf_cotizacion', generar_bytes_pdf_cotizacion, datos)
+    pdf_bytes = mostrar_trabajo('trabajo_pdf_123', "Generando PDF")
+    if pdf_bytes:
+        st.download_button(...)
+
+Mientras el trabajo está activo, mostrar_trabajo dibuja la barra de progreso en un
+fragmento que se vuelve a ejecutar solo cada INTERVALO_SONDEO segundos (sin bloquear el
+script ni volver a ejecutar la página). Cuando el trabajo termina, el fragmento pide un
+rerun de la página para que la vista muestre el resultado; como el trabajo ya no está
+activo el fragmento no se vuelve a dibujar y el sondeo se detiene.
+"""
+from typing import Any, Callable, Optional
+
+import streamlit as st
+
+from src.utils.cola_trabajos import obtener_cola, ERROR, CANCELADO
+
+INTERVALO_SONDEO = 1.0  # segundos entre consultas de estado
+
+
+def enviar_trabajo(clave_sesion: str, tipo: str, funcion: Callable[..., Any], *args, **kwargs) -> str:
+    """Encola el trabajo a nombre del usuario actual y guarda su id en session_state[clave_sesion]"""
+    trabajo_id = obtener_cola().enviar(
+        tipo, funcion, *args, propietario=st.session_state.get('user_id'), **kwargs
+    )
+    st.session_state[clave_sesion] = trabajo_id
+    return trabajo_id
+
+
+def descartar_trabajo(clave_sesion: str) -> None:
+    """Olvida el trabajo guardado en la sesión: lo cancela si sigue activo y libera su resultado"""
+    trabajo_id = st.session_state.pop(clave_sesion, None)
+    if trabajo_id:
+        obtener_cola().cancelar(trabajo_id)
+        obtener_cola().descartar(trabajo_id)
+
+
+def mostrar_trabajo(clave_sesion: str, etiqueta: str) -> Optional[Any]:
+    """
+    Muestra el estado del trabajo cuyo id está en session_state[clave_sesion].
+
+    Returns:
+        El resultado si el trabajo terminó bien; None si no hay trabajo, sigue en
+        curso (se muestra una barra de progreso que se actualiza sola) o falló (se
+        muestra el error).
+    """
+    trabajo_id = st.session_state.get(clave_sesion)
+    if not trabajo_id:
+        return None
+
+    trabajo = obtener_cola().obtener(trabajo_id, st.session_state.get('user_id'))
+    if trabajo is None:
+        st.session_state.pop(clave_sesion, None)
+        st.warning(f"{etiqueta}: el resultado ya no está disponible, vuelva a generarlo.")
+        return None
+
+    if trabajo.activo:
+        _progreso_trabajo(trabajo_id, etiqueta)
+        return None
+
+    if trabajo.estado == ERROR:
+        st.error(f"❌ {etiqueta}: {trabajo.error}")
+        st.session_state.pop(clave_sesion, None)
+        return None
+
+    if trabajo.estado == CANCELADO:
+        st.session_state.pop(clave_sesion, None)
+        return None
+
+    return trabajo.resultado
+
+
+@st.fragment(run_every=INTERVALO_SONDEO)
+def _progreso_trabajo(trabajo_id: str, etiqueta: str) -> None:
+    """Barra de progreso del trabajo; al terminar vuelve a ejecutar la página para mostrar el resultado"""
+    trabajo = obtener_cola().obtener(trabajo_id, st.session_state.get('user_id'))
+    if trabajo is None or not trabajo.activo:
+        st.rerun()
+    texto = trabajo.mensaje or ("En cola..." if trabajo.progreso == 0 else "Procesando...")
+    st.progress(trabajo.progreso, text=f"⏳ {etiqueta}: {texto}")
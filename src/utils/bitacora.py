@@ -0,0 +1,183 @@
+"""
+Bitácora (logging) de la capa de datos y del gestor de cotizaciones.
+
+Antes DBManager y CotizacionManager imprimían con print() payloads y respuestas completas
+(parámetros RPC, filas de clientes...): bajo carga eso inunda stdout, cuesta serializar
+cada dict aunque nadie lo lea y deja datos de clientes en los logs. Aquí:
+
+    log = obtener_bitacora('datos')
+    log.debug("Parámetros RPC: %s", rpc_params)      # formato diferido
+    log.error("Error al crear cliente %s: %s", Sensible(nombre), e)
+
+    - Niveles: LOG_NIVEL (DEBUG, INFO, WARNING, ERROR; por defecto INFO) para todo el
+      cotizador y LOG_NIVELES="datos=DEBUG,cotizaciones=WARNING" por categoría. Un mensaje
+      por debajo del nivel se descarta en logger.isEnabledFor, antes de crear el registro:
+      en WARNING los debug/info no formatean ni redactan nada.
+    - Formato diferido: el mensaje usa %s y los argumentos se formatean solo si el
+      registro se emite (nunca pasar f-strings a la bitácora).
+    - Muestreo por categoría: LOG_MUESTREO="datos=0.1" emite solo esa fracción de los
+      mensajes DEBUG/INFO de la categoría (WARNING y superiores siempre se emiten).
+    - Redacción: antes de formatear, los argumentos dict / list / dataclass / respuestas
+      de postgrest se copian con los campos de datos personales reemplazados (CAMPOS_PII
+      y claves tipo 'cliente_nombre' a cualquier profundidad; en un registro de cliente
+      también el nombre) y los correos en textos se ocultan. Un argumento suelto que es
+      dato personal (nombre, NIT...) se marca con Sensible(valor).
+
+Las categorías cuelgan del logger 'cotizador' ('cotizador.datos', 'cotizador.cotizaciones').
+"""
+import dataclasses
+import logging
+import os
+import random
+import re
+import sys
+from typing import Any, Dict, Optional
+
+RAIZ = 'cotizador'
+NIVEL_POR_DEFECTO = os.environ.get('LOG_NIVEL', 'INFO').upper()
+FORMATO = '%(asctime)s %(levelname)s %(name)s: %(message)s'
+
+# Campos con datos personales de clientes y comerciales
+CAMPOS_PII = {
+    'codigo', 'nit', 'cliente_codigo', 'codigo_cliente', 'persona_contacto', 'correo_electronico',
+    'email', 'correo', 'telefono', 'celular', 'direccion', 'cliente_nombre', 'nombre_cliente',
+    'comercial_email', 'comercial_telefono', 'comercial_celular',
+}
+# Con alguno de estos campos el dict es un registro de cliente y 'nombre' también es PII
+CAMPOS_REGISTRO_CLIENTE = {'persona_contacto', 'correo_electronico', 'nit'}
+# Un dict (o lista de dicts) guardado bajo estas claves también es un registro de cliente
+CLAVES_REGISTRO_CLIENTE = {'cliente', 'clientes'}
+OCULTO = '***'
+_PATRON_CORREO = re.compile(r'[\w.+-]+@[\w-]+\.[\w.-]+')
+_MAX_PROFUNDIDAD = 6
+
+
+class Sensible:
+    """Marca un argumento de la bitácora como dato personal: se emite como OCULTO"""
+    __slots__ = ('valor',)
+
+    def __init__(self, valor: Any):
+        self.valor = valor
+
+    def __str__(self) -> str:
+        return OCULTO
+
+    __repr__ = __str__
+
+
+def _es_campo_pii(campo: Any) -> bool:
+    """Campo de CAMPOS_PII o nombre de cliente con otro orden/prefijo ('cliente_nombre_comercial')"""
+    if not isinstance(campo, str):
+        return False
+    campo = campo.lower()
+    return campo in CAMPOS_PII or ('cliente' in campo and 'nombre' in campo)
+
+
+def redactar(valor: Any, profundidad: int = 0, registro_cliente: bool = False) -> Any:
+    """
+    Copia del valor con los datos personales ocultos (ver CAMPOS_PII). Con
+    registro_cliente=True los dicts del valor son registros de cliente y su
+    'nombre' también se oculta.
+    """
+    if valor is None or isinstance(valor, (bool, int, float)):
+        return valor
+    if isinstance(valor, str):
+        return _PATRON_CORREO.sub(OCULTO, valor)
+    if isinstance(valor, Sensible):
+        return OCULTO
+    if profundidad > _MAX_PROFUNDIDAD:
+        # Demasiado anidado para revisarlo: no se emite
+        return OCULTO
+    if isinstance(valor, dict):
+        # Los parámetros de las RPC llevan prefijo 'p_' (p_nombre, p_telefono...)
+        campos = {k: k[2:] if isinstance(k, str) and k.startswith('p_') else k for k in valor}
+        es_cliente = registro_cliente or not CAMPOS_REGISTRO_CLIENTE.isdisjoint(campos.values())
+        return {
+            k: OCULTO if v is not None and (
+                _es_campo_pii(campos[k]) or (es_cliente and campos[k] == 'nombre')
+                # {'cliente': 'ACME SAS'}: el valor es el nombre
+                or (campos[k] in CLAVES_REGISTRO_CLIENTE and isinstance(v, str)))
+            else redactar(v, profundidad + 1, campos[k] in CLAVES_REGISTRO_CLIENTE)
+            for k, v in valor.items()
+        }
+    if isinstance(valor, tuple):
+        return tuple(redactar(v, profundidad + 1, registro_cliente) for v in valor)
+    if isinstance(valor, (list, set)):
+        return [redactar(v, profundidad + 1, registro_cliente) for v in valor]
+    if dataclasses.is_dataclass(valor) and not isinstance(valor, type):
+        datos = {f.name: getattr(valor, f.name) for f in dataclasses.fields(valor)}
+        es_cliente = registro_cliente or type(valor).__name__ == 'Cliente'
+        return f"{type(valor).__name__}({redactar(datos, profundidad + 1, es_cliente)})"
+    datos = getattr(valor, 'data', None)
+    if isinstance(datos, (list, dict)):
+        # Respuestas de postgrest / supabase (APIResponse)
+        return f"{type(valor).__name__}(data={redactar(datos, profundidad + 1)})"
+    return valor
+
+
+class _FiltroRedaccion(logging.Filter):
+    """Redacta los argumentos del registro (solo corre si el registro se va a emitir)"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.args:
+            if isinstance(record.args, dict):
+                record.args = redactar(record.args)
+            else:
+                record.args = tuple(redactar(arg) for arg in record.args)
+        if isinstance(record.msg, str):
+            record.msg = _PATRON_CORREO.sub(OCULTO, record.msg)
+        return True
+
+
+class _FiltroMuestreo(logging.Filter):
+    """Deja pasar solo una fracción de los DEBUG/INFO de una categoría"""
+
+    def __init__(self, fraccion: float):
+        super().__init__()
+        self.fraccion = fraccion
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        return record.levelno >= logging.WARNING or random.random() < self.fraccion
+
+
+def _parsear_pares(texto: str) -> Dict[str, str]:
+    """'a=1, b=2' -> {'a': '1', 'b': '2'} (se ignoran pares mal formados)"""
+    pares = {}
+    for parte in texto.split(','):
+        if '=' in parte:
+            clave, valor = parte.split('=', 1)
+            pares[clave.strip()] = valor.strip()
+    return pares
+
+
+_configurada = False
+
+
+def _configurar() -> None:
+    global _configurada
+    if _configurada:
+        return
+    _configurada = True
+    raiz = logging.getLogger(RAIZ)
+    raiz.setLevel(NIVEL_POR_DEFECTO)
+    raiz.propagate = False
+    manejador = logging.StreamHandler(sys.stdout)
+    manejador.setFormatter(logging.Formatter(FORMATO))
+    manejador.addFilter(_FiltroRedaccion())
+    raiz.addHandler(manejador)
+    for categoria, nivel in _parsear_pares(os.environ.get('LOG_NIVELES', '')).items():
+        logging.getLogger(f"{RAIZ}.{categoria}").setLevel(nivel.upper())
+
+
+def obtener_bitacora(categoria: str, muestreo: Optional[float] = None) -> logging.Logger:
+    """
+    Logger de la categoría ('datos', 'cotizaciones'...). La fracción de muestreo de
+    DEBUG/INFO sale de LOG_MUESTREO o, si no está, del argumento (por defecto 1.0).
+    """
+    _configurar()
+    logger = logging.getLogger(f"{RAIZ}.{categoria}")
+    fraccion = _parsear_pares(os.environ.get('LOG_MUESTREO', '')).get(categoria)
+    fraccion = float(fraccion) if fraccion is not None else muestreo
+    if fraccion is not None and fraccion < 1.0 and not any(isinstance(f, _FiltroMuestreo) for f in logger.filters):
+        logger.addFilter(_FiltroMuestreo(fraccion))
+    return logger
@@ -0,0 +1,219 @@
+"""
+Cola de trabajos en segundo plano para renders pesados (PDF de cotización, informe
+técnico en PDF, exportaciones).
+
+Los trabajos se ejecutan en un pool de hilos compartido por todo el proceso, fuera del
+hilo del script de Streamlit: el rerun del usuario no queda bloqueado bajo st.spinner y
+varios comerciales generando PDF a la vez no se serializan entre sí (hasta
+MAX_TRABAJADORES renders en paralelo).
+
+Cada trabajo tiene un id, un estado, un progreso (0.0 a 1.0) y su resultado, guardados
+en memoria del proceso. La UI guarda el id en session_state y consulta el estado en
+cada rerun (ver src/ui/trabajos_ui.py). Los resultados vencen después de TTL_RESULTADOS.
+
+Un trabajo se puede cancelar: si aún no empezó no se ejecuta; si ya está corriendo, la
+función que acepte el argumento 'cancelado' puede consultarlo (cancelado() -> bool) para
+cortar antes de terminar, y su resultado se descarta igual.
+"""
+import inspect
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Optional
+
+from src.utils import perfilador
+from src.utils.bitacora import obtener_bitacora
+
+log = obtener_bitacora('trabajos')
+
+MAX_TRABAJADORES = 4
+TTL_RESULTADOS = 30 * 60  # segundos que un trabajo terminado se conserva
+
+PENDIENTE = 'pendiente'
+EN_PROCESO = 'en_proceso'
+COMPLETADO = 'completado'
+ERROR = 'error'
+CANCELADO = 'cancelado'
+
+
+def _acepta(funcion: Callable[..., Any], argumento: str) -> bool:
+    try:
+        return argumento in inspect.signature(funcion).parameters
+    except (TypeError, ValueError):
+        return False
+
+
+@dataclass
+class Trabajo:
+    """Estado de un trabajo en la cola"""
+    id: str
+    tipo: str
+    propietario: Optional[str] = None
+    estado: str = PENDIENTE
+    progreso: float = 0.0
+    mensaje: str = ''
+    resultado: Any = None
+    error: Optional[str] = None
+    creado: float = field(default_factory=time.time)
+    iniciado: Optional[float] = None
+    terminado: Optional[float] = None
+    cancelacion_solicitada: bool = False
+
+    @property
+    def terminado_ok(self) -> bool:
+        return self.estado == COMPLETADO
+
+    @property
+    def activo(self) -> bool:
+        return self.estado in (PENDIENTE, EN_PROCESO)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Resumen sin el resultado (que puede ser un PDF completo)"""
+        return {
+            'id': self.id,
+            'tipo': self.tipo,
+            'estado': self.estado,
+            'progreso': self.progreso,
+            'mensaje': self.mensaje,
+            'error': self.error,
+            'espera': (self.iniciado or time.time()) - self.creado,
+            'duracion': (self.terminado - self.iniciado) if self.terminado and self.iniciado else None,
+        }
+
+
+class ColaTrabajos:
+    """Pool de trabajadores y registro de trabajos del proceso"""
+
+    def __init__(self, max_trabajadores: int = MAX_TRABAJADORES, ttl_resultados: float = TTL_RESULTADOS):
+        self.max_trabajadores = max_trabajadores
+        self.ttl_resultados = ttl_resultados
+        self._pool = ThreadPoolExecutor(max_workers=max_trabajadores, thread_name_prefix='trabajo')
+        self._trabajos: Dict[str, Trabajo] = {}
+        self._futuros: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+    def enviar(self, tipo: str, funcion: Callable[..., Any], *args,
+               propietario: Optional[str] = None, **kwargs) -> str:
+        """
+        Encola funcion(*args, **kwargs) y devuelve el id del trabajo.
+
+        Si la función acepta el argumento 'reportar_progreso', recibe un callable
+        reportar_progreso(progreso, mensaje='') para informar avance parcial; si acepta
+        'cancelado', un callable cancelado() que indica si se pidió cancelar el trabajo.
+
+        Si la sesión que encola tiene el perfilador activo, el trabajo se mide en su
+        propia traza (el rerun que lo encoló ya habrá terminado cuando se ejecute).
+        """
+        self.limpiar_vencidos()
+        trabajo = Trabajo(id=uuid.uuid4().hex, tipo=tipo, propietario=propietario)
+        perfilar = perfilador.tramo_actual() is not None
+        with self._lock:
+            self._trabajos[trabajo.id] = trabajo
+            self._futuros[trabajo.id] = self._pool.submit(self._ejecutar, trabajo, funcion, args, kwargs, perfilar)
+        log.debug('Trabajo encolado: %s (%s)', tipo, trabajo.id[:8])
+        return trabajo.id
+
+    def _ejecutar(self, trabajo: Trabajo, funcion: Callable[..., Any], args, kwargs,
+                  perfilar: bool = False) -> None:
+        trabajo.estado = EN_PROCESO
+        trabajo.iniciado = time.time()
+
+        def reportar_progreso(progreso: float, mensaje: str = '') -> None:
+            trabajo.progreso = max(0.0, min(1.0, float(progreso)))
+            if mensaje:
+                trabajo.mensaje = mensaje
+
+        try:
+            if _acepta(funcion, 'reportar_progreso'):
+                kwargs = dict(kwargs, reportar_progreso=reportar_progreso)
+            if _acepta(funcion, 'cancelado'):
+                kwargs = dict(kwargs, cancelado=lambda: trabajo.cancelacion_solicitada)
+            with perfilador.traza(f"trabajo:{trabajo.tipo}", perfilador.TRABAJO, activo=perfilar):
+                resultado = funcion(*args, **kwargs)
+            if trabajo.cancelacion_solicitada:
+                trabajo.estado = CANCELADO
+            elif resultado is None:
+                trabajo.error = "El trabajo no produjo resultado"
+                trabajo.estado = ERROR
+            else:
+                trabajo.resultado = resultado
+                trabajo.progreso = 1.0
+                trabajo.estado = COMPLETADO
+        except Exception as e:
+            log.error('Trabajo %s (%s) falló: %s', trabajo.tipo, trabajo.id[:8], e, exc_info=True)
+            trabajo.error = str(e)
+            trabajo.estado = ERROR
+        finally:
+            with self._lock:
+                self._futuros.pop(trabajo.id, None)
+            trabajo.terminado = time.time()
+            log.info('Trabajo %s (%s): %s en %.2fs', trabajo.tipo, trabajo.id[:8], trabajo.estado,
+                     trabajo.terminado - trabajo.iniciado)
+
+    def obtener(self, trabajo_id: Optional[str], propietario: Optional[str] = None) -> Optional[Trabajo]:
+        """Trabajo por id; None si no existe, venció o pertenece a otro usuario"""
+        if not trabajo_id:
+            return None
+        with self._lock:
+            trabajo = self._trabajos.get(trabajo_id)
+        if trabajo is None:
+            return None
+        if trabajo.propietario is not None and trabajo.propietario != propietario:
+            return None
+        return trabajo
+
+    def cancelar(self, trabajo_id: Optional[str]) -> bool:
+        """
+        Cancela un trabajo activo. Uno pendiente no llega a ejecutarse; uno en proceso
+        termina como CANCELADO (su resultado se descarta) cuando la función retorna.
+
+        Returns:
+            bool: True si el trabajo estaba activo
+        """
+        with self._lock:
+            trabajo = self._trabajos.get(trabajo_id)
+            if trabajo is None or not trabajo.activo:
+                return False
+            trabajo.cancelacion_solicitada = True
+            futuro = self._futuros.get(trabajo_id)
+            if futuro is not None and futuro.cancel():
+                # No había empezado: _ejecutar no correrá
+                del self._futuros[trabajo_id]
+                trabajo.estado = CANCELADO
+                trabajo.terminado = time.time()
+        log.info('Trabajo cancelado: %s (%s)', trabajo.tipo, trabajo.id[:8])
+        return True
+
+    def descartar(self, trabajo_id: Optional[str]) -> None:
+        with self._lock:
+            self._trabajos.pop(trabajo_id, None)
+
+    def limpiar_vencidos(self) -> None:
+        limite = time.time() - self.ttl_resultados
+        with self._lock:
+            vencidos = [i for i, t in self._trabajos.items() if t.terminado and t.terminado < limite]
+            for trabajo_id in vencidos:
+                del self._trabajos[trabajo_id]
+
+    def estadisticas(self) -> Dict[str, Any]:
+        with self._lock:
+            trabajos = list(self._trabajos.values())
+        por_estado = {estado: 0 for estado in (PENDIENTE, EN_PROCESO, COMPLETADO, ERROR, CANCELADO)}
+        for trabajo in trabajos:
+            por_estado[trabajo.estado] += 1
+        return {'max_trabajadores': self.max_trabajadores, 'trabajos': len(trabajos), **por_estado}
+
+
+_cola: Optional[ColaTrabajos] = None
+_lock_cola = threading.Lock()
+
+
+def obtener_cola() -> ColaTrabajos:
+    """Cola única del proceso (compartida por todas las sesiones)"""
+    global _cola
+    with _lock_cola:
+        if _cola is None:
+            _cola = ColaTrabajos()
+        return _cola
@@ -0,0 +1,413 @@
+"""
+Métricas agregadas del proceso (contadores, medidores e histogramas) en formato de texto
+de Prometheus.
+
+El perfilador (src/utils/perfilador.py) explica un rerun puntual; estas métricas se
+acumulan desde que arranca el proceso y sirven para comparar antes y después de un
+despliegue:
+
+    cotizador_db_llamada_segundos{metodo,resultado}     latencia por método de DBManager
+    cotizador_db_reintentos_total{operacion,motivo}     reintentos de _retry_operation
+    cotizador_db_operaciones_fallidas_total{operacion}  reintentos agotados
+    cotizador_calculo_segundos{tipo_producto}           cálculo de cotización (etiqueta/manga)
+    cotizador_pdf_render_segundos{documento}            render de PDF
+    cotizador_pdf_bytes{documento}                      tamaño del PDF
+    cotizador_sesiones_activas                          sesiones con un rerun en los últimos 5 min
+    cotizador_cache_*{cache,dominio}                    aciertos, fallos y entradas de las cachés
+    cotizador_pool_*                                    pool HTTP compartido
+    cotizador_trabajos{estado}                          cola de trabajos en segundo plano
+
+Las de caché, pool y cola se leen de las estadísticas que ya llevan esos módulos al
+momento de exportar (recolectores), sin contar nada extra en el camino caliente. Los
+métodos de DBManager con caché (cache_por_principal) también cuentan los aciertos de
+caché en su histograma de latencia.
+
+Registrar un valor cuesta tomar un lock y sumar. La exportación se activa con
+variables de entorno (iniciar_exportacion(), una vez por proceso):
+
+    METRICAS_ARCHIVO=metricas.prom   reescribe el archivo cada METRICAS_INTERVALO segundos
+    METRICAS_PUERTO=9464             sirve GET /metrics en METRICAS_HOST (127.0.0.1)
+"""
+import bisect
+import functools
+import os
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+BUCKETS_SEGUNDOS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+BUCKETS_BYTES = (10_000, 50_000, 100_000, 250_000, 500_000, 1_000_000, 5_000_000)
+VENTANA_SESION_ACTIVA = 5 * 60  # segundos
+INTERVALO_ARCHIVO = float(os.environ.get('METRICAS_INTERVALO', '15'))
+
+# (etiquetas, valor) de una serie para los recolectores
+Muestra = Tuple[Dict[str, str], float]
+
+
+def _escapar(valor: Any) -> str:
+    return str(valor).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _formatear_etiquetas(etiquetas: Dict[str, Any]) -> str:
+    if not etiquetas:
+        return ''
+    return '{' + ','.join(f'{k}="{_escapar(v)}"' for k, v in etiquetas.items()) + '}'
+
+
+def _formatear_valor(valor: float) -> str:
+    if valor == float('inf'):
+        return '+Inf'
+    return repr(float(valor)) if not float(valor).is_integer() else str(int(valor))
+
+
+class _Metrica:
+    tipo = ''
+
+    def __init__(self, nombre: str, ayuda: str, etiquetas: Tuple[str, ...] = ()):
+        self.nombre = nombre
+        self.ayuda = ayuda
+        self.etiquetas = tuple(etiquetas)
+        self._valores: Dict[Tuple[str, ...], Any] = {}
+        self._lock = threading.Lock()
+
+    def _clave(self, etiquetas: Dict[str, Any]) -> Tuple[str, ...]:
+        if set(etiquetas) != set(self.etiquetas):
+            raise ValueError(f"{self.nombre}: se esperaban las etiquetas {self.etiquetas}, llegaron {tuple(etiquetas)}")
+        return tuple(str(etiquetas[nombre]) for nombre in self.etiquetas)
+
+    def _encabezado(self) -> List[str]:
+        return [f"# HELP {self.nombre} {self.ayuda}", f"# TYPE {self.nombre} {self.tipo}"]
+
+    def exportar(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Contador(_Metrica):
+    """Valor que solo crece"""
+    tipo = 'counter'
+
+    def inc(self, valor: float = 1.0, **etiquetas) -> None:
+        clave = self._clave(etiquetas)
+        with self._lock:
+            self._valores[clave] = self._valores.get(clave, 0.0) + valor
+
+    def valor(self, **etiquetas) -> float:
+        with self._lock:
+            return self._valores.get(self._clave(etiquetas), 0.0)
+
+    def exportar(self) -> List[str]:
+        with self._lock:
+            valores = list(self._valores.items())
+        lineas = self._encabezado()
+        for clave, valor in valores:
+            lineas.append(f"{self.nombre}{_formatear_etiquetas(dict(zip(self.etiquetas, clave)))} {_formatear_valor(valor)}")
+        return lineas
+
+
+class Medidor(Contador):
+    """Valor que sube y baja"""
+    tipo = 'gauge'
+
+    def set(self, valor: float, **etiquetas) -> None:
+        clave = self._clave(etiquetas)
+        with self._lock:
+            self._valores[clave] = float(valor)
+
+
+class Histograma(_Metrica):
+    """Conteo de observaciones por bucket acumulado, con suma y total"""
+    tipo = 'histogram'
+
+    def __init__(self, nombre: str, ayuda: str, etiquetas: Tuple[str, ...] = (),
+                 buckets: Tuple[float, ...] = BUCKETS_SEGUNDOS):
+        super().__init__(nombre, ayuda, etiquetas)
+        self.buckets = tuple(sorted(buckets))
+
+    def observar(self, valor: float, **etiquetas) -> None:
+        clave = self._clave(etiquetas)
+        indice = bisect.bisect_left(self.buckets, valor)
+        with self._lock:
+            serie = self._valores.get(clave)
+            if serie is None:
+                # [conteos por bucket (+ el de +Inf), suma]
+                serie = self._valores[clave] = [[0] * (len(self.buckets) + 1), 0.0]
+            serie[0][indice] += 1
+            serie[1] += valor
+
+    @contextmanager
+    def cronometrar(self, **etiquetas) -> Iterator[None]:
+        """Observa la duración del bloque en segundos (también si termina con una excepción)"""
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observar(time.perf_counter() - inicio, **etiquetas)
+
+    def resumen(self, **etiquetas) -> Dict[str, float]:
+        with self._lock:
+            serie = self._valores.get(self._clave(etiquetas))
+            if serie is None:
+                return {'conteo': 0, 'suma': 0.0}
+            return {'conteo': sum(serie[0]), 'suma': serie[1]}
+
+    def exportar(self) -> List[str]:
+        with self._lock:
+            valores = [(clave, list(serie[0]), serie[1]) for clave, serie in self._valores.items()]
+        lineas = self._encabezado()
+        limites = self.buckets + (float('inf'),)
+        for clave, conteos, suma in valores:
+            etiquetas = dict(zip(self.etiquetas, clave))
+            acumulado = 0
+            for limite, conteo in zip(limites, conteos):
+                acumulado += conteo
+                serie = _formatear_etiquetas({**etiquetas, 'le': _formatear_valor(limite)})
+                lineas.append(f"{self.nombre}_bucket{serie} {acumulado}")
+            lineas.append(f"{self.nombre}_sum{_formatear_etiquetas(etiquetas)} {_formatear_valor(suma)}")
+            lineas.append(f"{self.nombre}_count{_formatear_etiquetas(etiquetas)} {acumulado}")
+        return lineas
+
+
+class RegistroMetricas:
+    """Métricas con nombre y recolectores que se leen al exportar"""
+
+    def __init__(self):
+        self._metricas: Dict[str, _Metrica] = {}
+        self._recolectores: List[Callable[[], Iterable[Tuple[str, str, str, List[Muestra]]]]] = []
+        self._lock = threading.Lock()
+
+    def _registrar(self, clase, nombre: str, ayuda: str, etiquetas: Tuple[str, ...], **kwargs) -> Any:
+        with self._lock:
+            metrica = self._metricas.get(nombre)
+            if metrica is None:
+                metrica = self._metricas[nombre] = clase(nombre, ayuda, etiquetas, **kwargs)
+            elif type(metrica) is not clase:
+                raise ValueError(f"La métrica {nombre} ya existe como {metrica.tipo}")
+            return metrica
+
+    def contador(self, nombre: str, ayuda: str, etiquetas: Tuple[str, ...] = ()) -> Contador:
+        return self._registrar(Contador, nombre, ayuda, etiquetas)
+
+    def medidor(self, nombre: str, ayuda: str, etiquetas: Tuple[str, ...] = ()) -> Medidor:
+        return self._registrar(Medidor, nombre, ayuda, etiquetas)
+
+    def histograma(self, nombre: str, ayuda: str, etiquetas: Tuple[str, ...] = (),
+                   buckets: Tuple[float, ...] = BUCKETS_SEGUNDOS) -> Histograma:
+        return self._registrar(Histograma, nombre, ayuda, etiquetas, buckets=buckets)
+
+    def agregar_recolector(self, recolector: Callable[[], Iterable[Tuple[str, str, str, List[Muestra]]]]) -> None:
+        """recolector() devuelve (nombre, tipo, ayuda, [(etiquetas, valor), ...]) por métrica"""
+        with self._lock:
+            self._recolectores.append(recolector)
+
+    def exportar(self) -> str:
+        """Todas las métricas en formato de texto de Prometheus (versión 0.0.4)"""
+        with self._lock:
+            metricas = list(self._metricas.values())
+            recolectores = list(self._recolectores)
+        lineas: List[str] = []
+        for metrica in metricas:
+            lineas.extend(metrica.exportar())
+        for recolector in recolectores:
+            try:
+                familias = list(recolector())
+            except Exception as e:
+                print(f"Métricas: error en recolector {getattr(recolector, '__name__', recolector)}: {e}")
+                continue
+            for nombre, tipo, ayuda, muestras in familias:
+                lineas.append(f"# HELP {nombre} {ayuda}")
+                lineas.append(f"# TYPE {nombre} {tipo}")
+                for etiquetas, valor in muestras:
+                    lineas.append(f"{nombre}{_formatear_etiquetas(etiquetas)} {_formatear_valor(valor)}")
+        return '\n'.join(lineas) + '\n'
+
+
+# Instancia única del proceso y métricas de la aplicación
+registro_metricas = RegistroMetricas()
+
+DB_LATENCIA = registro_metricas.histograma(
+    'cotizador_db_llamada_segundos', 'Duración de los métodos públicos de DBManager', ('metodo', 'resultado'))
+DB_REINTENTOS = registro_metricas.contador(
+    'cotizador_db_reintentos_total', 'Reintentos de _retry_operation', ('operacion', 'motivo'))
+DB_FALLIDAS = registro_metricas.contador(
+    'cotizador_db_operaciones_fallidas_total', 'Operaciones que agotaron los reintentos', ('operacion',))
+CALCULO_DURACION = registro_metricas.histograma(
+    'cotizador_calculo_segundos', 'Duración del cálculo de una cotización', ('tipo_producto',))
+SNAPSHOT_CALCULO = registro_metricas.contador(
+    'cotizador_snapshot_calculo_total', 'Cotizaciones reabiertas con snapshot de cálculo', ('resultado',))
+PDF_DURACION = registro_metricas.histograma(
+    'cotizador_pdf_render_segundos', 'Duración del render de PDF', ('documento',))
+PDF_BYTES = registro_metricas.histograma(
+    'cotizador_pdf_bytes', 'Tamaño de los PDF generados', ('documento',), buckets=BUCKETS_BYTES)
+
+
+def latencia_por_metodo(histograma: Histograma, excluir: tuple = ()) -> Callable:
+    """Decorador de clase: observa en el histograma la duración de cada método público"""
+    def decorador(cls):
+        for nombre, valor in list(vars(cls).items()):
+            if nombre.startswith('_') or nombre in excluir:
+                continue
+            if isinstance(valor, (staticmethod, classmethod, property, type)) or not callable(valor):
+                continue
+            setattr(cls, nombre, _observar_metodo(histograma, nombre, valor))
+        return cls
+    return decorador
+
+
+def _observar_metodo(histograma: Histograma, nombre: str, metodo: Callable) -> Callable:
+    @functools.wraps(metodo)
+    def envoltura(*args, **kwargs):
+        inicio = time.perf_counter()
+        resultado = 'error'
+        try:
+            valor = metodo(*args, **kwargs)
+            resultado = 'ok'
+            return valor
+        finally:
+            histograma.observar(time.perf_counter() - inicio, metodo=nombre, resultado=resultado)
+    return envoltura
+
+
+# --- Sesiones activas ---
+
+_sesiones_vistas: Dict[str, float] = {}
+_lock_sesiones = threading.Lock()
+
+
+def registrar_actividad_sesion(sesion_id: str) -> None:
+    """Marca la sesión como activa (se llama en cada rerun)"""
+    with _lock_sesiones:
+        _sesiones_vistas[sesion_id] = time.monotonic()
+
+
+def _recolectar_sesiones():
+    limite = time.monotonic() - VENTANA_SESION_ACTIVA
+    with _lock_sesiones:
+        for sesion_id in [s for s, visto in _sesiones_vistas.items() if visto < limite]:
+            del _sesiones_vistas[sesion_id]
+        activas = len(_sesiones_vistas)
+    yield ('cotizador_sesiones_activas', 'gauge',
+           f'Sesiones con un rerun en los últimos {VENTANA_SESION_ACTIVA // 60} minutos', [({}, activas)])
+
+
+# --- Recolectores de las estadísticas existentes ---
+
+def _familias_cache(nombre_cache: str, stats_por_dominio: Dict[str, Dict[str, Any]]):
+    familias = {
+        'aciertos': ('cotizador_cache_aciertos_total', 'counter', 'Aciertos de caché'),
+        'fallos': ('cotizador_cache_fallos_total', 'counter', 'Fallos de caché'),
+        'entradas': ('cotizador_cache_entradas', 'gauge', 'Entradas guardadas en caché'),
+    }
+    for campo, (nombre, tipo, ayuda) in familias.items():
+        muestras = [({'cache': nombre_cache, 'dominio': dominio}, stats.get(campo, 0))
+                    for dominio, stats in stats_por_dominio.items()]
+        yield nombre, tipo, ayuda, muestras
+
+
+def _recolectar_caches():
+    # Importación diferida: estos módulos importan a su vez la capa de datos
+    from src.data.cache_datos import cache_datos
+    from src.logic.cache_calculos import cache_calculos
+    from src.auth.cache_perfiles import cache_perfiles
+    from src.pdf.pdf_anticipado import cache_pdf
+
+    muestras: Dict[str, Tuple[str, str, List[Muestra]]] = {}
+    fuentes = [
+        ('datos', cache_datos.estadisticas()['dominios']),
+        ('calculos', {'': cache_calculos.estadisticas()}),
+        ('perfiles', {'': cache_perfiles.estadisticas()}),
+        ('pdf', {'': cache_pdf.estadisticas()}),
+    ]
+    for nombre_cache, stats in fuentes:
+        for nombre, tipo, ayuda, serie in _familias_cache(nombre_cache, stats):
+            muestras.setdefault(nombre, (tipo, ayuda, []))[2].extend(serie)
+    for nombre, (tipo, ayuda, serie) in muestras.items():
+        yield nombre, tipo, ayuda, serie
+
+
+def _recolectar_pool_y_trabajos():
+    from src.data.conexion_supabase import estadisticas_pool
+    from src.utils.cola_trabajos import obtener_cola
+
+    pool = estadisticas_pool()
+    if pool:
+        yield 'cotizador_pool_peticiones_total', 'counter', 'Peticiones HTTP a Supabase', [({}, pool['peticiones'])]
+        yield 'cotizador_pool_errores_total', 'counter', 'Peticiones HTTP con error de transporte', [({}, pool['errores'])]
+        yield ('cotizador_pool_conexiones_nuevas_total', 'counter', 'Conexiones abiertas (handshakes)',
+               [({}, pool['conexiones_nuevas'])])
+        yield 'cotizador_pool_conexiones_en_uso', 'gauge', 'Conexiones del pool en uso', [({}, pool['conexiones_en_uso'])]
+    stats = obtener_cola().estadisticas()
+    yield ('cotizador_trabajos', 'gauge', 'Trabajos en segundo plano por estado',
+           [({'estado': estado}, stats[estado]) for estado in ('pendiente', 'en_proceso', 'completado', 'error', 'cancelado')])
+
+
+registro_metricas.agregar_recolector(_recolectar_sesiones)
+registro_metricas.agregar_recolector(_recolectar_caches)
+registro_metricas.agregar_recolector(_recolectar_pool_y_trabajos)
+
+
+# --- Exportación ---
+
+class _ManejadorMetricas(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split('?')[0] not in ('/metrics', '/'):
+            self.send_error(404)
+            return
+        cuerpo = registro_metricas.exportar().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+        self.send_header('Content-Length', str(len(cuerpo)))
+        self.end_headers()
+        self.wfile.write(cuerpo)
+
+    def log_message(self, format, *args):
+        pass  # Sin una línea por scrape en la consola
+
+
+def escribir_archivo(ruta: str) -> None:
+    """Escribe la exportación completa en la ruta (reemplazo atómico)"""
+    temporal = f"{ruta}.tmp"
+    with open(temporal, 'w', encoding='utf-8') as f:
+        f.write(registro_metricas.exportar())
+    os.replace(temporal, ruta)
+
+
+def _escribir_periodicamente(ruta: str, intervalo: float) -> None:
+    while True:
+        try:
+            escribir_archivo(ruta)
+        except OSError as e:
+            print(f"Métricas: no se pudo escribir {ruta}: {e}")
+        time.sleep(intervalo)
+
+
+_exportacion_iniciada = False
+_lock_exportacion = threading.Lock()
+servidor_metricas: Optional[ThreadingHTTPServer] = None
+
+
+def iniciar_exportacion() -> None:
+    """Arranca (una vez por proceso) el archivo y/o el endpoint HTTP según el entorno"""
+    global _exportacion_iniciada, servidor_metricas
+    with _lock_exportacion:
+        if _exportacion_iniciada:
+            return
+        _exportacion_iniciada = True
+
+    archivo = os.environ.get('METRICAS_ARCHIVO')
+    if archivo:
+        threading.Thread(target=_escribir_periodicamente, args=(archivo, INTERVALO_ARCHIVO),
+                         name='metricas-archivo', daemon=True).start()
+        print(f"Métricas: exportando a {archivo} cada {INTERVALO_ARCHIVO:.0f}s")
+
+    puerto = os.environ.get('METRICAS_PUERTO')
+    if puerto:
+        host = os.environ.get('METRICAS_HOST', '127.0.0.1')
+        try:
+            servidor_metricas = ThreadingHTTPServer((host, int(puerto)), _ManejadorMetricas)
+        except (OSError, ValueError) as e:
+            print(f"Métricas: no se pudo abrir http://{host}:{puerto}/metrics: {e}")
+            return
+        threading.Thread(target=servidor_metricas.serve_forever, name='metricas-http', daemon=True).start()
+        print(f"Métricas: sirviendo http://{host}:{puerto}/metrics")
@@ -0,0 +1,276 @@
+"""
+Perfilador de latencia por rerun: árbol de tramos (spans) con tiempos y tráfico de red.
+
+Un rerun lento puede venir de las consultas de DBManager, de las calculadoras, del
+render del PDF o de la propia página. Con el perfilador activo, cada rerun completo se
+registra como un árbol:
+
+    rerun (main)                                  412 ms · 9 peticiones · 38 KB
+    ├── vista:calculator                          380 ms
+    │   ├── DBManager.get_clientes                120 ms · 1 petición
+    │   └── CalculadoraCostosEscala.preparar_plan   3 ms
+    ...
+
+    - tramo(nombre, tipo): bloque medido (with).
+    - medir(tipo): decorador para funciones y métodos.
+    - instrumentar_clase(tipo): mide todos los métodos públicos de una clase (DBManager).
+    - registrar_peticion(...): lo llama el transporte HTTP compartido
+      (src/data/conexion_supabase.py) para contar peticiones y bytes en el tramo actual.
+
+El tramo actual vive en un ContextVar: cada hilo de script de Streamlit tiene el suyo y
+los hilos sin traza (cola de trabajos, sesiones sin perfilador) no miden nada. Sin traza
+activa, medir/instrumentar_clase cuestan una lectura del ContextVar por llamada y el
+transporte HTTP no envuelve las respuestas.
+
+Cada traza terminada se guarda en memoria (las últimas MAX_RECIENTES) y una muestra
+(fracción MUESTREO) se agrega como una línea JSON a ARCHIVO_MUESTRAS, que rota al pasar
+de MAX_BYTES_ARCHIVO (queda un respaldo '.1') para análisis fuera de línea.
+
+Configuración por variables de entorno:
+    PERFILADOR_ACTIVO=1         perfila todas las sesiones (si no, solo las de los
+                                administradores que lo activen en la barra lateral)
+    PERFILADOR_MUESTREO=0.1     fracción de trazas que se escriben al archivo
+    PERFILADOR_ARCHIVO=...      ruta del archivo de muestras
+"""
+import contextvars
+import functools
+import json
+import os
+import random
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+ACTIVO_POR_DEFECTO = os.environ.get('PERFILADOR_ACTIVO', '').lower() in ('1', 'true', 'si', 'sí')
+MUESTREO = float(os.environ.get('PERFILADOR_MUESTREO', '0.1'))
+ARCHIVO_MUESTRAS = os.environ.get('PERFILADOR_ARCHIVO', 'perfiles_rerun.jsonl')
+MAX_BYTES_ARCHIVO = 5 * 1024 * 1024
+MAX_RECIENTES = 50
+
+# Tipos de tramo
+RERUN = 'rerun'
+TRABAJO = 'trabajo'
+VISTA = 'vista'
+DB = 'db'
+CALCULO = 'calculo'
+PDF = 'pdf'
+
+
+@dataclass
+class Tramo:
+    """Un tramo medido y sus hijos. Las peticiones se cuentan en el tramo más interno."""
+    nombre: str
+    tipo: str
+    inicio: float = field(default_factory=time.perf_counter)
+    segundos: float = 0.0
+    peticiones: int = 0
+    bytes_enviados: int = 0
+    bytes_recibidos: int = 0
+    error: Optional[str] = None
+    hijos: List['Tramo'] = field(default_factory=list)
+
+    def totales(self) -> Dict[str, int]:
+        """Peticiones y bytes del tramo incluyendo todos sus hijos"""
+        totales = {'peticiones': self.peticiones, 'bytes_enviados': self.bytes_enviados,
+                   'bytes_recibidos': self.bytes_recibidos}
+        for hijo in self.hijos:
+            for clave, valor in hijo.totales().items():
+                totales[clave] += valor
+        return totales
+
+    def to_dict(self) -> Dict[str, Any]:
+        datos = {
+            'nombre': self.nombre,
+            'tipo': self.tipo,
+            'ms': round(self.segundos * 1000, 2),
+            **self.totales(),
+        }
+        if self.error:
+            datos['error'] = self.error
+        if self.hijos:
+            datos['hijos'] = [hijo.to_dict() for hijo in self.hijos]
+        return datos
+
+
+_tramo_actual: contextvars.ContextVar[Optional[Tramo]] = contextvars.ContextVar('tramo_actual', default=None)
+
+
+def tramo_actual() -> Optional[Tramo]:
+    """Tramo en curso del hilo actual (None si no hay traza activa)"""
+    return _tramo_actual.get()
+
+
+def _abrir(padre: Tramo, nombre: str, tipo: str) -> Tramo:
+    nuevo = Tramo(nombre, tipo)
+    padre.hijos.append(nuevo)
+    return nuevo
+
+
+def _cerrar(nuevo: Tramo) -> None:
+    nuevo.segundos = time.perf_counter() - nuevo.inicio
+
+
+@contextmanager
+def tramo(nombre: str, tipo: str = VISTA) -> Iterator[Optional[Tramo]]:
+    """Mide el bloque como hijo del tramo actual; sin traza activa no hace nada"""
+    padre = _tramo_actual.get()
+    if padre is None:
+        yield None
+        return
+    nuevo = _abrir(padre, nombre, tipo)
+    token = _tramo_actual.set(nuevo)
+    try:
+        yield nuevo
+    except Exception as e:
+        nuevo.error = type(e).__name__
+        raise
+    finally:
+        _cerrar(nuevo)
+        _tramo_actual.reset(token)
+
+
+def medir(tipo: str, nombre: Optional[str] = None) -> Callable:
+    """Decorador: cada llamada es un tramo (nombre por defecto: Clase.metodo)"""
+    def decorador(funcion: Callable) -> Callable:
+        etiqueta = nombre or funcion.__qualname__
+
+        @functools.wraps(funcion)
+        def envoltura(*args, **kwargs):
+            padre = _tramo_actual.get()
+            if padre is None:
+                return funcion(*args, **kwargs)
+            nuevo = _abrir(padre, etiqueta, tipo)
+            token = _tramo_actual.set(nuevo)
+            try:
+                return funcion(*args, **kwargs)
+            except Exception as e:
+                nuevo.error = type(e).__name__
+                raise
+            finally:
+                _cerrar(nuevo)
+                _tramo_actual.reset(token)
+        return envoltura
+    return decorador
+
+
+def instrumentar_clase(tipo: str, excluir: tuple = ()) -> Callable:
+    """Decorador de clase: aplica medir(tipo) a todos los métodos públicos definidos en ella"""
+    def decorador(cls):
+        for nombre, valor in list(vars(cls).items()):
+            if nombre.startswith('_') or nombre in excluir:
+                continue
+            if isinstance(valor, (staticmethod, classmethod, property, type)) or not callable(valor):
+                continue
+            setattr(cls, nombre, medir(tipo, f"{cls.__name__}.{nombre}")(valor))
+        return cls
+    return decorador
+
+
+def registrar_peticion(destino: Tramo, bytes_enviados: int = 0, bytes_recibidos: int = 0,
+                       nueva: bool = True) -> None:
+    """Suma una petición (nueva=True) y/o bytes al tramo indicado"""
+    if nueva:
+        destino.peticiones += 1
+    destino.bytes_enviados += bytes_enviados
+    destino.bytes_recibidos += bytes_recibidos
+
+
+class RegistroPerfiles:
+    """Trazas terminadas: las últimas en memoria y una muestra en archivo JSON lines"""
+
+    def __init__(self, archivo: str = ARCHIVO_MUESTRAS, muestreo: float = MUESTREO,
+                 max_bytes: int = MAX_BYTES_ARCHIVO, max_recientes: int = MAX_RECIENTES):
+        self.archivo = archivo
+        self.muestreo = muestreo
+        self.max_bytes = max_bytes
+        self._recientes: 'deque[Dict[str, Any]]' = deque(maxlen=max_recientes)
+        self._lock = threading.Lock()
+        self.trazas = 0
+        self.escritas = 0
+
+    def registrar(self, raiz: Tramo, contexto: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        registro = {'fecha': datetime.now().isoformat(timespec='seconds'), **(contexto or {}), **raiz.to_dict()}
+        with self._lock:
+            self.trazas += 1
+            self._recientes.append(registro)
+            if self.archivo and random.random() < self.muestreo:
+                self._escribir(registro)
+        return registro
+
+    def _escribir(self, registro: Dict[str, Any]) -> None:
+        try:
+            if os.path.exists(self.archivo) and os.path.getsize(self.archivo) > self.max_bytes:
+                os.replace(self.archivo, self.archivo + '.1')
+            with open(self.archivo, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(registro, ensure_ascii=False) + '\n')
+            self.escritas += 1
+        except OSError as e:
+            print(f"Perfilador: no se pudo escribir la muestra en {self.archivo}: {e}")
+
+    def recientes(self, tipo: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Últimas trazas (la más reciente primero), opcionalmente solo de un tipo"""
+        with self._lock:
+            trazas = list(self._recientes)
+        return [t for t in reversed(trazas) if tipo is None or t['tipo'] == tipo]
+
+    def estadisticas(self) -> Dict[str, Any]:
+        with self._lock:
+            return {'trazas': self.trazas, 'escritas': self.escritas,
+                    'muestreo': self.muestreo, 'archivo': self.archivo}
+
+
+# Instancia única del proceso
+registro_perfiles = RegistroPerfiles()
+
+
+@contextmanager
+def traza(nombre: str, tipo: str = RERUN, activo: bool = True,
+          contexto: Optional[Dict[str, Any]] = None) -> Iterator[Optional[Tramo]]:
+    """
+    Abre una traza (tramo raíz) en el hilo actual y la registra al terminar, también si
+    el bloque termina con una excepción (st.rerun y st.stop se implementan así).
+    Dentro de otra traza, o con activo=False, no hace nada.
+    """
+    if not activo or _tramo_actual.get() is not None:
+        yield None
+        return
+    raiz = Tramo(nombre, tipo)
+    token = _tramo_actual.set(raiz)
+    try:
+        yield raiz
+    except Exception as e:
+        raiz.error = type(e).__name__
+        raise
+    finally:
+        _cerrar(raiz)
+        _tramo_actual.reset(token)
+        registro_perfiles.registrar(raiz, contexto)
+
+
+def formatear_arbol(registro: Dict[str, Any], max_profundidad: int = 6) -> str:
+    """Árbol de tramos en texto, un tramo por línea (para la UI y la consola)"""
+    lineas: List[str] = []
+
+    def _agregar(nodo: Dict[str, Any], prefijo: str, es_ultimo: bool, profundidad: int) -> None:
+        rama = '' if profundidad == 0 else ('└── ' if es_ultimo else '├── ')
+        detalle = f"{nodo['ms']:.1f} ms"
+        if nodo['peticiones']:
+            kb = (nodo['bytes_enviados'] + nodo['bytes_recibidos']) / 1024
+            detalle += f" · {nodo['peticiones']} pet. · {kb:.1f} KB"
+        if nodo.get('error'):
+            detalle += f" · {nodo['error']}"
+        lineas.append(f"{prefijo}{rama}{nodo['nombre']}  [{detalle}]")
+        hijos = nodo.get('hijos', [])
+        if profundidad + 1 > max_profundidad and hijos:
+            lineas.append(f"{prefijo}    … {len(hijos)} tramos más")
+            return
+        siguiente = prefijo if profundidad == 0 else prefijo + ('    ' if es_ultimo else '│   ')
+        for i, hijo in enumerate(hijos):
+            _agregar(hijo, siguiente, i == len(hijos) - 1, profundidad + 1)
+
+    _agregar(registro, '', True, 0)
+    return '\n'.join(lineas)
@@ -128,27 +128,39 @@ class SessionManager:
             del st.session_state[filename_key]
             print(f"Limpiando datos PDF para quote_id {quote_id}") # Mensaje de debug
 
+    @staticmethod
+    def get_role() -> Optional[str]:
+        """
+        Rol del usuario actual desde la caché de perfiles (búsqueda en memoria).
+        Si la entrada venció con el token, se recarga una vez vía AuthManager.
+        """
+        from ..auth.cache_perfiles import cache_perfiles
+        user_id = st.session_state.get('user_id')
+        rol = cache_perfiles.obtener_rol(user_id)
+        if rol:
+            return rol
+
+        auth_manager = st.session_state.get('auth_manager')
+        if user_id and auth_manager is not None:
+            perfil = auth_manager.get_perfil_actual()
+            if perfil:
+                return perfil.get('rol_nombre')
+
+        # Sin caché ni sesión de auth: usar lo que haya en session_state
+        rol = st.session_state.get('usuario_rol')
+        if rol is None:
+            perfil = st.session_state.get('perfil_usuario') or {}
+            rol = perfil.get('rol_nombre')
+            if rol:
+                st.session_state.usuario_rol = rol
+        return rol
+
     @staticmethod
     def verify_role(allowed_roles: List[str]) -> bool:
         """
         Verifica si el rol del usuario actual está en la lista de roles permitidos.
         """
-        # Obtener el rol del usuario de la sesión
-        current_role = st.session_state.get('usuario_rol')
-        
-        # Debug para ver qué está pasando
-        print(f"Rol actual: {current_role}")
-        print(f"Roles permitidos: {allowed_roles}")
-        
-        if current_role is None:
-            # Si no hay rol, intentar obtenerlo del perfil
-            perfil = st.session_state.get('perfil_usuario', {})
-            current_role = perfil.get('rol_nombre')
-            
-            # Actualizar el rol en la sesión si lo encontramos
-            if current_role:
-                st.session_state.usuario_rol = current_role
-        
+        current_role = SessionManager.get_role()
         return current_role in allowed_roles
 
     @staticmethod
@@ -235,9 +247,33 @@ class SessionManager:
         for key in keys_to_reset:
             if key in st.session_state:
                 del st.session_state[key]
+
+        # Volver a consultar precios de material/acabado en el próximo cálculo
+        if 'grafo_cotizacion' in st.session_state:
+            from ..logic.grafo_cotizacion import NODOS_BD
+            st.session_state.grafo_cotizacion.invalidar(*NODOS_BD)
                 
         # Opcional: Podríamos querer establecer algunos a valores por defecto en lugar de borrar
         # Ejemplo: st.session_state.num_tintas = 3
         # Por ahora, borrar es más simple y fuerza al usuario a rellenar.
         
-        print("DEBUG: Calculator widgets reset in session state.") # Para confirmar
\ No newline at end of file
+        print("DEBUG: Calculator widgets reset in session state.") # Para confirmar
+
+    @staticmethod
+    def invalidar_catalogo_precios() -> None:
+        """
+        Descarta el catálogo de precios en caché después de cambiar valores de
+        material_adhesivo o acabados (una sola vez por importación, no por fila).
+        """
+        # load_initial_data y las lecturas de catálogo de DBManager (src/data/cache_datos.py);
+        # la escritura ya invalida el dominio, esto cubre cambios que no pasan por DBManager
+        from ..data.cache_datos import cache_datos, CATALOGO
+        cache_datos.invalidar(CATALOGO)
+        # Los cálculos guardados con los precios anteriores ya no se pueden reutilizar
+        from ..logic.cache_calculos import cache_calculos
+        cache_calculos.limpiar()
+        st.session_state.initial_data = None
+        if 'grafo_cotizacion' in st.session_state:
+            from ..logic.grafo_cotizacion import NODOS_BD
+            st.session_state.grafo_cotizacion.invalidar(*NODOS_BD)
+        print("DEBUG: Catálogo de precios invalidado.")
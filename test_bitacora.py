@@ -0,0 +1,128 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Pruebas de la bitácora (src/utils/bitacora.py): redacción de datos personales,
+muestreo por categoría y formato diferido.
+
+Uso:
+    python -m pytest -q test_bitacora.py
+"""
+
+import io
+import logging
+import sys
+
+import pytest
+
+sys.path.append('.')
+
+from src.data.models import Cliente
+from src.utils import bitacora
+from src.utils.bitacora import OCULTO, RAIZ, Sensible, obtener_bitacora, redactar
+
+
+@pytest.fixture
+def salida():
+    """Lo que emite el manejador real de la bitácora durante la prueba"""
+    obtener_bitacora('prueba')
+    manejador = logging.getLogger(RAIZ).handlers[0]
+    flujo = io.StringIO()
+    anterior = manejador.setStream(flujo)
+    yield flujo
+    manejador.setStream(anterior)
+
+
+def _bitacora(categoria: str, nivel: int = logging.DEBUG) -> logging.Logger:
+    log = obtener_bitacora(categoria)
+    log.setLevel(nivel)
+    return log
+
+
+class Contador:
+    """Argumento que cuenta cuántas veces se formatea"""
+
+    def __init__(self):
+        self.formateos = 0
+
+    def __str__(self):
+        self.formateos += 1
+        return 'contador'
+
+    __repr__ = __str__
+
+
+def test_cliente_anidado_oculta_nombre(salida):
+    log = _bitacora('prueba.redaccion')
+    log.debug('%s', {'cliente': {'nombre': 'ACME SAS', 'codigo': '900'}})
+    emitido = salida.getvalue()
+    assert 'ACME' not in emitido
+    assert '900' not in emitido
+    assert OCULTO in emitido
+
+
+def test_redactar_registros_de_cliente():
+    assert redactar({'cliente': 'ACME SAS'}) == {'cliente': OCULTO}
+    assert redactar({'clientes': [{'id': 1, 'nombre': 'ACME SAS'}]}) == {'clientes': [{'id': 1, 'nombre': OCULTO}]}
+    # 'nombre' fuera de un registro de cliente no es dato personal
+    assert redactar({'material': {'nombre': 'BOPP'}}) == {'material': {'nombre': 'BOPP'}}
+    assert redactar({'nombre': 'ACME SAS', 'nit': '900'}) == {'nombre': OCULTO, 'nit': OCULTO}
+    assert redactar({'p_nombre': 'ACME SAS', 'p_persona_contacto': 'Ana'}) == {'p_nombre': OCULTO, 'p_persona_contacto': OCULTO}
+    assert 'ACME' not in redactar(Cliente(id=1, nombre='ACME SAS', codigo=900123456))
+
+
+def test_redactar_nombre_de_cliente_a_cualquier_profundidad():
+    anidado = {'cliente_nombre': 'ACME SAS'}
+    for _ in range(10):
+        anidado = {'datos': [anidado]}
+    assert 'ACME' not in str(redactar(anidado))
+    assert redactar({'a': {'b': {'nombre_cliente': 'X', 'Cliente_Nombre_Comercial': 'Y'}}}) == \
+        {'a': {'b': {'nombre_cliente': OCULTO, 'Cliente_Nombre_Comercial': OCULTO}}}
+
+
+def test_redactar_correos_y_sensible(salida):
+    log = _bitacora('prueba.correos')
+    log.info('Usuario ana@empresa.com creó el cliente %s', Sensible('ACME SAS'))
+    log.info('Sin argumentos: ana@empresa.com')
+    emitido = salida.getvalue()
+    assert 'ana@empresa.com' not in emitido
+    assert 'ACME' not in emitido
+    assert redactar({'id': 7, 'valor': 1.5, 'nota': 'ok'}) == {'id': 7, 'valor': 1.5, 'nota': 'ok'}
+
+
+def test_muestreo_por_categoria(salida, monkeypatch):
+    monkeypatch.setenv('LOG_MUESTREO', 'prueba.muestreo=0.5')
+    log = _bitacora('prueba.muestreo')
+
+    monkeypatch.setattr(bitacora.random, 'random', lambda: 0.7)
+    log.debug('debug descartado')
+    log.info('info descartado')
+    log.warning('warning siempre')
+    monkeypatch.setattr(bitacora.random, 'random', lambda: 0.3)
+    log.debug('debug muestreado')
+
+    emitido = salida.getvalue()
+    assert 'descartado' not in emitido
+    assert 'warning siempre' in emitido
+    assert 'debug muestreado' in emitido
+
+
+def test_sin_muestreo_emite_todo(salida, monkeypatch):
+    monkeypatch.setenv('LOG_MUESTREO', 'otra_categoria=0.0')
+    log = _bitacora('prueba.sin_muestreo')
+    log.debug('uno')
+    log.debug('dos')
+    assert 'uno' in salida.getvalue() and 'dos' in salida.getvalue()
+
+
+def test_en_warning_no_se_formatea(salida):
+    log = _bitacora('prueba.diferido', logging.WARNING)
+    argumento = Contador()
+    log.debug('Parámetros: %s', argumento)
+    log.info('Respuesta: %s', argumento)
+    assert argumento.formateos == 0
+    assert salida.getvalue() == ''
+
+    log.warning('Advertencia: %s', argumento)
+    assert argumento.formateos > 0
+    assert 'Advertencia: contador' in salida.getvalue()
@@ -0,0 +1,68 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Pruebas de la caché de resultados de cálculo (src/logic/cache_calculos.py).
+
+Uso:
+    python -m pytest -q test_cache_calculos.py
+"""
+
+import sys
+
+sys.path.append('.')
+
+from ayudas_pruebas import ENTRADAS, BDPrecios, evaluar_cacheado
+from src.data.cache_datos import cache_datos, CATALOGO
+from src.logic.cache_calculos import CacheCalculos, clave_calculo
+from src.logic.grafo_cotizacion import construir_grafo_cotizacion
+
+PRECIOS = {'valor_material': 1800.0, 'valor_acabado': 300.0}
+
+
+def test_clave_normaliza_numeros_y_depende_de_precios_y_version():
+    base = clave_calculo(ENTRADAS, PRECIOS, 3)
+    assert clave_calculo({**ENTRADAS, 'ancho': 50, 'pistas': 3.0}, PRECIOS, 3) == base
+    assert clave_calculo(ENTRADAS, {**PRECIOS, 'valor_material': 1900.0}, 3) != base
+    assert clave_calculo(ENTRADAS, PRECIOS, 4) != base
+    assert clave_calculo({**ENTRADAS, 'escalas': [5000, 1000, 10000]}, PRECIOS, 3) != base
+
+
+def test_otra_sesion_reutiliza_el_resultado():
+    cache = CacheCalculos()
+    primera = construir_grafo_cotizacion(BDPrecios())
+    segunda = construir_grafo_cotizacion(BDPrecios())
+    valores = evaluar_cacheado(primera, cache)
+    assert evaluar_cacheado(segunda, cache) is valores
+    assert segunda.recalculos['resultados'] == 0
+    assert cache.estadisticas()['aciertos'] == 1
+
+
+def test_cambio_de_precio_no_reutiliza_resultados_viejos():
+    cache = CacheCalculos()
+    bd = BDPrecios()
+    grafo = construir_grafo_cotizacion(bd)
+    antes = evaluar_cacheado(grafo, cache)
+    # Otra sesión cambia el precio desde la aplicación
+    bd.valores_material = [2000.0]
+    cache_datos.invalidar(CATALOGO)
+    despues = evaluar_cacheado(grafo, cache)
+    assert despues is not antes
+    assert despues['valor_material'] == 2000.0
+    assert cache.estadisticas()['aciertos'] == 0
+
+
+def test_precio_cambiado_durante_el_calculo_se_guarda_con_el_usado():
+    cache = CacheCalculos()
+    franja = [0]
+
+    def version():
+        franja[0] += 1  # cada evaluación ve una franja nueva: el grafo relee los precios
+        return franja[0]
+
+    grafo = construir_grafo_cotizacion(BDPrecios(valores_material=(1800.0, 2000.0)), version=version)
+    version_catalogo = cache_datos.version(CATALOGO)
+    valores = evaluar_cacheado(grafo, cache)
+    assert valores['valor_material'] == 2000.0
+    assert cache.obtener(clave_calculo(ENTRADAS, {**PRECIOS, 'valor_material': 2000.0}, version_catalogo)) is valores
+    assert cache.obtener(clave_calculo(ENTRADAS, PRECIOS, version_catalogo)) is None
@@ -0,0 +1,195 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Pruebas de la caché de lecturas por principal (src/data/cache_datos.py).
+
+Uso:
+    python -m pytest -q test_cache_datos.py
+"""
+
+import sys
+
+sys.path.append('.')
+
+from src.data.cache_datos import CacheDatos, CATALOGO, CLIENTES, cache_por_principal
+
+COMERCIAL = ('comercial', 'u-1')
+OTRO_COMERCIAL = ('comercial', 'u-2')
+
+
+class Calculo:
+    """calcular() que cuenta sus llamadas y devuelve un valor fijo"""
+
+    def __init__(self, valor):
+        self.valor = valor
+        self.llamadas = 0
+
+    def __call__(self):
+        self.llamadas += 1
+        return self.valor
+
+
+def test_acierto_para_el_mismo_principal():
+    cache, calculo = CacheDatos(), Calculo(['adhesivo'])
+    primero = cache.obtener_o_calcular(CATALOGO, COMERCIAL, 'adhesivos', (1,), calculo)
+    segundo = cache.obtener_o_calcular(CATALOGO, COMERCIAL, 'adhesivos', (1,), calculo)
+    assert primero is segundo
+    assert calculo.llamadas == 1
+
+
+def test_dos_principales_no_comparten_entrada():
+    cache = CacheDatos()
+    propio = cache.obtener_o_calcular(CATALOGO, COMERCIAL, 'clientes', (), Calculo(['propio']))
+    ajeno = cache.obtener_o_calcular(CATALOGO, OTRO_COMERCIAL, 'clientes', (), Calculo(['ajeno']))
+    assert propio == ['propio']
+    assert ajeno == ['ajeno']
+    assert cache.estadisticas()['dominios'][CATALOGO]['aciertos'] == 0
+
+
+def test_argumentos_distintos_no_comparten_entrada():
+    cache = CacheDatos()
+    cache.obtener_o_calcular(CATALOGO, COMERCIAL, 'adhesivos', (1,), Calculo(['a']))
+    assert cache.obtener_o_calcular(CATALOGO, COMERCIAL, 'adhesivos', (2,), Calculo(['b'])) == ['b']
+
+
+def test_invalidar_sube_version_y_quita_entradas():
+    cache = CacheDatos()
+    cache.obtener_o_calcular(CATALOGO, COMERCIAL, 'materiales', (), Calculo(['viejo']))
+    cache.obtener_o_calcular(CLIENTES, COMERCIAL, 'indice', (), Calculo(['indice']))
+
+    assert cache.invalidar(CATALOGO) == {CATALOGO: 1}
+    assert cache.version(CATALOGO) == 1
+    assert cache.version(CLIENTES) == 0
+
+    estadisticas = cache.estadisticas()
+    assert estadisticas['entradas'] == 1
+    assert estadisticas['dominios'][CATALOGO]['entradas'] == 0
+    assert estadisticas['dominios'][CLIENTES]['entradas'] == 1
+
+    calculo = Calculo(['nuevo'])
+    assert cache.obtener_o_calcular(CATALOGO, COMERCIAL, 'materiales', (), calculo) == ['nuevo']
+    assert calculo.llamadas == 1
+
+
+def test_valor_calculado_durante_invalidacion_no_se_guarda():
+    cache = CacheDatos()
+
+    def calcular_mientras_otro_escribe():
+        cache.invalidar(CATALOGO)
+        return ['leido antes de la escritura']
+
+    cache.obtener_o_calcular(CATALOGO, COMERCIAL, 'materiales', (), calcular_mientras_otro_escribe)
+    assert cache.estadisticas()['entradas'] == 0
+
+    calculo = Calculo(['vigente'])
+    assert cache.obtener_o_calcular(CATALOGO, COMERCIAL, 'materiales', (), calculo) == ['vigente']
+    assert calculo.llamadas == 1
+
+
+def test_none_no_se_guarda():
+    cache, calculo = CacheDatos(), Calculo(None)
+    cache.obtener_o_calcular(CATALOGO, COMERCIAL, 'materiales', (), calculo)
+    cache.obtener_o_calcular(CATALOGO, COMERCIAL, 'materiales', (), calculo)
+    assert calculo.llamadas == 2
+    assert cache.estadisticas()['entradas'] == 0
+
+
+def test_vacios_segun_guardar_vacios():
+    cache = CacheDatos()
+    sin_guardar = Calculo([])
+    for _ in range(2):
+        cache.obtener_o_calcular(CLIENTES, COMERCIAL, 'indice', (), sin_guardar, guardar_vacios=False)
+    assert sin_guardar.llamadas == 2
+
+    guardando = Calculo([])
+    for _ in range(2):
+        cache.obtener_o_calcular(CATALOGO, COMERCIAL, 'tipos', (), guardando)
+    assert guardando.llamadas == 1
+
+
+def test_sin_principal_no_usa_cache():
+    cache, calculo = CacheDatos(), Calculo(['valor'])
+    cache.obtener_o_calcular(CATALOGO, None, 'materiales', (), calculo)
+    cache.obtener_o_calcular(CATALOGO, None, 'materiales', (), calculo)
+    assert calculo.llamadas == 2
+    assert cache.estadisticas() == {'entradas': 0, 'max_entradas': cache.max_entradas, 'dominios': {}}
+
+
+def test_entrada_vencida_se_recalcula():
+    cache, calculo = CacheDatos(), Calculo(['valor'])
+    cache.obtener_o_calcular(CATALOGO, COMERCIAL, 'materiales', (), calculo, ttl=0)
+    cache.obtener_o_calcular(CATALOGO, COMERCIAL, 'materiales', (), calculo, ttl=0)
+    assert calculo.llamadas == 2
+
+    contador = cache.estadisticas()['dominios'][CATALOGO]
+    assert contador['vencidas'] == 1
+    assert contador['fallos'] == 2
+    assert contador['aciertos'] == 0
+
+
+def test_lru_descarta_la_menos_usada():
+    cache = CacheDatos(max_entradas=2)
+    cache.obtener_o_calcular(CATALOGO, COMERCIAL, 'f', (1,), Calculo(['1']))
+    cache.obtener_o_calcular(CATALOGO, COMERCIAL, 'f', (2,), Calculo(['2']))
+    # Usar la 1 la deja como la más reciente: la 3 desplaza a la 2
+    cache.obtener_o_calcular(CATALOGO, COMERCIAL, 'f', (1,), Calculo(['otro']))
+    cache.obtener_o_calcular(CATALOGO, COMERCIAL, 'f', (3,), Calculo(['3']))
+
+    uno, dos = Calculo(['1 de nuevo']), Calculo(['2 de nuevo'])
+    assert cache.obtener_o_calcular(CATALOGO, COMERCIAL, 'f', (1,), uno) == ['1']
+    assert cache.obtener_o_calcular(CATALOGO, COMERCIAL, 'f', (2,), dos) == ['2 de nuevo']
+    assert uno.llamadas == 0
+    assert dos.llamadas == 1
+
+    estadisticas = cache.estadisticas()
+    assert estadisticas['entradas'] == 2
+    assert estadisticas['dominios'][CATALOGO]['descartadas'] == 2
+
+
+def test_estadisticas_por_dominio():
+    cache = CacheDatos()
+    calculo = Calculo(['valor'])
+    for _ in range(3):
+        cache.obtener_o_calcular(CATALOGO, COMERCIAL, 'materiales', (), calculo)
+    cache.invalidar(CLIENTES)
+
+    dominios = cache.estadisticas()['dominios']
+    assert dominios[CATALOGO]['aciertos'] == 2
+    assert dominios[CATALOGO]['fallos'] == 1
+    assert abs(dominios[CATALOGO]['tasa_aciertos'] - 2 / 3) < 1e-12
+    assert dominios[CATALOGO]['version'] == 0
+    assert dominios[CLIENTES]['version'] == 1
+    assert dominios[CLIENTES]['tasa_aciertos'] == 0.0
+
+
+def test_decorador_usa_principal_de_la_sesion():
+    class Sesion:
+        def __init__(self, principal):
+            self._principal = principal
+            self.lecturas = 0
+
+        def principal(self):
+            return self._principal
+
+        @cache_por_principal('prueba_decorador', ttl=60)
+        def leer(self, codigo, filtro=None):
+            self.lecturas += 1
+            return [self._principal, codigo, filtro]
+
+    sesion, otra = Sesion(COMERCIAL), Sesion(OTRO_COMERCIAL)
+    try:
+        assert sesion.leer(1, filtro='a') == sesion.leer(1, filtro='a')
+        assert sesion.lecturas == 1
+        assert otra.leer(1, filtro='a') == [OTRO_COMERCIAL, 1, 'a']
+
+        Sesion.leer.clear()
+        sesion.leer(1, filtro='a')
+        assert sesion.lecturas == 2
+
+        anonima = Sesion(None)
+        anonima.leer(1)
+        anonima.leer(1)
+        assert anonima.lecturas == 2
+    finally:
+        Sesion.leer.clear()
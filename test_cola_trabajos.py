@@ -0,0 +1,108 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Pruebas de la cola de trabajos en segundo plano (src/utils/cola_trabajos.py) y de su
+UI (src/ui/trabajos_ui.py).
+
+Uso:
+    python -m pytest -q test_cola_trabajos.py
+"""
+
+import sys
+import threading
+import time
+
+sys.path.append('.')
+
+from streamlit.testing.v1 import AppTest
+
+from src.utils.cola_trabajos import CANCELADO, COMPLETADO, ERROR, ColaTrabajos
+
+
+def _esperar(cola, trabajo_id, limite=5.0):
+    fin = time.monotonic() + limite
+    while cola.obtener(trabajo_id).activo:
+        assert time.monotonic() < fin, "el trabajo no terminó"
+        time.sleep(0.01)
+    return cola.obtener(trabajo_id)
+
+
+def test_resultado_y_progreso():
+    cola = ColaTrabajos(max_trabajadores=1)
+
+    def funcion(valor, reportar_progreso):
+        reportar_progreso(0.5, "mitad")
+        return valor * 2
+
+    trabajo = _esperar(cola, cola.enviar('prueba', funcion, 21))
+    assert trabajo.estado == COMPLETADO
+    assert trabajo.resultado == 42
+    assert trabajo.progreso == 1.0
+    assert trabajo.mensaje == "mitad"
+
+
+def test_error_y_resultado_vacio():
+    cola = ColaTrabajos(max_trabajadores=1)
+
+    def falla():
+        raise ValueError("sin datos")
+
+    assert _esperar(cola, cola.enviar('prueba', falla)).error == "sin datos"
+    assert _esperar(cola, cola.enviar('prueba', lambda: None)).estado == ERROR
+
+
+def test_trabajo_de_otro_usuario_no_se_ve():
+    cola = ColaTrabajos(max_trabajadores=1)
+    trabajo_id = cola.enviar('prueba', lambda: 1, propietario='ana')
+    assert cola.obtener(trabajo_id, 'luis') is None
+    assert cola.obtener(trabajo_id, 'ana') is not None
+
+
+def test_cancelar_pendiente_y_en_proceso():
+    cola = ColaTrabajos(max_trabajadores=1)
+    liberar = threading.Event()
+    vio_cancelacion = []
+
+    def ocupado(cancelado):
+        liberar.wait(5)
+        vio_cancelacion.append(cancelado())
+        return 'descartado'
+
+    en_proceso = cola.enviar('prueba', ocupado)
+    pendiente = cola.enviar('prueba', lambda: 'nunca')
+    assert cola.cancelar(pendiente)
+    assert cola.obtener(pendiente).estado == CANCELADO
+    assert cola.cancelar(en_proceso)
+    liberar.set()
+    trabajo = _esperar(cola, en_proceso)
+    assert trabajo.estado == CANCELADO
+    assert trabajo.resultado is None
+    assert vio_cancelacion == [True]
+    assert not cola.cancelar(en_proceso)
+
+
+def _app_trabajo():
+    import time
+    import streamlit as st
+    from src.ui.trabajos_ui import enviar_trabajo, mostrar_trabajo
+
+    def lento():
+        time.sleep(0.3)
+        return 'listo'
+
+    if 'trabajo' not in st.session_state:
+        enviar_trabajo('trabajo', 'prueba', lento)
+    resultado = mostrar_trabajo('trabajo', "Probando")
+    if resultado:
+        st.write(resultado)
+
+
+def test_ui_muestra_progreso_y_luego_el_resultado():
+    at = AppTest.from_function(_app_trabajo).run()
+    assert len(at.get('progress')) == 1
+    time.sleep(0.6)
+    at.run()
+    # Trabajo terminado: sin barra (el fragmento que sondea ya no se dibuja)
+    assert len(at.get('progress')) == 0
+    assert [m.value for m in at.markdown] == ['listo']
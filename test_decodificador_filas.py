@@ -0,0 +1,126 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Pruebas de la decodificación en bloque de respuestas de PostgREST
+(src/data/decodificador_filas.py).
+
+Uso:
+    python -m pytest -q test_decodificador_filas.py
+"""
+
+import sys
+from datetime import datetime, timezone
+from decimal import Decimal
+
+sys.path.append('.')
+
+from src.data import decodificador_filas
+from src.data.decodificador_filas import (
+    BOOLEANO, DECIMAL, ENTERO, FECHA, NUMERO, a_booleano, construir_modelos, decodificar_columnas,
+    decodificar_filas, parsear_fecha, parsear_fechas,
+)
+from src.data.models import Cliente, PoliticasEntrega
+
+UTC = timezone.utc
+
+
+def _contar_parseo_tolerante(monkeypatch) -> list:
+    """Registra los valores que pasan por el parseo tolerante (parsear_fecha)"""
+    llamadas = []
+    original = decodificador_filas.parsear_fecha
+    monkeypatch.setattr(decodificador_filas, 'parsear_fecha', lambda v: llamadas.append(v) or original(v))
+    return llamadas
+
+
+def test_fechas_con_z_y_fracciones():
+    valores = [
+        '2024-05-01T10:20:30Z',
+        '2024-05-01T10:20:30.1+00:00',
+        '2024-05-01T10:20:30.12+00:00',
+        '2024-05-01T10:20:30.123Z',
+        '2024-05-01T10:20:30.1234+00:00',
+        '2024-05-01T10:20:30.12345+00:00',
+        '2024-05-01T10:20:30.123456+00:00',
+    ]
+    microsegundos = [0, 100000, 120000, 123000, 123400, 123450, 123456]
+    esperado = [datetime(2024, 5, 1, 10, 20, 30, us, tzinfo=UTC) for us in microsegundos]
+    assert parsear_fechas(valores) == esperado
+    assert [parsear_fecha(v) for v in valores] == esperado
+
+
+def test_fechas_vacias_y_datetime():
+    ya_parseada = datetime(2024, 1, 2, 3, 4, 5, tzinfo=UTC)
+    assert parsear_fechas(['', None, ya_parseada]) == [None, None, ya_parseada]
+    assert parsear_fecha('') is None
+    assert parsear_fecha(None) is None
+
+
+def test_columna_con_basura_no_afecta_a_las_demas(monkeypatch):
+    llamadas = _contar_parseo_tolerante(monkeypatch)
+    filas = [
+        {'creado_en': '2024-05-01T10:20:30.12Z', 'actualizado_en': 'no es fecha'},
+        {'creado_en': '2024-05-02T10:20:30Z', 'actualizado_en': '2024-05-02T11:00:00.5Z'},
+    ]
+    columnas = decodificar_columnas(filas, {'creado_en': FECHA, 'actualizado_en': FECHA})
+
+    assert columnas['creado_en'] == [
+        datetime(2024, 5, 1, 10, 20, 30, 120000, tzinfo=UTC),
+        datetime(2024, 5, 2, 10, 20, 30, tzinfo=UTC),
+    ]
+    assert columnas['actualizado_en'] == [None, datetime(2024, 5, 2, 11, 0, 0, 500000, tzinfo=UTC)]
+    if decodificador_filas._FROMISOFORMAT_COMPLETO:
+        # Solo la columna con el valor inválido se repite valor por valor
+        assert llamadas == ['no es fecha', '2024-05-02T11:00:00.5Z']
+
+
+def test_a_booleano_desde_texto():
+    assert a_booleano('true') is True
+    assert a_booleano(' TRUE ') is True
+    assert a_booleano('false') is False
+    assert a_booleano('si') is False
+    assert a_booleano('') is False
+    assert a_booleano(None) is None
+    assert a_booleano(1) is True
+    assert a_booleano(0) is False
+
+
+def test_conversion_por_tipo_con_vacios():
+    filas = [
+        {'id': '7', 'valor': '1800.5', 'activo': 'true', 'precio': '12.30'},
+        {'id': 8, 'valor': 300, 'activo': False, 'precio': 5},
+        {'id': '', 'valor': '', 'activo': None, 'precio': ''},
+        {'id': None, 'valor': 'abc', 'activo': 'false', 'precio': 'abc'},
+    ]
+    decodificar_filas(filas, {'id': ENTERO, 'valor': NUMERO, 'activo': BOOLEANO, 'precio': DECIMAL})
+    assert [f['id'] for f in filas] == [7, 8, None, None]
+    assert [f['valor'] for f in filas] == [1800.5, 300.0, None, None]
+    assert [f['activo'] for f in filas] == [True, False, None, False]
+    assert [f['precio'] for f in filas] == [Decimal('12.30'), Decimal('5'), None, None]
+
+
+def test_columnas_ausentes_no_se_agregan():
+    filas = decodificar_filas([{'id': '1'}, {'id': '2', 'creado_en': '2024-05-01T00:00:00Z'}],
+                              {'id': ENTERO, 'creado_en': FECHA})
+    assert filas[0] == {'id': 1}
+    assert filas[1]['creado_en'] == datetime(2024, 5, 1, tzinfo=UTC)
+    assert decodificar_filas(None, {'id': ENTERO}) == []
+
+
+def test_construir_modelos_omite_filas_incompletas():
+    filas = [
+        {'id': 1, 'descripcion': 'Entrega en 8 días', 'created_at': '2024-05-01T10:20:30.1Z'},
+        {'id': 2},  # falta 'descripcion', obligatorio
+        {'id': 3, 'descripcion': 'Entrega en 15 días', 'columna_nueva': 'ignorada'},
+    ]
+    politicas = construir_modelos(PoliticasEntrega, filas, {'created_at': FECHA})
+    assert [p.id for p in politicas] == [1, 3]
+    assert politicas[0].created_at == datetime(2024, 5, 1, 10, 20, 30, 100000, tzinfo=UTC)
+    assert politicas[1].created_at is None
+
+
+def test_construir_modelos_camino_rapido():
+    filas = [{'id': 1, 'nombre': 'Uno'}, {'id': 2, 'nombre': 'Dos', 'codigo': '900'}]
+    clientes = construir_modelos(Cliente, filas)
+    assert clientes == [Cliente(id=1, nombre='Uno'), Cliente(id=2, nombre='Dos', codigo='900')]
+    assert construir_modelos(Cliente, None) == []
@@ -0,0 +1,56 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Pruebas del grafo de cálculo de la cotización (src/logic/grafo_cotizacion.py).
+
+Uso:
+    python -m pytest -q test_grafo_cotizacion.py
+"""
+
+import sys
+
+sys.path.append('.')
+
+from ayudas_pruebas import ENTRADAS, BDPrecios, evaluar
+from src.data.cache_datos import cache_datos, CATALOGO
+from src.logic.grafo_cotizacion import NODOS_BD, construir_grafo_cotizacion
+
+
+def test_solo_escalas_recalcula_resultados():
+    grafo = construir_grafo_cotizacion(BDPrecios(), version=lambda: 0)
+    evaluar(grafo)
+    evaluar(grafo, {**ENTRADAS, 'escalas': [2000, 3000]})
+    assert grafo.ultimos_recalculados == ['resultados']
+
+
+def test_precios_no_se_releen_sin_cambio_de_version():
+    bd = BDPrecios()
+    grafo = construir_grafo_cotizacion(bd, version=lambda: 0)
+    evaluar(grafo)
+    evaluar(grafo, {**ENTRADAS, 'rentabilidad_ajustada': 35.0})
+    assert bd.lecturas == 2
+
+
+def test_cambio_de_catalogo_relee_precios():
+    bd = BDPrecios()
+    grafo = construir_grafo_cotizacion(bd)
+    antes = evaluar(grafo)
+    # Otra sesión cambia el precio desde la aplicación
+    bd.valor_material = 2000.0
+    cache_datos.invalidar(CATALOGO)
+    despues = evaluar(grafo)
+    assert bd.lecturas == 4
+    assert set(NODOS_BD) <= set(grafo.ultimos_recalculados)
+    assert despues['valor_material'] == 2000.0
+    assert despues['resultados'][0]['valor_unidad'] > antes['resultados'][0]['valor_unidad']
+
+
+def test_franja_de_ttl_relee_precios():
+    bd = BDPrecios()
+    franja = [0]
+    grafo = construir_grafo_cotizacion(bd, version=lambda: franja[0])
+    evaluar(grafo, objetivos=NODOS_BD)
+    franja[0] += 1
+    evaluar(grafo, objetivos=NODOS_BD)
+    assert bd.lecturas == 4
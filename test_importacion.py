@@ -0,0 +1,109 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Pruebas de los importadores masivos: precios (src/logic/importacion_precios.py) y
+clientes/referencias (src/logic/importacion_clientes.py).
+
+El importador de clientes corre contra el Supabase falso en proceso de
+benchmarks/supabase_falso.py.
+
+Uso:
+    python -m pytest -q test_importacion.py
+"""
+
+import contextlib
+import io
+import sys
+
+sys.path.append('.')
+
+import pytest
+import streamlit.logger
+
+streamlit.logger.set_log_level('error')
+
+from benchmarks.supabase_falso import BaseFalsa, ClienteSupabaseFalso, CLAVE_USUARIOS, poblar_base
+from src.data.database import DBManager
+from src.logic.importacion_clientes import ImportadorClientes, leer_filas, limpiar_codigo, mapa_comerciales
+from src.logic.importacion_precios import leer_archivo_precios, validar_precios
+
+
+# --- Precios ---
+
+CATALOGO = [
+    {'id': 1, 'code': 'PELB-ACR', 'valor': 1800, 'descripcion': 'PELB + ACR'},
+    {'id': 2, 'code': 'LAM', 'valor': 920, 'descripcion': 'Laminado'},
+]
+
+
+def test_precios_separados_por_punto_y_coma_con_miles():
+    filas = leer_archivo_precios('código;valor\npelb-acr;1.850\nLAM;920\n'.encode('utf-8'), 'lista.csv')
+    resultado = validar_precios(filas, CATALOGO)
+    assert resultado.valido
+    assert [(c.id, c.valor_actual, c.valor_nuevo) for c in resultado.cambios] == [(1, 1800, 1850)]
+    assert resultado.sin_cambio == ['LAM']
+
+
+def test_precios_errores_por_fila():
+    contenido = b'codigo,valor\nPELB-ACR,abc\nNOEXISTE,10\nLAM,-5\nLAM,900\n'
+    resultado = validar_precios(leer_archivo_precios(contenido, 'lista.csv'), CATALOGO)
+    assert not resultado.valido
+    assert len(resultado.errores) == 4
+    assert resultado.errores[0].startswith('Fila 2:')
+
+
+def test_precios_columnas_obligatorias():
+    with pytest.raises(ValueError):
+        leer_archivo_precios(b'referencia,precio\nX,1\n', 'lista.csv')
+
+
+# --- Clientes ---
+
+@pytest.mark.parametrize('codigo, esperado', [
+    ('900123456', 900123456),
+    ('900.123.456', 900123456),
+    ('900.123.456-7', 9001234567),
+    ('900123.0', 900123),
+    (900123.0, 900123),
+    (900123, 900123),
+    ('', None),
+    ('NIT 900', None),
+    (900123.5, None),
+    (float('nan'), None),
+])
+def test_limpiar_codigo(codigo, esperado):
+    assert limpiar_codigo(codigo) == esperado
+
+
+def _sesion_administrador():
+    base = BaseFalsa()
+    usuarios = poblar_base(base, comerciales=1, clientes=5, cotizaciones_previas=1)
+    admin = next(u for u in usuarios if u['rol'] == 'administrador')
+    cliente = ClienteSupabaseFalso(base)
+    cliente.auth.sign_in_with_password({'email': admin['email'], 'password': CLAVE_USUARIOS})
+    return DBManager(cliente), usuarios
+
+
+def test_importar_clientes_y_referencias():
+    db, usuarios = _sesion_administrador()
+    comercial = usuarios[0]
+    contenido = (
+        'Nombre,NIT,Referencia,Comercial\n'
+        f'Zapatería Nueva,900.555.111,Etiqueta caja,{comercial["email"]}\n'
+        'Zapatería Nueva,900555111.0,Etiqueta bolsa,\n'
+        'Sin NIT,abc,,\n'
+        f'CLIENTE 0001 S.A.S,900000001,,{comercial["email"]}\n'
+    ).encode('utf-8')
+    importador = ImportadorClientes(db, mapa_comerciales([comercial]), comercial_por_defecto=comercial['id'],
+                                    tamano_lote=2)
+    with contextlib.redirect_stdout(io.StringIO()):
+        reporte = importador.importar(leer_filas(contenido, 'clientes.csv'))
+
+    assert reporte.filas_leidas == 4
+    assert reporte.clientes_creados == 1
+    assert reporte.clientes_existentes == 1
+    assert reporte.referencias_creadas == 2
+    assert [fila for fila, _ in reporte.rechazos] == [4]
+    nuevo = db.get_indice_clientes().obtener_por_codigo(900555111)
+    assert nuevo is not None and nuevo.nombre == 'Zapatería Nueva'
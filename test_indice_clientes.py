@@ -0,0 +1,68 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Pruebas del índice de búsqueda de clientes (src/data/indice_clientes.py) y de su
+vigencia entre sesiones en DBManager.get_indice_clientes.
+
+Las sesiones usan el Supabase falso en proceso de benchmarks/supabase_falso.py.
+
+Uso:
+    python -m pytest -q test_indice_clientes.py
+"""
+
+import sys
+import time
+
+sys.path.append('.')
+
+import streamlit.logger
+
+streamlit.logger.set_log_level('error')
+
+from ayudas_pruebas import sesiones
+from src.data.database import DBManager
+from src.data.indice_clientes import IndiceClientes
+from src.data.models import Cliente
+
+
+def _contar_lecturas(db: DBManager) -> list:
+    lecturas = []
+    original = db.get_clientes
+    db.get_clientes = lambda: lecturas.append(1) or original()
+    return lecturas
+
+
+def test_busqueda_por_nombre_y_nit():
+    indice = IndiceClientes([
+        Cliente(id=1, nombre='ETIQUETAS CÍA. S.A.S', codigo=900123456),
+        Cliente(id=2, nombre='Flexoimpresos Ltda', codigo=800555444),
+    ])
+    assert [c.id for c in indice.buscar('etiquetas cia')] == [1]
+    assert [c.id for c in indice.buscar('impres')] == [2]
+    assert [c.id for c in indice.buscar('800555')] == [2]
+
+
+def test_cliente_creado_en_otra_sesion_aparece():
+    _, _, (ana, luis) = sesiones()
+    assert not ana.buscar_clientes('zapateria')
+    luis.crear_clientes_lote([{'nombre': 'Zapatería Nueva', 'codigo': 900555111}])
+    assert [c.nombre for c in ana.buscar_clientes('zapateria')] == ['Zapatería Nueva']
+
+
+def test_escritura_propia_no_reconstruye():
+    _, _, (ana, _luis) = sesiones()
+    lecturas = _contar_lecturas(ana)
+    ana.get_indice_clientes()
+    ana.crear_clientes_lote([{'nombre': 'Papelería Sur', 'codigo': 900777888}])
+    assert [c.nombre for c in ana.buscar_clientes('papeleria')] == ['Papelería Sur']
+    assert len(lecturas) == 1
+
+
+def test_cambios_fuera_de_la_aplicacion_se_ven_al_vencer():
+    base, _, (ana, _luis) = sesiones()
+    ana.TTL_INDICES = 0.05
+    ana.get_indice_clientes()
+    base.insertar('clientes', {'nombre': 'Importado Directo', 'codigo': 900999000})
+    time.sleep(0.1)
+    assert [c.nombre for c in ana.buscar_clientes('importado')] == ['Importado Directo']
@@ -0,0 +1,87 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Pruebas de la vigencia del índice de cotizaciones entre sesiones
+(DBManager.get_indice_cotizaciones / buscar_cotizaciones).
+
+Las sesiones usan el Supabase falso en proceso de benchmarks/supabase_falso.py.
+
+Uso:
+    python -m pytest -q test_indice_cotizaciones.py
+"""
+
+import sys
+import time
+
+sys.path.append('.')
+
+import streamlit.logger
+
+streamlit.logger.set_log_level('error')
+
+from ayudas_pruebas import sesiones
+from src.data.database import DBManager
+
+
+def _contar_construcciones(db: DBManager) -> list:
+    """Cuenta las lecturas de la primera página del índice (una por construcción)"""
+    construcciones = []
+    original = db._retry_operation
+
+    def _contar(nombre, operacion, *args, **kwargs):
+        if nombre.startswith('leer cotizaciones para el índice (desde 0)'):
+            construcciones.append(1)
+        return original(nombre, operacion, *args, **kwargs)
+
+    db._retry_operation = _contar
+    return construcciones
+
+
+def _crear(db: DBManager, usuario: dict, descripcion: str, identificador: str) -> int:
+    _referencia_id, cotizacion_id = db.crear_referencia_y_cotizacion(
+        {'cliente_id': 1, 'descripcion': descripcion, 'id_usuario': usuario['id']},
+        {'identificador': identificador, 'numero_cotizacion': 990000, 'estado_id': 1,
+         'id_usuario': usuario['id'], 'fecha_creacion': '2026-10-18T10:00:00'},
+    )
+    return cotizacion_id
+
+
+def test_cotizacion_creada_en_otra_sesion_aparece():
+    _, usuarios, (ana, luis) = sesiones(cotizaciones_previas=5)
+    assert not ana.buscar_cotizaciones('zapatos')
+    cotizacion_id = _crear(luis, usuarios[1], 'Etiqueta zapatos', 'ET PELB 50x50 ZAPATOS 990000')
+    assert [c.id for c in ana.buscar_cotizaciones('zapatos')] == [cotizacion_id]
+
+
+def test_escritura_propia_no_reconstruye():
+    _, usuarios, (ana, _luis) = sesiones(cotizaciones_previas=5)
+    construcciones = _contar_construcciones(ana)
+    ana.get_indice_cotizaciones()
+    cotizacion_id = _crear(ana, usuarios[0], 'Etiqueta bolsos', 'ET PELB 40x40 BOLSOS 990000')
+    assert [c.id for c in ana.buscar_cotizaciones('bolsos')] == [cotizacion_id]
+    assert len(construcciones) == 1
+
+
+def test_escritura_de_otra_sesion_reconstruye_una_vez():
+    _, usuarios, (ana, luis) = sesiones(cotizaciones_previas=5)
+    construcciones = _contar_construcciones(ana)
+    ana.get_indice_cotizaciones()
+    _crear(luis, usuarios[1], 'Etiqueta vinos', 'ET PELB 60x60 VINOS 990000')
+    ana.buscar_cotizaciones('vinos')
+    ana.buscar_cotizaciones('vinos')
+    assert len(construcciones) == 2
+
+
+def test_cambios_fuera_de_la_aplicacion_se_ven_al_vencer():
+    base, usuarios, (ana, _luis) = sesiones(cotizaciones_previas=5)
+    ana.TTL_INDICES = 0.05
+    ana.get_indice_cotizaciones()
+    referencia = base.insertar('referencias_cliente', {'cliente_id': 1, 'descripcion': 'Carga directa',
+                                                       'id_usuario': usuarios[0]['id']})
+    cotizacion = base.insertar('cotizaciones', {'referencia_cliente_id': referencia['id'],
+                                                'identificador': 'ET CARGA DIRECTA', 'numero_cotizacion': 990001,
+                                                'estado_id': 1, 'id_usuario': usuarios[0]['id'],
+                                                'fecha_creacion': '2026-10-18T10:00:00'})
+    time.sleep(0.1)
+    assert [c.id for c in ana.buscar_cotizaciones('directa')] == [cotizacion['id']]
@@ -0,0 +1,76 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Pruebas de los modelos compactos para listados (src/data/models.py): CotizacionResumen,
+LoteCotizaciones y EscalaCompacta / PrecioEscalaCompacto.
+
+Uso:
+    python -m pytest -q test_modelos_compactos.py
+"""
+
+import sys
+from datetime import datetime
+
+sys.path.append('.')
+
+import pytest
+
+from src.data.models import (
+    CotizacionResumen, Escala, EscalaCompacta, LoteCotizaciones, PrecioEscala, PrecioEscalaCompacto,
+)
+
+FILAS = [
+    {'id': 3, 'numero_cotizacion': 103, 'referencia': 'Etiqueta caja', 'cliente_nombre': 'ACME', 'estado_id': 1},
+    {'id': 1, 'numero_cotizacion': 101, 'referencia': 'Etiqueta bolsa', 'cliente': 'VLAMOS'},
+    {'id': 2, 'numero_cotizacion': 102, 'extra': 'x'},
+]
+
+
+def test_lote_columnar_completa_claves_faltantes():
+    lote = LoteCotizaciones.from_filas(FILAS)
+    assert len(lote) == 3
+    assert lote.nombres_columnas == ['id', 'numero_cotizacion', 'referencia', 'cliente_nombre', 'estado_id',
+                                     'cliente', 'extra']
+    assert lote.columna('extra') == [None, None, 'x']
+    assert lote.columna('no_existe') == [None, None, None]
+
+
+def test_lote_filas_como_resumen():
+    lote = LoteCotizaciones.from_filas(FILAS)
+    assert lote.fila(1) == CotizacionResumen(id=1, numero_cotizacion=101, referencia='Etiqueta bolsa',
+                                             cliente_nombre='VLAMOS')
+    assert [r.id for r in lote] == [3, 1, 2]
+
+
+def test_lote_seleccionar_respeta_el_orden_y_omite_inexistentes():
+    lote = LoteCotizaciones.from_filas(FILAS)
+    seleccion = lote.seleccionar([2, 99, 3])
+    assert seleccion.columna('id') == [2, 3]
+    df = seleccion.to_dataframe()
+    assert list(df['numero_cotizacion']) == [102, 103]
+    assert list(df.columns) == lote.nombres_columnas
+    vacio = lote.seleccionar([]).to_dataframe()
+    assert vacio.empty and 'estado_id' in vacio.columns
+
+
+def test_lote_rechaza_columnas_de_distinto_largo():
+    with pytest.raises(ValueError):
+        LoteCotizaciones({'id': [1, 2], 'estado_id': [1]})
+
+
+def test_escala_compacta_ida_y_vuelta():
+    fecha = datetime(2026, 1, 1)
+    escala = Escala(id=7, cotizacion_id=3, escala=1000, valor_unidad=120.0, metros=100.0, precios=[
+        PrecioEscala(id=1, escala_id=7, precio=118.0, tipo_precio='normal', created_at=fecha),
+        PrecioEscala(id=2, escala_id=7, precio=110.0, tipo_precio='especial', created_at=fecha),
+    ])
+    compacta = EscalaCompacta.from_escala(escala)
+    assert not hasattr(compacta, '__dict__')
+    assert not hasattr(compacta.precios[0], '__dict__')
+    assert isinstance(compacta.precios[0], PrecioEscalaCompacto)
+    assert compacta.precio_normal == 118.0
+    assert compacta.obtener_precio('especial') == 110.0
+    assert compacta.to_escala() == escala
+    # Como Escala.from_dict, from_dict no lee los precios
+    assert EscalaCompacta.from_dict(escala.to_dict()).to_escala() == Escala.from_dict(escala.to_dict())
@@ -0,0 +1,195 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Pruebas de paridad entre CalculadoraLitografia, CalculadoraCostosEscala y kernel_precio.
+
+Ambas calculadoras son envoltorios del núcleo (src/logic/calculators/kernel_precio.py):
+para la misma configuración y la misma unidad de montaje deben producir exactamente los
+mismos valores de Q3/S3, plancha, troquel, área y desperdicio de tintas. También se
+verifica que el cálculo por escala a partir del plan coincida con los métodos por paso
+y con la curva de precio.
+
+Uso:
+    python test_paridad_calculadoras.py
+    python -m pytest -q test_paridad_calculadoras.py
+"""
+
+import io
+import itertools
+import contextlib
+import sys
+
+sys.path.append('.')
+
+from src.logic.calculators import kernel_precio
+from src.logic.calculators.calculadora_costos_escala import CalculadoraCostosEscala, DatosEscala
+from src.logic.calculators.calculadora_litografia import CalculadoraLitografia, DatosLitografia
+from src.logic.calculators.curva_precio import CurvaPrecio
+from src.config.constants import GAP_AVANCE_ETIQUETAS, GAP_AVANCE_MANGAS
+
+ESCALAS = [1000, 2000, 3000, 5000, 10000, 50000, 100000]
+
+# (es_manga, ancho, avance, pistas) - anchos de manga ya ajustados como en la app
+CONFIGURACIONES = [
+    (False, 50.0, 70.0, 3),
+    (False, 80.0, 120.0, 2),
+    (False, 100.0, 40.0, 1),
+    (False, 30.0, 108.0, 4),
+    (True, 180.0, 120.0, 1),
+    (True, 166.0, 200.0, 1),
+]
+TINTAS = [0, 1, 4, 7]
+
+
+def _silencio():
+    """Las calculadoras imprimen debug en cada paso"""
+    return contextlib.redirect_stdout(io.StringIO())
+
+
+def _casos():
+    for (es_manga, ancho, avance, pistas), num_tintas, troquel_existe, separadas in itertools.product(
+            CONFIGURACIONES, TINTAS, [False, True], [False, True]):
+        yield es_manga, ancho, avance, pistas, num_tintas, troquel_existe, separadas
+
+
+def _datos(es_manga, ancho, avance, pistas, num_tintas, troquel_existe, separadas):
+    with _silencio():
+        datos_escala = DatosEscala(
+            escalas=ESCALAS,
+            pistas=pistas,
+            ancho=ancho,
+            avance=avance,
+            avance_total=avance + (GAP_AVANCE_MANGAS if es_manga else GAP_AVANCE_ETIQUETAS),
+            desperdicio=0,
+            rentabilidad=45.0 if es_manga else 40.0,
+            porcentaje_desperdicio=30.0 if es_manga else 10.0,
+            troquel_existe=troquel_existe,
+            planchas_por_separado=separadas
+        )
+    datos_lito = DatosLitografia(
+        ancho=ancho, avance=avance, pistas=pistas,
+        planchas_por_separado=separadas, troquel_existe=troquel_existe
+    )
+    return datos_escala, datos_lito
+
+
+def test_q3_s3():
+    costos, lito = CalculadoraCostosEscala(), CalculadoraLitografia()
+    for es_manga, ancho, avance, pistas, *_ in _casos():
+        q3 = kernel_precio.calcular_q3(ancho, pistas, es_manga)
+        assert costos.calcular_q3(ancho, pistas, es_manga)['q3'] == q3
+        assert lito.calcular_q3(ancho, pistas, es_manga)['q3'] == q3
+        assert lito.calcular_s3(ancho, pistas, es_manga)['s3'] == kernel_precio.calcular_s3(q3)
+
+
+def test_plancha_troquel_area():
+    costos, lito = CalculadoraCostosEscala(), CalculadoraLitografia()
+    for caso in _casos():
+        es_manga, _, _, _, num_tintas, troquel_existe, _ = caso
+        datos_escala, datos_lito = _datos(*caso)
+        for tipo_grafado_id in ([1, 4] if es_manga else [None]):
+            with _silencio():
+                opcion = costos.obtener_opcion_montaje(datos_escala, es_manga)
+
+                plancha_costos = costos.calcular_valor_plancha(datos_escala, num_tintas, es_manga, opcion=opcion)
+                plancha_lito = lito.calcular_precio_plancha(datos_lito, num_tintas, es_manga, opcion=opcion)
+                assert plancha_lito['precio'] == plancha_costos, caso
+
+                troquel_costos = costos.calcular_valor_troquel(datos_escala, es_manga, tipo_grafado_id, opcion=opcion)
+                troquel_lito = lito.calcular_valor_troquel(
+                    datos_lito, opcion.repeticiones, troquel_existe=troquel_existe,
+                    tipo_grafado_id=tipo_grafado_id, es_manga=es_manga
+                )
+                assert troquel_lito['valor'] == troquel_costos, caso
+
+                area_costos = costos.calcular_area_etiqueta(datos_escala, num_tintas, es_manga, opcion=opcion)
+                area_lito = lito.calcular_area_etiqueta(
+                    datos_lito, num_tintas, opcion.medida_mm, opcion.repeticiones, es_manga
+                )
+                assert area_lito['area'] == area_costos['area'], caso
+
+
+def test_desperdicio_tintas():
+    costos, lito = CalculadoraCostosEscala(), CalculadoraLitografia()
+    valor_material = 1800.0
+    for caso in _casos():
+        es_manga, _, _, _, num_tintas, _, _ = caso
+        datos_escala, datos_lito = _datos(*caso)
+        with _silencio():
+            desp_costos = costos.calcular_desperdicio_tintas(datos_escala, num_tintas, valor_material, es_manga)
+            s3 = lito.calcular_s3(datos_lito.ancho, datos_lito.pistas, es_manga)['s3']
+            desp_lito = lito.calcular_desperdicio_por_escala(
+                datos_lito, num_tintas, valor_material, 1000, es_manga, s3=s3, area_etiqueta=0
+            )
+        esperado = desp_costos['desperdicio_tintas']
+        if es_manga:
+            assert desp_lito['valor'] == esperado, caso
+        else:
+            assert desp_lito['detalles']['primera_parte'] == esperado, caso
+
+
+def test_escala_contra_metodos_por_paso():
+    """calcular_escala (plan) vs la composición de los métodos por paso"""
+    costos = CalculadoraCostosEscala()
+    valor_material, valor_acabado = 1800.0, 300.0
+    for caso in _casos():
+        es_manga, _, _, _, num_tintas, _, _ = caso
+        datos, _ = _datos(*caso)
+        with _silencio():
+            plan = costos.preparar_plan(datos, num_tintas, None, None, valor_material, valor_acabado, es_manga, 1)
+            for escala in ESCALAS:
+                resultado = costos.calcular_escala(plan, escala)
+
+                metros = costos.calcular_metros(escala, datos, es_manga)
+                tiempo = costos.calcular_tiempo_horas(metros, datos)
+                mo_y_maq = costos.calcular_mo_y_maq(tiempo, num_tintas, datos, es_manga)
+                tintas = costos.calcular_tintas(escala, num_tintas, datos.area_etiqueta, datos)
+                papel_lam = costos.calcular_papel_lam(escala, datos.area_etiqueta, valor_material, valor_acabado)
+                desperdicio = plan.desperdicio_tintas + papel_lam * plan.porcentaje_desperdicio
+                suma = costos.calcular_montaje(num_tintas, datos) + mo_y_maq + tintas + papel_lam + desperdicio
+                valor_unidad = costos.calcular_valor_unidad_full(
+                    suma, datos, escala, plan.valor_plancha, plan.valor_troquel
+                )
+
+                assert resultado['metros'] == metros, caso
+                assert resultado['mo_y_maq'] == mo_y_maq, caso
+                assert resultado['tintas'] == tintas, caso
+                assert resultado['papel_lam'] == papel_lam, caso
+                assert resultado['valor_unidad'] == valor_unidad, (caso, escala)
+
+
+def test_curva_contra_escalas():
+    costos = CalculadoraCostosEscala()
+    for caso in _casos():
+        es_manga, _, _, _, num_tintas, _, _ = caso
+        datos, _ = _datos(*caso)
+        with _silencio():
+            plan = costos.preparar_plan(datos, num_tintas, None, None, 1800.0, 300.0, es_manga, 1)
+            resultados = costos.calcular_costos_por_escala(
+                datos, num_tintas, None, None, 1800.0, 300.0, es_manga, 1, plan=plan
+            )
+        curva = CurvaPrecio.desde_plan(plan)
+        for resultado in resultados:
+            esperado = resultado['valor_unidad']
+            assert abs(curva.valor_unidad(resultado['escala']) - esperado) <= 1e-9 * max(1.0, abs(esperado)), caso
+
+
+def main():
+    """Ejecuta todas las pruebas de paridad e imprime un resumen"""
+    pruebas = [test_q3_s3, test_plancha_troquel_area, test_desperdicio_tintas,
+               test_escala_contra_metodos_por_paso, test_curva_contra_escalas]
+    fallas = 0
+    for prueba in pruebas:
+        try:
+            prueba()
+            print(f"OK     {prueba.__name__}")
+        except AssertionError as e:
+            fallas += 1
+            print(f"FALLA  {prueba.__name__}: {e}")
+    print(f"\n{len(pruebas) - fallas}/{len(pruebas)} pruebas de paridad correctas")
+    return 1 if fallas else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,180 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Pruebas del PDF de cotización anticipado (src/pdf/pdf_anticipado.py): versiones por
+guardado, dueño de cada entrada y cancelación del render en la cola de trabajos.
+
+Uso:
+    python -m pytest -q test_pdf_anticipado.py
+"""
+
+import sys
+import threading
+import time
+
+import pytest
+
+sys.path.append('.')
+
+from src.pdf import pdf_anticipado
+from src.pdf.pdf_anticipado import CachePDF, nombre_archivo_pdf, renderizar_pdf_anticipado
+from src.utils.cola_trabajos import CANCELADO, ColaTrabajos
+
+DATOS = {'identificador': 'ET-ANA-0001', 'consecutivo': 1}
+
+
+class BDFalsa:
+    """Solo la hidratación que usa renderizar_pdf_anticipado"""
+
+    def __init__(self, datos=DATOS):
+        self.datos = datos
+
+    def get_datos_completos_cotizacion(self, cotizacion_id):
+        return self.datos
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    """CachePDF nueva en lugar de la del proceso"""
+    cache = CachePDF()
+    monkeypatch.setattr(pdf_anticipado, 'cache_pdf', cache)
+    return cache
+
+
+@pytest.fixture
+def renders(monkeypatch):
+    """Reemplaza el render real; registra los datos de cada llamada"""
+    llamadas = []
+    monkeypatch.setattr(pdf_anticipado, 'generar_bytes_pdf_cotizacion',
+                        lambda datos: llamadas.append(datos) or b'%PDF-prueba')
+    return llamadas
+
+
+def test_nueva_version_sube_por_cotizacion():
+    cache = CachePDF()
+    assert cache.nueva_version(7) == 1
+    assert cache.nueva_version(7) == 2
+    assert cache.nueva_version(8) == 1
+
+
+def test_nueva_version_libera_pdf_anterior():
+    cache = CachePDF()
+    version = cache.nueva_version(7)
+    assert cache.guardar(7, version, 'ana', b'v1', 'a.pdf')
+    otra = cache.nueva_version(8)
+    cache.guardar(8, otra, 'ana', b'otra', 'b.pdf')
+
+    cache.nueva_version(7)
+    assert cache.obtener(7, version, 'ana') is None
+    assert cache.obtener(8, otra, 'ana').pdf == b'otra'
+    assert cache.estadisticas()['entradas'] == 1
+
+
+def test_version_obsoleta_no_se_guarda():
+    cache = CachePDF()
+    vieja = cache.nueva_version(7)
+    vigente = cache.nueva_version(7)
+    assert not cache.guardar(7, vieja, 'ana', b'viejo', 'a.pdf')
+    assert cache.obtener(7, vieja, 'ana') is None
+    assert cache.guardar(7, vigente, 'ana', b'nuevo', 'a.pdf')
+    assert cache.obtener(7, vigente, 'ana').pdf == b'nuevo'
+    # Sin nueva_version no hay versión vigente
+    assert not cache.guardar(9, 1, 'ana', b'x', 'c.pdf')
+
+
+def test_solo_el_propietario_obtiene_el_pdf():
+    cache = CachePDF()
+    version = cache.nueva_version(7)
+    cache.guardar(7, version, 'ana', b'pdf', 'a.pdf')
+    assert cache.obtener(7, version, 'luis') is None
+    assert cache.obtener(7, version, None) is None
+    assert cache.obtener(7, version, 'ana').nombre == 'a.pdf'
+    estadisticas = cache.estadisticas()
+    assert (estadisticas['aciertos'], estadisticas['fallos']) == (1, 2)
+
+
+def test_vencimiento_y_lru():
+    vencida = CachePDF(ttl=0)
+    version = vencida.nueva_version(7)
+    vencida.guardar(7, version, 'ana', b'pdf', 'a.pdf')
+    assert vencida.obtener(7, version, 'ana') is None
+    assert vencida.estadisticas()['entradas'] == 0
+
+    acotada = CachePDF(max_entradas=2)
+    for cotizacion_id in (1, 2, 3):
+        acotada.guardar(cotizacion_id, acotada.nueva_version(cotizacion_id), 'ana', b'pdf', 'a.pdf')
+    assert acotada.obtener(1, 1, 'ana') is None
+    assert acotada.obtener(3, 1, 'ana') is not None
+    assert acotada.estadisticas()['descartadas'] == 1
+
+
+def test_nombre_archivo():
+    assert nombre_archivo_pdf(DATOS) == 'ET-ANA-0001.pdf'
+    assert nombre_archivo_pdf({'consecutivo': 12}) == 'Cotizacion_12.pdf'
+
+
+def test_render_guarda_en_cache(cache, renders):
+    version = cache.nueva_version(7)
+    assert renderizar_pdf_anticipado(BDFalsa(), 7, version, 'ana') == b'%PDF-prueba'
+    entrada = cache.obtener(7, version, 'ana')
+    assert entrada.pdf == b'%PDF-prueba'
+    assert entrada.nombre == 'ET-ANA-0001.pdf'
+
+
+def test_render_de_version_obsoleta_no_se_sirve(cache, renders):
+    vieja = cache.nueva_version(7)
+    vigente = cache.nueva_version(7)  # se guardó otra vez mientras se renderizaba
+    renderizar_pdf_anticipado(BDFalsa(), 7, vieja, 'ana')
+    assert cache.obtener(7, vieja, 'ana') is None
+    assert cache.obtener(7, vigente, 'ana') is None
+    assert cache.estadisticas()['entradas'] == 0
+
+
+def test_cancelado_antes_de_renderizar(cache, renders):
+    version = cache.nueva_version(7)
+    assert renderizar_pdf_anticipado(BDFalsa(), 7, version, 'ana', cancelado=lambda: True) is None
+    assert renders == []
+    assert cache.estadisticas()['entradas'] == 0
+
+
+def test_cancelado_durante_el_render(cache, renders):
+    version = cache.nueva_version(7)
+    consultas = iter([False, True])
+    assert renderizar_pdf_anticipado(BDFalsa(), 7, version, 'ana', cancelado=lambda: next(consultas)) is None
+    assert len(renders) == 1
+    assert cache.estadisticas()['entradas'] == 0
+
+
+def test_sin_datos_falla(cache, renders):
+    with pytest.raises(ValueError):
+        renderizar_pdf_anticipado(BDFalsa(datos=None), 7, cache.nueva_version(7), 'ana')
+    assert renders == []
+
+
+def test_cancelar_en_la_cola_no_guarda_bytes(cache, monkeypatch):
+    empezo, liberar = threading.Event(), threading.Event()
+
+    def render_lento(datos):
+        empezo.set()
+        liberar.wait(5)
+        return b'%PDF-prueba'
+
+    monkeypatch.setattr(pdf_anticipado, 'generar_bytes_pdf_cotizacion', render_lento)
+    cola = ColaTrabajos(max_trabajadores=1)
+    version = cache.nueva_version(7)
+    trabajo_id = cola.enviar('pdf_cotizacion_anticipado', renderizar_pdf_anticipado, BDFalsa(),
+                             7, version, 'ana', propietario='ana')
+    assert empezo.wait(5)
+    assert cola.cancelar(trabajo_id)
+    liberar.set()
+
+    fin = time.monotonic() + 5
+    while cola.obtener(trabajo_id, 'ana').activo:
+        assert time.monotonic() < fin, "el trabajo no terminó"
+        time.sleep(0.01)
+    trabajo = cola.obtener(trabajo_id, 'ana')
+    assert trabajo.estado == CANCELADO
+    assert trabajo.resultado is None
+    assert cache.obtener(7, version, 'ana') is None
+    assert cache.estadisticas()['entradas'] == 0
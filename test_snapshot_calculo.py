@@ -0,0 +1,77 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Pruebas del snapshot de cálculo de cotizaciones guardadas (src/logic/snapshot_calculo.py).
+
+Uso:
+    python -m pytest -q test_snapshot_calculo.py
+"""
+
+import sys
+
+sys.path.append('.')
+
+from ayudas_pruebas import ENTRADAS, BDPrecios, evaluar_guardado
+from src.logic.cache_calculos import cache_calculos
+from src.logic.grafo_cotizacion import construir_grafo_cotizacion
+from src.logic.snapshot_calculo import (
+    CLAVE_SNAPSHOT, VERSION_SNAPSHOT, SnapshotCalculo, snapshot_desde_parametros,
+)
+from src.utils.metricas import SNAPSHOT_CALCULO
+
+
+def _grafo(bd):
+    # Versión fija: los precios solo se releen si se invalidan los nodos de BD
+    return construir_grafo_cotizacion(bd, version=lambda: 0)
+
+
+def _guardado(bd):
+    """Snapshot como sale de parametros_especiales tras guardar la cotización"""
+    cache_calculos.limpiar()
+    _, snapshot = evaluar_guardado(_grafo(bd))
+    return snapshot_desde_parametros({CLAVE_SNAPSHOT: snapshot.to_dict()})
+
+
+def test_snapshot_reutilizado_sin_calcular():
+    bd = BDPrecios()
+    snapshot = _guardado(bd)
+    grafo = _grafo(bd)
+    antes = SNAPSHOT_CALCULO.valor(resultado='reutilizado')
+    valores, devuelto = evaluar_guardado(grafo, snapshot)
+    assert devuelto is snapshot
+    assert grafo.recalculos['resultados'] == 0
+    assert valores['resultados'] == snapshot.resultados
+    assert SNAPSHOT_CALCULO.valor(resultado='reutilizado') == antes + 1
+
+
+def test_precio_cambiado_en_la_bd_se_detecta_aunque_la_sesion_lo_tenga_memorizado():
+    bd = BDPrecios()
+    snapshot = _guardado(bd)
+    grafo = _grafo(bd)
+    evaluar_guardado(grafo)  # la sesión memoriza el precio viejo
+    bd.valor_material = 2000.0  # cambiado fuera de la aplicación: sin invalidar el catálogo
+    antes = SNAPSHOT_CALCULO.valor(resultado='precios_cambiaron')
+    valores, nuevo = evaluar_guardado(grafo, snapshot)
+    assert SNAPSHOT_CALCULO.valor(resultado='precios_cambiaron') == antes + 1
+    assert valores['valor_material'] == 2000.0
+    assert nuevo.precios['valor_material'] == 2000.0
+    assert nuevo.clave != snapshot.clave
+
+
+def test_entradas_cambiadas_recalculan():
+    bd = BDPrecios()
+    snapshot = _guardado(bd)
+    antes = SNAPSHOT_CALCULO.valor(resultado='entradas_cambiaron')
+    valores, nuevo = evaluar_guardado(_grafo(bd), snapshot, {**ENTRADAS, 'escalas': [2000]})
+    assert SNAPSHOT_CALCULO.valor(resultado='entradas_cambiaron') == antes + 1
+    assert [r['escala'] for r in valores['resultados']] == [2000]
+    assert nuevo.clave != snapshot.clave
+
+
+def test_otra_version_de_snapshot_se_ignora():
+    datos = _guardado(BDPrecios()).to_dict()
+    assert snapshot_desde_parametros({CLAVE_SNAPSHOT: {**datos, 'version': VERSION_SNAPSHOT + 1}}) is None
+    assert snapshot_desde_parametros({CLAVE_SNAPSHOT: {**datos, 'campo_nuevo': 1}}) is None
+    assert snapshot_desde_parametros(None) is None
+    assert isinstance(snapshot_desde_parametros({CLAVE_SNAPSHOT: datos}), SnapshotCalculo)
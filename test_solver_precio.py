@@ -0,0 +1,78 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Pruebas del solver inverso de precios (src/logic/calculators/solver_precio.py).
+
+Uso:
+    python -m pytest -q test_solver_precio.py
+"""
+
+import json
+import sys
+
+import numpy as np
+
+sys.path.append('.')
+
+from src.logic.calculators.curva_precio import CurvaPrecio
+from src.logic.calculators.solver_precio import SolverPrecio
+
+
+def _curva(rentabilidad: float = 0.4) -> CurvaPrecio:
+    return CurvaPrecio(
+        montaje=60000.0,
+        mo_base=150000.0,
+        metros_por_unidad=0.025,
+        velocidad_maquina=80.0,
+        tintas_fijo=12000.0,
+        tintas_por_unidad=0.8,
+        papel_lam_por_unidad=9.5,
+        porcentaje_desperdicio=0.10,
+        desperdicio_tintas=3000.0,
+        rentabilidad=rentabilidad,
+        valor_plancha=120000.0,
+        valor_troquel=80000.0,
+    )
+
+
+def test_escala_minima_para_valor_unidad():
+    curva = _curva()
+    solver = SolverPrecio(curva)
+    for escala_referencia in (500, 1000, 4000, 10000, 50000):
+        objetivo = curva.valor_unidad(escala_referencia)
+        resultado = solver.escala_para_valor_unidad(objetivo)
+        escala = resultado['escala']
+        assert curva.valor_unidad(escala) <= objetivo
+        assert escala == 1 or curva.valor_unidad(escala - 1) > objetivo
+        assert escala <= escala_referencia
+        assert resultado['tramo'] == ('alto' if curva.es_tramo_alto(escala) else 'bajo')
+
+
+def test_valor_objetivo_inalcanzable():
+    solver = SolverPrecio(_curva())
+    resultado = solver.escala_para_valor_unidad(solver.valor_minimo_alcanzable())
+    assert resultado['escala'] is None
+    assert resultado['error']
+
+
+def test_rentabilidad_para_precio_tope():
+    curva = _curva()
+    solver = SolverPrecio(curva)
+    for escala in (1000, 5000, 20000):
+        objetivo = curva.valor_unidad(escala) * 0.95
+        resultado = solver.rentabilidad_para_valor_unidad(escala, objetivo)
+        assert 0 < resultado['rentabilidad'] < curva.rentabilidad
+        assert abs(resultado['valor_unidad'] - objetivo) <= 1e-9 * objetivo
+
+
+def test_rentabilidad_sin_solucion():
+    solver = SolverPrecio(_curva())
+    assert solver.rentabilidad_para_valor_unidad(1000, 1.0)['rentabilidad'] is None
+    assert solver.rentabilidad_para_valor_unidad(0, 100.0)['error']
+
+
+def test_curva_con_valores_numpy_es_serializable():
+    curva = CurvaPrecio(**{**_curva().__dict__, 'metros_por_unidad': np.float64(0.025)})
+    datos = json.loads(json.dumps(curva.to_dict()))
+    assert CurvaPrecio.from_dict(datos) == curva